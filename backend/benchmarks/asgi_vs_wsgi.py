@@ -0,0 +1,210 @@
+"""
+Benchmark: gunicorn sync (WSGI) vs. gunicorn + workers de uvicorn (ASGI)
+con el mismo número de workers, sobre las lecturas calientes (feed,
+detalle y comentarios de una publicación).
+
+Levanta los dos servidores contra la BD configurada en el entorno (la
+misma que usaría entrypoint.sh; debe tener publicaciones), mide cada
+endpoint con N conexiones concurrentes durante D segundos y escribe un
+JSON con peticiones/s, errores y latencias p50/p95/p99 (ms).
+
+Con --autores-lento MS se levanta además un auth_service falso que tarda
+MS en responder, para medir el caso que más bloquea a un worker sync.
+
+Uso (desde backend/):
+    python benchmarks/asgi_vs_wsgi.py --workers 2 --conexiones 64 --duracion 20
+    python benchmarks/asgi_vs_wsgi.py --autores-lento 150 --salida resultado.json
+Requiere httpx y uvicorn-worker (requirements.txt).
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+# ------------------ 🔹 AUTH_SERVICE FALSO ------------------
+def auth_service_lento(puerto, demora_ms):
+    """ POST {"ids": [...]} → nombres, después de `demora_ms`. """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            largo = int(self.headers.get("Content-Length") or 0)
+            ids = json.loads(self.rfile.read(largo) or b"{}").get("ids", [])
+            time.sleep(demora_ms / 1000)
+            cuerpo = json.dumps([{"id": i, "nombre": "Usuario", "apellido": i[:4]} for i in ids]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+# ------------------ 🔹 SERVIDORES ------------------
+def comando(modo, puerto, args):
+    base = ["gunicorn", "--bind", f"127.0.0.1:{puerto}", "--workers", str(args.workers), "--log-level", "warning"]
+    if modo == "asgi":
+        return base + ["-k", "uvicorn_worker.UvicornWorker", "news_service.asgi:application"]
+    return base + ["--threads", str(args.hilos), "news_service.wsgi:application"]
+
+
+def entorno(modo, args):
+    env = dict(os.environ)
+    env["SERVER_MODE"] = modo
+    env.setdefault("DJANGO_DEBUG", "0")
+    if not args.con_cache:
+        env["NEWS_CACHE_RESPUESTAS_TTL"] = "0"
+    if args.autores_lento:
+        env["AUTH_SERVICE_USUARIOS_URL"] = f"http://127.0.0.1:{args.puerto_autores}/"
+        # Sin caché de nombres: cada respuesta con comentarios consulta auth_service
+        env["NEWS_AUTORES_CACHE_TTL"] = "0"
+        env["NEWS_AUTORES_CACHE_TTL_NEGATIVO"] = "0"
+        env["NEWS_AUTORES_RESOLUTORES"] = "news.autores.ResolutorHTTP"
+    return env
+
+
+def esperar_listo(url, timeout=30):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"El servidor no respondió en {url}")
+
+
+# ------------------ 🔹 CARGA ------------------
+def percentil(valores, p):
+    if not valores:
+        return None
+    indice = min(len(valores) - 1, max(0, round(p / 100 * len(valores)) - 1))
+    return round(valores[indice], 2)
+
+
+async def medir(url, conexiones, duracion):
+    latencias = []
+    errores = 0
+    limite = time.monotonic() + duracion
+
+    async def cliente(http):
+        nonlocal errores
+        while time.monotonic() < limite:
+            inicio = time.perf_counter()
+            try:
+                respuesta = await http.get(url)
+                ok = respuesta.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            else:
+                errores += 1
+
+    limites = httpx.Limits(max_connections=conexiones, max_keepalive_connections=conexiones)
+    async with httpx.AsyncClient(limits=limites, timeout=30) as http:
+        inicio = time.monotonic()
+        await asyncio.gather(*(cliente(http) for _ in range(conexiones)))
+        transcurrido = time.monotonic() - inicio
+
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "errores": errores,
+        "rps": round(len(latencias) / transcurrido, 1),
+        "p50_ms": percentil(latencias, 50),
+        "p95_ms": percentil(latencias, 95),
+        "p99_ms": percentil(latencias, 99),
+    }
+
+
+def endpoints(base):
+    feed = httpx.get(f"{base}/api/publicaciones/", timeout=10).json()
+    if not feed.get("results"):
+        raise RuntimeError("No hay publicaciones en la BD: carga datos antes de medir.")
+    pid = feed["results"][0]["id"]
+    return {
+        "feed": f"{base}/api/publicaciones/",
+        "detalle": f"{base}/api/publicaciones/{pid}/",
+        "comentarios": f"{base}/api/publicaciones/{pid}/comentarios/",
+    }
+
+
+def correr_modo(modo, puerto, args):
+    proceso = subprocess.Popen(comando(modo, puerto, args), cwd=BACKEND, env=entorno(modo, args))
+    base = f"http://127.0.0.1:{puerto}"
+    try:
+        esperar_listo(f"{base}/api/publicaciones/")
+        resultados = {}
+        for nombre, url in endpoints(base).items():
+            asyncio.run(medir(url, args.conexiones, min(2, args.duracion)))  # calentamiento
+            resultados[nombre] = asyncio.run(medir(url, args.conexiones, args.duracion))
+            print(f"[{modo}] {nombre}: {resultados[nombre]}", file=sys.stderr)
+        return resultados
+    finally:
+        proceso.send_signal(signal.SIGTERM)
+        proceso.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--hilos", type=int, default=int(os.getenv("GUNICORN_THREADS", "4")),
+                        help="hilos por worker sync (como entrypoint.sh)")
+    parser.add_argument("--conexiones", type=int, default=32)
+    parser.add_argument("--duracion", type=float, default=15, help="segundos por endpoint")
+    parser.add_argument("--modos", default="wsgi,asgi")
+    parser.add_argument("--puerto", type=int, default=8101)
+    parser.add_argument("--con-cache", action="store_true", help="no desactivar la caché de respuestas")
+    parser.add_argument("--autores-lento", type=int, default=0, metavar="MS")
+    parser.add_argument("--puerto-autores", type=int, default=8199)
+    parser.add_argument("--salida", help="archivo JSON (por defecto, stdout)")
+    args = parser.parse_args()
+
+    stub = auth_service_lento(args.puerto_autores, args.autores_lento) if args.autores_lento else None
+    try:
+        resultado = {
+            "configuracion": {
+                "workers": args.workers,
+                "hilos_wsgi": args.hilos,
+                "conexiones": args.conexiones,
+                "duracion_s": args.duracion,
+                "cache_respuestas": args.con_cache,
+                "autores_lento_ms": args.autores_lento,
+            },
+            "modos": {
+                modo: correr_modo(modo, args.puerto + i, args)
+                for i, modo in enumerate(m.strip() for m in args.modos.split(",") if m.strip())
+            },
+        }
+    finally:
+        if stub:
+            stub.shutdown()
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
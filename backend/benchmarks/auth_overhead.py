@@ -0,0 +1,147 @@
+"""
+Micro-benchmark: costo de autenticar una petición (µs por `authenticate`).
+
+Compara, sobre la misma petición con `Authorization: Bearer ...`:
+- antes: jwt.decode en cada petición + SimpleNamespace (lo que había),
+- HS256 y RS256 (JWKS local con `kid`) sin caché y con caché de tokens.
+
+No toca la BD ni levanta servidores: solo Django configurado y
+RequestFactory. Las llaves RSA se generan al vuelo (requiere cryptography,
+PyJWT[crypto] en requirements.txt).
+
+Uso (desde backend/):
+    python benchmarks/auth_overhead.py --iteraciones 20000
+    python benchmarks/auth_overhead.py --salida auth.json
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "news_service.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import jwt  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from jwt.algorithms import RSAAlgorithm  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+
+from news import authentication, llaves_jwt  # noqa: E402
+
+SECRETO_HS = "secreto-benchmark-0123456789abcdef"
+CLAIMS = {"id": "8c6f1f0e-1111-4c1b-9a55-2f0d6f1b0c01", "rol": "estudiante", "nombre": "Ana"}
+
+
+# ------------------ 🔹 LLAVES ------------------
+def _b64(texto):
+    return base64.urlsafe_b64encode(texto.encode()).rstrip(b"=").decode()
+
+
+def preparar_llaves(directorio):
+    """ JWKS con una llave "oct" y una RSA; devuelve (ruta, llave privada RSA). """
+    privada = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    publica = json.loads(RSAAlgorithm.to_jwk(privada.public_key()))
+    jwks = {
+        "keys": [
+            {"kty": "oct", "kid": "hs-1", "k": _b64(SECRETO_HS)},
+            {**publica, "kid": "rs-1", "use": "sig"},
+        ]
+    }
+    ruta = Path(directorio) / "jwks.json"
+    ruta.write_text(json.dumps(jwks), encoding="utf-8")
+    return str(ruta), privada
+
+
+def token(llave, algoritmo, kid=None):
+    claims = {**CLAIMS, "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, llave, algorithm=algoritmo, headers={"kid": kid} if kid else None)
+
+
+# ------------------ 🔹 MEDICIÓN ------------------
+class AutenticacionAnterior:
+    """ La autenticación tal como estaba: decode + SimpleNamespace en cada petición. """
+
+    def authenticate(self, request):
+        auth = request.META["HTTP_AUTHORIZATION"]
+        payload = jwt.decode(auth.split(" ", 1)[1].strip(), SECRETO_HS, algorithms=["HS256"])
+        user = SimpleNamespace(
+            is_authenticated=True,
+            id=payload.get("id") or payload.get("user_id") or payload.get("sub"),
+            rol=payload.get("rol") or payload.get("role"),
+            institucion_id=payload.get("institucion_id") or payload.get("institution_id"),
+            email=payload.get("email"),
+            nombre=payload.get("nombre") or payload.get("name"),
+        )
+        return user, payload
+
+
+def medir(autenticador, tok, iteraciones):
+    peticion = Request(RequestFactory().get("/api/publicaciones/", HTTP_AUTHORIZATION=f"Bearer {tok}"))
+    autenticador.authenticate(peticion)  # calentamiento (y primera entrada en caché)
+    muestras = []
+    for _ in range(5):
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            autenticador.authenticate(peticion)
+        muestras.append((time.perf_counter() - inicio) / iteraciones * 1e6)
+    muestras.sort()
+    return {"us_por_peticion": round(muestras[len(muestras) // 2], 2), "mejor_us": round(muestras[0], 2)}
+
+
+def reiniciar():
+    """ Llavero y caché nuevos para que cada caso lea su configuración. """
+    llaves_jwt._llavero = None
+    authentication._cache = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iteraciones", type=int, default=5000, help="llamadas por muestra (5 muestras)")
+    parser.add_argument("--salida", help="archivo JSON (por defecto, stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_jwks, privada_rsa = preparar_llaves(directorio)
+        base = {"JWT_SECRET": SECRETO_HS, "JWT_ALG": "HS256", "JWT_JWKS_PATH": ruta_jwks}
+        token_hs = token(SECRETO_HS, "HS256")
+        token_rs = token(privada_rsa, "RS256", kid="rs-1")
+        casos = {
+            "anterior_hs256": (AutenticacionAnterior(), token_hs, {}),
+            "hs256_sin_cache": (authentication.JWTUserAuthentication(), token_hs, {"JWT_CACHE_TTL": 0}),
+            "hs256_con_cache": (authentication.JWTUserAuthentication(), token_hs, {}),
+            "rs256_sin_cache": (authentication.JWTUserAuthentication(), token_rs, {"JWT_CACHE_TTL": 0}),
+            "rs256_con_cache": (authentication.JWTUserAuthentication(), token_rs, {}),
+        }
+
+        resultados = {}
+        for nombre, (autenticador, tok, ajustes) in casos.items():
+            with override_settings(**base, **ajustes):
+                reiniciar()
+                resultados[nombre] = medir(autenticador, tok, args.iteraciones)
+            print(f"{nombre}: {resultados[nombre]}", file=sys.stderr)
+        reiniciar()
+
+    texto = json.dumps(
+        {"iteraciones": args.iteraciones, "resultados": resultados, "metricas": authentication.metricas_auth()},
+        indent=2,
+        ensure_ascii=False,
+    )
+    if args.salida:
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
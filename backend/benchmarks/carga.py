@@ -0,0 +1,356 @@
+"""
+Benchmark de los endpoints calientes, en proceso o por HTTP.
+
+Escenarios: feed, feed compacto (?vista=compacta), feed con filtros,
+feed por tendencia, detalle, comentarios, búsqueda y like_toggle. Los ids salen del propio feed y se
+eligen con el mismo sesgo que el tráfico real (las publicaciones con más
+interacción se piden más). Por escenario reporta peticiones/s, errores,
+latencias p50/p95/p99 (ms), consultas a la BD (de la cabecera
+Server-Timing, news/instrumentacion.py) y bytes por respuesta, y guarda
+un JSON con la revisión de git para comparar entre versiones.
+
+- proceso: Django en este proceso con el cliente de pruebas (sin red ni
+  servidor): mide la vista, el ORM y la BD configurada en el entorno.
+  La caché de respuestas se desactiva salvo --con-cache.
+- http: contra un servidor ya levantado (--url). Para contar consultas,
+  el servidor debe tener NEWS_SERVER_TIMING=1. Los tokens de like_toggle
+  se firman con --jwt-secret (por defecto, JWT_SECRET del entorno).
+
+Datos: `python manage.py generar_datos --publicaciones 100000 --comentarios 2000000 ...`
+
+Uso (desde backend/):
+    python benchmarks/carga.py --modo proceso --duracion 10 --salida base.json
+    python benchmarks/carga.py --modo proceso --duracion 10 --comparar base.json
+    python benchmarks/carga.py --modo http --url http://127.0.0.1:8000 --hilos 8
+"""
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+ESCENARIOS = ("feed", "feed_compacto", "feed_filtros", "tendencia", "detalle", "comentarios", "busqueda", "like_toggle")
+CONSULTAS = re.compile(r'db;[^,]*desc="(\d+) consultas"')
+
+
+# ------------------ 🔹 CLIENTES ------------------
+class ClienteProceso:
+    """ django.test.Client, uno por hilo (cada hilo con su conexión a la BD). """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def pedir(self, metodo, ruta, cabeceras=None):
+        from django.test import Client
+
+        cliente = getattr(self._local, "cliente", None)
+        if cliente is None:
+            cliente = self._local.cliente = Client()
+        extra = {f"HTTP_{k.upper().replace('-', '_')}": v for k, v in (cabeceras or {}).items()}
+        respuesta = getattr(cliente, metodo.lower())(ruta, **extra)
+        cuerpo = b"" if getattr(respuesta, "streaming", False) else respuesta.content
+        return respuesta.status_code, cuerpo, respuesta.headers.get("Server-Timing", "")
+
+    def cerrar_hilo(self):
+        from django.db import connections
+
+        connections.close_all()
+
+
+class ClienteHTTP:
+    def __init__(self, url):
+        import httpx
+
+        self.url = url.rstrip("/")
+        self._httpx = httpx
+        self._local = threading.local()
+
+    def pedir(self, metodo, ruta, cabeceras=None):
+        cliente = getattr(self._local, "cliente", None)
+        if cliente is None:
+            cliente = self._local.cliente = self._httpx.Client(base_url=self.url, timeout=30)
+        try:
+            respuesta = cliente.request(metodo, ruta, headers=cabeceras)
+        except self._httpx.HTTPError:
+            return 0, b"", ""
+        return respuesta.status_code, respuesta.content, respuesta.headers.get("Server-Timing", "")
+
+    def cerrar_hilo(self):
+        cliente = getattr(self._local, "cliente", None)
+        if cliente is not None:
+            cliente.close()
+
+
+# ------------------ 🔹 OBJETIVOS ------------------
+def _ruta(url):
+    partes = urlsplit(url)
+    return partes.path + (f"?{partes.query}" if partes.query else "")
+
+
+def descubrir(cliente, paginas):
+    """ Ids, categorías y palabras de búsqueda a partir del feed público. """
+    publicaciones = []
+    ruta = "/api/publicaciones/?page_size=100"
+    for _ in range(paginas):
+        estado, cuerpo, _ = cliente.pedir("GET", ruta)
+        if estado != 200:
+            raise RuntimeError(f"GET {ruta} respondió {estado}")
+        pagina = json.loads(cuerpo)
+        publicaciones += pagina["results"]
+        if not pagina.get("next"):
+            break
+        ruta = _ruta(pagina["next"])
+    if not publicaciones:
+        raise RuntimeError("No hay publicaciones: generar datos con `manage.py generar_datos`.")
+
+    palabras = sorted({p for pub in publicaciones for p in pub["titulo"].lower().split() if len(p) > 4})
+    return {
+        "publicaciones": [pub["id"] for pub in publicaciones],
+        # Peso por interacción: el tráfico se concentra en lo popular
+        "pesos": [1 + pub.get("likes_count", 0) + pub.get("comentarios_count", 0) for pub in publicaciones],
+        "categorias": sorted({pub["categoria"] for pub in publicaciones if pub.get("categoria")}),
+        "palabras": palabras[:200] or ["noticia"],
+    }
+
+
+def tokens(secreto, cantidad):
+    import jwt
+
+    return [
+        jwt.encode({"id": str(uuid.uuid4()), "rol": "estudiante", "nombre": f"Bench {i}"}, secreto, algorithm="HS256")
+        for i in range(cantidad)
+    ]
+
+
+def peticion(escenario, objetivos, rng, tokens_like):
+    """ (método, ruta, cabeceras) de una petición del escenario. """
+    def popular():
+        return rng.choices(objetivos["publicaciones"], weights=objetivos["pesos"])[0]
+
+    if escenario == "feed":
+        return "GET", "/api/publicaciones/", None
+    if escenario == "feed_compacto":
+        return "GET", "/api/publicaciones/?vista=compacta", None
+    if escenario == "feed_filtros":
+        categoria = rng.choice(objetivos["categorias"]) if objetivos["categorias"] else ""
+        return "GET", f"/api/publicaciones/?categoria={categoria}&page_size=20", None
+    if escenario == "tendencia":
+        return "GET", "/api/publicaciones/?orden=tendencia", None
+    if escenario == "detalle":
+        return "GET", f"/api/publicaciones/{popular()}/", None
+    if escenario == "comentarios":
+        return "GET", f"/api/publicaciones/{popular()}/comentarios/", None
+    if escenario == "busqueda":
+        return "GET", f"/api/publicaciones/?q={rng.choice(objetivos['palabras'])}", None
+    if escenario == "like_toggle":
+        return "POST", f"/api/publicaciones/{popular()}/like_toggle/", {
+            "Authorization": f"Bearer {rng.choice(tokens_like)}"
+        }
+    raise ValueError(f"Escenario desconocido: {escenario}")
+
+
+# ------------------ 🔹 MEDICIÓN ------------------
+def percentil(valores, p):
+    if not valores:
+        return None
+    indice = min(len(valores) - 1, max(0, round(p / 100 * len(valores)) - 1))
+    return round(valores[indice], 2)
+
+
+def medir(cliente, escenario, objetivos, tokens_like, hilos, duracion, semilla):
+    latencias, consultas, tamanos = [], [], []
+    errores = 0
+    lock = threading.Lock()
+    limite = time.monotonic() + duracion
+
+    def trabajar(n):
+        nonlocal errores
+        rng = random.Random(semilla + n)
+        propias, propias_consultas, propios_tamanos, propios_errores = [], [], [], 0
+        try:
+            while time.monotonic() < limite:
+                metodo, ruta, cabeceras = peticion(escenario, objetivos, rng, tokens_like)
+                inicio = time.perf_counter()
+                estado, cuerpo, timing = cliente.pedir(metodo, ruta, cabeceras)
+                transcurrido = (time.perf_counter() - inicio) * 1000
+                if estado >= 400 or estado == 0:
+                    propios_errores += 1
+                    continue
+                propias.append(transcurrido)
+                propios_tamanos.append(len(cuerpo))
+                encontrado = CONSULTAS.search(timing)
+                if encontrado:
+                    propias_consultas.append(int(encontrado.group(1)))
+        finally:
+            cliente.cerrar_hilo()
+        with lock:
+            latencias.extend(propias)
+            consultas.extend(propias_consultas)
+            tamanos.extend(propios_tamanos)
+            errores += propios_errores
+
+    inicio = time.monotonic()
+    trabajadores = [threading.Thread(target=trabajar, args=(n,)) for n in range(hilos)]
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    transcurrido = time.monotonic() - inicio
+
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "errores": errores,
+        "rps": round(len(latencias) / transcurrido, 1),
+        "p50_ms": percentil(latencias, 50),
+        "p95_ms": percentil(latencias, 95),
+        "p99_ms": percentil(latencias, 99),
+        "consultas_media": round(sum(consultas) / len(consultas), 2) if consultas else None,
+        "consultas_max": max(consultas) if consultas else None,
+        "bytes_media": round(sum(tamanos) / len(tamanos)) if tamanos else None,
+    }
+
+
+# ------------------ 🔹 RESULTADOS ------------------
+def revision():
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        sucio = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND, capture_output=True, text=True
+        ).stdout.strip()
+        return sha + ("-sucio" if sucio else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def datos_en_bd():
+    from django.db import connection
+
+    from news.models import Categoria, Comentario, Like, Publicacion
+
+    return {
+        "vendor": connection.vendor,
+        "categorias": Categoria.objects.count(),
+        "publicaciones": Publicacion.objects.count(),
+        "comentarios": Comentario.objects.count(),
+        "likes": Like.objects.count(),
+    }
+
+
+def comparar(actual, ruta_anterior):
+    anterior = json.loads(Path(ruta_anterior).read_text(encoding="utf-8"))
+    print(f"\nComparación con {ruta_anterior} ({anterior.get('revision')} → {actual.get('revision')}):", file=sys.stderr)
+    print(f"{'escenario':<14}{'rps':>22}{'p95 ms':>24}{'consultas':>14}", file=sys.stderr)
+
+    def delta(antes, ahora):
+        if antes in (None, 0) or ahora is None:
+            return f"{ahora}"
+        return f"{antes}→{ahora} ({(ahora - antes) / antes * 100:+.0f}%)"
+
+    for nombre, ahora in actual["escenarios"].items():
+        antes = anterior.get("escenarios", {}).get(nombre)
+        if not antes:
+            continue
+        print(
+            f"{nombre:<14}{delta(antes['rps'], ahora['rps']):>22}{delta(antes['p95_ms'], ahora['p95_ms']):>24}"
+            f"{str(antes['consultas_media']) + '→' + str(ahora['consultas_media']):>14}",
+            file=sys.stderr,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modo", choices=("proceso", "http"), default="proceso")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="servidor (modo http)")
+    parser.add_argument("--escenarios", default=",".join(ESCENARIOS))
+    parser.add_argument("--hilos", type=int, default=1)
+    parser.add_argument("--duracion", type=float, default=10, help="segundos por escenario")
+    parser.add_argument("--calentamiento", type=float, default=1, help="segundos previos sin medir")
+    parser.add_argument("--paginas", type=int, default=5, help="páginas del feed para elegir ids")
+    parser.add_argument("--usuarios-like", type=int, default=200, help="tokens distintos para like_toggle")
+    parser.add_argument("--jwt-secret", default=os.getenv("JWT_SECRET", os.getenv("DJANGO_SECRET_KEY", "dev-secret")))
+    parser.add_argument("--con-cache", action="store_true", help="no desactivar la caché de respuestas (proceso)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON (por defecto, stdout)")
+    parser.add_argument("--comparar", metavar="JSON", help="resultado anterior con el que comparar")
+    args = parser.parse_args()
+
+    escenarios = [e.strip() for e in args.escenarios.split(",") if e.strip()]
+    desconocidos = set(escenarios) - set(ESCENARIOS)
+    if desconocidos:
+        parser.error(f"escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+
+    datos = None
+    if args.modo == "proceso":
+        sys.path.insert(0, str(BACKEND))
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "news_service.settings")
+        import django
+
+        django.setup()
+        from django.conf import settings
+        from django.test.utils import override_settings
+
+        ajustes = {"NEWS_SERVER_TIMING": True}
+        if not args.con_cache:
+            ajustes["NEWS_CACHE_RESPUESTAS_TTL"] = 0
+        override_settings(**ajustes).enable()
+        if "news.instrumentacion.InstrumentacionMiddleware" not in settings.MIDDLEWARE:
+            parser.error("el modo proceso necesita NEWS_INSTRUMENTACION=1 para contar consultas")
+        secreto = settings.JWT_SECRET
+        cliente = ClienteProceso()
+        datos = datos_en_bd()
+    else:
+        secreto = args.jwt_secret
+        cliente = ClienteHTTP(args.url)
+
+    objetivos = descubrir(cliente, args.paginas)
+    cliente.cerrar_hilo()
+    tokens_like = tokens(secreto, args.usuarios_like)
+
+    resultados = {}
+    for escenario in escenarios:
+        if args.calentamiento:
+            medir(cliente, escenario, objetivos, tokens_like, args.hilos, args.calentamiento, args.semilla)
+        resultados[escenario] = medir(
+            cliente, escenario, objetivos, tokens_like, args.hilos, args.duracion, args.semilla
+        )
+        print(f"[{args.modo}] {escenario}: {resultados[escenario]}", file=sys.stderr)
+
+    resultado = {
+        "revision": revision(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "configuracion": {
+            "modo": args.modo,
+            "url": args.url if args.modo == "http" else None,
+            "hilos": args.hilos,
+            "duracion_s": args.duracion,
+            "cache_respuestas": args.con_cache if args.modo == "proceso" else None,
+            "semilla": args.semilla,
+        },
+        "datos": datos,
+        "escenarios": resultados,
+    }
+    if args.comparar:
+        comparar(resultado, args.comparar)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Micro-benchmark: serializar y renderizar una página del feed compacto
+(µs por página), camino de DRF contra el rápido.
+
+Pasos medidos por separado, sobre las mismas filas sintéticas en memoria:
+- hidratar: filas de la BD → instancias del modelo (Model.from_db), lo que
+  un listado por valores se ahorra (news/valores.py),
+- serializar: PublicacionCompactaSerializer(many=True).data contra
+  PlanValores.convertir sobre dicts,
+- renderizar: JSONRenderer de DRF contra JSONRapidoRenderer (orjson),
+- parsear: JSONParser contra JSONRapidoParser con el cuerpo renderizado,
+y el total de cada camino (hidratar + serializar + renderizar).
+
+No toca la BD: Django configurado y RequestFactory (las URLs de imagen
+salen absolutas como en una petición). Sin orjson instalado, el camino
+rápido de render/parse es el de DRF y así se reporta.
+
+Uso (desde backend/):
+    python benchmarks/json_rapido.py --filas 20 --iteraciones 2000
+    python benchmarks/json_rapido.py --filas 100 --salida json.json
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "news_service.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+
+from news import renderers  # noqa: E402
+from news.models import Publicacion  # noqa: E402
+from news.serializers import MARGEN_EXTRACTO, PublicacionCompactaSerializer  # noqa: E402
+from news.valores import plan_valores  # noqa: E402
+
+PALABRAS = "beca convocatoria carrera universidad taller feria orientación ciencia arte año".split()
+
+
+# ------------------ 🔹 DATOS ------------------
+def filas_sinteticas(cantidad, semilla):
+    """ Filas como las devuelve la BD: (columnas, [tuplas]) con extracto_bd ya cortado. """
+    rng = random.Random(semilla)
+    ahora = timezone.now()
+    largo = settings.NEWS_EXTRACTO_LARGO + MARGEN_EXTRACTO
+    columnas = (
+        "id", "titulo", "imagen", "categoria_id", "autor_id", "autor_institucion_id", "tipo_autor",
+        "estado", "fecha_publicacion", "vistas", "likes_count", "comentarios_count", "version",
+    )
+    filas = []
+    for i in range(cantidad):
+        institucion = rng.random() < 0.2
+        contenido = " ".join(rng.choices(PALABRAS, k=rng.randint(20, 120)))
+        filas.append((
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            " ".join(rng.choices(PALABRAS, k=6)).capitalize(),
+            f"publicaciones/{i}.jpg" if rng.random() < 0.5 else "",
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            uuid.UUID(int=rng.getrandbits(128), version=4) if institucion else None,
+            "institucion" if institucion else "usuario",
+            "publicado",
+            ahora - timedelta(seconds=rng.randint(0, 86400 * 90), microseconds=rng.randint(0, 999999)),
+            rng.randint(0, 5000),
+            rng.randint(0, 300),
+            rng.randint(0, 80),
+            rng.randint(1, 20),
+            contenido[:largo],
+        ))
+    return columnas, filas
+
+
+def hidratar(columnas, filas):
+    """ Lo que hace el ORM por fila: instancia del modelo + anotación. """
+    # from_db recibe los valores en el orden de los campos del modelo
+    orden = [f.attname for f in Publicacion._meta.concrete_fields if f.attname in columnas]
+    indices = [columnas.index(nombre) for nombre in orden]
+    objetos = []
+    for fila in filas:
+        obj = Publicacion.from_db("default", orden, [fila[i] for i in indices])
+        obj.extracto_bd = fila[-1]
+        objetos.append(obj)
+    return objetos
+
+
+def como_dicts(columnas, filas):
+    """ Lo que hace .values(): un dict por fila. """
+    nombres = (*columnas, "extracto_bd")
+    return [dict(zip(nombres, fila)) for fila in filas]
+
+
+# ------------------ 🔹 MEDICIÓN ------------------
+def medir(funcion, iteraciones):
+    funcion()  # calentamiento
+    muestras = []
+    for _ in range(5):
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            funcion()
+        muestras.append((time.perf_counter() - inicio) / iteraciones * 1e6)
+    muestras.sort()
+    return {"us_por_pagina": round(muestras[len(muestras) // 2], 1), "mejor_us": round(muestras[0], 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=20, help="publicaciones por página")
+    parser.add_argument("--iteraciones", type=int, default=1000, help="páginas por muestra (5 muestras)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON (por defecto, stdout)")
+    args = parser.parse_args()
+
+    request = Request(RequestFactory().get("/api/publicaciones/?vista=compacta"))
+    contexto = {"request": request, "campos": None, "expandir": frozenset()}
+    columnas, filas = filas_sinteticas(args.filas, args.semilla)
+    objetos = hidratar(columnas, filas)
+    dicts = como_dicts(columnas, filas)
+
+    with override_settings(NEWS_LISTAS_POR_VALORES=True, NEWS_JSON_RAPIDO=True):
+        plan = plan_valores(PublicacionCompactaSerializer(context=contexto))
+        datos = PublicacionCompactaSerializer(objetos, many=True, context=contexto).data
+        if plan.convertir(dicts) != [dict(d) for d in datos]:
+            raise SystemExit("La salida por valores no coincide con la del serializador.")
+
+        drf, rapido = JSONRenderer(), renderers.JSONRapidoRenderer()
+        cuerpo = drf.render({"results": datos})
+        if rapido.render({"results": datos}) != cuerpo:
+            raise SystemExit("El JSON de orjson no coincide con el de DRF.")
+
+        def serializar_drf():
+            return PublicacionCompactaSerializer(objetos, many=True, context=contexto).data
+
+        def total_drf():
+            objs = hidratar(columnas, filas)
+            return drf.render({"results": PublicacionCompactaSerializer(objs, many=True, context=contexto).data})
+
+        def total_rapido():
+            return rapido.render({"results": plan.convertir(como_dicts(columnas, filas))})
+
+        casos = {
+            "hidratar_modelos": lambda: hidratar(columnas, filas),
+            "hidratar_dicts": lambda: como_dicts(columnas, filas),
+            "serializar_drf": serializar_drf,
+            "serializar_valores": lambda: plan.convertir(dicts),
+            "renderizar_drf": lambda: drf.render({"results": datos}),
+            "renderizar_rapido": lambda: rapido.render({"results": datos}),
+            "parsear_drf": lambda: JSONParser().parse(io.BytesIO(cuerpo)),
+            "parsear_rapido": lambda: renderers.JSONRapidoParser().parse(io.BytesIO(cuerpo)),
+            "total_drf": total_drf,
+            "total_rapido": total_rapido,
+        }
+        resultados = {}
+        for nombre, funcion in casos.items():
+            resultados[nombre] = medir(funcion, args.iteraciones)
+            print(f"{nombre}: {resultados[nombre]}", file=sys.stderr)
+
+    base, nuevo = resultados["total_drf"]["us_por_pagina"], resultados["total_rapido"]["us_por_pagina"]
+    texto = json.dumps(
+        {
+            "filas": args.filas,
+            "iteraciones": args.iteraciones,
+            "orjson": renderers.orjson is not None,
+            "bytes_por_pagina": len(cuerpo),
+            "resultados": resultados,
+            "aceleracion_total": round(base / nuevo, 2) if nuevo else None,
+        },
+        indent=2,
+        ensure_ascii=False,
+    )
+    if args.salida:
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,20 @@ else
   echo "🔄 [PROD] Ejecutando migraciones..."
   python manage.py migrate --noinput || true
 
+  if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    echo "🚀 [PROD] Iniciando servidor ASGI (Gunicorn + Uvicorn)..."
+    # Feed, detalle y comentarios en vistas async; el resto corre en hilos
+    exec gunicorn news_service.asgi:application --bind 0.0.0.0:${PORT:-8000} \
+      --workers ${GUNICORN_WORKERS:-2} -k uvicorn_worker.UvicornWorker
+  fi
+
   echo "🚀 [PROD] Iniciando servidor con Gunicorn..."
-  exec gunicorn news_service.wsgi:application --bind 0.0.0.0:${PORT:-8000}
+  # Hilos por worker: una subida lenta no bloquea el worker entero.
+  # Conexiones a la BD: cada hilo abre la suya y con DB_CONN_MAX_AGE > 0 la
+  # conserva, así que el tope por instancia es GUNICORN_WORKERS x GUNICORN_THREADS
+  # (2 x 4 = 8 por defecto; otras tantas por réplica). Con DB_POOL=1 el tope es
+  # GUNICORN_WORKERS x DB_POOL_MAX y los hilos de más esperan una conexión libre.
+  exec gunicorn news_service.wsgi:application --bind 0.0.0.0:${PORT:-8000} \
+    --workers ${GUNICORN_WORKERS:-2} --threads ${GUNICORN_THREADS:-4}
 fi
 
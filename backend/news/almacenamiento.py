@@ -0,0 +1,86 @@
+"""
+Almacenamiento de media direccionado por contenido.
+
+El nombre final de cada archivo es el sha256 de sus bytes dentro de la
+carpeta pedida (`publicaciones/<hash>.jpg`): subir dos veces la misma
+imagen la guarda una sola vez, y como un nombre nunca cambia de contenido
+sus URLs se sirven como inmutables (ver news/media.py).
+
+Backends (STORAGES["default"], NEWS_MEDIA_BACKEND):
+- AlmacenamientoLocal: disco (MEDIA_ROOT). También es el stand-in de S3 en
+  dev/tests.
+- AlmacenamientoS3: S3 o compatible (MinIO, R2...) vía django-storages,
+  solo si está instalado.
+
+Como un archivo puede estar referenciado por varias publicaciones, nunca
+se borra al borrar una publicación.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+LARGO_HASH = 32
+NOMBRE_POR_CONTENIDO = re.compile(rf"^[0-9a-f]{{{LARGO_HASH}}}$")
+
+
+class _YaExiste(Exception):
+    pass
+
+
+def es_nombre_por_contenido(nombre):
+    """ True si el nombre es un hash de contenido (URL inmutable). """
+    base = os.path.splitext(os.path.basename(nombre))[0]
+    return bool(NOMBRE_POR_CONTENIDO.match(base))
+
+
+def resumen_contenido(content):
+    sha = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for trozo in content.chunks():
+        sha.update(trozo if isinstance(trozo, bytes) else trozo.encode("utf-8"))
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return sha.hexdigest()[:LARGO_HASH]
+
+
+class ContenidoDireccionadoMixin:
+    def nombre_por_contenido(self, name, content):
+        carpeta, archivo = os.path.split(name)
+        extension = os.path.splitext(archivo)[1].lower()
+        return os.path.join(carpeta, f"{resumen_contenido(content)}{extension}").replace("\\", "/")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.nombre_por_contenido(name, content)
+        try:
+            return super().save(name, content, max_length=max_length)
+        except _YaExiste:
+            # Mismo nombre = mismo contenido: ya está guardado
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        # Nunca sufijos aleatorios; si existe, otro proceso ya lo guardó
+        if self.exists(name):
+            raise _YaExiste(name)
+        return name
+
+
+class AlmacenamientoLocal(ContenidoDireccionadoMixin, FileSystemStorage):
+    pass
+
+
+try:
+    from storages.backends.s3 import S3Storage
+except ImportError:  # django-storages es opcional
+    S3Storage = None
+
+if S3Storage is not None:
+    class AlmacenamientoS3(ContenidoDireccionadoMixin, S3Storage):
+        pass
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .instrumentacion import instalar_en_conexion
+
+        if settings.NEWS_INSTRUMENTACION:
+            connection_created.connect(instalar_en_conexion, dispatch_uid="news_instrumentacion")
@@ -0,0 +1,106 @@
+"""
+Lecturas async para el modo ASGI (SERVER_MODE=asgi): feed, detalle,
+comentarios de una publicación y su stream de eventos (news/eventos.py).
+
+DRF no tiene vistas async, así que aquí se arma el PublicacionViewSet a
+mano y se reutiliza todo lo que no hace E/S (autenticación JWT, permisos,
+filtros, paginador, serializadores). La E/S va por el ORM async y por los
+resolutores async de autores (news/autores.py), con la misma caché de
+respuestas y los mismos validadores HTTP que las vistas sync.
+
+Solo GET/HEAD pasan por aquí: el resto de métodos de las mismas URLs se
+delegan a las vistas del router (`con_lectura_asincrona`). Se renderiza
+siempre JSON: la API navegable consulta la BD de forma síncrona.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+
+from .renderers import JSONRapidoRenderer
+from .views import PublicacionViewSet
+
+METODOS_LECTURA = ("GET", "HEAD")
+
+
+def _plano(respuesta):
+    """
+    Response de DRF ya renderizada → HttpResponse simple, para que Django
+    no la vuelva a renderizar en un hilo (render() no es async).
+    """
+    respuesta.render()
+    plano = HttpResponse(respuesta.content, status=respuesta.status_code)
+    for nombre, valor in respuesta.items():
+        plano[nombre] = valor
+    return plano
+
+
+async def despachar(request, accion, **kwargs):
+    """ Equivalente async de APIView.dispatch para una acción `a<accion>` del ViewSet. """
+    vista = PublicacionViewSet(
+        action_map={"get": accion, "head": accion},
+        renderer_classes=[JSONRapidoRenderer],
+        basename="publicacion",
+    )
+    vista.args = ()
+    vista.kwargs = kwargs
+    vista.format_kwarg = None
+    peticion = vista.initialize_request(request, **kwargs)
+    vista.request = peticion
+    vista.headers = vista.default_response_headers
+
+    try:
+        # Negociación, autenticación (JWT, sin BD) y permisos
+        vista.initial(peticion, **kwargs)
+        respuesta = await getattr(vista, f"a{accion}")(peticion, **kwargs)
+    except Exception as exc:
+        respuesta = vista.handle_exception(exc)
+
+    respuesta = vista.finalize_response(peticion, respuesta, **kwargs)
+    return _plano(respuesta) if isinstance(respuesta, Response) else respuesta
+
+
+def con_lectura_asincrona(vista_sync, accion):
+    """
+    Vista para una URL del router: GET/HEAD por la acción async, el resto
+    por `vista_sync` (en un hilo, como cualquier vista sync bajo ASGI) o
+    405 si no hay.
+    """
+    vista_sync_async = sync_to_async(vista_sync) if vista_sync else None
+
+    async def vista(request, *args, **kwargs):
+        if request.method in METODOS_LECTURA:
+            return await despachar(request, accion, **kwargs)
+        if vista_sync_async is None:
+            return HttpResponseNotAllowed(METODOS_LECTURA)
+        return await vista_sync_async(request, *args, **kwargs)
+
+    vista.__name__ = f"{accion}_async"
+    return csrf_exempt(vista)
+
+
+# 🔹 Rutas: mismas URLs y nombres que el router; `<uuid:pk>` para no tapar
+#     las acciones de lista (sync/, subidas/, likes-estado/)
+feed = con_lectura_asincrona(
+    PublicacionViewSet.as_view({"get": "list", "post": "create"}, basename="publicacion", detail=False),
+    "list",
+)
+detalle = con_lectura_asincrona(
+    PublicacionViewSet.as_view(
+        {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"},
+        basename="publicacion",
+        detail=True,
+    ),
+    "retrieve",
+)
+comentarios = con_lectura_asincrona(
+    PublicacionViewSet.as_view(
+        {"get": "listar_comentarios"},
+        basename="publicacion",
+        detail=True,
+        **PublicacionViewSet.listar_comentarios.kwargs,
+    ),
+    "listar_comentarios",
+)
+
+eventos = con_lectura_asincrona(None, "eventos")
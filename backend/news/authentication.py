@@ -1,15 +1,155 @@
-import os
+import hashlib
+import threading
+import time
+
 import jwt
-from types import SimpleNamespace
+from django.conf import settings
 from rest_framework import authentication, exceptions
 
-JWT_SECRET = os.getenv("JWT_SECRET", os.getenv("DJANGO_SECRET_KEY", "dev-secret"))
-JWT_ALG = os.getenv("JWT_ALG", "HS256")
+from .autores import ResolutorClaimsJWT
+from .cache_local import CacheLRU
+from .llaves_jwt import get_llavero
+
+
+class Principal:
+    """
+    Usuario del token (no hay tabla de usuarios en este servicio).
+    Con __slots__: se crea uno por token verificado y vive en la caché.
+    """
+    __slots__ = ("id", "rol", "institucion_id", "email", "nombre")
+
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+    # Sin staff de Django: IsAdminUser niega (en vez de fallar con AttributeError)
+    is_staff = False
+
+    def __init__(self, id, rol=None, institucion_id=None, email=None, nombre=None):
+        self.id = id
+        self.rol = rol
+        self.institucion_id = institucion_id
+        self.email = email
+        self.nombre = nombre
+
+    @property
+    def pk(self):
+        return self.id
+
+    @classmethod
+    def desde_claims(cls, payload):
+        # Compatibilidad con distintos nombres de claims
+        return cls(
+            id=payload.get("id") or payload.get("user_id") or payload.get("sub"),
+            rol=payload.get("rol") or payload.get("role"),
+            institucion_id=payload.get("institucion_id") or payload.get("institution_id"),
+            email=payload.get("email"),
+            nombre=payload.get("nombre") or payload.get("name"),
+        )
+
+    def __repr__(self):
+        return f"<Principal {self.id} rol={self.rol}>"
+
+
+# ------------------ 🔹 CACHÉ DE TOKENS VERIFICADOS ------------------
+# sha256(token) → (principal, payload), hasta su `exp` o JWT_CACHE_TTL (lo
+# que llegue antes). Los tokens rechazados no se guardan: un token basura
+# no debe poder desplazar a los válidos.
+_cache = None
+_generacion = 0
+_metricas = {"aciertos": 0, "fallos": 0, "rechazados": 0}
+_metricas_lock = threading.Lock()
+
+
+def _contar(metrica):
+    with _metricas_lock:
+        _metricas[metrica] += 1
+
+
+def _get_cache(llavero):
+    global _cache, _generacion
+    if _cache is None:
+        _cache = CacheLRU(settings.JWT_CACHE_MAX, settings.JWT_CACHE_TTL, 0)
+    if llavero.generacion != _generacion:
+        # Cambiaron las llaves: un token de una llave retirada ya no vale
+        _generacion = llavero.generacion
+        _cache.limpiar()
+    return _cache
+
+
+def _decodificar(token, llavero):
+    try:
+        cabecera = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as e:
+        raise exceptions.AuthenticationFailed(f"Token inválido: {e}")
+
+    candidatas = llavero.candidatas(cabecera.get("kid"), cabecera.get("alg"))
+    if not candidatas:
+        raise exceptions.AuthenticationFailed("Token inválido: llave o algoritmo no admitido.")
+
+    error = None
+    for llave in candidatas:
+        try:
+            return jwt.decode(
+                token, llave.clave, algorithms=[llave.algoritmo], leeway=settings.JWT_LEEWAY
+            )
+        except jwt.InvalidSignatureError as e:
+            # Sin `kid` se prueban varias llaves: solo la firma justifica seguir
+            error = e
+        except jwt.PyJWTError as e:
+            raise exceptions.AuthenticationFailed(f"Token inválido: {e}")
+    raise exceptions.AuthenticationFailed(f"Token inválido: {error}")
+
+
+def verificar_token(token):
+    """ (principal, payload) de un token válido; AuthenticationFailed si no lo es. """
+    llavero = get_llavero()
+    llavero.revisar()
+    usar_cache = settings.JWT_CACHE_MAX > 0 and settings.JWT_CACHE_TTL > 0
+    if usar_cache:
+        cache = _get_cache(llavero)
+        clave = hashlib.sha256(token.encode("utf-8")).digest()
+        guardado = cache.obtener(clave, None)
+        if guardado is not None:
+            _contar("aciertos")
+            return guardado
+    _contar("fallos")
+
+    try:
+        payload = _decodificar(token, llavero)
+    except exceptions.AuthenticationFailed:
+        _contar("rechazados")
+        raise
+
+    principal = Principal.desde_claims(payload)
+    if not principal.id:
+        _contar("rechazados")
+        raise exceptions.AuthenticationFailed("Token sin 'id' de usuario.")
+
+    # Los nombres que traen los tokens alimentan la resolución de autores
+    ResolutorClaimsJWT.recordar(principal.id, principal.nombre)
+
+    if usar_cache:
+        ttl = settings.JWT_CACHE_TTL
+        if "exp" in payload:
+            ttl = min(ttl, float(payload["exp"]) + settings.JWT_LEEWAY - time.time())
+        if ttl > 0:
+            cache.guardar(clave, (principal, payload), ttl=ttl)
+    return principal, payload
+
+
+def metricas_auth():
+    with _metricas_lock:
+        metricas = dict(_metricas)
+    metricas["cache_tokens"] = len(_cache) if _cache is not None else 0
+    return metricas
+
 
 class JWTUserAuthentication(authentication.BaseAuthentication):
     """
-    Lee Authorization: Bearer <token>, decodifica y crea un objeto usuario con:
-    user.id, user.rol, user.institucion_id, user.email, user.nombre (si vienen)
+    Lee Authorization: Bearer <token>, lo verifica (news/llaves_jwt.py) y
+    devuelve un Principal con: user.id, user.rol, user.institucion_id,
+    user.email, user.nombre (si vienen). Los tokens ya verificados salen de
+    una caché en memoria hasta su `exp`.
     """
     def authenticate(self, request):
         auth = authentication.get_authorization_header(request).decode("utf-8")
@@ -17,27 +157,4 @@ class JWTUserAuthentication(authentication.BaseAuthentication):
             return None
 
         token = auth.split(" ", 1)[1].strip()
-        try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
-        except jwt.PyJWTError as e:
-            raise exceptions.AuthenticationFailed(f"Token inválido: {e}")
-
-        # Compatibilidad con distintos nombres de claims
-        user_id = payload.get("id") or payload.get("user_id") or payload.get("sub")
-        rol = payload.get("rol") or payload.get("role")
-        institucion_id = payload.get("institucion_id") or payload.get("institution_id")
-        email = payload.get("email")
-        nombre = payload.get("nombre") or payload.get("name")
-
-        if not user_id:
-            raise exceptions.AuthenticationFailed("Token sin 'id' de usuario.")
-
-        user = SimpleNamespace(
-            is_authenticated=True,
-            id=user_id,
-            rol=rol,
-            institucion_id=institucion_id,
-            email=email,
-            nombre=nombre,
-        )
-        return (user, payload)
+        return verificar_token(token)
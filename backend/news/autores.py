@@ -0,0 +1,284 @@
+"""
+Resolución de nombres de autores de comentarios.
+
+Los usuarios viven en auth_service, así que los nombres se resuelven por
+lotes: se juntan todos los `usuario_id` de la respuesta, se buscan en una
+caché LRU con TTL (incluida caché negativa para ids desconocidos) y los
+faltantes se piden a los resolutores configurados en
+NEWS_AUTORES_RESOLUTORES, en orden, con una sola llamada por resolutor.
+
+`aresolver_nombres` es la variante async (vistas ASGI): la E/S HTTP usa un
+cliente async y el resto de resolutores corre fuera del event loop.
+"""
+import asyncio
+import json
+import logging
+import threading
+import urllib.request
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .cache_local import DESCONOCIDO, CacheLRU
+
+logger = logging.getLogger(__name__)
+
+
+def nombre_visible(nombre=None, apellido=None, email=None):
+    """ "Nombre Apellido", o el correo, o None. """
+    if nombre or apellido:
+        return f"{nombre or ''} {apellido or ''}".strip()
+    return email or None
+
+
+def nombre_por_defecto(usuario_id):
+    return f"Usuario {str(usuario_id)[:8]}"
+
+
+# ------------------ 🔹 RESOLUTORES ------------------
+class ResolutorAutores:
+    """
+    Interfaz: `resolver(ids)` recibe ids en texto y devuelve {id: nombre}
+    solo con los que conoce. Lanzar una excepción significa "no sé" (los
+    ids no se cachean como desconocidos).
+    """
+
+    def resolver(self, usuario_ids):
+        raise NotImplementedError
+
+    async def aresolver(self, usuario_ids):
+        """ Por defecto, `resolver` en un hilo (puede tocar el ORM). """
+        return await sync_to_async(self.resolver)(usuario_ids)
+
+
+class ResolutorClaimsJWT(ResolutorAutores):
+    """
+    Nombres vistos en los claims de los tokens que llegan a este proceso
+    (JWTUserAuthentication llama a `recordar`). No hace E/S.
+    """
+    _nombres = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def recordar(cls, usuario_id, nombre):
+        if not usuario_id or not nombre:
+            return
+        with cls._lock:
+            cls._nombres[str(usuario_id)] = nombre
+            if len(cls._nombres) > settings.NEWS_AUTORES_CACHE_MAX:
+                cls._nombres.pop(next(iter(cls._nombres)))
+
+    def resolver(self, usuario_ids):
+        with self._lock:
+            return {uid: self._nombres[uid] for uid in usuario_ids if uid in self._nombres}
+
+    async def aresolver(self, usuario_ids):
+        # Solo memoria: no vale la pena saltar a un hilo
+        return self.resolver(usuario_ids)
+
+
+class ResolutorTablaLocal(ResolutorAutores):
+    """ Modelo de usuario local de Django (una consulta para todo el lote). """
+
+    def resolver(self, usuario_ids):
+        from django.contrib.auth import get_user_model
+
+        try:
+            usuarios = list(get_user_model().objects.filter(id__in=usuario_ids))
+        except Exception:
+            # El id local (entero) no es compatible con los UUID de auth_service
+            return {}
+        nombres = {}
+        for user in usuarios:
+            nombre = nombre_visible(
+                getattr(user, "nombre", None),
+                getattr(user, "apellido", None),
+                getattr(user, "email", None),
+            )
+            if nombre:
+                nombres[str(user.id)] = nombre
+        return nombres
+
+
+def transporte_urllib(url, cuerpo, timeout):
+    """ POST JSON y devuelve el JSON de respuesta. """
+    peticion = urllib.request.Request(
+        url,
+        data=json.dumps(cuerpo).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Accept": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(peticion, timeout=timeout) as respuesta:
+        return json.loads(respuesta.read().decode("utf-8"))
+
+
+# Un cliente httpx por event loop: crearlo (contexto TLS) cuesta más que la
+# petición y reutilizarlo mantiene las conexiones keep-alive con auth_service
+_clientes_async = weakref.WeakKeyDictionary()
+
+
+def _cliente_async(httpx):
+    loop = asyncio.get_running_loop()
+    cliente = _clientes_async.get(loop)
+    if cliente is None:
+        cliente = _clientes_async[loop] = httpx.AsyncClient()
+    return cliente
+
+
+async def transporte_async(url, cuerpo, timeout):
+    """ POST JSON async con httpx; sin httpx, urllib en un hilo. """
+    try:
+        import httpx
+    except ImportError:  # httpx es opcional
+        return await asyncio.to_thread(transporte_urllib, url, cuerpo, timeout)
+    respuesta = await _cliente_async(httpx).post(
+        url, json=cuerpo, headers={"Accept": "application/json"}, timeout=timeout
+    )
+    respuesta.raise_for_status()
+    return respuesta.json()
+
+
+class ResolutorHTTP(ResolutorAutores):
+    """
+    Pide el lote a auth_service: POST {"ids": [...]} a NEWS_AUTORES_URL y
+    espera una lista de {id, nombre, apellido, email} (o un dict id -> nombre).
+    `transporte` y `transporte_async` son reemplazables (en tests, un stub
+    local); con solo `transporte`, la versión async lo corre en un hilo.
+    """
+
+    def __init__(self, url=None, timeout=None, transporte=None, transporte_async=None):
+        self.url = url or settings.NEWS_AUTORES_URL
+        self.timeout = timeout or settings.NEWS_AUTORES_TIMEOUT
+        if transporte_async is None and transporte is None:
+            transporte_async = import_string(settings.NEWS_AUTORES_TRANSPORTE_ASYNC)
+        self.transporte = transporte or import_string(settings.NEWS_AUTORES_TRANSPORTE)
+        self.transporte_async = transporte_async
+
+    def resolver(self, usuario_ids):
+        if not self.url:
+            return {}
+        datos = self.transporte(self.url, {"ids": list(usuario_ids)}, self.timeout)
+        return self.interpretar(datos)
+
+    async def aresolver(self, usuario_ids):
+        if not self.url:
+            return {}
+        cuerpo = {"ids": list(usuario_ids)}
+        if self.transporte_async is None:
+            datos = await asyncio.to_thread(self.transporte, self.url, cuerpo, self.timeout)
+        else:
+            datos = await self.transporte_async(self.url, cuerpo, self.timeout)
+        return self.interpretar(datos)
+
+    @staticmethod
+    def interpretar(datos):
+        if isinstance(datos, dict):
+            return {str(uid): nombre for uid, nombre in datos.items() if nombre}
+        nombres = {}
+        for usuario in datos or []:
+            nombre = nombre_visible(usuario.get("nombre"), usuario.get("apellido"), usuario.get("email"))
+            if usuario.get("id") and nombre:
+                nombres[str(usuario["id"])] = nombre
+        return nombres
+
+
+# ------------------ 🔹 API ------------------
+_cache = None
+_resolutores = None
+_init_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _init_lock:
+            if _cache is None:
+                _cache = CacheLRU(
+                    settings.NEWS_AUTORES_CACHE_MAX,
+                    settings.NEWS_AUTORES_CACHE_TTL,
+                    settings.NEWS_AUTORES_CACHE_TTL_NEGATIVO,
+                )
+    return _cache
+
+
+def get_resolutores():
+    global _resolutores
+    if _resolutores is None:
+        with _init_lock:
+            if _resolutores is None:
+                _resolutores = [import_string(ruta)() for ruta in settings.NEWS_AUTORES_RESOLUTORES]
+    return _resolutores
+
+
+def _desde_cache(usuario_ids):
+    """ (nombres ya cacheados, {clave: id} faltantes). """
+    cache = get_cache()
+    nombres = {}
+    faltantes = {}
+    for uid in set(usuario_ids):
+        valor = cache.obtener(str(uid))
+        if valor is DESCONOCIDO:
+            faltantes[str(uid)] = uid
+        else:
+            nombres[uid] = valor
+    return nombres, faltantes
+
+
+def _anotar(nombres, faltantes, encontrados):
+    cache = get_cache()
+    for clave, nombre in encontrados.items():
+        if clave in faltantes:
+            nombres[faltantes.pop(clave)] = nombre
+            cache.guardar(clave, nombre)
+
+
+def _cerrar(nombres, faltantes, fallidos):
+    cache = get_cache()
+    for clave, uid in faltantes.items():
+        nombres[uid] = None
+        if not fallidos:
+            cache.guardar(clave, None)
+    return {uid: nombre or nombre_por_defecto(uid) for uid, nombre in nombres.items()}
+
+
+def _fallo(resolutor):
+    logger.warning("Resolutor de autores %s falló", type(resolutor).__name__, exc_info=True)
+
+
+def resolver_nombres(usuario_ids):
+    """
+    {usuario_id: nombre visible} para todos los ids, con fallback
+    "Usuario xxxxxxxx". Cada resolutor se consulta como mucho una vez.
+    """
+    nombres, faltantes = _desde_cache(usuario_ids)
+    fallidos = False
+    for resolutor in get_resolutores():
+        if not faltantes:
+            break
+        try:
+            encontrados = resolutor.resolver(list(faltantes))
+        except Exception:
+            _fallo(resolutor)
+            fallidos = True
+            continue
+        _anotar(nombres, faltantes, encontrados)
+    return _cerrar(nombres, faltantes, fallidos)
+
+
+async def aresolver_nombres(usuario_ids):
+    """ Versión async de `resolver_nombres` (misma caché, mismos resolutores). """
+    nombres, faltantes = _desde_cache(usuario_ids)
+    fallidos = False
+    for resolutor in get_resolutores():
+        if not faltantes:
+            break
+        try:
+            encontrados = await resolutor.aresolver(list(faltantes))
+        except Exception:
+            _fallo(resolutor)
+            fallidos = True
+            continue
+        _anotar(nombres, faltantes, encontrados)
+    return _cerrar(nombres, faltantes, fallidos)
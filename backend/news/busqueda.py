@@ -0,0 +1,90 @@
+from django.db import connection
+from django.db.models import F, Q
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+
+# Configuración de texto de Postgres (debe coincidir con el trigger de la migración 0004)
+CONFIG_TEXTO = "spanish"
+
+ORDEN_RELEVANCIA = ("-relevancia", "-id")
+ORDEN_SIMILITUD = ("-similitud", "-id")
+
+
+def soporta_busqueda_completa():
+    """ El motor full-text solo existe en Postgres; SQLite usa icontains. """
+    return connection.vendor == "postgresql"
+
+
+def vector_publicacion():
+    """
+    Mismo tsvector que mantiene el trigger: título con peso A, contenido con peso B.
+    Lo usa el comando `reindexar_busqueda` para rellenar filas existentes.
+    """
+    return (
+        SearchVector("titulo", weight="A", config=CONFIG_TEXTO)
+        + SearchVector("contenido", weight="B", config=CONFIG_TEXTO)
+    )
+
+
+def _busqueda_postgres(queryset, texto):
+    """ (coincidencias, coincidencias anotadas, fallback por trigramas). """
+    consulta = SearchQuery(texto, config=CONFIG_TEXTO, search_type="websearch")
+    coincidencias = queryset.filter(busqueda=consulta)
+    anotadas = coincidencias.annotate(
+        relevancia=SearchRank(F("busqueda"), consulta),
+        fragmento=SearchHeadline(
+            "contenido",
+            consulta,
+            config=CONFIG_TEXTO,
+            start_sel="<mark>",
+            stop_sel="</mark>",
+            max_words=35,
+            min_words=15,
+        ),
+    )
+    similares = queryset.filter(titulo__trigram_similar=texto).annotate(
+        similitud=TrigramSimilarity("titulo", texto)
+    )
+    return coincidencias, anotadas, similares
+
+
+def _busqueda_simple(queryset, texto):
+    return queryset.filter(Q(titulo__icontains=texto) | Q(contenido__icontains=texto))
+
+
+def buscar_publicaciones(queryset, texto):
+    """
+    Aplica la búsqueda de `texto` sobre `queryset`.
+
+    Devuelve (queryset, ordering) donde ordering es la llave keyset que debe
+    usar el paginador, o None para conservar el orden cronológico.
+
+    - Postgres: tsvector + GIN, ordenado por relevancia y con `fragmento`
+      resaltado; si no hay coincidencias, fallback por trigramas del título
+      (tolera errores de tipeo).
+    - Otros motores (SQLite en tests/dev): icontains sobre título y contenido.
+    """
+    if not soporta_busqueda_completa():
+        return _busqueda_simple(queryset, texto), None
+
+    coincidencias, anotadas, similares = _busqueda_postgres(queryset, texto)
+    if coincidencias.exists():
+        return anotadas, ORDEN_RELEVANCIA
+    return similares, ORDEN_SIMILITUD
+
+
+async def abuscar_publicaciones(queryset, texto):
+    """ Versión async de `buscar_publicaciones` (ORM async). """
+    if not soporta_busqueda_completa():
+        return _busqueda_simple(queryset, texto), None
+
+    coincidencias, anotadas, similares = _busqueda_postgres(queryset, texto)
+    if await coincidencias.aexists():
+        return anotadas, ORDEN_RELEVANCIA
+    return similares, ORDEN_SIMILITUD
@@ -0,0 +1,54 @@
+"""
+Caché en memoria del proceso, compartida por módulos que no se conocen
+entre sí: nombres de autores (news/autores.py) y tokens JWT verificados
+(news/authentication.py), cada uno con su instancia.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+DESCONOCIDO = object()
+
+
+class CacheLRU:
+    """
+    LRU acotada con TTL. Guardar None es caché negativa (ttl_negativo):
+    evita volver a preguntar enseguida por ids que nadie conoce. `guardar`
+    acepta un ttl propio por entrada (p. ej. hasta el `exp` de un JWT).
+    """
+
+    def __init__(self, maximo, ttl, ttl_negativo):
+        self.maximo = maximo
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, defecto=DESCONOCIDO):
+        """ Valor guardado (puede ser None) o `defecto` (DESCONOCIDO) si no está o expiró. """
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return defecto
+            valor, expira = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return defecto
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor, ttl=None):
+        if ttl is None:
+            ttl = self.ttl if valor is not None else self.ttl_negativo
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + ttl)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
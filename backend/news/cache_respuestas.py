@@ -0,0 +1,210 @@
+"""
+Caché de respuestas de lectura (feed, detalle, categorías).
+
+Las claves llevan la versión de los grupos de los que depende la respuesta
+("feed", "pub:<id>", "categorias"). Invalidar es incrementar la versión del
+grupo: las claves viejas dejan de usarse y expiran solas. Las señales de
+news/signals.py (y las rutas que escriben con SQL directo) llaman a
+`invalidar_*` tras el commit.
+
+Los roles que ven borradores (admin, institución) no usan la caché, y
+no se guarda lo leído de una réplica atrasada (news/replicas.py).
+Las vistas async (news/asincrono.py) comparten claves con las sync
+mediante `acachear_respuesta`.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .condicional import con_validadores, no_modificado, validadores_de
+from .replicas import leyo_de_replica_atrasada
+
+ROLES_SIN_CACHE = {"admin", "institucion"}
+
+GRUPO_FEED = "feed"
+GRUPO_CATEGORIAS = "categorias"
+
+
+def grupo_publicacion(publicacion_id):
+    return f"pub:{publicacion_id}"
+
+
+def get_cache():
+    return caches[settings.NEWS_CACHE_ALIAS]
+
+
+# ------------------ 🔹 VERSIONES ------------------
+def _clave_version(grupo):
+    return f"news:v:{grupo}"
+
+
+def versiones(grupos):
+    """ Versión actual de cada grupo (una sola ida a la caché). """
+    claves = {_clave_version(g): g for g in grupos}
+    actuales = get_cache().get_many(list(claves))
+    return [actuales.get(clave, 0) for clave in claves]
+
+
+async def aversiones(grupos):
+    claves = {_clave_version(g): g for g in grupos}
+    actuales = await get_cache().aget_many(list(claves))
+    return [actuales.get(clave, 0) for clave in claves]
+
+
+def _incrementar_versiones(grupos):
+    cache = get_cache()
+    for grupo in grupos:
+        clave = _clave_version(grupo)
+        # add() crea la versión si no existe; incr() es atómico en Redis
+        if not cache.add(clave, 1, timeout=None):
+            try:
+                cache.incr(clave)
+            except ValueError:
+                cache.set(clave, 1, timeout=None)
+
+
+def invalidar(*grupos):
+    """ Invalida los grupos cuando la transacción actual confirme. """
+    grupos = [g for g in grupos if g]
+    transaction.on_commit(lambda: _incrementar_versiones(grupos))
+
+
+def invalidar_publicacion(publicacion_id):
+    invalidar(GRUPO_FEED, grupo_publicacion(publicacion_id))
+
+
+def invalidar_categorias():
+    invalidar(GRUPO_CATEGORIAS, GRUPO_FEED)
+
+
+# ------------------ 🔹 CLAVES ------------------
+def parametros_normalizados(request):
+    """ Query params ordenados, sin vacíos; `q` en minúsculas y sin espacios extra. """
+    normalizados = []
+    for nombre in sorted(request.query_params):
+        for valor in sorted(request.query_params.getlist(nombre)):
+            valor = valor.strip()
+            if not valor:
+                continue
+            if nombre == "q":
+                valor = " ".join(valor.lower().split())
+            normalizados.append((nombre, valor))
+    return normalizados
+
+
+def _clave(request, nombre, versiones_grupos):
+    base = repr((
+        nombre,
+        versiones_grupos,
+        request.scheme,
+        request.get_host(),
+        parametros_normalizados(request),
+    ))
+    return f"news:resp:{nombre}:{hashlib.sha256(base.encode('utf-8')).hexdigest()}"
+
+
+def clave_respuesta(request, nombre, grupos):
+    """
+    Clave = endpoint + versiones de los grupos + host (las URLs de imagen
+    son absolutas) + parámetros normalizados.
+    """
+    return _clave(request, nombre, versiones(grupos))
+
+
+async def aclave_respuesta(request, nombre, grupos):
+    return _clave(request, nombre, await aversiones(grupos))
+
+
+def usa_cache(request):
+    if request.method != "GET" or not settings.NEWS_CACHE_RESPUESTAS_TTL:
+        return False
+    user = getattr(request, "user", None)
+    if user and getattr(user, "is_authenticated", False):
+        return (getattr(user, "rol", None) or "").lower() not in ROLES_SIN_CACHE
+    return True
+
+
+# ------------------ 🔹 DECORADOR ------------------
+def _nombre(view, metodo):
+    # La acción (no el método) para que list y su versión async compartan claves
+    return f"{type(view).__name__}.{getattr(view, 'action', None) or metodo.__name__}"
+
+
+def _desde_cache(request, guardado):
+    datos, etag, ultima_modificacion = guardado
+    respuesta = no_modificado(request, etag, ultima_modificacion)
+    if respuesta is None:
+        respuesta = con_validadores(Response(datos), etag, ultima_modificacion)
+    respuesta["X-Cache"] = "HIT"
+    return respuesta
+
+
+def _para_guardar(respuesta):
+    return (respuesta.data, *validadores_de(respuesta))
+
+
+def _guardable(respuesta):
+    # Leída de una réplica atrasada: quedaría vieja bajo la versión nueva (news/replicas.py)
+    return respuesta.status_code == 200 and not leyo_de_replica_atrasada()
+
+
+def cachear_respuesta(grupos, al_acertar=None):
+    """
+    Decora una acción de ViewSet (list/retrieve). `grupos(view, kwargs)`
+    devuelve los grupos de invalidación; `al_acertar(view, kwargs)` se
+    ejecuta también cuando la respuesta sale de la caché (p. ej. contar la vista).
+    Los validadores (ETag / Last-Modified) se guardan con los datos, así que
+    un acierto también puede responder 304.
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, request, *args, **kwargs):
+            if not usa_cache(request):
+                return metodo(self, request, *args, **kwargs)
+
+            cache = get_cache()
+            clave = clave_respuesta(request, _nombre(self, metodo), grupos(self, kwargs))
+            guardado = cache.get(clave)
+            if guardado is not None:
+                if al_acertar:
+                    al_acertar(self, kwargs)
+                return _desde_cache(request, guardado)
+
+            respuesta = metodo(self, request, *args, **kwargs)
+            if _guardable(respuesta):
+                cache.set(clave, _para_guardar(respuesta), settings.NEWS_CACHE_RESPUESTAS_TTL)
+                respuesta["X-Cache"] = "MISS"
+            return respuesta
+        return envoltura
+    return decorador
+
+
+def acachear_respuesta(grupos, al_acertar=None):
+    """ Igual que `cachear_respuesta` para acciones async; `al_acertar` puede ser async. """
+    def decorador(metodo):
+        @wraps(metodo)
+        async def envoltura(self, request, *args, **kwargs):
+            if not usa_cache(request):
+                return await metodo(self, request, *args, **kwargs)
+
+            cache = get_cache()
+            clave = await aclave_respuesta(request, _nombre(self, metodo), grupos(self, kwargs))
+            guardado = await cache.aget(clave)
+            if guardado is not None:
+                if al_acertar:
+                    resultado = al_acertar(self, kwargs)
+                    if hasattr(resultado, "__await__"):
+                        await resultado
+                return _desde_cache(request, guardado)
+
+            respuesta = await metodo(self, request, *args, **kwargs)
+            if _guardable(respuesta):
+                await cache.aset(clave, _para_guardar(respuesta), settings.NEWS_CACHE_RESPUESTAS_TTL)
+                respuesta["X-Cache"] = "MISS"
+            return respuesta
+        return envoltura
+    return decorador
@@ -0,0 +1,60 @@
+"""
+GET condicionales (ETag / Last-Modified).
+
+Los validadores salen de columnas baratas —`version` y `fecha_actividad`
+de la publicación— y se comparan ANTES de serializar: si el cliente ya
+tiene la representación, se responde 304 sin armar comentarios, autores
+ni JSON.
+
+- Detalle: (id, version) y fecha_actividad.
+- Comentarios de una publicación: version de la publicación (los
+  comentarios la suben al crearse, editarse o borrarse) + parámetros.
+- Feed: (id, version) de las filas de la página y sus cursores. No lleva
+  Last-Modified: una publicación que sale de la página no mueve la fecha.
+"""
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def etag_de(*partes):
+    """ ETag débil a partir de cualquier cosa con repr estable. """
+    resumen = hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()
+    return f'W/"{resumen}"'
+
+
+def marca_de_tiempo(fecha):
+    return timegm(fecha.utctimetuple()) if fecha else None
+
+
+def no_modificado(request, etag=None, ultima_modificacion=None):
+    """
+    HttpResponseNotModified (con sus validadores) si los del cliente
+    coinciden; None si hay que generar la respuesta. `ultima_modificacion`
+    puede ser datetime o marca de tiempo.
+    """
+    if hasattr(ultima_modificacion, "utctimetuple"):
+        ultima_modificacion = marca_de_tiempo(ultima_modificacion)
+    respuesta = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+    if respuesta is not None:
+        con_validadores(respuesta, etag, ultima_modificacion)
+    return respuesta
+
+
+def con_validadores(respuesta, etag=None, ultima_modificacion=None):
+    if hasattr(ultima_modificacion, "utctimetuple"):
+        ultima_modificacion = marca_de_tiempo(ultima_modificacion)
+    if etag:
+        respuesta["ETag"] = etag
+    if ultima_modificacion:
+        respuesta["Last-Modified"] = http_date(ultima_modificacion)
+    return respuesta
+
+
+def validadores_de(respuesta):
+    """ (etag, marca de tiempo) ya puestos en una respuesta (para la caché). """
+    etag = respuesta.get("ETag")
+    ultima_modificacion = parse_http_date_safe(respuesta.get("Last-Modified") or "")
+    return etag, ultima_modificacion
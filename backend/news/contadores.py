@@ -0,0 +1,59 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+from .cache_respuestas import invalidar_publicacion
+from .models import Publicacion
+from .sincronizacion import ENTIDAD_PUBLICACION, registrar_cambio
+from .tendencia import expresion_score
+
+
+def cambios_de_version():
+    """ Lo que hay que sumar a un UPDATE para invalidar los validadores HTTP. """
+    return {"version": F("version") + 1, "fecha_actividad": Now()}
+
+
+def conteo_por_publicacion(modelo):
+    """
+    Subconsulta correlacionada con el número de filas de `modelo`
+    que apuntan a la publicación (OuterRef("pk")).
+    """
+    filas = (
+        modelo.objects.filter(publicacion=OuterRef("pk"))
+        .order_by()
+        .values("publicacion")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return Coalesce(Subquery(filas), 0)
+
+
+def incrementar(publicacion_id, **deltas):
+    """
+    Suma `deltas` a los contadores de una publicación en un solo UPDATE
+    con F(): el incremento lo hace la BD, así que es correcto aunque
+    haya muchas peticiones concurrentes sobre la misma fila. En el mismo
+    UPDATE sube la versión (ETag), se recalcula el score de tendencia y se
+    invalida la caché de respuestas.
+
+        incrementar(pub.id, likes_count=1)
+        incrementar(pub.id, comentarios_count=-1)
+    """
+    cambios = {campo: F(campo) + delta for campo, delta in deltas.items() if delta}
+    if not cambios:
+        return 0
+    return tocar(publicacion_id, **cambios, score=expresion_score(**deltas))
+
+
+def tocar(publicacion_id, **cambios):
+    """
+    Marca la publicación como modificada (versión + fecha_actividad) sin
+    pasar por save(): comentarios editados, likes, contadores.
+    """
+    publicacion_modificada(publicacion_id)
+    return Publicacion.objects.filter(pk=publicacion_id).update(**cambios, **cambios_de_version())
+
+
+def publicacion_modificada(publicacion_id):
+    """ Invalida la caché de respuestas y deja el cambio para la sincronización. """
+    invalidar_publicacion(publicacion_id)
+    registrar_cambio(ENTIDAD_PUBLICACION, publicacion_id)
@@ -0,0 +1,367 @@
+"""
+Eventos en vivo por publicación (Server-Sent Events).
+
+Los cambios (comentario nuevo, respuesta, comentario borrado, conteo de
+likes) se publican tras el commit en un bus configurable
+(NEWS_EVENTOS_BACKEND):
+- BusMemoria: entrega directa a las conexiones de este proceso (dev/tests).
+- BusPostgres: `pg_notify` al publicar y un hilo por worker con `LISTEN`
+  que reparte a las conexiones locales; así un comentario creado en
+  cualquier worker llega a todos. Por defecto si la BD es Postgres.
+  El LISTEN necesita una conexión directa (no pgbouncer en modo
+  transacción): NEWS_EVENTOS_DSN.
+
+Sin NEWS_EVENTOS (por defecto, fuera del modo ASGI) no se publica nada.
+Los datos del evento se arman después del commit, fuera de la transacción,
+y solo si a alguien le pueden interesar (BusMemoria: conexiones abiertas
+a esa publicación en este proceso).
+
+Cada worker ASGI tiene un Centro con las suscripciones abiertas:
+- tope de conexiones por worker (NEWS_SSE_MAX_CONEXIONES) → 503,
+- cola acotada por conexión (NEWS_SSE_COLA): si un cliente lento la llena
+  se descarta lo pendiente y se le envía `desfase` (debe resincronizar con
+  el endpoint sync/), en lugar de acumular memoria sin límite.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.http import StreamingHttpResponse
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .renderers import volcar
+
+logger = logging.getLogger(__name__)
+
+EVENTO_COMENTARIO = "comentario"
+EVENTO_RESPUESTA = "respuesta"
+EVENTO_COMENTARIO_ELIMINADO = "comentario_eliminado"
+EVENTO_LIKES = "likes"
+EVENTO_DESFASE = "desfase"
+
+# pg_notify admite hasta 8000 bytes de payload
+MAX_PAYLOAD_NOTIFY = 7500
+
+
+class DemasiadasConexiones(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Demasiadas conexiones de eventos abiertas; reintenta más tarde."
+    default_code = "demasiadas_conexiones"
+
+    def __init__(self):
+        super().__init__()
+        # El manejador de excepciones de DRF lo envía como Retry-After
+        self.wait = max(1, settings.NEWS_SSE_RETRY_MS // 1000)
+
+
+def _json(datos):
+    return volcar(datos).decode("utf-8")
+
+
+def formatear(tipo, datos):
+    """ Un evento SSE (`event:` + `data:` en una línea JSON). """
+    return f"event: {tipo}\ndata: {_json(datos)}\n\n"
+
+
+# ------------------ 🔹 SUSCRIPCIONES (por worker) ------------------
+class Suscripcion:
+    def __init__(self, centro, publicacion_id, loop, maximo):
+        self.centro = centro
+        self.publicacion_id = publicacion_id
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=maximo)
+
+    def poner(self, trama):
+        """ Se ejecuta en el loop de la conexión. """
+        try:
+            self.cola.put_nowait(trama)
+        except asyncio.QueueFull:
+            self.desfasar()
+
+    def desfasar(self):
+        # Cliente lento (o eventos perdidos): fuera lo pendiente, que resincronice
+        while not self.cola.empty():
+            self.cola.get_nowait()
+        self.centro.contar("desfases")
+        self.cola.put_nowait(formatear(EVENTO_DESFASE, {"publicacion": self.publicacion_id}))
+
+
+class Centro:
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._por_publicacion = defaultdict(set)
+        self._lock = threading.Lock()
+        self.metricas = {"conexiones": 0, "rechazadas": 0, "entregados": 0, "desfases": 0}
+
+    def escuchada(self, publicacion_id):
+        """ ¿Hay conexiones abiertas a la publicación en este proceso? """
+        return str(publicacion_id) in self._por_publicacion
+
+    def suscribir(self, publicacion_id):
+        publicacion_id = str(publicacion_id)
+        with self._lock:
+            if self.metricas["conexiones"] >= self.maximo:
+                self.metricas["rechazadas"] += 1
+                raise DemasiadasConexiones()
+            suscripcion = Suscripcion(
+                self, publicacion_id, asyncio.get_running_loop(), settings.NEWS_SSE_COLA
+            )
+            self._por_publicacion[publicacion_id].add(suscripcion)
+            self.metricas["conexiones"] += 1
+        get_bus().escuchar()
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            abiertas = self._por_publicacion.get(suscripcion.publicacion_id)
+            if abiertas is None or suscripcion not in abiertas:
+                return
+            abiertas.discard(suscripcion)
+            if not abiertas:
+                del self._por_publicacion[suscripcion.publicacion_id]
+            self.metricas["conexiones"] -= 1
+
+    def contar(self, metrica, cantidad=1):
+        with self._lock:
+            self.metricas[metrica] += cantidad
+
+    def entregar(self, mensaje):
+        """ Reparte un mensaje del bus; la trama se arma una sola vez. Seguro entre hilos. """
+        with self._lock:
+            suscripciones = list(self._por_publicacion.get(mensaje["publicacion"], ()))
+        if not suscripciones:
+            return
+        trama = formatear(mensaje["tipo"], {"publicacion": mensaje["publicacion"], **mensaje["datos"]})
+        for suscripcion in suscripciones:
+            self._llamar(suscripcion, suscripcion.poner, trama)
+        self.contar("entregados", len(suscripciones))
+
+    def desfasar_todas(self):
+        """ Tras perder el LISTEN: todas las conexiones deben resincronizar. """
+        with self._lock:
+            suscripciones = [s for abiertas in self._por_publicacion.values() for s in abiertas]
+        for suscripcion in suscripciones:
+            self._llamar(suscripcion, suscripcion.desfasar)
+
+    @staticmethod
+    def _llamar(suscripcion, funcion, *args):
+        try:
+            suscripcion.loop.call_soon_threadsafe(funcion, *args)
+        except RuntimeError:
+            # Loop cerrado: la conexión ya terminó
+            pass
+
+
+_centro = None
+_centro_lock = threading.Lock()
+
+
+def get_centro():
+    global _centro
+    if _centro is None:
+        with _centro_lock:
+            if _centro is None:
+                _centro = Centro(settings.NEWS_SSE_MAX_CONEXIONES)
+    return _centro
+
+
+# ------------------ 🔹 BUSES ------------------
+class BusMemoria:
+    """ Solo este proceso (dev/tests, o un único worker). """
+
+    def publicar(self, mensaje):
+        get_centro().entregar(mensaje)
+
+    def interesa(self, publicacion_id):
+        return _centro is not None and _centro.escuchada(publicacion_id)
+
+    def escuchar(self):
+        pass
+
+
+class BusPostgres:
+    """ LISTEN/NOTIFY: cualquier worker publica, todos los que escuchan reparten. """
+
+    def __init__(self, canal=None, dsn=None):
+        self.canal = canal or settings.NEWS_EVENTOS_CANAL
+        self.dsn = dsn if dsn is not None else settings.NEWS_EVENTOS_DSN
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def interesa(self, publicacion_id):
+        # Las conexiones pueden estar en cualquier worker
+        return True
+
+    def publicar(self, mensaje):
+        carga = _json(mensaje)
+        if len(carga.encode("utf-8")) > MAX_PAYLOAD_NOTIFY:
+            # Demasiado grande para NOTIFY: solo la referencia, el cliente la pide
+            carga = _json({**mensaje, "datos": {"id": mensaje["datos"].get("id"), "truncado": True}})
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.canal, carga])
+
+    def escuchar(self):
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="news-eventos", daemon=True)
+                self._hilo.start()
+
+    def _conectar(self):
+        import psycopg2
+
+        if self.dsn:
+            conexion = psycopg2.connect(self.dsn)
+        else:
+            conexion = psycopg2.connect(**connections["default"].get_connection_params())
+        conexion.autocommit = True
+        return conexion
+
+    def _bucle(self):
+        espera = 1
+        reconexion = False
+        while True:
+            try:
+                conexion = self._conectar()
+                try:
+                    with conexion.cursor() as cursor:
+                        cursor.execute(f'LISTEN "{self.canal}"')
+                    if reconexion:
+                        get_centro().desfasar_todas()
+                    espera = 1
+                    self._escuchar(conexion)
+                finally:
+                    conexion.close()
+            except Exception:
+                logger.exception("Se perdió el LISTEN de eventos; reintentando en %ss", espera)
+                reconexion = True
+                time.sleep(espera)
+                espera = min(espera * 2, 30)
+
+    def _escuchar(self, conexion):
+        centro = get_centro()
+        while True:
+            if not select.select([conexion], [], [], settings.NEWS_SSE_PING)[0]:
+                continue
+            conexion.poll()
+            while conexion.notifies:
+                aviso = conexion.notifies.pop(0)
+                try:
+                    centro.entregar(json.loads(aviso.payload))
+                except (ValueError, KeyError):
+                    logger.warning("Evento con formato inválido: %r", aviso.payload[:200])
+
+
+_bus = None
+
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        ruta = settings.NEWS_EVENTOS_BACKEND or (
+            "news.eventos.BusPostgres" if connection.vendor == "postgresql" else "news.eventos.BusMemoria"
+        )
+        _bus = import_string(ruta)()
+    return _bus
+
+
+# ------------------ 🔹 PUBLICAR ------------------
+def eventos_activos():
+    return settings.NEWS_EVENTOS
+
+
+def publicar_evento(publicacion_id, tipo, datos):
+    """
+    Publica el evento cuando la transacción actual confirme. `datos` puede
+    ser una función: se llama después del commit y solo si hay a quién enviarlo.
+    """
+    if not eventos_activos():
+        return
+
+    def enviar():
+        try:
+            bus = get_bus()
+            if not bus.interesa(publicacion_id):
+                return
+            carga = datos() if callable(datos) else datos
+            bus.publicar({"tipo": tipo, "publicacion": str(publicacion_id), "datos": carga})
+        except Exception:
+            # Los eventos son best-effort: nunca rompen la escritura
+            logger.exception("No se pudo publicar el evento %s de %s", tipo, publicacion_id)
+
+    transaction.on_commit(enviar)
+
+
+def publicar_comentario(comentario):
+    """ Comentario nuevo (o respuesta) con la misma forma que en los listados. """
+    padre_id = comentario.padre_id
+
+    def datos():
+        # Tras el commit: el nombre del autor puede pedirse a auth_service
+        from .autores import resolver_nombres
+        from .serializers import ComentarioSerializer
+
+        rep = ComentarioSerializer(
+            comentario,
+            context={
+                "respuestas_por_padre": {},
+                "nombres_usuario": resolver_nombres([comentario.usuario_id]),
+            },
+        ).data
+        return {**rep, "padre": str(padre_id) if padre_id else None}
+
+    publicar_evento(comentario.publicacion_id, EVENTO_RESPUESTA if padre_id else EVENTO_COMENTARIO, datos)
+
+
+# ------------------ 🔹 STREAM SSE ------------------
+async def _flujo(suscripcion):
+    loop = asyncio.get_running_loop()
+    limite = loop.time() + settings.NEWS_SSE_DURACION_MAX
+    try:
+        yield f"retry: {settings.NEWS_SSE_RETRY_MS}\n\n"
+        while True:
+            restante = limite - loop.time()
+            if restante <= 0:
+                # Cierre periódico: el cliente reconecta (reparte carga entre workers)
+                return
+            try:
+                trama = await asyncio.wait_for(
+                    suscripcion.cola.get(), timeout=min(settings.NEWS_SSE_PING, restante)
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield trama
+    finally:
+        suscripcion.centro.cancelar(suscripcion)
+
+
+class RespuestaSSE(StreamingHttpResponse):
+    def __init__(self, suscripcion):
+        super().__init__(_flujo(suscripcion), content_type="text/event-stream")
+        self.suscripcion = suscripcion
+        self["Cache-Control"] = "no-cache"
+        self["X-Accel-Buffering"] = "no"  # nginx no debe acumular el stream
+
+    def close(self):
+        # Django la cierra siempre, también si el cliente se fue antes de empezar
+        self.suscripcion.centro.cancelar(self.suscripcion)
+        super().close()
+
+
+def respuesta_sse(publicacion_id):
+    """ Stream de eventos de la publicación (solo ASGI). """
+    return RespuestaSSE(get_centro().suscribir(publicacion_id))
+
+
+def metricas_eventos():
+    return dict(get_centro().metricas) if _centro is not None else {}
@@ -0,0 +1,147 @@
+"""
+Exportación completa de publicaciones (GET publicaciones/exportar/ y el
+comando `exportar_publicaciones`) en NDJSON o CSV, en memoria constante.
+
+- Las filas salen de un cursor de servidor (`.iterator(chunk_size)`) en
+  orden (fecha_publicacion, id). Detrás de pgbouncer en modo transacción
+  (DISABLE_SERVER_SIDE_CURSORS) psycopg traería todo el resultado de una
+  vez, así que ahí se pide por lotes con keyset sobre esa misma llave.
+- Se escribe por bloques de NEWS_EXPORTACION_LOTE filas (no una escritura
+  por fila). Las columnas son las que acepta la importación (news/importacion.py)
+  más autor, contadores e imagen, así que un volcado se puede reimportar.
+- En ASGI, Django junta en memoria un iterador sync antes de enviarlo: la
+  respuesta usa uno async que pide cada bloque al hilo de la petición.
+"""
+import csv
+import io
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .renderers import volcar
+
+# (nombre en el volcado, columna)
+COLUMNAS = (
+    ("id", "id"),
+    ("titulo", "titulo"),
+    ("contenido", "contenido"),
+    ("categoria", "categoria_id"),
+    ("estado", "estado"),
+    ("fecha_publicacion", "fecha_publicacion"),
+    ("fecha_actualizacion", "fecha_actualizacion"),
+    ("autor_id", "autor_id"),
+    ("autor_institucion_id", "autor_institucion_id"),
+    ("tipo_autor", "tipo_autor"),
+    ("imagen", "imagen"),
+    ("vistas", "vistas"),
+    ("likes_count", "likes_count"),
+    ("comentarios_count", "comentarios_count"),
+)
+NOMBRES = tuple(nombre for nombre, _ in COLUMNAS)
+TIPOS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+_encoder = JSONEncoder()
+_FECHA = NOMBRES.index("fecha_publicacion")
+
+
+# ------------------ 🔹 FILAS ------------------
+def _por_llave(queryset, lote):
+    """ Lotes con keyset sobre (fecha_publicacion, id): una consulta por lote. """
+    ultimo = None
+    while True:
+        q = queryset
+        if ultimo is not None:
+            fecha, pk = ultimo
+            q = q.filter(Q(fecha_publicacion__gt=fecha) | Q(fecha_publicacion=fecha, id__gt=pk))
+        bloque = list(q[:lote])
+        yield from bloque
+        if len(bloque) < lote:
+            return
+        ultimo = bloque[-1][_FECHA], bloque[-1][0]
+
+
+def filas(queryset, lote=None):
+    """ Tuplas con las columnas de COLUMNAS, en orden (fecha_publicacion, id). """
+    lote = lote or settings.NEWS_EXPORTACION_LOTE
+    queryset = queryset.order_by("fecha_publicacion", "id").values_list(*(c for _, c in COLUMNAS))
+    conexion = connections[queryset.db]
+    if conexion.vendor == "postgresql" and conexion.settings_dict.get("DISABLE_SERVER_SIDE_CURSORS"):
+        return _por_llave(queryset, lote)
+    return queryset.iterator(chunk_size=lote)
+
+
+# ------------------ 🔹 FORMATOS ------------------
+def _texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        # Mismo formato que el JSON de la API ("Z" para UTC)
+        return _encoder.default(valor)
+    return valor
+
+
+def bloques_ndjson(filas, lote=None):
+    lote = lote or settings.NEWS_EXPORTACION_LOTE
+    bloque = []
+    for fila in filas:
+        bloque.append(volcar(dict(zip(NOMBRES, fila))))
+        if len(bloque) >= lote:
+            yield b"\n".join(bloque) + b"\n"
+            bloque = []
+    if bloque:
+        yield b"\n".join(bloque) + b"\n"
+
+
+def bloques_csv(filas, lote=None):
+    lote = lote or settings.NEWS_EXPORTACION_LOTE
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(NOMBRES)
+    for numero, fila in enumerate(filas, 1):
+        escritor.writerow([_texto(valor) for valor in fila])
+        if numero % lote == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+BLOQUES = {"ndjson": bloques_ndjson, "csv": bloques_csv}
+
+
+def exportar(queryset, formato, lote=None):
+    """ Iterador de bloques de bytes del volcado (lazy: consulta al iterarlo). """
+    return BLOQUES[formato](filas(queryset, lote), lote)
+
+
+# ------------------ 🔹 RESPUESTA ------------------
+async def _asincrono(bloques):
+    """
+    Cada bloque se pide con sync_to_async en el hilo de la petición
+    (thread_sensitive), el mismo de la conexión y del cursor abierto.
+    """
+    siguiente = sync_to_async(next, thread_sensitive=True)
+    fin = object()
+    try:
+        while (bloque := await siguiente(bloques, fin)) is not fin:
+            yield bloque
+    finally:
+        # Cliente desconectado a mitad: cerrar el cursor de servidor
+        await sync_to_async(bloques.close, thread_sensitive=True)()
+
+
+def respuesta_exportacion(queryset, formato, asincrono=False, lote=None):
+    # La base (réplica incluida) se fija ahora: el volcado se lee después
+    # de que la petición haya salido de los middlewares
+    queryset = queryset.using(queryset.db)
+    bloques = exportar(queryset, formato, lote)
+    respuesta = StreamingHttpResponse(_asincrono(bloques) if asincrono else bloques, content_type=TIPOS[formato])
+    respuesta["Content-Disposition"] = f'attachment; filename="publicaciones.{formato}"'
+    respuesta["Cache-Control"] = "no-store"
+    return respuesta
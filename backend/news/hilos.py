@@ -0,0 +1,45 @@
+"""
+Hilos de comentarios materializados (hilo_id + ruta + profundidad).
+
+Un hilo completo, o los hilos de una página de comentarios hasta cierta
+profundidad, se leen con una sola consulta sobre idx_com_hilo_prof y el
+árbol se arma en Python a partir de la ruta de cada comentario.
+"""
+from .models import Comentario
+
+
+def _consulta_hilos(hilo_ids, profundidad_max):
+    comentarios = Comentario.objects.filter(hilo_id__in=set(hilo_ids))
+    if profundidad_max is not None:
+        comentarios = comentarios.filter(profundidad__lte=profundidad_max)
+    return comentarios
+
+
+def cargar_hilos(hilo_ids, profundidad_max=None):
+    """ Todos los comentarios de los hilos dados, en una consulta. """
+    return list(_consulta_hilos(hilo_ids, profundidad_max))
+
+
+async def acargar_hilos(hilo_ids, profundidad_max=None):
+    return [c async for c in _consulta_hilos(hilo_ids, profundidad_max)]
+
+
+def armar_arbol(comentarios):
+    """
+    {comentario_id: [respuestas directas ordenadas por fecha]} para cada
+    comentario del conjunto. Las respuestas cuyo padre no está en el
+    conjunto (p. ej. fue eliminado) no se cuelgan de nadie.
+    """
+    respuestas_por_padre = {c.id: [] for c in comentarios}
+    for comentario in comentarios:
+        padre_id = comentario.padre_id
+        if padre_id in respuestas_por_padre:
+            respuestas_por_padre[padre_id].append(comentario)
+    for respuestas in respuestas_por_padre.values():
+        respuestas.sort(key=lambda c: (c.fecha_comentario, c.id))
+    return respuestas_por_padre
+
+
+def hilo_de(comentario):
+    """ Árbol completo del hilo al que pertenece `comentario` (una consulta). """
+    return armar_arbol(cargar_hilos([comentario.hilo_id or comentario.id]))
@@ -0,0 +1,234 @@
+"""
+Procesamiento de imágenes de publicaciones (Pillow).
+
+En la petición (barato, una decodificación):
+- se valida formato y tamaño (sin decodificar: solo la cabecera),
+- se corrige la orientación EXIF y se re-codifica sin metadatos,
+- se limita el lado mayor a NEWS_IMAGEN_LADO_MAX,
+- se guarda con nombre por contenido (sha256).
+Un JPEG, PNG o WebP de un solo cuadro, sin metadatos y dentro del tamaño
+se guarda tal cual (re-codificarlo solo perdería calidad). MPO (JPEG con
+varias imágenes, habitual en cámaras y móviles) siempre se re-codifica:
+queda solo la primera.
+
+Fuera de la petición (pool de hilos, tras el commit): variantes de ancho
+fijo (NEWS_IMAGEN_ANCHOS) en cada formato de NEWS_IMAGEN_FORMATOS, también
+con nombre por contenido, registradas en `Publicacion.imagen_variantes`
+como {"webp": {"320": "publicaciones/variantes/<hash>.webp", ...}, ...}.
+La publicación queda con `variantes_pendientes` hasta que se registran:
+lo que el pool no llegó a hacer (reinicio, error) lo retoma el comando
+`generar_variantes_imagenes`.
+"""
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .contadores import cambios_de_version, publicacion_modificada
+from .models import Publicacion
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_ACEPTADOS = {"JPEG", "PNG", "WEBP", "GIF", "MPO"}
+EXTENSIONES = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+# Lo que Pillow deja en `info` y no es metadato del usuario (ni EXIF ni XMP ni texto)
+INFO_INOCUA = {
+    "jfif", "jfif_version", "jfif_unit", "jfif_density", "dpi", "progressive", "progression",
+    "adobe", "adobe_transform", "icc_profile", "gamma", "srgb", "chromaticity", "transparency",
+    "background", "lossless", "loop", "duration", "timestamp",
+}
+CARPETA_VARIANTES = "publicaciones/variantes"
+
+
+class ImagenInvalida(ValueError):
+    pass
+
+
+def _storage():
+    return Publicacion._meta.get_field("imagen").storage
+
+
+def _nombre_por_contenido(carpeta, datos, formato):
+    resumen = hashlib.sha256(datos).hexdigest()[:32]
+    return f"{carpeta}/{resumen}.{EXTENSIONES[formato]}"
+
+
+def _codificar(imagen, formato, calidad):
+    salida = io.BytesIO()
+    opciones = {"optimize": True}
+    if imagen.mode not in ("RGB", "RGBA"):
+        imagen = imagen.convert("RGBA" if _tiene_alfa(imagen) else "RGB")
+    if formato == "JPEG":
+        if imagen.mode != "RGB":
+            imagen = _sobre_blanco(imagen)
+        opciones.update(quality=calidad, progressive=True)
+    elif formato == "WEBP":
+        opciones = {"quality": calidad, "method": 4}
+    icc = imagen.info.get("icc_profile")
+    if icc:
+        opciones["icc_profile"] = icc
+    imagen.save(salida, formato, **opciones)
+    return salida.getvalue()
+
+
+def _sobre_blanco(imagen):
+    """ RGB para JPEG: la transparencia se aplana sobre blanco. """
+    imagen = imagen.convert("RGBA")
+    fondo = Image.new("RGB", imagen.size, (255, 255, 255))
+    fondo.paste(imagen, mask=imagen.getchannel("A"))
+    return fondo
+
+
+def _tiene_alfa(imagen):
+    return imagen.mode in ("RGBA", "LA") or (imagen.mode == "P" and "transparency" in imagen.info)
+
+
+# ------------------ 🔹 EN LA PETICIÓN ------------------
+def abrir_validada(archivo):
+    """ Abre la imagen y valida formato y píxeles antes de decodificarla. """
+    try:
+        archivo.seek(0)
+        imagen = Image.open(archivo)
+    except (UnidentifiedImageError, OSError):
+        raise ImagenInvalida("El archivo no es una imagen válida.")
+    except Image.DecompressionBombError:
+        raise ImagenInvalida("La imagen tiene demasiados píxeles.")
+    if imagen.format not in FORMATOS_ACEPTADOS:
+        raise ImagenInvalida(f"Formato no permitido ({imagen.format}). Usa JPEG, PNG, WebP o GIF.")
+    ancho, alto = imagen.size
+    if ancho * alto > settings.NEWS_IMAGEN_MAX_PIXELES:
+        raise ImagenInvalida("La imagen tiene demasiados píxeles.")
+    return imagen
+
+
+def _sirve_tal_cual(imagen):
+    """ Ya es lo que saldría de re-codificarla: formato final, un cuadro, sin metadatos, tamaño acotado. """
+    return (
+        imagen.format in EXTENSIONES
+        and getattr(imagen, "n_frames", 1) == 1
+        and max(imagen.size) <= settings.NEWS_IMAGEN_LADO_MAX
+        and set(imagen.info) <= INFO_INOCUA
+    )
+
+
+def preparar_original(archivo):
+    """
+    Original normalizado listo para guardar en el ImageField: orientación
+    aplicada, sin EXIF, lado mayor acotado y nombre por contenido.
+    """
+    imagen = abrir_validada(archivo)
+    if _sirve_tal_cual(imagen):
+        archivo.seek(0)
+        datos = archivo.read()
+        nombre = _nombre_por_contenido("publicaciones", datos, imagen.format)
+        return ContentFile(datos, name=nombre.rsplit("/", 1)[-1])
+    try:
+        imagen = ImageOps.exif_transpose(imagen)
+        imagen.thumbnail((settings.NEWS_IMAGEN_LADO_MAX,) * 2, Image.LANCZOS)
+    except (OSError, ValueError):
+        raise ImagenInvalida("No se pudo procesar la imagen.")
+
+    formato = "PNG" if _tiene_alfa(imagen) else "JPEG"
+    datos = _codificar(imagen, formato, settings.NEWS_IMAGEN_CALIDAD_ORIGINAL)
+    nombre = _nombre_por_contenido("publicaciones", datos, formato)
+    return ContentFile(datos, name=nombre.rsplit("/", 1)[-1])
+
+
+# ------------------ 🔹 VARIANTES ------------------
+def generar_variantes(publicacion_id):
+    """
+    Genera las variantes de la imagen actual y las registra. Si la imagen
+    cambió mientras tanto, no pisa el registro de la nueva.
+    Devuelve el mapa de variantes (vacío si no hay imagen).
+    """
+    nombre = (
+        Publicacion.objects.filter(pk=publicacion_id)
+        .values_list("imagen", flat=True)
+        .first()
+    )
+    if not nombre:
+        Publicacion.objects.filter(pk=publicacion_id, variantes_pendientes=True).update(variantes_pendientes=False)
+        return {}
+
+    storage = _storage()
+    with storage.open(nombre, "rb") as archivo:
+        imagen = ImageOps.exif_transpose(abrir_validada(archivo))
+        imagen.load()
+
+    # Nunca se amplía: los anchos mayores que el original se quedan en el original
+    anchos = sorted({min(ancho, imagen.width) for ancho in settings.NEWS_IMAGEN_ANCHOS})
+    redimensionadas = {
+        ancho: imagen if ancho == imagen.width else imagen.resize(
+            (ancho, max(1, round(imagen.height * ancho / imagen.width))), Image.LANCZOS
+        )
+        for ancho in anchos
+    }
+
+    variantes = {}
+    for formato in settings.NEWS_IMAGEN_FORMATOS:
+        formato = formato.upper()
+        for ancho, copia in redimensionadas.items():
+            datos = _codificar(copia, formato, settings.NEWS_IMAGEN_CALIDAD)
+            ruta = _nombre_por_contenido(CARPETA_VARIANTES, datos, formato)
+            if not storage.exists(ruta):
+                ruta = storage.save(ruta, ContentFile(datos))
+            variantes.setdefault(formato.lower(), {})[str(ancho)] = ruta
+
+    actualizadas = Publicacion.objects.filter(pk=publicacion_id, imagen=nombre).update(
+        imagen_variantes=variantes, variantes_pendientes=False, **cambios_de_version()
+    )
+    if actualizadas:
+        publicacion_modificada(publicacion_id)
+    return variantes
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.NEWS_IMAGEN_WORKERS, thread_name_prefix="news-imagenes"
+                )
+    return _pool
+
+
+def _generar_en_hilo(publicacion_id):
+    try:
+        generar_variantes(publicacion_id)
+    except Exception:
+        logger.exception("No se pudieron generar las variantes de %s", publicacion_id)
+    finally:
+        connection.close()
+
+
+def programar_variantes(publicacion_id):
+    """
+    Encola la generación de variantes para después del commit. Con
+    NEWS_IMAGEN_WORKERS = 0 se generan en el mismo hilo (dev/tests).
+    """
+    if settings.NEWS_IMAGEN_WORKERS <= 0:
+        transaction.on_commit(lambda: generar_variantes(publicacion_id))
+        return
+    transaction.on_commit(lambda: get_pool().submit(_generar_en_hilo, publicacion_id))
+
+
+def srcset(variantes, url):
+    """ {"webp": "<url> 320w, <url> 640w", ...} a partir de imagen_variantes. """
+    return {
+        formato: ", ".join(
+            f"{url(ruta)} {ancho}w"
+            for ancho, ruta in sorted(por_ancho.items(), key=lambda item: int(item[0]))
+        )
+        for formato, por_ancho in (variantes or {}).items()
+    }
@@ -0,0 +1,266 @@
+"""
+Importación masiva de publicaciones (POST publicaciones/importar/ y el
+comando `importar_publicaciones`): NDJSON o CSV leído en streaming, línea
+a línea, sin cargar el cuerpo entero en memoria.
+
+- Cada fila se valida con PublicacionImportacionSerializer; categorías e
+  ids propios se comprueban por lote (una consulta por lote, no por fila).
+- Cada lote de NEWS_IMPORTACION_LOTE filas válidas se escribe en su propia
+  transacción con bulk_create: el lote entra entero o no entra, y una
+  importación larga no tiene una transacción abierta durante minutos.
+- bulk_create no pasa por save() ni por las señales: aquí se calcula el
+  score, se anotan los cambios para la sincronización y se invalida el feed.
+- El reporte lleva los errores por fila (número de línea en NDJSON, de
+  registro en CSV, contando la cabecera como la 1).
+
+Las imágenes no se importan: se agregan después editando la publicación.
+"""
+import codecs
+import csv
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import UnsupportedMediaType
+
+from .cache_respuestas import GRUPO_FEED, invalidar
+from .models import Categoria, Publicacion
+from .renderers import cargar
+from .serializers import PublicacionImportacionSerializer
+from .sincronizacion import ENTIDAD_PUBLICACION, registrar_cambios
+from .tendencia import calcular_score
+
+FORMATOS = ("ndjson", "csv")
+TIPOS_FORMATO = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/jsonlines": "ndjson",
+    "text/csv": "csv",
+}
+
+
+def autor_de(user):
+    """ Campos de autor de lo que publica `user` (alta normal e importación). """
+    rol = (user.rol or "").lower()
+    return {
+        "autor_id": user.id,
+        "tipo_autor": "institucion" if rol == "institucion" else "usuario",
+        "autor_institucion_id": getattr(user, "institucion_id", None) if rol == "institucion" else None,
+    }
+
+
+def formato_de(request):
+    """ ?formato= o, si no viene, el Content-Type; 415 si no es NDJSON ni CSV. """
+    formato = request.query_params.get("formato")
+    tipo = (request.content_type or "").split(";")[0].strip().lower()
+    formato = formato or TIPOS_FORMATO.get(tipo)
+    if formato not in FORMATOS:
+        raise UnsupportedMediaType(tipo or formato, "Formato no admitido: usa NDJSON o CSV (?formato=ndjson|csv).")
+    return formato
+
+
+# ------------------ 🔹 LECTURA ------------------
+class LineaDemasiadoLarga(Exception):
+    pass
+
+
+def lineas(leer_linea, maximo=None):
+    """
+    (número, bytes) por línea, leyendo de a una con `leer_linea(tamaño)`.
+    Una línea de más de `maximo` bytes se descarta entera y sale como
+    (número, None): nunca se tiene en memoria más que eso.
+    """
+    maximo = maximo or settings.NEWS_IMPORTACION_MAX_LINEA
+    numero = 0
+    while linea := leer_linea(maximo + 1):
+        numero += 1
+        if len(linea) > maximo and not linea.endswith(b"\n"):
+            while (resto := leer_linea(maximo)) and not resto.endswith(b"\n"):
+                pass
+            yield numero, None
+            continue
+        yield numero, linea
+
+
+def filas_ndjson(lineas):
+    """ (fila, datos, errores) por línea no vacía; errores None si se pudo leer. """
+    for numero, linea in lineas:
+        if linea is None:
+            yield numero, None, {"linea": [f"Más de {settings.NEWS_IMPORTACION_MAX_LINEA} bytes."]}
+            continue
+        if not linea.strip():
+            continue
+        try:
+            datos = cargar(linea)
+        except ValueError as exc:
+            yield numero, None, {"json": [f"JSON inválido: {exc}"]}
+            continue
+        yield numero, datos, None
+
+
+def filas_csv(lineas):
+    """
+    (fila, datos, errores) por registro; la primera línea es la cabecera.
+    Las celdas vacías cuentan como campo ausente. Un error de lectura
+    (codificación, línea demasiado larga) corta el archivo en esa línea.
+    """
+    def texto():
+        for _, linea in lineas:
+            if linea is None:
+                raise LineaDemasiadoLarga()
+            yield linea
+
+    lector = csv.DictReader(codecs.iterdecode(texto(), "utf-8-sig"))
+    # Número de registro, no de línea: un campo entre comillas puede tener saltos
+    numero = 1
+    try:
+        for numero, registro in enumerate(lector, 2):
+            datos = {campo: valor for campo, valor in registro.items() if campo and valor not in ("", None)}
+            yield numero, datos, None
+        return
+    except LineaDemasiadoLarga:
+        errores = {"linea": [f"Más de {settings.NEWS_IMPORTACION_MAX_LINEA} bytes; se corta la importación."]}
+    except (UnicodeDecodeError, csv.Error) as exc:
+        errores = {"csv": [f"CSV inválido: {exc}; se corta la importación."]}
+    # El registro que no se pudo leer es el siguiente al último leído
+    yield numero + 1, None, errores
+
+
+LECTORES = {"ndjson": filas_ndjson, "csv": filas_csv}
+
+
+# ------------------ 🔹 IMPORTACIÓN ------------------
+class Importacion:
+    """
+    Valida y escribe por lotes las filas de `filas` (ver `LECTORES`).
+    Con `validar=True` solo valida (también los chequeos por lote) y no escribe.
+    """
+
+    def __init__(self, autor, lote=None, validar=False, max_filas=None, max_errores=None):
+        self.autor = autor
+        self.lote = lote or settings.NEWS_IMPORTACION_LOTE
+        self.validar = validar
+        self.max_filas = max_filas
+        self.max_errores = settings.NEWS_IMPORTACION_MAX_ERRORES if max_errores is None else max_errores
+        self.filas = 0
+        self.validas = 0
+        self.creadas = 0
+        self.errores = []
+        self.errores_total = 0
+        self.truncado = False
+        self.ids = set()  # ids propios ya vistos en esta importación
+
+    def error(self, fila, errores):
+        self.errores_total += 1
+        if len(self.errores) < self.max_errores:
+            self.errores.append({"fila": fila, "errores": errores})
+
+    def ejecutar(self, filas, al_escribir=None):
+        """ Procesa todo; `al_escribir(importacion)` tras cada lote. """
+        serializador = PublicacionImportacionSerializer()
+        pendientes = []
+        for numero, datos, errores in filas:
+            if self.max_filas is not None and self.filas >= self.max_filas:
+                self.truncado = True
+                break
+            self.filas += 1
+            if errores is None and not isinstance(datos, dict):
+                errores = {"fila": ["Se esperaba un objeto."]}
+            if errores is None:
+                try:
+                    datos = serializador.run_validation(datos)
+                except serializers.ValidationError as exc:
+                    errores = serializers.as_serializer_error(exc)
+            if errores is not None:
+                self.error(numero, errores)
+                continue
+            pendientes.append((numero, datos))
+            if len(pendientes) >= self.lote:
+                self.escribir(pendientes)
+                pendientes = []
+                if al_escribir:
+                    al_escribir(self)
+        if pendientes:
+            self.escribir(pendientes)
+            if al_escribir:
+                al_escribir(self)
+        return self
+
+    def revisar_lote(self, pendientes):
+        """ {fila: errores} de lo que depende de la BD o de otras filas. """
+        categorias = {d["categoria"] for _, d in pendientes if d.get("categoria")}
+        existentes = set(Categoria.objects.filter(pk__in=categorias).values_list("pk", flat=True)) if categorias else set()
+        ids = [d["id"] for _, d in pendientes if "id" in d]
+        tomados = set(Publicacion.objects.filter(pk__in=ids).values_list("pk", flat=True)) if ids else set()
+
+        errores = {}
+        for numero, datos in pendientes:
+            fila = {}
+            if datos.get("categoria") and datos["categoria"] not in existentes:
+                fila["categoria"] = [f"La categoría {datos['categoria']} no existe."]
+            if "id" in datos:
+                if datos["id"] in tomados:
+                    fila["id"] = ["Ya existe una publicación con este id."]
+                elif datos["id"] in self.ids:
+                    fila["id"] = ["Id repetido en la importación."]
+                self.ids.add(datos["id"])
+            if fila:
+                errores[numero] = fila
+        return errores
+
+    def escribir(self, pendientes):
+        errores = self.revisar_lote(pendientes)
+        for numero, fila in errores.items():
+            self.error(numero, fila)
+        validas = [(numero, datos) for numero, datos in pendientes if numero not in errores]
+        self.validas += len(validas)
+        if self.validar or not validas:
+            return
+
+        ahora = timezone.now()
+        objetos, fechas = [], []
+        for _, datos in validas:
+            datos = dict(datos)
+            categoria = datos.pop("categoria", None)
+            fecha = datos.pop("fecha_publicacion", None)
+            publicacion = Publicacion(
+                **datos,
+                **self.autor,
+                categoria_id=categoria,
+                score=calcular_score(0, 0, 0, fecha or ahora),
+            )
+            objetos.append(publicacion)
+            fechas.append(fecha)
+        try:
+            with transaction.atomic():
+                Publicacion.objects.bulk_create(objetos)
+                # bulk_create pone la hora actual en los auto_now_add: la fecha traída va aparte
+                con_fecha = []
+                for publicacion, fecha in zip(objetos, fechas):
+                    if fecha is not None:
+                        publicacion.fecha_publicacion = fecha
+                        con_fecha.append(publicacion)
+                if con_fecha:
+                    Publicacion.objects.bulk_update(con_fecha, ["fecha_publicacion"])
+                registrar_cambios(ENTIDAD_PUBLICACION, [p.pk for p in objetos])
+                invalidar(GRUPO_FEED)
+        except IntegrityError as exc:
+            # Carrera con otra escritura (p. ej. el mismo id): se pierde el lote, no la importación
+            for numero, _ in validas:
+                self.error(numero, {"lote": [f"No se pudo guardar el lote: {exc}"]})
+            self.validas -= len(validas)
+            return
+        self.creadas += len(objetos)
+
+    def reporte(self):
+        return {
+            "filas": self.filas,
+            "validas": self.validas,
+            "creadas": self.creadas,
+            "validar": self.validar,
+            "truncado": self.truncado,
+            "errores_total": self.errores_total,
+            "errores": sorted(self.errores, key=lambda e: e["fila"]),
+        }
@@ -0,0 +1,257 @@
+"""
+Instrumentación por petición: consultas a la BD, tiempo de BD, tiempo de
+serialización, duración total y tamaño de la respuesta, agrupados por
+acción ("publicacion.list", "publicacion.like_toggle", "comentario.responder"...).
+
+- Consultas: un execute_wrapper que se instala en cada conexión al crearse
+  (señal connection_created) y anota en la medición de la petición en
+  curso, que viaja en un ContextVar. Así cuenta también las consultas de
+  las vistas async, que corren en hilos de sync_to_async.
+- Serialización: el mixin SerializacionMedida en los serializadores (solo
+  el nivel externo; incluye las consultas que hagan sus campos), o
+  `midiendo_serializacion()` alrededor de otra serialización (news/valores.py).
+- Acción: AccionMedida en los ViewSets la fija en `initial()`; fuera de DRF
+  se usa el nombre de la URL.
+
+Salida:
+- cabecera Server-Timing (NEWS_SERVER_TIMING) para verla en el navegador,
+- /internal/metricas/ en formato Prometheus (news/metricas.py),
+- presupuestos de consultas por acción (NEWS_PRESUPUESTOS_CONSULTAS): se
+  registran en el log o, con NEWS_PRESUPUESTO_MODO=error, la petición
+  falla (CI/desarrollo). news/testing.py los comprueba en los tests.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SIN_ACCION = "otros"
+
+# Límites del histograma de duración (segundos)
+BUCKETS_DURACION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+_actual = ContextVar("news_medicion", default=None)
+
+
+class PresupuestoExcedido(AssertionError):
+    pass
+
+
+class Medicion:
+    __slots__ = ("accion", "consultas", "tiempo_bd", "serializacion", "serializando", "inicio", "duracion", "bytes")
+
+    def __init__(self):
+        self.accion = None
+        self.consultas = 0
+        self.tiempo_bd = 0.0
+        self.serializacion = 0.0
+        self.serializando = False
+        self.inicio = perf_counter()
+        self.duracion = 0.0
+        self.bytes = None
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.tiempo_bd * 1000:.1f};desc="{self.consultas} consultas", '
+            f"ser;dur={self.serializacion * 1000:.1f}, "
+            f"total;dur={self.duracion * 1000:.1f}"
+        )
+
+
+def medicion_actual():
+    return _actual.get()
+
+
+def etiquetar(accion):
+    """ Fija la acción de la petición en curso (la primera gana: vistas anidadas no la pisan). """
+    medicion = _actual.get()
+    if medicion is not None and medicion.accion is None:
+        medicion.accion = accion
+
+
+# ------------------ 🔹 BD ------------------
+def _medir_consulta(execute, sql, params, many, context):
+    medicion = _actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.tiempo_bd += perf_counter() - inicio
+        medicion.consultas += 1
+
+
+@contextmanager
+def sin_medir():
+    """ Consultas internas que no son de la petición (chequeos de salud de réplicas). """
+    token = _actual.set(None)
+    try:
+        yield
+    finally:
+        _actual.reset(token)
+
+
+def instalar_en_conexion(sender, connection, **kwargs):
+    """ Receptor de connection_created; la conexión se reabre a menudo, se instala una vez. """
+    if _medir_consulta not in connection.execute_wrappers:
+        # Al principio: `execute_wrapper()` quita el último de la lista al salir
+        connection.execute_wrappers.insert(0, _medir_consulta)
+
+
+# ------------------ 🔹 DRF ------------------
+class AccionMedida:
+    """ Mixin de vistas DRF: etiqueta la medición con "<basename>.<acción>". """
+
+    def initial(self, request, *args, **kwargs):
+        accion = getattr(self, "action", None) or request.method.lower()
+        basename = getattr(self, "basename", None) or type(self).__name__
+        etiquetar(f"{basename}.{accion}")
+        super().initial(request, *args, **kwargs)
+
+
+@contextmanager
+def midiendo_serializacion():
+    """ Suma la duración del bloque al tiempo de serialización (solo el nivel externo). """
+    medicion = _actual.get()
+    if medicion is None or medicion.serializando:
+        yield
+        return
+    medicion.serializando = True
+    inicio = perf_counter()
+    try:
+        yield
+    finally:
+        medicion.serializando = False
+        medicion.serializacion += perf_counter() - inicio
+
+
+class SerializacionMedida:
+    """ Mixin de serializadores: suma el tiempo de to_representation del nivel externo. """
+
+    def to_representation(self, instance):
+        if _actual.get() is None:
+            return super().to_representation(instance)
+        with midiendo_serializacion():
+            return super().to_representation(instance)
+
+
+# ------------------ 🔹 REGISTRO (por proceso) ------------------
+class Registro:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acciones = {}
+
+    def anotar(self, medicion, estado):
+        with self._lock:
+            datos = self.acciones.get(medicion.accion)
+            if datos is None:
+                datos = self.acciones[medicion.accion] = {
+                    "peticiones": 0,
+                    "errores": 0,
+                    "consultas": 0,
+                    "tiempo_bd": 0.0,
+                    "serializacion": 0.0,
+                    "duracion": 0.0,
+                    "bytes": 0,
+                    "presupuesto_excedido": 0,
+                    "buckets": [0] * len(BUCKETS_DURACION),
+                }
+            datos["peticiones"] += 1
+            datos["errores"] += estado >= 500
+            datos["consultas"] += medicion.consultas
+            datos["tiempo_bd"] += medicion.tiempo_bd
+            datos["serializacion"] += medicion.serializacion
+            datos["duracion"] += medicion.duracion
+            datos["bytes"] += medicion.bytes or 0
+            for i, limite in enumerate(BUCKETS_DURACION):
+                if medicion.duracion <= limite:
+                    datos["buckets"][i] += 1
+                    break
+
+    def excedido(self, accion):
+        with self._lock:
+            if accion in self.acciones:
+                self.acciones[accion]["presupuesto_excedido"] += 1
+
+    def copia(self):
+        with self._lock:
+            return {accion: {**datos, "buckets": list(datos["buckets"])} for accion, datos in self.acciones.items()}
+
+
+registro = Registro()
+
+# Callbacks con cada medición terminada (news/testing.py)
+observadores = []
+
+
+def presupuesto(accion):
+    return settings.NEWS_PRESUPUESTOS_CONSULTAS.get(accion)
+
+
+def excede_presupuesto(medicion):
+    maximo = presupuesto(medicion.accion)
+    return maximo is not None and medicion.consultas > maximo
+
+
+# ------------------ 🔹 MIDDLEWARE ------------------
+class InstrumentacionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _actual.set(medicion)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self.terminar(request, medicion, respuesta)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = _actual.set(medicion)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self.terminar(request, medicion, respuesta)
+
+    def terminar(self, request, medicion, respuesta):
+        medicion.duracion = perf_counter() - medicion.inicio
+        if medicion.accion is None:
+            coincidencia = getattr(request, "resolver_match", None)
+            medicion.accion = (coincidencia and coincidencia.url_name) or SIN_ACCION
+        if not getattr(respuesta, "streaming", False):
+            medicion.bytes = len(respuesta.content)
+
+        registro.anotar(medicion, respuesta.status_code)
+        for observador in list(observadores):
+            observador(medicion)
+        if settings.NEWS_SERVER_TIMING:
+            respuesta["Server-Timing"] = medicion.server_timing()
+
+        if excede_presupuesto(medicion):
+            registro.excedido(medicion.accion)
+            mensaje = (
+                f"{medicion.accion}: {medicion.consultas} consultas "
+                f"(presupuesto {presupuesto(medicion.accion)}) en {request.method} {request.path}"
+            )
+            if settings.NEWS_PRESUPUESTO_MODO == "error":
+                raise PresupuestoExcedido(mensaje)
+            logger.warning("Presupuesto de consultas excedido: %s", mensaje)
+        return respuesta
@@ -0,0 +1,184 @@
+"""
+Likes idempotentes en una sola sentencia.
+
+En Postgres el INSERT ... ON CONFLICT DO NOTHING / DELETE ... RETURNING y el
+ajuste de `likes_count` van en la misma sentencia (CTE), así que un doble tap
+concurrente nunca choca con `uniq_like_pub_usuario` ni descuadra el contador.
+En otros motores (SQLite en dev/tests) se usa el mismo INSERT ... ON CONFLICT
+y el contador se ajusta en la misma transacción según las filas afectadas.
+Cada like efectivo sube también la versión de la publicación (ETag),
+invalida la caché de respuestas, queda en el registro de cambios y se
+publica el nuevo conteo a los streams de eventos.
+"""
+import uuid
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .contadores import incrementar, publicacion_modificada
+from .eventos import EVENTO_LIKES, publicar_evento
+from .models import Like, Publicacion
+from .tendencia import sql_score
+
+
+def _db(campo, valor):
+    return Like._meta.get_field(campo).get_db_prep_value(valor, connection)
+
+
+def _tablas():
+    quote = connection.ops.quote_name
+    return quote(Like._meta.db_table), quote(Publicacion._meta.db_table)
+
+
+def dar_like(publicacion_id, usuario_id):
+    """ Devuelve (creado, likes_count). Repetirlo no tiene efecto. """
+    tabla_like, tabla_pub = _tablas()
+    insertar = (
+        f"INSERT INTO {tabla_like} (id, publicacion_id, usuario_id, fecha_like) "
+        f"VALUES (%s, %s, %s, %s) ON CONFLICT (publicacion_id, usuario_id) DO NOTHING"
+    )
+    parametros = [
+        _db("id", uuid.uuid4()),
+        _db("publicacion", publicacion_id),
+        _db("usuario_id", usuario_id),
+        _db("fecha_like", timezone.now()),
+    ]
+
+    if connection.vendor == "postgresql":
+        score, parametros_score = sql_score(delta_likes=1)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH nuevo AS ({insertar} RETURNING publicacion_id) "
+                f"UPDATE {tabla_pub} SET likes_count = likes_count + 1, score = {score}, "
+                f"version = version + 1, fecha_actividad = now() "
+                f"WHERE id IN (SELECT publicacion_id FROM nuevo) RETURNING likes_count",
+                parametros + parametros_score,
+            )
+            fila = cursor.fetchone()
+        if fila:
+            publicacion_modificada(publicacion_id)
+            return True, _avisar(publicacion_id, fila[0])
+        return False, _likes_count(publicacion_id)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(insertar, parametros)
+            creado = cursor.rowcount == 1
+        if creado:
+            incrementar(publicacion_id, likes_count=1)
+            return True, _avisar(publicacion_id, _likes_count(publicacion_id))
+        return False, _likes_count(publicacion_id)
+
+
+def quitar_like(publicacion_id, usuario_id):
+    """ Devuelve (borrado, likes_count). Repetirlo no tiene efecto. """
+    tabla_like, tabla_pub = _tablas()
+    borrar = f"DELETE FROM {tabla_like} WHERE publicacion_id = %s AND usuario_id = %s"
+    parametros = [_db("publicacion", publicacion_id), _db("usuario_id", usuario_id)]
+
+    if connection.vendor == "postgresql":
+        score, parametros_score = sql_score(delta_likes=-1)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH borrado AS ({borrar} RETURNING publicacion_id) "
+                f"UPDATE {tabla_pub} SET likes_count = likes_count - 1, score = {score}, "
+                f"version = version + 1, fecha_actividad = now() "
+                f"WHERE id IN (SELECT publicacion_id FROM borrado) RETURNING likes_count",
+                parametros + parametros_score,
+            )
+            fila = cursor.fetchone()
+        if fila:
+            publicacion_modificada(publicacion_id)
+            return True, _avisar(publicacion_id, fila[0])
+        return False, _likes_count(publicacion_id)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(borrar, parametros)
+            borrado = cursor.rowcount > 0
+        if borrado:
+            incrementar(publicacion_id, likes_count=-1)
+            return True, _avisar(publicacion_id, _likes_count(publicacion_id))
+        return False, _likes_count(publicacion_id)
+
+
+def alternar_like(publicacion_id, usuario_id):
+    """
+    Quita el like si existe; si no, lo crea. Devuelve (liked, likes_count).
+    En Postgres es una sola sentencia: DELETE ... RETURNING y, si no borró
+    nada, INSERT ... ON CONFLICT; el contador se ajusta con la diferencia.
+    """
+    tabla_like, tabla_pub = _tablas()
+    borrar = f"DELETE FROM {tabla_like} WHERE publicacion_id = %s AND usuario_id = %s"
+    parametros_borrar = [_db("publicacion", publicacion_id), _db("usuario_id", usuario_id)]
+    parametros_insertar = [
+        _db("id", uuid.uuid4()),
+        _db("publicacion", publicacion_id),
+        _db("usuario_id", usuario_id),
+        _db("fecha_like", timezone.now()),
+    ]
+
+    if connection.vendor == "postgresql":
+        delta = "((SELECT count(*) FROM nuevo) - (SELECT count(*) FROM borrado))"
+        score, parametros_score = sql_score(sql_delta_likes=delta)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH borrado AS ({borrar} RETURNING publicacion_id), "
+                f"nuevo AS (INSERT INTO {tabla_like} (id, publicacion_id, usuario_id, fecha_like) "
+                f"SELECT %s, %s, %s, %s WHERE NOT EXISTS (SELECT 1 FROM borrado) "
+                f"ON CONFLICT (publicacion_id, usuario_id) DO NOTHING RETURNING publicacion_id), "
+                f"cambio AS (UPDATE {tabla_pub} SET likes_count = likes_count + {delta}, score = {score}, "
+                f"version = version + 1, fecha_actividad = now() "
+                f"WHERE id IN (SELECT publicacion_id FROM borrado UNION ALL SELECT publicacion_id FROM nuevo) "
+                f"RETURNING likes_count) "
+                # Sin borrado ni alta (otro tap ganó el INSERT): sigue marcado, conteo sin cambios
+                f"SELECT EXISTS (SELECT 1 FROM borrado), EXISTS (SELECT 1 FROM cambio), "
+                f"COALESCE((SELECT likes_count FROM cambio), (SELECT likes_count FROM {tabla_pub} WHERE id = %s))",
+                parametros_borrar + parametros_insertar + parametros_score + [parametros_borrar[0]],
+            )
+            borrado, cambio, total = cursor.fetchone()
+        if cambio:
+            publicacion_modificada(publicacion_id)
+            _avisar(publicacion_id, total)
+        return not borrado, total
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(borrar, parametros_borrar)
+            borrado = cambio = cursor.rowcount > 0
+            if not borrado:
+                cursor.execute(
+                    f"INSERT INTO {tabla_like} (id, publicacion_id, usuario_id, fecha_like) "
+                    f"VALUES (%s, %s, %s, %s) ON CONFLICT (publicacion_id, usuario_id) DO NOTHING",
+                    parametros_insertar,
+                )
+                cambio = cursor.rowcount == 1
+        if borrado or cambio:
+            incrementar(publicacion_id, likes_count=-1 if borrado else 1)
+            return not borrado, _avisar(publicacion_id, _likes_count(publicacion_id))
+        return True, _likes_count(publicacion_id)
+
+
+def publicaciones_con_like(usuario_id, publicacion_ids, visibles=None):
+    """
+    Ids (de `publicacion_ids`) que el usuario ya marcó, en una consulta.
+    Con `visibles` (queryset de publicaciones) solo cuentan las que el
+    usuario puede ver: un like a algo que volvió a borrador no lo delata.
+    """
+    likes = Like.objects.filter(usuario_id=usuario_id, publicacion_id__in=publicacion_ids)
+    if visibles is not None:
+        likes = likes.filter(publicacion__in=visibles.values("id"))
+    return set(likes.values_list("publicacion_id", flat=True))
+
+
+def _avisar(publicacion_id, likes_count):
+    publicar_evento(publicacion_id, EVENTO_LIKES, {"likes_count": likes_count})
+    return likes_count
+
+
+def _likes_count(publicacion_id):
+    return (
+        Publicacion.objects.filter(pk=publicacion_id)
+        .values_list("likes_count", flat=True)
+        .first()
+    )
@@ -0,0 +1,126 @@
+"""
+Llaves para verificar los JWT, con rotación por `kid`.
+
+- Llave por defecto: JWT_SECRET con JWT_ALG (tokens sin `kid`, como hasta ahora).
+- JWT_JWKS_PATH: archivo JWKS local con llaves adicionales, cada una con su
+  `kid`: "oct" (HS256/384/512, secreto en base64url) o "RSA" (RS256, solo la
+  parte pública). Se revisa su mtime cada JWT_JWKS_RECARGA segundos y se
+  recarga si cambió, así que rotar es: agregar la llave nueva al archivo,
+  empezar a firmar con ella y quitar la vieja cuando sus tokens expiren.
+  Sin reiniciar workers.
+
+El algoritmo lo fija cada llave, nunca la cabecera del token (evita la
+confusión de algoritmos: un HS256 "firmado" con la llave pública RSA).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import jwt
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+Llave = namedtuple("Llave", "kid clave algoritmo")
+
+
+def leer_jwks(ruta):
+    """ {kid: Llave} de un archivo JWKS. Ignora (con aviso) las llaves que no se pueden usar. """
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+
+    llaves = {}
+    for jwk in datos.get("keys", []):
+        kid = jwk.get("kid")
+        if not kid:
+            logger.warning("Llave sin 'kid' en %s: se ignora", ruta)
+            continue
+        try:
+            # Sin "alg" en la llave: HS256 para "oct", RS256 para "RSA"
+            llave = jwt.PyJWK(jwk)
+        except jwt.PyJWTError as e:
+            logger.warning("Llave '%s' inválida en %s: %s", kid, ruta, e)
+            continue
+        llaves[kid] = Llave(kid, llave.key, llave.algorithm_name)
+    return llaves
+
+
+class LlaveroJWT:
+    def __init__(self, ruta="", recarga=30):
+        self.ruta = ruta
+        self.recarga = recarga
+        # Sube con cada recarga: quien cachee tokens verificados debe vaciarse
+        self.generacion = 0
+        self._llaves = {}
+        self._mtime = None
+        self._revisado = 0.0
+        self._lock = threading.Lock()
+        if ruta:
+            self._recargar(forzar=True)
+
+    def _recargar(self, forzar=False):
+        try:
+            mtime = os.stat(self.ruta).st_mtime
+        except OSError as e:
+            if forzar:
+                logger.error("No se pudo leer JWT_JWKS_PATH (%s): %s", self.ruta, e)
+            return
+        if mtime == self._mtime and not forzar:
+            return
+        try:
+            llaves = leer_jwks(self.ruta)
+        except (OSError, ValueError) as e:
+            # Archivo a medio escribir o roto: se siguen usando las llaves anteriores
+            logger.error("No se pudo cargar %s: %s", self.ruta, e)
+            return
+        self._llaves = llaves
+        self._mtime = mtime
+        self.generacion += 1
+        logger.info("Llaves JWT cargadas de %s: %s", self.ruta, ", ".join(sorted(llaves)) or "ninguna")
+
+    def revisar(self):
+        """ Recarga el archivo si cambió (como mucho una vez cada `recarga` segundos). """
+        if not self.ruta:
+            return
+        ahora = time.monotonic()
+        if ahora - self._revisado < self.recarga:
+            return
+        with self._lock:
+            if ahora - self._revisado < self.recarga:
+                return
+            self._revisado = ahora
+            self._recargar()
+
+    def por_defecto(self):
+        return Llave(None, settings.JWT_SECRET, settings.JWT_ALG)
+
+    def candidatas(self, kid, algoritmo):
+        """
+        Llaves con las que probar un token: la de su `kid`; con un `kid` que
+        no está en el archivo, la por defecto; sin `kid`, la por defecto y
+        luego las del archivo (tokens emitidos antes de que el emisor pusiera
+        `kid`). Solo las que usan el `alg` de la cabecera.
+        """
+        if kid in self._llaves:
+            llaves = [self._llaves[kid]]
+        elif kid is not None:
+            llaves = [self.por_defecto()]
+        else:
+            llaves = [self.por_defecto(), *self._llaves.values()]
+        return [llave for llave in llaves if llave.algoritmo == algoritmo]
+
+
+_llavero = None
+_llavero_lock = threading.Lock()
+
+
+def get_llavero():
+    global _llavero
+    if _llavero is None:
+        with _llavero_lock:
+            if _llavero is None:
+                _llavero = LlaveroJWT(settings.JWT_JWKS_PATH, settings.JWT_JWKS_RECARGA)
+    return _llavero
@@ -0,0 +1,56 @@
+import sys
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.exportacion import exportar
+from news.importacion import FORMATOS
+from news.models import Publicacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta las publicaciones en NDJSON o CSV leyendo con un cursor de servidor, en memoria "
+        "constante. El volcado se puede reimportar con `importar_publicaciones`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--salida", default="-", help="Ruta del archivo, o '-' para la salida estándar.")
+        parser.add_argument("--formato", choices=FORMATOS, default="ndjson")
+        parser.add_argument("--estado", choices=[e for e, _ in Publicacion.ESTADOS])
+        parser.add_argument("--categoria", help="UUID de la categoría.")
+        parser.add_argument("--institucion", help="UUID de la institución autora.")
+        parser.add_argument("--lote", type=int, default=None, help="Filas por lectura (NEWS_EXPORTACION_LOTE).")
+
+    def handle(self, *args, **opciones):
+        if opciones["lote"] is not None and opciones["lote"] <= 0:
+            raise CommandError("--lote debe ser mayor que 0.")
+        for opcion in ("categoria", "institucion"):
+            if opciones[opcion]:
+                try:
+                    uuid.UUID(opciones[opcion])
+                except ValueError:
+                    raise CommandError(f"--{opcion}: UUID inválido.")
+        q = Publicacion.objects.all()
+        if opciones["estado"]:
+            q = q.filter(estado=opciones["estado"])
+        if opciones["categoria"]:
+            q = q.filter(categoria_id=opciones["categoria"])
+        if opciones["institucion"]:
+            q = q.filter(autor_institucion_id=opciones["institucion"])
+
+        a_archivo = opciones["salida"] != "-"
+        try:
+            salida = open(opciones["salida"], "wb") if a_archivo else sys.stdout.buffer
+        except OSError as exc:
+            raise CommandError(f"No se pudo abrir {opciones['salida']}: {exc}")
+        try:
+            for bloque in exportar(q, opciones["formato"], opciones["lote"]):
+                salida.write(bloque)
+        finally:
+            if a_archivo:
+                salida.close()
+            else:
+                salida.flush()
+        if a_archivo:
+            self.stdout.write(self.style.SUCCESS(f"✅ Publicaciones exportadas a {opciones['salida']}."))
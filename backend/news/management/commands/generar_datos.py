@@ -0,0 +1,276 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from news.cache_respuestas import GRUPO_CATEGORIAS, GRUPO_FEED, invalidar
+from news.models import Categoria, Comentario, ComentarioRespuesta, Like, Publicacion
+from news.tendencia import calcular_score
+
+PALABRAS = (
+    "orientación vocacional carrera universidad beca convocatoria estudiante docente taller feria "
+    "ingeniería medicina derecho arte diseño ciencia tecnología programación matemática biología "
+    "inscripción admisión examen calendario charla mentoría práctica pasantía empleo futuro "
+    "proyecto comunidad investigación laboratorio biblioteca idiomas intercambio deporte cultura "
+    "nuevo abierto gratuito presencial virtual semana mes plazo requisito resultado ganador"
+).split()
+
+CATEGORIAS = (
+    "Becas", "Convocatorias", "Eventos", "Ferias", "Talleres", "Carreras", "Admisión",
+    "Investigación", "Empleo", "Intercambios", "Cultura", "Deportes", "Avisos", "Tecnología",
+)
+
+
+@contextmanager
+def fechas_propias(*campos):
+    """
+    bulk_create pisa los auto_now/auto_now_add con la hora actual; mientras
+    dure el bloque, los campos aceptan la fecha que traiga cada objeto.
+    """
+    anteriores = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in anteriores:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def _campo(modelo, nombre):
+    return modelo._meta.get_field(nombre)
+
+
+class Generador:
+    """
+    Datos sintéticos reproducibles (misma semilla → mismos ids y textos).
+    La popularidad sigue una ley de potencias (Zipf): unas pocas
+    publicaciones concentran la mayoría de comentarios, likes y vistas.
+    """
+
+    def __init__(self, semilla, lote):
+        self.rng = random.Random(semilla)
+        self.lote = lote
+        self.ahora = timezone.now()
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def texto(self, minimo, maximo):
+        return " ".join(self.rng.choices(PALABRAS, k=self.rng.randint(minimo, maximo)))
+
+    def repartir(self, total, pesos, tope=None):
+        """ `total` repartido según `pesos` (redondeo aleatorio, suma ≈ total). """
+        suma = sum(pesos)
+        cantidades = []
+        for peso in pesos:
+            esperado = total * peso / suma
+            cantidad = int(esperado) + (self.rng.random() < esperado - int(esperado))
+            cantidades.append(min(cantidad, tope) if tope is not None else cantidad)
+        return cantidades
+
+    def guardar(self, modelo, objetos):
+        with transaction.atomic():
+            modelo.objects.bulk_create(objetos, batch_size=self.lote)
+
+    # ------------------ 🔹 ETAPAS ------------------
+    def categorias(self, cantidad):
+        categorias = [
+            Categoria(
+                id=self.uuid(),
+                nombre=CATEGORIAS[i % len(CATEGORIAS)] + (f" {i // len(CATEGORIAS) + 1}" if i >= len(CATEGORIAS) else ""),
+                descripcion=self.texto(5, 15),
+                color="#%06x" % self.rng.getrandbits(24),
+            )
+            for i in range(cantidad)
+        ]
+        self.guardar(Categoria, categorias)
+        return [c.id for c in categorias]
+
+    def publicaciones(self, cantidad, categorias, usuarios, instituciones, dias, comentarios, likes, vistas, zipf):
+        # El rango de popularidad no depende de la antigüedad
+        rangos = list(range(1, cantidad + 1))
+        self.rng.shuffle(rangos)
+        pesos = [1 / rango ** zipf for rango in rangos]
+        por_publicacion = list(zip(
+            self.repartir(comentarios, pesos),
+            self.repartir(likes, pesos, tope=len(usuarios)),
+            self.repartir(vistas, pesos),
+        ))
+
+        planes = []
+        pendientes = []
+        segundos = dias * 86400
+        for i in range(cantidad):
+            n_comentarios, n_likes, n_vistas = por_publicacion[i]
+            institucion = self.rng.random() < 0.2
+            fecha = self.ahora - timedelta(seconds=self.rng.uniform(0, segundos))
+            estado = self.rng.choices(("publicado", "borrador", "archivado"), weights=(90, 7, 3))[0]
+            publicacion = Publicacion(
+                id=self.uuid(),
+                titulo=self.texto(4, 10).capitalize(),
+                contenido=self.texto(40, 200),
+                autor_id=self.rng.choice(usuarios),
+                autor_institucion_id=self.rng.choice(instituciones) if institucion else None,
+                tipo_autor="institucion" if institucion else "usuario",
+                categoria_id=self.rng.choice(categorias) if categorias else None,
+                estado=estado,
+                fecha_publicacion=fecha,
+                fecha_actualizacion=fecha,
+                fecha_actividad=fecha,
+                vistas=n_vistas,
+                likes_count=n_likes,
+                comentarios_count=n_comentarios,
+                score=calcular_score(n_likes, n_comentarios, n_vistas, fecha),
+            )
+            pendientes.append(publicacion)
+            planes.append((publicacion.id, fecha, n_comentarios, n_likes))
+            if len(pendientes) >= self.lote:
+                self.guardar(Publicacion, pendientes)
+                pendientes = []
+        if pendientes:
+            self.guardar(Publicacion, pendientes)
+        return planes
+
+    def comentarios(self, planes, usuarios, respuestas, profundidad_max):
+        """ Comentarios y cadenas de respuestas (ruta materializada como Comentario.colgar_de). """
+        total = 0
+        comentarios, mapeos = [], []
+        for publicacion_id, fecha_publicacion, cantidad, _ in planes:
+            del_hilo = []
+            inicio = fecha_publicacion
+            for _ in range(cantidad):
+                fecha = inicio + (self.ahora - inicio) * self.rng.random() ** 3
+                comentario = Comentario(
+                    id=self.uuid(),
+                    publicacion_id=publicacion_id,
+                    usuario_id=self.rng.choice(usuarios),
+                    contenido=self.texto(5, 40),
+                    fecha_comentario=fecha,
+                )
+                padre = None
+                if del_hilo and self.rng.random() < respuestas:
+                    # Casi siempre se responde a lo último: salen cadenas largas
+                    padre = del_hilo[-1] if self.rng.random() < 0.6 else self.rng.choice(del_hilo)
+                    if padre.profundidad >= profundidad_max:
+                        padre = None
+                if padre is None:
+                    comentario.hilo_id = comentario.id
+                    comentario.ruta = comentario.id.hex
+                    comentario.profundidad = 0
+                else:
+                    comentario.colgar_de(padre)
+                    comentario.fecha_comentario = max(fecha, padre.fecha_comentario + timedelta(seconds=1))
+                    mapeos.append(ComentarioRespuesta(
+                        id=self.uuid(), comentario_padre_id=padre.id, comentario_respuesta_id=comentario.id
+                    ))
+                del_hilo.append(comentario)
+                comentarios.append(comentario)
+
+            if len(comentarios) >= self.lote:
+                total += self._volcar_comentarios(comentarios, mapeos)
+                comentarios, mapeos = [], []
+        if comentarios:
+            total += self._volcar_comentarios(comentarios, mapeos)
+        return total
+
+    def _volcar_comentarios(self, comentarios, mapeos):
+        with transaction.atomic():
+            Comentario.objects.bulk_create(comentarios, batch_size=self.lote)
+            ComentarioRespuesta.objects.bulk_create(mapeos, batch_size=self.lote)
+        return len(comentarios)
+
+    def likes(self, planes, usuarios):
+        total = 0
+        pendientes = []
+        for publicacion_id, fecha_publicacion, _, cantidad in planes:
+            for usuario_id in self.rng.sample(usuarios, cantidad):
+                pendientes.append(Like(
+                    id=self.uuid(),
+                    publicacion_id=publicacion_id,
+                    usuario_id=usuario_id,
+                    fecha_like=fecha_publicacion + (self.ahora - fecha_publicacion) * self.rng.random(),
+                ))
+            if len(pendientes) >= self.lote:
+                self.guardar(Like, pendientes)
+                total += len(pendientes)
+                pendientes = []
+        if pendientes:
+            self.guardar(Like, pendientes)
+            total += len(pendientes)
+        return total
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos reproducibles (categorías, publicaciones, comentarios con "
+        "cadenas de respuestas y likes con popularidad sesgada) para pruebas de carga y benchmarks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--publicaciones", type=int, default=1000)
+        parser.add_argument("--comentarios", type=int, default=10000, help="Total, respuestas incluidas.")
+        parser.add_argument("--likes", type=int, default=20000, help="Total (máximo uno por usuario y publicación).")
+        parser.add_argument("--vistas", type=int, default=200000, help="Total de vistas repartidas.")
+        parser.add_argument("--usuarios", type=int, default=5000)
+        parser.add_argument("--instituciones", type=int, default=50)
+        parser.add_argument("--categorias", type=int, default=12)
+        parser.add_argument("--dias", type=int, default=180, help="Antigüedad máxima de las publicaciones.")
+        parser.add_argument("--respuestas", type=float, default=0.35, help="Fracción de comentarios que responden a otro.")
+        parser.add_argument("--profundidad", type=int, default=8, help="Nivel máximo de las cadenas de respuestas.")
+        parser.add_argument("--zipf", type=float, default=1.1, help="Sesgo de popularidad (0 = uniforme).")
+        parser.add_argument("--semilla", type=int, default=42)
+        parser.add_argument("--lote", type=int, default=5000, help="Filas por bulk_create.")
+        parser.add_argument(
+            "--limpiar",
+            action="store_true",
+            help="Borra antes TODAS las categorías, publicaciones, comentarios y likes.",
+        )
+
+    def handle(self, *args, **opciones):
+        if opciones["publicaciones"] <= 0 or opciones["usuarios"] <= 0:
+            raise CommandError("--publicaciones y --usuarios deben ser mayores que 0.")
+
+        inicio = time.monotonic()
+        if opciones["limpiar"]:
+            with transaction.atomic():
+                Publicacion.objects.all().delete()
+                Categoria.objects.all().delete()
+            self.stdout.write("Datos anteriores borrados.")
+
+        generador = Generador(opciones["semilla"], opciones["lote"])
+        usuarios = [generador.uuid() for _ in range(opciones["usuarios"])]
+        instituciones = [generador.uuid() for _ in range(max(1, opciones["instituciones"]))]
+
+        categorias = generador.categorias(opciones["categorias"])
+        self.stdout.write(f"{len(categorias)} categorías")
+
+        with fechas_propias(
+            _campo(Publicacion, "fecha_publicacion"),
+            _campo(Publicacion, "fecha_actualizacion"),
+            _campo(Publicacion, "fecha_actividad"),
+            _campo(Comentario, "fecha_comentario"),
+            _campo(Like, "fecha_like"),
+        ):
+            planes = generador.publicaciones(
+                opciones["publicaciones"], categorias, usuarios, instituciones, opciones["dias"],
+                opciones["comentarios"], opciones["likes"], opciones["vistas"], opciones["zipf"],
+            )
+            self.stdout.write(f"{len(planes)} publicaciones ({time.monotonic() - inicio:.1f}s)")
+
+            comentarios = generador.comentarios(planes, usuarios, opciones["respuestas"], opciones["profundidad"])
+            self.stdout.write(f"{comentarios} comentarios ({time.monotonic() - inicio:.1f}s)")
+
+            likes = generador.likes(planes, usuarios)
+            self.stdout.write(f"{likes} likes ({time.monotonic() - inicio:.1f}s)")
+
+        # Las escrituras en bloque no pasan por las señales
+        invalidar(GRUPO_FEED, GRUPO_CATEGORIAS)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Datos sintéticos generados en {time.monotonic() - inicio:.1f}s (semilla {opciones['semilla']})."
+        ))
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from news.imagenes import generar_variantes
+from news.models import Publicacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las variantes (anchos/formatos) de las imágenes que no las tienen, por lotes: "
+        "las pendientes que el pool no llegó a hacer (reinicio, error) y las anteriores a las variantes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=100, help="Publicaciones por consulta.")
+        parser.add_argument(
+            "--todas",
+            action="store_true",
+            help="Regenerar también las que ya tienen variantes (p. ej. tras cambiar anchos).",
+        )
+        parser.add_argument(
+            "--margen",
+            type=int,
+            default=300,
+            help="Segundos: las pendientes más recientes las está generando el pool; no se tocan.",
+        )
+
+    def handle(self, *args, lote, todas, margen, **options):
+        pendientes = Publicacion.objects.exclude(imagen="").exclude(imagen__isnull=True)
+        if not todas:
+            reciente = timezone.now() - timedelta(seconds=margen)
+            pendientes = pendientes.filter(
+                Q(variantes_pendientes=True, fecha_actualizacion__lt=reciente)
+                | Q(variantes_pendientes=False, imagen_variantes={})
+            )
+
+        total = errores = 0
+        ultimo_id = None
+        while True:
+            bloque = pendientes.order_by("id")
+            if ultimo_id is not None:
+                bloque = bloque.filter(id__gt=ultimo_id)
+            ids = list(bloque.values_list("id", flat=True)[:lote])
+            if not ids:
+                break
+            for publicacion_id in ids:
+                try:
+                    generar_variantes(publicacion_id)
+                    total += 1
+                except Exception as exc:
+                    errores += 1
+                    self.stderr.write(f"  {publicacion_id}: {exc}")
+            ultimo_id = ids[-1]
+            self.stdout.write(f"  {total} publicaciones procesadas...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Variantes generadas ({total} publicaciones, {errores} con error)."
+        ))
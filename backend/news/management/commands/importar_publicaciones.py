@@ -0,0 +1,75 @@
+import json
+import sys
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.importacion import FORMATOS, LECTORES, Importacion, lineas
+
+
+def _uuid(valor):
+    try:
+        return uuid.UUID(valor)
+    except ValueError:
+        raise CommandError(f"UUID inválido: {valor}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa publicaciones desde un archivo NDJSON o CSV (o la entrada estándar con '-'), "
+        "validando por fila y escribiendo por lotes. Ver news/importacion.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="Ruta del archivo, o '-' para la entrada estándar.")
+        parser.add_argument("--formato", choices=FORMATOS, help="Por defecto, según la extensión (.csv o NDJSON).")
+        parser.add_argument("--autor", required=True, help="UUID del autor de las publicaciones.")
+        parser.add_argument("--institucion", help="UUID de la institución (las publicaciones quedan como suyas).")
+        parser.add_argument("--lote", type=int, default=None, help="Filas por transacción (NEWS_IMPORTACION_LOTE).")
+        parser.add_argument("--validar", action="store_true", help="Solo valida; no escribe nada.")
+        parser.add_argument("--reporte", help="Guarda el reporte completo (JSON) en esta ruta.")
+
+    def handle(self, *args, archivo, **opciones):
+        formato = opciones["formato"] or ("csv" if archivo.lower().endswith(".csv") else "ndjson")
+        institucion = _uuid(opciones["institucion"]) if opciones["institucion"] else None
+        autor = {
+            "autor_id": _uuid(opciones["autor"]),
+            "tipo_autor": "institucion" if institucion else "usuario",
+            "autor_institucion_id": institucion,
+        }
+        if opciones["lote"] is not None and opciones["lote"] <= 0:
+            raise CommandError("--lote debe ser mayor que 0.")
+
+        inicio = time.monotonic()
+
+        def progreso(importacion):
+            hechas = f"{importacion.validas} válidas" if opciones["validar"] else f"{importacion.creadas} creadas"
+            self.stdout.write(
+                f"{importacion.filas} filas, {hechas}, "
+                f"{importacion.errores_total} con error ({time.monotonic() - inicio:.1f}s)"
+            )
+
+        importacion = Importacion(autor, lote=opciones["lote"], validar=opciones["validar"], max_errores=sys.maxsize)
+        try:
+            entrada = sys.stdin.buffer if archivo == "-" else open(archivo, "rb")
+        except OSError as exc:
+            raise CommandError(f"No se pudo abrir {archivo}: {exc}")
+        with entrada:
+            importacion.ejecutar(LECTORES[formato](lineas(entrada.readline)), al_escribir=progreso)
+
+        reporte = importacion.reporte()
+        if opciones["reporte"]:
+            with open(opciones["reporte"], "w", encoding="utf-8") as salida:
+                json.dump(reporte, salida, ensure_ascii=False, indent=2, default=str)
+        for error in reporte["errores"][:20]:
+            self.stderr.write(f"Fila {error['fila']}: {json.dumps(error['errores'], ensure_ascii=False)}")
+        if reporte["errores_total"] > 20:
+            self.stderr.write(f"... y {reporte['errores_total'] - 20} errores más.")
+
+        accion = "validadas" if opciones["validar"] else "creadas"
+        cantidad = reporte["validas"] if opciones["validar"] else reporte["creadas"]
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {cantidad} de {reporte['filas']} publicaciones {accion} "
+            f"({reporte['errores_total']} con error) en {time.monotonic() - inicio:.1f}s."
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from news.sincronizacion import podar_cambios
+
+
+class Command(BaseCommand):
+    help = "Poda el registro de cambios de la sincronización (expirados y superados)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=None,
+            help="Retención en días (por defecto NEWS_SYNC_RETENCION_DIAS).",
+        )
+
+    def handle(self, *args, dias, **options):
+        expiradas, superadas = podar_cambios(dias)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Registro de cambios podado ({expiradas} expirados, {superadas} superados)."
+        ))
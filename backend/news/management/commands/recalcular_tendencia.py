@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from news.cache_respuestas import GRUPO_FEED, invalidar
+from news.models import Publicacion
+from news.tendencia import expresion_score
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula el score de tendencia (recoge las vistas volcadas por lotes y los cambios "
+        "de pesos). Pensado para cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Publicaciones por UPDATE.")
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=None,
+            help="Solo publicaciones de los últimos N días (las viejas ya no compiten).",
+        )
+
+    def handle(self, *args, lote, dias, **options):
+        publicaciones = Publicacion.objects.order_by("id")
+        if dias is not None:
+            publicaciones = publicaciones.filter(fecha_publicacion__gte=timezone.now() - timedelta(days=dias))
+        ids = list(publicaciones.values_list("id", flat=True))
+
+        actualizadas = 0
+        for inicio in range(0, len(ids), lote):
+            bloque = ids[inicio:inicio + lote]
+            actualizadas += Publicacion.objects.filter(id__in=bloque).update(score=expresion_score())
+        if actualizadas:
+            # El orden del feed por tendencia pudo cambiar
+            invalidar(GRUPO_FEED)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Score de tendencia recalculado ({actualizadas} publicaciones)."))
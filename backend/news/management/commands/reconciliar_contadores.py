@@ -0,0 +1,48 @@
+from django.db.models import F, Q
+
+from django.core.management.base import BaseCommand
+
+from news.cache_respuestas import GRUPO_FEED, grupo_publicacion, invalidar
+from news.contadores import cambios_de_version, conteo_por_publicacion
+from news.models import Comentario, Like, Publicacion
+from news.sincronizacion import ENTIDAD_PUBLICACION, registrar_cambios
+from news.tendencia import expresion_score
+
+
+class Command(BaseCommand):
+    help = "Corrige en bloque la deriva de likes_count y comentarios_count respecto a las tablas reales."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Publicaciones por UPDATE.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo informar cuántas publicaciones tienen deriva.",
+        )
+
+    def handle(self, *args, lote, dry_run, **options):
+        reales = {
+            "likes_count": conteo_por_publicacion(Like),
+            "comentarios_count": conteo_por_publicacion(Comentario),
+        }
+        con_deriva = (
+            Publicacion.objects.annotate(likes_real=reales["likes_count"], comentarios_real=reales["comentarios_count"])
+            .filter(~Q(likes_count=F("likes_real")) | ~Q(comentarios_count=F("comentarios_real")))
+            .values_list("id", flat=True)
+        )
+        ids = list(con_deriva)
+
+        if dry_run:
+            self.stdout.write(f"{len(ids)} publicaciones con contadores desalineados.")
+            return
+
+        corregidas = 0
+        for inicio in range(0, len(ids), lote):
+            bloque = ids[inicio:inicio + lote]
+            corregidas += Publicacion.objects.filter(id__in=bloque).update(**reales, **cambios_de_version())
+            # El score se calcula con los contadores ya corregidos
+            Publicacion.objects.filter(id__in=bloque).update(score=expresion_score())
+            invalidar(GRUPO_FEED, *[grupo_publicacion(publicacion_id) for publicacion_id in bloque])
+            registrar_cambios(ENTIDAD_PUBLICACION, bloque)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Contadores reconciliados ({corregidas} publicaciones)."))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from news.busqueda import soporta_busqueda_completa, vector_publicacion
+from news.models import Publicacion
+
+
+class Command(BaseCommand):
+    help = "Rellena/recalcula el tsvector `busqueda` de las publicaciones existentes, por lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Filas por UPDATE.")
+        parser.add_argument(
+            "--todas",
+            action="store_true",
+            help="Recalcular también las filas que ya tienen vector (p. ej. tras cambiar pesos).",
+        )
+
+    def handle(self, *args, lote, todas, **options):
+        if not soporta_busqueda_completa():
+            self.stdout.write("La base de datos no es Postgres: nada que indexar.")
+            return
+
+        pendientes = Publicacion.objects.all()
+        if not todas:
+            pendientes = pendientes.filter(busqueda__isnull=True)
+
+        total = 0
+        ultimo_id = None
+        while True:
+            # Recorrido por llave (id) para no re-leer filas ya procesadas
+            bloque = pendientes.order_by("id")
+            if ultimo_id is not None:
+                bloque = bloque.filter(id__gt=ultimo_id)
+            ids = list(bloque.values_list("id", flat=True)[:lote])
+            if not ids:
+                break
+            total += Publicacion.objects.filter(id__in=ids).update(busqueda=vector_publicacion())
+            ultimo_id = ids[-1]
+            self.stdout.write(f"  {total} publicaciones indexadas...")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Índice de búsqueda actualizado ({total} filas)."))
@@ -0,0 +1,150 @@
+"""
+Servido de media (/media/<ruta>).
+
+- Nombres por contenido (news/almacenamiento.py): Cache-Control inmutable
+  a un año; el resto (archivos viejos), NEWS_MEDIA_MAX_AGE.
+- ETag fuerte = nombre por contenido o (tamaño, mtime); If-None-Match → 304.
+- Range de un solo tramo (bytes=a-b, a-, -n) → 206; fuera de rango → 416.
+  Con If-Range, el Range solo vale si el validador (ETag fuerte o fecha)
+  es el actual; si no, va el archivo entero (200).
+- En ASGI, Django junta en memoria un iterador sync antes de enviarlo
+  (también el de FileResponse): el cuerpo es un iterador async que lee
+  cada trozo en un hilo, como en news/exportacion.py.
+- Con NEWS_MEDIA_X_ACCEL_PREFIX, nginx envía el archivo (X-Accel-Redirect)
+  y Django solo pone las cabeceras.
+- Almacenamientos sin disco local (S3): redirección a storage.url().
+"""
+import mimetypes
+import os
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .almacenamiento import es_nombre_por_contenido
+
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+TROZO = 64 * 1024
+RANGO = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _rango(cabecera, tamano):
+    """ (inicio, fin) inclusivo; None si no hay Range válido; False si es insatisfacible. """
+    coincidencia = RANGO.match(cabecera.strip()) if cabecera else None
+    if not coincidencia or coincidencia.groups() == ("", ""):
+        return None
+    inicio, fin = coincidencia.groups()
+    if inicio == "":
+        largo = int(fin)
+        if largo == 0:
+            return False
+        return max(0, tamano - largo), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or fin < inicio:
+        return False
+    return inicio, fin
+
+
+def _if_range_vale(cabecera, etag, mtime):
+    """ Sin If-Range, o con el validador actual: el Range se respeta. """
+    if cabecera is None:
+        return True
+    cabecera = cabecera.strip()
+    if cabecera.startswith(('"', "W/")):
+        # Comparación fuerte: un ETag débil nunca coincide
+        return cabecera == etag
+    return parse_http_date_safe(cabecera) == int(mtime)
+
+
+def _leer(ruta_completa, inicio, largo):
+    with open(ruta_completa, "rb") as archivo:
+        archivo.seek(inicio)
+        while largo > 0:
+            trozo = archivo.read(min(TROZO, largo))
+            if not trozo:
+                break
+            largo -= len(trozo)
+            yield trozo
+
+
+async def _leer_asincrono(ruta_completa, inicio, largo):
+    """ Cada trozo se lee en un hilo aparte: no bloquea el event loop ni junta el archivo. """
+    trozos = _leer(ruta_completa, inicio, largo)
+    siguiente = sync_to_async(next, thread_sensitive=False)
+    fin = object()
+    try:
+        while (trozo := await siguiente(trozos, fin)) is not fin:
+            yield trozo
+    finally:
+        trozos.close()
+
+
+@require_safe
+def servir_media(request, ruta):
+    storage = default_storage
+    try:
+        ruta_completa = storage.path(ruta)
+    except NotImplementedError:
+        return HttpResponseRedirect(storage.url(ruta))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(ruta_completa):
+        raise Http404
+
+    estado = os.stat(ruta_completa)
+    tamano = estado.st_size
+    inmutable = es_nombre_por_contenido(ruta)
+    if inmutable:
+        etag = f'"{os.path.splitext(os.path.basename(ruta))[0]}"'
+    else:
+        etag = f'"{tamano:x}-{int(estado.st_mtime):x}"'
+    cabeceras = {
+        "ETag": etag,
+        "Cache-Control": CACHE_INMUTABLE if inmutable else f"public, max-age={settings.NEWS_MEDIA_MAX_AGE}",
+        "Last-Modified": http_date(estado.st_mtime),
+        "Accept-Ranges": "bytes",
+    }
+
+    if etag in [e.strip() for e in request.headers.get("If-None-Match", "").split(",")]:
+        respuesta = HttpResponseNotModified()
+        for nombre, valor in cabeceras.items():
+            respuesta[nombre] = valor
+        return respuesta
+
+    tipo = mimetypes.guess_type(ruta)[0] or "application/octet-stream"
+
+    if settings.NEWS_MEDIA_X_ACCEL_PREFIX:
+        # nginx resuelve el Range y envía el archivo
+        respuesta = HttpResponse(content_type=tipo)
+        respuesta["X-Accel-Redirect"] = settings.NEWS_MEDIA_X_ACCEL_PREFIX.rstrip("/") + "/" + ruta
+    else:
+        rango = None
+        if _if_range_vale(request.headers.get("If-Range"), etag, estado.st_mtime):
+            rango = _rango(request.headers.get("Range"), tamano)
+        if rango is False:
+            respuesta = HttpResponse(status=416)
+            respuesta["Content-Range"] = f"bytes */{tamano}"
+            return respuesta
+        inicio, fin = rango or (0, tamano - 1)
+        largo = fin - inicio + 1 if tamano else 0
+        if request.method != "GET":
+            cuerpo = []
+        elif isinstance(request, ASGIRequest):
+            cuerpo = _leer_asincrono(ruta_completa, inicio, largo)
+        else:
+            cuerpo = _leer(ruta_completa, inicio, largo)
+        respuesta = StreamingHttpResponse(cuerpo, content_type=tipo, status=206 if rango else 200)
+        respuesta["Content-Length"] = str(largo)
+        if rango:
+            respuesta["Content-Range"] = f"bytes {inicio}-{fin}/{tamano}"
+
+    for nombre, valor in cabeceras.items():
+        respuesta[nombre] = valor
+    return respuesta
@@ -0,0 +1,131 @@
+"""
+Endpoint interno de métricas en formato de texto de Prometheus
+(GET /internal/metricas/).
+
+Junta lo que ya cuenta cada módulo en este proceso: peticiones por acción
+(news/instrumentacion.py), vistas en buffer, pools de conexiones, réplicas
+de lectura, caché de tokens JWT y conexiones SSE. Todo es por proceso:
+cada serie lleva la etiqueta `pid`, y con varios workers cada scrape ve al
+que le tocó (para sumar, agregar por acción en Prometheus).
+
+Protección: con NEWS_METRICAS_TOKEN se exige `Authorization: Bearer
+<token>`; sin él, el endpoint solo responde con DEBUG.
+"""
+import hmac
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from news_service.db_pool.base import metricas_pools
+
+from .authentication import metricas_auth
+from .eventos import metricas_eventos
+from .instrumentacion import BUCKETS_DURACION, registro
+from .replicas import metricas_replicas
+from .vistas import metricas_vistas
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# nombre interno → (métrica, tipo, ayuda)
+_POR_ACCION = {
+    "peticiones": ("news_peticiones_total", "counter", "Peticiones atendidas"),
+    "errores": ("news_peticiones_error_total", "counter", "Respuestas 5xx"),
+    "consultas": ("news_consultas_bd_total", "counter", "Consultas a la BD"),
+    "tiempo_bd": ("news_tiempo_bd_segundos_total", "counter", "Tiempo en la BD"),
+    "serializacion": ("news_serializacion_segundos_total", "counter", "Tiempo serializando"),
+    "bytes": ("news_respuesta_bytes_total", "counter", "Bytes de respuesta (sin streaming)"),
+    "presupuesto_excedido": (
+        "news_presupuesto_excedido_total", "counter", "Peticiones sobre el presupuesto de consultas",
+    ),
+}
+
+
+def _etiquetas(**valores):
+    partes = []
+    for nombre, valor in valores.items():
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        partes.append(f'{nombre}="{valor}"')
+    return "{" + ",".join(partes) + "}"
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(int(valor))
+
+
+def _cabecera(lineas, nombre, tipo, ayuda):
+    lineas.append(f"# HELP {nombre} {ayuda}")
+    lineas.append(f"# TYPE {nombre} {tipo}")
+
+
+def _acciones(lineas, pid):
+    acciones = registro.copia()
+    for clave, (nombre, tipo, ayuda) in _POR_ACCION.items():
+        _cabecera(lineas, nombre, tipo, ayuda)
+        for accion, datos in sorted(acciones.items()):
+            lineas.append(f"{nombre}{_etiquetas(pid=pid, accion=accion)} {_numero(datos[clave])}")
+
+    nombre = "news_peticion_duracion_segundos"
+    _cabecera(lineas, nombre, "histogram", "Duración de las peticiones")
+    for accion, datos in sorted(acciones.items()):
+        acumulado = 0
+        for limite, cantidad in zip(BUCKETS_DURACION, datos["buckets"]):
+            acumulado += cantidad
+            lineas.append(f"{nombre}_bucket{_etiquetas(pid=pid, accion=accion, le=limite)} {acumulado}")
+        etiquetas = _etiquetas(pid=pid, accion=accion)
+        lineas.append(f"{nombre}_bucket{_etiquetas(pid=pid, accion=accion, le='+Inf')} {datos['peticiones']}")
+        lineas.append(f"{nombre}_sum{etiquetas} {_numero(datos['duracion'])}")
+        lineas.append(f"{nombre}_count{etiquetas} {datos['peticiones']}")
+
+
+def _planas(lineas, prefijo, metricas, pid, **extra):
+    """ Un dict {clave: número} → una métrica gauge por clave. """
+    for clave, valor in sorted(metricas.items()):
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            continue
+        nombre = f"{prefijo}_{clave}"
+        _cabecera(lineas, nombre, "gauge", f"{prefijo.replace('_', ' ')}: {clave}")
+        lineas.append(f"{nombre}{_etiquetas(pid=pid, **extra)} {_numero(valor)}")
+
+
+def exportar():
+    pid = os.getpid()
+    lineas = []
+    _acciones(lineas, pid)
+    _planas(lineas, "news_vistas", metricas_vistas(), pid)
+    _planas(lineas, "news_auth", metricas_auth(), pid)
+    _planas(lineas, "news_sse", metricas_eventos(), pid)
+
+    _por_alias(lineas, "news_pool", "Pool de conexiones", metricas_pools(), pid)
+    _por_alias(lineas, "news_replica", "Réplica de lectura", metricas_replicas(), pid)
+    return "\n".join(lineas) + "\n"
+
+
+def _por_alias(lineas, prefijo, ayuda, estados, pid):
+    """ {alias: {clave: número}} → una métrica gauge por clave, con etiqueta alias. """
+    claves = sorted({clave for estado in estados.values() for clave in estado})
+    for clave in claves:
+        nombre = f"{prefijo}_{clave}"
+        _cabecera(lineas, nombre, "gauge", f"{ayuda}: {clave}")
+        for alias, estado in sorted(estados.items()):
+            if isinstance(estado.get(clave), (int, float)):
+                lineas.append(f"{nombre}{_etiquetas(pid=pid, alias=alias)} {_numero(estado[clave])}")
+
+
+def _autorizado(request):
+    token = settings.NEWS_METRICAS_TOKEN
+    if not token:
+        return settings.DEBUG
+    cabecera = request.headers.get("Authorization", "")
+    return hmac.compare_digest(cabecera.encode(), f"Bearer {token}".encode())
+
+
+@require_GET
+def metricas(request):
+    if not _autorizado(request):
+        # Sin token configurado y fuera de DEBUG, como si no existiera
+        if not settings.NEWS_METRICAS_TOKEN:
+            raise Http404
+        return HttpResponseForbidden()
+    return HttpResponse(exportar(), content_type=CONTENT_TYPE)
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_remove_publicacion_imagen_url_publicacion_imagen'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comentario',
+            name='idx_comentarios_publicacion',
+        ),
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['publicacion', 'fecha_comentario', 'id'], name='idx_com_pub_fecha_id'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(fields=['estado', 'fecha_publicacion', 'id'], name='idx_pub_estado_fecha_id'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(fields=['fecha_publicacion', 'id'], name='idx_pub_fecha_id'),
+        ),
+    ]
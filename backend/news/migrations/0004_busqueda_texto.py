@@ -0,0 +1,63 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:08
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# Trigger que mantiene `busqueda` en cada INSERT/UPDATE de título o contenido
+# (también cubre bulk_create y UPDATE masivos, que no disparan señales).
+CREAR_TRIGGER = """
+CREATE OR REPLACE FUNCTION news_publicacion_busqueda_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.busqueda :=
+        setweight(to_tsvector('spanish', coalesce(NEW.titulo, '')), 'A') ||
+        setweight(to_tsvector('spanish', coalesce(NEW.contenido, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS news_publicacion_busqueda_tg ON {tabla};
+CREATE TRIGGER news_publicacion_busqueda_tg
+    BEFORE INSERT OR UPDATE OF titulo, contenido ON {tabla}
+    FOR EACH ROW EXECUTE FUNCTION news_publicacion_busqueda_trigger();
+
+CREATE INDEX IF NOT EXISTS idx_pub_busqueda ON {tabla} USING gin (busqueda);
+CREATE INDEX IF NOT EXISTS idx_pub_titulo_trgm ON {tabla} USING gin (titulo gin_trgm_ops);
+"""
+
+BORRAR_TRIGGER = """
+DROP INDEX IF EXISTS idx_pub_titulo_trgm;
+DROP INDEX IF EXISTS idx_pub_busqueda;
+DROP TRIGGER IF EXISTS news_publicacion_busqueda_tg ON {tabla};
+DROP FUNCTION IF EXISTS news_publicacion_busqueda_trigger();
+"""
+
+
+def _ejecutar_en_postgres(sql):
+    def operacion(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        tabla = apps.get_model("news", "Publicacion")._meta.db_table
+        schema_editor.execute(sql.format(tabla=schema_editor.quote_name(tabla)))
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_indices_keyset'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='publicacion',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            _ejecutar_en_postgres(CREAR_TRIGGER),
+            _ejecutar_en_postgres(BORRAR_TRIGGER),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def rellenar_contadores(apps, schema_editor):
+    Publicacion = apps.get_model("news", "Publicacion")
+
+    def conteo(modelo):
+        filas = (
+            apps.get_model("news", modelo).objects.filter(publicacion=OuterRef("pk"))
+            .order_by().values("publicacion").annotate(total=Count("*")).values("total")
+        )
+        return Coalesce(Subquery(filas), 0)
+
+    Publicacion.objects.update(
+        likes_count=conteo("Like"),
+        comentarios_count=conteo("Comentario"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_busqueda_texto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicacion',
+            name='comentarios_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='publicacion',
+            name='likes_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(rellenar_contadores, migrations.RunPython.noop),
+    ]
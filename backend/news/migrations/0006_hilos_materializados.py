@@ -0,0 +1,74 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+def rellenar_hilos(apps, schema_editor):
+    """
+    Calcula hilo_id/ruta/profundidad de los comentarios existentes a partir
+    del mapeo ComentarioRespuesta (respuesta -> padre), por lotes.
+    """
+    Comentario = apps.get_model("news", "Comentario")
+    ComentarioRespuesta = apps.get_model("news", "ComentarioRespuesta")
+
+    padre_de = dict(
+        ComentarioRespuesta.objects.values_list("comentario_respuesta_id", "comentario_padre_id")
+        .iterator(chunk_size=5000)
+    )
+    rutas = {}
+
+    def ruta_de(comentario_id):
+        # Subir hasta la raíz de forma iterativa (los hilos pueden ser profundos)
+        cadena = []
+        actual = comentario_id
+        while actual not in rutas and actual in padre_de:
+            cadena.append(actual)
+            actual = padre_de[actual]
+        if actual not in rutas:
+            rutas[actual] = [actual]
+        for nodo in reversed(cadena):
+            rutas[nodo] = rutas[padre_de[nodo]] + [nodo]
+        return rutas[comentario_id]
+
+    lote = []
+    for comentario in Comentario.objects.only("id").iterator(chunk_size=2000):
+        ruta = ruta_de(comentario.id)
+        comentario.hilo_id = ruta[0]
+        comentario.ruta = "/".join(nodo.hex for nodo in ruta)
+        comentario.profundidad = len(ruta) - 1
+        lote.append(comentario)
+        if len(lote) >= 1000:
+            Comentario.objects.bulk_update(lote, ["hilo_id", "ruta", "profundidad"])
+            lote = []
+    if lote:
+        Comentario.objects.bulk_update(lote, ["hilo_id", "ruta", "profundidad"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_contadores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comentario',
+            name='hilo_id',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='comentario',
+            name='profundidad',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comentario',
+            name='ruta',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['hilo_id', 'profundidad'], name='idx_com_hilo_prof'),
+        ),
+        migrations.RunPython(rellenar_hilos, migrations.RunPython.noop),
+    ]
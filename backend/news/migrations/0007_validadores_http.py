@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:18
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def rellenar_fecha_actividad(apps, schema_editor):
+    Publicacion = apps.get_model("news", "Publicacion")
+    Publicacion.objects.update(fecha_actividad=F("fecha_actualizacion"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_hilos_materializados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicacion',
+            name='fecha_actividad',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='publicacion',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(rellenar_fecha_actividad, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_validadores_http'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroCambio',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entidad', models.CharField(choices=[('publicacion', 'Publicación'), ('comentario', 'Comentario')], max_length=20)),
+                ('objeto_id', models.UUIDField()),
+                ('publicacion_id', models.UUIDField(blank=True, null=True)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['entidad', 'id'], name='idx_cambio_entidad_id'), models.Index(fields=['publicacion_id', 'id'], name='idx_cambio_pub_id'), models.Index(fields=['entidad', 'objeto_id'], name='idx_cambio_objeto'), models.Index(fields=['fecha'], name='idx_cambio_fecha')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_registro_cambios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicacion',
+            name='imagen_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
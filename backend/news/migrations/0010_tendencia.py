@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+from news.tendencia import expresion_score
+
+
+def calcular_scores(apps, schema_editor):
+    Publicacion = apps.get_model("news", "Publicacion")
+    Publicacion.objects.update(score=expresion_score())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_imagen_variantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicacion',
+            name='score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(fields=['estado', '-score', '-id'], name='idx_pub_estado_score_id'),
+        ),
+        migrations.RunPython(calcular_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0010_tendencia'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='registrocambio',
+            name='idx_cambio_entidad_id',
+        ),
+        migrations.RemoveIndex(
+            model_name='registrocambio',
+            name='idx_cambio_pub_id',
+        ),
+        migrations.AddField(
+            model_name='registrocambio',
+            name='transaccion',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='registrocambio',
+            index=models.Index(fields=['entidad', 'transaccion', 'id'], name='idx_cambio_entidad_tx_id'),
+        ),
+        migrations.AddIndex(
+            model_name='registrocambio',
+            index=models.Index(fields=['publicacion_id', 'transaccion', 'id'], name='idx_cambio_pub_tx_id'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-18 19:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0011_registro_cambios_transaccion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicacion',
+            name='variantes_pendientes',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(condition=models.Q(('variantes_pendientes', True)), fields=['id'], name='idx_pub_variantes_pend'),
+        ),
+    ]
@@ -1,5 +1,9 @@
 import uuid
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+
+from .tendencia import calcular_score
 
 class Categoria(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -37,8 +41,27 @@ class Publicacion(models.Model):
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     estado = models.CharField(max_length=20, choices=ESTADOS, default="borrador")
     imagen = models.ImageField(upload_to='publicaciones/', blank=True, null=True)
+    # Variantes generadas fuera de la petición (ver news/imagenes.py):
+    # {"webp": {"320": "publicaciones/variantes/<hash>.webp", ...}, "jpeg": {...}}
+    imagen_variantes = models.JSONField(default=dict, blank=True, editable=False)
+    # Imagen nueva sin variantes registradas todavía: si el proceso se reinicia
+    # antes de generarlas, `generar_variantes_imagenes` las retoma
+    variantes_pendientes = models.BooleanField(default=False, editable=False)
     vistas = models.IntegerField(default=0)
+    # Contadores desnormalizados (ver news/contadores.py y `reconciliar_contadores`)
+    likes_count = models.IntegerField(default=0)
+    comentarios_count = models.IntegerField(default=0)
     tipo_autor = models.CharField(max_length=20, choices=TIPOS)
+    # tsvector (título peso A, contenido peso B) mantenido por trigger en Postgres.
+    # Sus índices GIN/trigramas se crean en la migración 0004 (solo Postgres).
+    busqueda = SearchVectorField(null=True, editable=False)
+    # Validadores HTTP (ETag / Last-Modified): suben con cada edición y con
+    # cada comentario o like (ver news/contadores.py y news/condicional.py).
+    # Las vistas no cuentan: se vuelcan por lotes y son aproximadas.
+    version = models.PositiveIntegerField(default=1, editable=False)
+    fecha_actividad = models.DateTimeField(auto_now=True)
+    # Score del feed por tendencia (ver news/tendencia.py)
+    score = models.FloatField(default=0, editable=False)
 
     class Meta:
         indexes = [
@@ -46,11 +69,34 @@ class Publicacion(models.Model):
             models.Index(fields=["autor_institucion_id"], name="idx_publicaciones_institucion"),
             models.Index(fields=["categoria"], name="idx_publicaciones_categoria"),
             models.Index(fields=["estado"], name="idx_publicaciones_estado"),
+            # Keyset del feed: (estado, fecha_publicacion, id) y sin filtro de estado
+            models.Index(fields=["estado", "fecha_publicacion", "id"], name="idx_pub_estado_fecha_id"),
+            models.Index(fields=["fecha_publicacion", "id"], name="idx_pub_fecha_id"),
+            # Keyset del feed por tendencia
+            models.Index(fields=["estado", "-score", "-id"], name="idx_pub_estado_score_id"),
+            # Variantes pendientes (pocas filas: índice parcial)
+            models.Index(fields=["id"], condition=models.Q(variantes_pendientes=True), name="idx_pub_variantes_pend"),
         ]
 
     def __str__(self):
         return self.titulo
 
+    def save(self, *args, **kwargs):
+        # La versión sube en la BD (F) para no perder ediciones concurrentes.
+        # Después queda diferida: solo quien la lea (p. ej. para un ETag) paga
+        # el SELECT, vía refresh_from_db(fields=["version"]).
+        if self._state.adding:
+            self.score = calcular_score(
+                self.likes_count, self.comentarios_count, self.vistas,
+                self.fecha_publicacion or timezone.now(),
+            )
+            return super().save(*args, **kwargs)
+        self.version = models.F("version") + 1
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "version", "fecha_actividad"}
+        super().save(*args, **kwargs)
+        del self.version
+
 
 class Comentario(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -58,13 +104,41 @@ class Comentario(models.Model):
     usuario_id = models.UUIDField()  # lógica a auth_service
     contenido = models.TextField()
     fecha_comentario = models.DateTimeField(auto_now_add=True)
+    # Hilo materializado: raíz del hilo (lógica, sin cascada), ruta de ids
+    # hex desde la raíz hasta este comentario ("raiz/.../id") y nivel.
+    hilo_id = models.UUIDField(blank=True, null=True, editable=False)
+    ruta = models.TextField(blank=True, default="", editable=False)
+    profundidad = models.PositiveSmallIntegerField(default=0, editable=False)
 
     class Meta:
         indexes = [
-            models.Index(fields=["publicacion"], name="idx_comentarios_publicacion"),
+            # Keyset de comentarios por publicación (cubre también el filtro simple)
+            models.Index(fields=["publicacion", "fecha_comentario", "id"], name="idx_com_pub_fecha_id"),
             models.Index(fields=["usuario_id"], name="idx_comentarios_usuario"),
+            # Un hilo completo (o hasta cierta profundidad) en un rango de índice
+            models.Index(fields=["hilo_id", "profundidad"], name="idx_com_hilo_prof"),
         ]
 
+    def colgar_de(self, padre):
+        """ Ubica este comentario (aún sin guardar) como respuesta de `padre`. """
+        self.hilo_id = padre.hilo_id or padre.id
+        self.ruta = f"{padre.ruta or padre.id.hex}/{self.id.hex}"
+        self.profundidad = padre.profundidad + 1
+
+    @property
+    def padre_id(self):
+        """ Id del comentario padre según la ruta (None si es raíz). """
+        partes = self.ruta.split("/")
+        return uuid.UUID(partes[-2]) if len(partes) > 1 else None
+
+    def save(self, *args, **kwargs):
+        # Comentario principal: es la raíz de su propio hilo
+        if not self.ruta:
+            self.hilo_id = self.id
+            self.ruta = self.id.hex
+            self.profundidad = 0
+        super().save(*args, **kwargs)
+
 
 class ComentarioRespuesta(models.Model):
     # Tabla de mapeo respuesta -> padre (1 a 1), fiel a tu SQL
@@ -93,3 +167,29 @@ class Like(models.Model):
             models.Index(fields=["usuario_id"], name="idx_likes_usuario"),
         ]
 
+
+
+class RegistroCambio(models.Model):
+    """
+    Registro de cambios para la sincronización incremental (news/sincronizacion.py).
+    La posición (transaccion, id) es el token; se poda con `podar_cambios`.
+    """
+    ENTIDADES = (
+        ("publicacion", "Publicación"),
+        ("comentario", "Comentario"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    entidad = models.CharField(max_length=20, choices=ENTIDADES)
+    objeto_id = models.UUIDField()
+    publicacion_id = models.UUIDField(blank=True, null=True)  # comentarios: su publicación
+    fecha = models.DateTimeField(auto_now_add=True)
+    transaccion = models.BigIntegerField(default=0, editable=False)  # xid en Postgres; 0 en otros motores
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["entidad", "transaccion", "id"], name="idx_cambio_entidad_tx_id"),
+            models.Index(fields=["publicacion_id", "transaccion", "id"], name="idx_cambio_pub_tx_id"),
+            models.Index(fields=["entidad", "objeto_id"], name="idx_cambio_objeto"),
+            models.Index(fields=["fecha"], name="idx_cambio_fecha"),
+        ]
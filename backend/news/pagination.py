@@ -0,0 +1,212 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorKeysetPagination(BasePagination):
+    """
+    Paginación por llave compuesta (keyset) con cursores opacos.
+
+    - `ordering` define la llave, p. ej. ("-fecha_publicacion", "-id");
+      el último campo debe ser único para desempatar.
+    - El cursor codifica los valores de la llave del borde de la página,
+      así que la página N cuesta lo mismo que la primera (rango sobre índice).
+    - Nunca se cuenta el total: se pide page_size + 1 filas para saber si hay más.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering = ("-id",)
+    invalid_cursor_message = "Cursor inválido."
+
+    def get_page_size(self, request):
+        page_size = settings.NEWS_PAGE_SIZE
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor:
+            try:
+                page_size = int(valor)
+            except ValueError:
+                pass
+        return max(1, min(page_size, settings.NEWS_MAX_PAGE_SIZE))
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        consulta = self.preparar_consulta(queryset, request, view)
+        return self.cerrar_pagina(list(consulta))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """ Igual que `paginate_queryset`, pero con el ORM async. """
+        consulta = self.preparar_consulta(queryset, request, view)
+        return self.cerrar_pagina([obj async for obj in consulta])
+
+    def preparar_consulta(self, queryset, request, view=None):
+        """ Consulta de la página (page_size + 1 filas), sin ejecutarla. """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.campos = self._campos(self.get_ordering(request, queryset, view))
+        self.posicion, self.reverso = self.decode_cursor(request, queryset.model)
+
+        orden = [
+            f"-{nombre}" if desc != self.reverso else nombre
+            for nombre, desc in self.campos
+        ]
+        queryset = queryset.order_by(*orden)
+        if self.posicion is not None:
+            queryset = queryset.filter(self._filtro_keyset(self.posicion, self.reverso))
+        return queryset[: self.page_size + 1]
+
+    def cerrar_pagina(self, resultados):
+        """ Recorta la fila extra y fija la navegación (next/previous). """
+        hay_mas = len(resultados) > self.page_size
+        resultados = resultados[: self.page_size]
+
+        if self.reverso:
+            resultados.reverse()
+            self.has_next = self.posicion is not None
+            self.has_previous = hay_mas
+        else:
+            self.has_next = hay_mas
+            self.has_previous = self.posicion is not None
+
+        self.page = resultados
+        return resultados
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._posicion(self.page[-1]), reverso=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._posicion(self.page[0]), reverso=True)
+
+    # 🔹 Cursores opacos: base64 de la posición + dirección
+    def encode_cursor(self, posicion, reverso):
+        datos = {"p": [self._a_json(v) for v in posicion]}
+        if reverso:
+            datos["r"] = 1
+        crudo = json.dumps(datos, separators=(",", ":")).encode("utf-8")
+        cursor = base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, modelo):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            relleno = "=" * (-len(cursor) % 4)
+            datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+            valores = datos["p"]
+            if len(valores) != len(self.campos):
+                raise ValueError
+            posicion = [
+                self._desde_json(modelo, nombre, valor)
+                for (nombre, _), valor in zip(self.campos, valores)
+            ]
+            return posicion, bool(datos.get("r"))
+        except (TypeError, ValueError, KeyError, AttributeError, binascii.Error, ValidationError):
+            # Cursor mal formado o manipulado: error del cliente (400), nunca un 500
+            raise ParseError(self.invalid_cursor_message)
+
+    # 🔹 Utilidades internas
+    @staticmethod
+    def _campos(ordering):
+        campos = [(campo.lstrip("-"), campo.startswith("-")) for campo in ordering]
+        if len({desc for _, desc in campos}) != 1:
+            raise ValueError("El ordering de keyset debe tener una sola dirección.")
+        return campos
+
+    def _posicion(self, obj):
+        # Modelos o filas de .values() (listados por valores, news/valores.py)
+        if isinstance(obj, dict):
+            return [obj[nombre] for nombre, _ in self.campos]
+        return [getattr(obj, nombre) for nombre, _ in self.campos]
+
+    def _filtro_keyset(self, posicion, reverso):
+        """
+        (a, b, c) < (x, y, z) expandido a OR/AND, con la cota del primer
+        campo repetida (a <= x) para que el planner use el índice como rango.
+        """
+        desc = self.campos[0][1] != reverso
+        estricto, cota = ("lt", "lte") if desc else ("gt", "gte")
+
+        filtro = Q()
+        iguales = Q()
+        for (nombre, _), valor in zip(self.campos, posicion):
+            filtro |= iguales & Q(**{f"{nombre}__{estricto}": valor})
+            iguales &= Q(**{nombre: valor})
+
+        primero, valor = self.campos[0][0], posicion[0]
+        return Q(**{f"{primero}__{cota}": valor}) & filtro
+
+    @staticmethod
+    def _a_json(valor):
+        if isinstance(valor, datetime):
+            return valor.isoformat()
+        if isinstance(valor, UUID):
+            return str(valor)
+        return valor
+
+    @staticmethod
+    def _desde_json(modelo, nombre, valor):
+        try:
+            campo = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            # Anotaciones (p. ej. relevancia): números, se comparan tal cual
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                raise ValueError(nombre)
+            return valor
+        return campo.to_python(valor)
+
+
+class PublicacionCursorPagination(CursorKeysetPagination):
+    """
+    Feed: más recientes primero (índice estado, fecha_publicacion, id).
+    La vista puede cambiar la llave con `orden_cursor` (p. ej. por relevancia).
+    """
+    ordering = ("-fecha_publicacion", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, "orden_cursor", None) or self.ordering
+
+
+class ComentarioCursorPagination(CursorKeysetPagination):
+    """ Comentarios en orden de conversación (índice publicacion, fecha, id). """
+    ordering = ("fecha_comentario", "id")
+
+
+class ComentarioRecientesPagination(CursorKeysetPagination):
+    """ Comentarios más recientes primero. """
+    ordering = ("-fecha_comentario", "-id")
@@ -0,0 +1,86 @@
+"""
+JSON rápido con orjson (NEWS_JSON_RAPIDO), con la misma salida que el
+JSONRenderer/JSONParser de DRF.
+
+- Renderizador: orjson serializa en C dicts, listas, UUIDs y números; lo
+  que no conoce (fechas sin serializar, Decimal, textos lazy, QuerySets)
+  pasa por el JSONEncoder de DRF, así que el formato no cambia (p. ej.
+  fechas UTC con "Z" en lugar de "+00:00"). U+2028/U+2029 salen escapados
+  como en DRF. Única diferencia de bytes: los floats en notación
+  exponencial (orjson "1e-7", DRF "1e-07"), el mismo valor. Con
+  indentación pedida (API navegable, `; indent=`), UNICODE_JSON o
+  COMPACT_JSON desactivados se usa el de DRF.
+- Parser: orjson.loads sobre el cuerpo en UTF-8; otro charset, el de DRF.
+
+Sin orjson instalado (es opcional) o con NEWS_JSON_RAPIDO=0, ambas clases
+se comportan exactamente como las de DRF.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import json
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+# Fechas al JSONEncoder de DRF: orjson escribe "+00:00" donde DRF pone "Z"
+_OPCIONES = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+_encoder = JSONEncoder()
+
+
+def _dumps(datos):
+    salida = orjson.dumps(datos, default=_encoder.default, option=_OPCIONES)
+    # Válidos en JSON pero no en JavaScript: DRF los escapa
+    if b"\xe2\x80\xa8" in salida or b"\xe2\x80\xa9" in salida:
+        salida = salida.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return salida
+
+
+def disponible():
+    return orjson is not None and settings.NEWS_JSON_RAPIDO
+
+
+def volcar(datos):
+    """ bytes JSON compactos en UTF-8, como los del renderizador. """
+    if disponible():
+        return _dumps(datos)
+    return JSONRenderer().render(datos)
+
+
+def cargar(crudo):
+    """ JSON (bytes o str) → objeto, estricto como el parser; ValueError si no es válido. """
+    if disponible():
+        return orjson.loads(crudo)
+    return json.loads(crudo)
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None
+            or not disponible()
+            or not (api_settings.UNICODE_JSON and api_settings.COMPACT_JSON)
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return _dumps(data)
+
+
+class JSONRapidoParser(JSONParser):
+    renderer_class = JSONRapidoRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        codificacion = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not disponible() or codificacion.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # Como el de DRF (strict): NaN/Infinity tampoco se aceptan
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
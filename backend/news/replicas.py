@@ -0,0 +1,276 @@
+"""
+Réplicas de lectura (DATABASE_REPLICA_URLS → alias "replica_1", "replica_2"...).
+
+- Router: solo las lecturas de peticiones GET/HEAD van a una réplica (la
+  misma durante toda la petición). Todo lo demás lee de la primaria:
+  escrituras, lecturas dentro de una transacción, lo que corre fuera de
+  una petición (comandos, hilos de fondo) y las lecturas posteriores a una
+  escritura en la misma petición.
+- Leer lo propio (read-your-writes): tras una petición que escribe
+  (POST/PUT/PATCH/DELETE sin error), el cliente lee de la primaria durante
+  NEWS_REPLICA_PEGAJOSO segundos. La marca viaja en la cookie
+  `news_primaria` y en la cabecera `X-Primaria-Hasta` (para clientes sin
+  cookies: basta con reenviarla en las peticiones siguientes).
+- Salud: cada NEWS_REPLICA_CHEQUEO segundos, como mucho, se revisa cada
+  réplica (en Postgres, el retraso de replay). Caída o con más de
+  NEWS_REPLICA_RETRASO_MAX segundos de retraso, deja de usarse hasta el
+  siguiente chequeo; sin réplicas sanas, todo va a la primaria.
+
+Una respuesta leída de una réplica con retraso no se guarda en la caché de
+respuestas (news/cache_respuestas.py): la clave lleva la versión nueva del
+grupo y quedaría el dato viejo hasta que expire.
+"""
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .instrumentacion import sin_medir
+
+logger = logging.getLogger(__name__)
+
+COOKIE_PRIMARIA = "news_primaria"
+CABECERA_PRIMARIA = "X-Primaria-Hasta"
+METODOS_LECTURA = ("GET", "HEAD", "OPTIONS")
+
+# Segundos de retraso de una réplica Postgres (0 si está al día o no es réplica)
+SQL_RETRASO_POSTGRES = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+_lectura = ContextVar("news_lectura", default=None)
+
+
+def alias_replicas():
+    return [alias for alias in settings.DATABASES if alias.startswith("replica_")]
+
+
+# ------------------ 🔹 SALUD ------------------
+class EstadoReplica:
+    __slots__ = ("sana", "retraso", "revisado", "lecturas", "fallos")
+
+    def __init__(self):
+        self.sana = True
+        self.retraso = 0.0
+        self.revisado = 0.0
+        self.lecturas = 0
+        self.fallos = 0
+
+
+class Replicas:
+    """ Estado de las réplicas en este proceso; se revisan a demanda, un hilo a la vez. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revisando = set()
+        self.estados = {}
+
+    def _estado(self, alias):
+        estado = self.estados.get(alias)
+        if estado is None:
+            estado = self.estados.setdefault(alias, EstadoReplica())
+        return estado
+
+    def medir_retraso(self, alias):
+        conexion = connections[alias]
+        with sin_medir(), conexion.cursor() as cursor:
+            if conexion.vendor == "postgresql":
+                cursor.execute(SQL_RETRASO_POSTGRES)
+                return float(cursor.fetchone()[0] or 0)
+            # Sin noción de retraso (SQLite en dev/tests): basta con que lea una tabla
+            cursor.execute(f"SELECT 1 FROM {conexion.ops.quote_name('django_migrations')} LIMIT 1")
+            return 0.0
+
+    def revisar(self, alias):
+        estado = self._estado(alias)
+        ahora = time.monotonic()
+        if ahora - estado.revisado < settings.NEWS_REPLICA_CHEQUEO:
+            return estado
+        with self._lock:
+            if alias in self._revisando:
+                return estado
+            self._revisando.add(alias)
+        try:
+            retraso = self.medir_retraso(alias)
+        except DatabaseError as exc:
+            # Conexión rota: no reutilizarla en el próximo intento
+            connections[alias].close()
+            if estado.sana:
+                logger.warning("Réplica %s fuera de servicio: %s", alias, exc)
+            estado.sana = False
+            estado.fallos += 1
+        else:
+            sana = retraso <= settings.NEWS_REPLICA_RETRASO_MAX
+            if sana != estado.sana:
+                logger.warning("Réplica %s %s (retraso %.1fs)", alias, "de vuelta" if sana else "atrasada", retraso)
+            estado.sana, estado.retraso = sana, retraso
+        finally:
+            estado.revisado = time.monotonic()
+            with self._lock:
+                self._revisando.discard(alias)
+        return estado
+
+    def sospechar(self, alias):
+        """ Revisar en la próxima lectura (p. ej. tras un 5xx leyendo de ella). """
+        self._estado(alias).revisado = 0.0
+
+    def elegir(self):
+        """ Una réplica sana al azar, o None (primaria). """
+        sanas = [alias for alias in alias_replicas() if self.revisar(alias).sana]
+        if not sanas:
+            return None
+        alias = random.choice(sanas)
+        self.estados[alias].lecturas += 1
+        return alias
+
+    def retraso(self, alias):
+        estado = self.estados.get(alias)
+        return estado.retraso if estado else 0.0
+
+    def metricas(self):
+        return {
+            alias: {
+                "sana": int(estado.sana),
+                "retraso_segundos": estado.retraso,
+                "lecturas": estado.lecturas,
+                "fallos": estado.fallos,
+            }
+            for alias, estado in list(self.estados.items())
+        }
+
+
+replicas = Replicas()
+
+
+def metricas_replicas():
+    """ {alias: {sana, retraso_segundos, lecturas, fallos}} de este proceso. """
+    return replicas.metricas()
+
+
+# ------------------ 🔹 ROUTER ------------------
+class Lectura:
+    """ Decisión de lectura de la petición en curso. """
+    __slots__ = ("primaria", "replica")
+
+    def __init__(self, primaria):
+        self.primaria = primaria
+        self.replica = None
+
+
+def leyo_de_replica_atrasada():
+    """ ¿La petición en curso leyó de una réplica con retraso? (para no cachear) """
+    lectura = _lectura.get()
+    if lectura is None or lectura.replica is None:
+        return False
+    return replicas.retraso(lectura.replica) > settings.NEWS_REPLICA_RETRASO_CACHE
+
+
+class RouterReplicas:
+    def db_for_read(self, model, **hints):
+        lectura = _lectura.get()
+        if lectura is None or lectura.primaria:
+            return DEFAULT_DB_ALIAS
+        instancia = hints.get("instance")
+        if instancia is not None and instancia._state.db:
+            # Relaciones de un objeto: de la misma base que el objeto
+            return instancia._state.db
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if lectura.replica is None:
+            lectura.replica = replicas.elegir()
+            if lectura.replica is None:
+                lectura.primaria = True
+                return DEFAULT_DB_ALIAS
+        return lectura.replica
+
+    def db_for_write(self, model, **hints):
+        lectura = _lectura.get()
+        if lectura is not None:
+            # Lo que se lea después en esta petición debe ver la escritura
+            lectura.primaria = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mismos datos en todas las bases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # El esquema llega a las réplicas por la replicación
+        return False if db.startswith("replica_") else None
+
+
+# ------------------ 🔹 MIDDLEWARE ------------------
+def _pegado_hasta(request):
+    """ Marca de primaria de la petición (cookie o cabecera), si sigue vigente. """
+    ahora = time.time()
+    for valor in (request.headers.get(CABECERA_PRIMARIA), request.COOKIES.get(COOKIE_PRIMARIA)):
+        try:
+            hasta = float(valor)
+        except (TypeError, ValueError):
+            continue
+        # Una marca manipulada no puede pegar al cliente más allá de la ventana
+        if ahora < hasta <= ahora + settings.NEWS_REPLICA_PEGAJOSO:
+            return hasta
+    return None
+
+
+class ReplicasMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        lectura = self.lectura(request)
+        token = _lectura.set(lectura)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _lectura.reset(token)
+        return self.terminar(request, lectura, respuesta)
+
+    async def __acall__(self, request):
+        lectura = self.lectura(request)
+        token = _lectura.set(lectura)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _lectura.reset(token)
+        return self.terminar(request, lectura, respuesta)
+
+    def lectura(self, request):
+        return Lectura(primaria=request.method not in METODOS_LECTURA or _pegado_hasta(request) is not None)
+
+    def terminar(self, request, lectura, respuesta):
+        if lectura.replica is not None and respuesta.status_code >= 500:
+            # Puede que la réplica se haya caído entre chequeos
+            replicas.sospechar(lectura.replica)
+        if request.method in METODOS_LECTURA or respuesta.status_code >= 400:
+            return respuesta
+        ventana = settings.NEWS_REPLICA_PEGAJOSO
+        hasta = int(time.time()) + ventana
+        respuesta[CABECERA_PRIMARIA] = str(hasta)
+        respuesta.set_cookie(
+            COOKIE_PRIMARIA,
+            str(hasta),
+            max_age=ventana,
+            secure=request.is_secure(),
+            httponly=True,
+            samesite="Lax",
+        )
+        return respuesta
@@ -1,18 +1,26 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from django.contrib.auth import get_user_model
+from .autores import aresolver_nombres, resolver_nombres
+from .hilos import acargar_hilos, armar_arbol, cargar_hilos
+from .imagenes import ImagenInvalida, preparar_original, srcset
+from .instrumentacion import SerializacionMedida
+from .subidas import tomar_subida
 from .models import Categoria, Publicacion, Comentario, ComentarioRespuesta, Like
 
-User = get_user_model()
-
 # ------------------ 🔹 CATEGORÍAS ------------------
-class CategoriaSerializer(serializers.ModelSerializer):
+class CategoriaSerializer(SerializacionMedida, serializers.ModelSerializer):
+    por_valores = True  # listado desde .values() (news/valores.py)
+
     class Meta:
         model = Categoria
         fields = "__all__"
 
 
 # ------------------ 🔹 COMENTARIOS ------------------
-class ComentarioSerializer(serializers.ModelSerializer):
+class ComentarioSerializer(SerializacionMedida, serializers.ModelSerializer):
     """
     Serializa los comentarios con:
     - nombre real del usuario (usuario_nombre)
@@ -46,19 +54,12 @@ class ComentarioSerializer(serializers.ModelSerializer):
         """
         Devuelve el nombre y apellido si existen,
         o correo, o fallback al UUID parcial.
+        Si la vista precargó los nombres en el contexto, no consulta la BD.
         """
-        try:
-            user = User.objects.filter(id=obj.usuario_id).first()
-            if user:
-                nombre = getattr(user, "nombre", None)
-                apellido = getattr(user, "apellido", None)
-                if nombre or apellido:
-                    return f"{nombre or ''} {apellido or ''}".strip()
-                if getattr(user, "email", None):
-                    return user.email
-        except Exception:
-            pass
-        return f"Usuario {str(obj.usuario_id)[:8]}"
+        nombres = self.context.get("nombres_usuario")
+        if nombres is not None and obj.usuario_id in nombres:
+            return nombres[obj.usuario_id]
+        return resolver_nombres([obj.usuario_id])[obj.usuario_id]
 
     # 🔹 Fecha legible (dd/mm/yyyy hh:mm)
     def get_fecha_formateada(self, obj):
@@ -68,7 +69,13 @@ class ComentarioSerializer(serializers.ModelSerializer):
     def get_respuestas(self, obj):
         """
         Devuelve solo las respuestas relacionadas con este comentario.
+        Usa el mapa precargado del contexto cuando existe.
         """
+        respuestas_por_padre = self.context.get("respuestas_por_padre")
+        if respuestas_por_padre is not None and obj.id in respuestas_por_padre:
+            respuestas = respuestas_por_padre[obj.id]
+            return ComentarioSerializer(respuestas, many=True, context=self.context).data
+
         relaciones = (
             ComentarioRespuesta.objects.filter(comentario_padre=obj)
             .select_related("comentario_respuesta")
@@ -78,8 +85,43 @@ class ComentarioSerializer(serializers.ModelSerializer):
         return ComentarioSerializer(respuestas, many=True, context=self.context).data
 
 
+def contexto_comentarios(comentarios, hilos_completos=False, profundidad_max=None):
+    """
+    Precarga todo lo que ComentarioSerializer necesita para un conjunto
+    de comentarios ya cargados, con un número de consultas acotado:
+    - árbol de respuestas: una consulta por los hilos del conjunto
+      (ninguna si `hilos_completos`, p. ej. todos los comentarios de una
+      publicación), hasta `profundidad_max` si se indica
+    - nombres de usuario (un lote por resolutor, con caché; ver news/autores.py)
+    """
+    por_id = {c.id: c for c in comentarios}
+    if por_id and not hilos_completos:
+        hilos = {c.hilo_id or c.id for c in por_id.values()}
+        for comentario in cargar_hilos(hilos, profundidad_max):
+            por_id.setdefault(comentario.id, comentario)
+
+    return {
+        "respuestas_por_padre": armar_arbol(list(por_id.values())),
+        "nombres_usuario": resolver_nombres(c.usuario_id for c in por_id.values()),
+    }
+
+
+async def acontexto_comentarios(comentarios, hilos_completos=False, profundidad_max=None):
+    """ Versión async de `contexto_comentarios` (ORM async y resolutores async). """
+    por_id = {c.id: c for c in comentarios}
+    if por_id and not hilos_completos:
+        hilos = {c.hilo_id or c.id for c in por_id.values()}
+        for comentario in await acargar_hilos(hilos, profundidad_max):
+            por_id.setdefault(comentario.id, comentario)
+
+    return {
+        "respuestas_por_padre": armar_arbol(list(por_id.values())),
+        "nombres_usuario": await aresolver_nombres(c.usuario_id for c in por_id.values()),
+    }
+
+
 # ------------------ 🔹 RELACIÓN COMENTARIO/RESPUESTA ------------------
-class ComentarioRespuestaSerializer(serializers.ModelSerializer):
+class ComentarioRespuestaSerializer(SerializacionMedida, serializers.ModelSerializer):
     comentario_respuesta_contenido = serializers.CharField(
         source="comentario_respuesta.contenido", read_only=True
     )
@@ -98,40 +140,241 @@ class ComentarioRespuestaSerializer(serializers.ModelSerializer):
         ]
 
 
+# ------------------ 🔹 CAMPOS A PEDIDO (?fields=, ?expand=) ------------------
+# Se agregan en to_representation (no son campos del serializador)
+CAMPOS_CALCULADOS = frozenset({"srcset", "fragmento"})
+# Caracteres extra que se piden a la BD para cortar el extracto en un espacio
+MARGEN_EXTRACTO = 40
+
+
+class CamposDinamicos:
+    """
+    Serializador con campos a pedido. La vista deja en el contexto:
+    - "campos": solo esos campos (None = todos los de por defecto),
+    - "expandir": campos opcionales (Meta.expandibles) que se agregan.
+    """
+    expandibles = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for nombre in self.context.get("expandir") or ():
+            if nombre in self.expandibles and nombre not in self.fields:
+                self.fields[nombre] = self.expandibles[nombre]()
+        campos = self.context.get("campos")
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+    @classmethod
+    def nombres(cls):
+        """ Campos de salida por defecto (calculado una vez por clase). """
+        if "_nombres" not in cls.__dict__:
+            cls._nombres = frozenset(n for n, campo in cls().fields.items() if not campo.write_only)
+        return cls._nombres
+
+
+Representacion = namedtuple("Representacion", "serializador campos expandir")
+
+
+def _lista_parametro(valor):
+    return [v.strip() for v in (valor or "").split(",") if v.strip()]
+
+
+def representacion_publicaciones(query_params, lista=False):
+    """
+    Serializador y campos pedidos en ?vista= (solo listados), ?fields= y
+    ?expand=. ValidationError (400) con nombres desconocidos.
+    """
+    vista = query_params.get("vista", settings.NEWS_FEED_VISTA) if lista else "completa"
+    if vista not in VISTAS_PUBLICACION:
+        raise serializers.ValidationError({"vista": f"Debe ser una de: {', '.join(VISTAS_PUBLICACION)}."})
+    serializador = VISTAS_PUBLICACION[vista]
+
+    expandir = _lista_parametro(query_params.get("expand"))
+    desconocidos = set(expandir) - set(serializador.expandibles)
+    if desconocidos:
+        raise serializers.ValidationError({"expand": f"No expandibles: {', '.join(sorted(desconocidos))}."})
+
+    campos = _lista_parametro(query_params.get("fields")) or None
+    if campos is not None:
+        validos = serializador.nombres() | set(expandir) | CAMPOS_CALCULADOS
+        desconocidos = set(campos) - validos
+        if desconocidos:
+            raise serializers.ValidationError({"fields": f"Campos desconocidos: {', '.join(sorted(desconocidos))}."})
+        campos = frozenset(campos) | {"id"}
+    return Representacion(serializador, campos, frozenset(expandir))
+
+
+def incluye(representacion, nombre):
+    """ ¿La salida lleva `nombre`? (para no cargar lo que no se va a mostrar) """
+    serializador, campos, expandir = representacion
+    if nombre not in serializador.nombres() and nombre not in expandir:
+        return False
+    return campos is None or nombre in campos
+
+
+def recortar(texto, largo, truncado=False):
+    """ Extracto de hasta `largo` caracteres, cortado en un espacio, con "…" si se cortó. """
+    texto = " ".join((texto or "").split())
+    if len(texto) <= largo and not truncado:
+        return texto
+    corte = texto.rfind(" ", 0, largo + 1)
+    return texto[: corte if corte > largo // 2 else largo].rstrip(" ,.;:") + "…"
+
+
+def extracto_de_bd(crudo):
+    """ Extracto a partir de la anotación extracto_bd (Substr con MARGEN_EXTRACTO de más). """
+    largo = settings.NEWS_EXTRACTO_LARGO
+    crudo = crudo or ""
+    # Si llegó lleno, el contenido sigue
+    return recortar(crudo, largo, truncado=len(crudo) >= largo + MARGEN_EXTRACTO)
+
+
+def _completar(rep, instance, context):
+    """ URL absoluta de la imagen, srcset y fragmento de búsqueda. """
+    request = context.get("request")
+    campos = context.get("campos")
+    imagen_url = rep.get("imagen")
+    if imagen_url and request:
+        if imagen_url.startswith("/"):
+            rep["imagen"] = request.build_absolute_uri(imagen_url)
+
+    # 🔹 Variantes responsive: {"webp": "<url> 320w, ...", "jpeg": ...}
+    if imagen_url and (campos is None or "srcset" in campos):
+        storage = Publicacion._meta.get_field("imagen").storage
+
+        def url_variante(ruta):
+            url = storage.url(ruta)
+            return request.build_absolute_uri(url) if request and url.startswith("/") else url
+
+        rep["srcset"] = srcset(instance.imagen_variantes, url_variante)
+
+    # 🔹 Resultados de búsqueda: relevancia y fragmento resaltado
+    if getattr(instance, "fragmento", None) is not None and (campos is None or "fragmento" in campos):
+        rep["fragmento"] = instance.fragmento
+    return rep
+
+
 # ------------------ 🔹 PUBLICACIONES ------------------
-class PublicacionSerializer(serializers.ModelSerializer):
-    comentarios_count = serializers.IntegerField(
-        source="comentarios.count", read_only=True
-    )
-    likes_count = serializers.IntegerField(source="likes.count", read_only=True)
+class PublicacionSerializer(CamposDinamicos, SerializacionMedida, serializers.ModelSerializer):
     comentarios = ComentarioSerializer(many=True, read_only=True)
     imagen = serializers.ImageField(use_url=True, required=False, allow_null=True)
+    # Clave de una subida directa (POST publicaciones/subidas/) en lugar del archivo
+    imagen_subida = serializers.CharField(write_only=True, required=False)
+
+    # Ya vienen siempre; se acepta ?expand=comentarios igual que en la compacta
+    expandibles = {"comentarios": lambda: ComentarioSerializer(many=True, read_only=True)}
 
     class Meta:
         model = Publicacion
-        fields = "__all__"
+        # version y fecha_actividad son internas: salen como ETag / Last-Modified
+        exclude = ("busqueda", "imagen_variantes", "variantes_pendientes", "score", "version", "fecha_actividad")
         read_only_fields = (
             "autor_id",
             "autor_institucion_id",
             "tipo_autor",
             "vistas",
+            "likes_count",
+            "comentarios_count",
             "fecha_publicacion",
             "fecha_actualizacion",
         )
 
+    # 🔹 Validar y normalizar la imagen subida (sin EXIF, tamaño acotado)
+    def validate_imagen(self, imagen):
+        if not imagen:
+            return imagen
+        try:
+            return preparar_original(imagen)
+        except ImagenInvalida as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def validate(self, attrs):
+        clave = attrs.pop("imagen_subida", None)
+        if clave:
+            request = self.context.get("request")
+            try:
+                attrs["imagen"] = tomar_subida(clave, getattr(request.user, "id", None))
+            except ImagenInvalida as exc:
+                raise serializers.ValidationError({"imagen_subida": str(exc)})
+        return attrs
+
     # 🔹 Construir URL completa de la imagen
     def to_representation(self, instance):
-        rep = super().to_representation(instance)
-        request = self.context.get("request")
-        imagen_url = rep.get("imagen")
-        if imagen_url and request:
-            if imagen_url.startswith("/"):
-                rep["imagen"] = request.build_absolute_uri(imagen_url)
-        return rep
+        return _completar(super().to_representation(instance), instance, self.context)
+
+
+class PublicacionCompactaSerializer(CamposDinamicos, SerializacionMedida, serializers.ModelSerializer):
+    """
+    Tarjeta del feed (?vista=compacta): extracto en lugar del contenido y
+    solo los conteos; los comentarios, con ?expand=comentarios. La vista
+    no carga `contenido`: el extracto sale de la BD (anotación extracto_bd).
+    """
+    extracto = serializers.SerializerMethodField()
+    imagen = serializers.ImageField(use_url=True, read_only=True)
+
+    expandibles = {"comentarios": lambda: ComentarioSerializer(many=True, read_only=True)}
+    # Listado desde .values() (news/valores.py); con ?expand=comentarios, el normal
+    por_valores = True
+    columnas_valores = {"extracto": ("extracto_bd",)}
+
+    class Meta:
+        model = Publicacion
+        fields = (
+            "id",
+            "titulo",
+            "extracto",
+            "imagen",
+            "categoria",
+            "autor_id",
+            "autor_institucion_id",
+            "tipo_autor",
+            "estado",
+            "fecha_publicacion",
+            "vistas",
+            "likes_count",
+            "comentarios_count",
+        )
+        read_only_fields = fields
+
+    def get_extracto(self, obj):
+        crudo = getattr(obj, "extracto_bd", None)
+        if crudo is None:
+            return recortar(obj.contenido, settings.NEWS_EXTRACTO_LARGO)
+        return extracto_de_bd(crudo)
+
+    def valor_extracto(self, fila):
+        return extracto_de_bd(fila["extracto_bd"])
+
+
+VISTAS_PUBLICACION = {
+    "completa": PublicacionSerializer,
+    "compacta": PublicacionCompactaSerializer,
+}
+
+
+class PublicacionImportacionSerializer(serializers.ModelSerializer):
+    """
+    Una fila de la importación masiva (news/importacion.py). Categoría e id
+    llegan como UUID y se comprueban por lote, no con una consulta por fila;
+    el autor es quien importa, como en el alta normal.
+    """
+    id = serializers.UUIDField(required=False)
+    categoria = serializers.UUIDField(required=False, allow_null=True)
+    fecha_publicacion = serializers.DateTimeField(required=False)
+
+    class Meta:
+        model = Publicacion
+        fields = ("id", "titulo", "contenido", "categoria", "estado", "fecha_publicacion")
+
+    def validate_fecha_publicacion(self, fecha):
+        if fecha > timezone.now():
+            raise serializers.ValidationError("La fecha de publicación no puede ser futura.")
+        return fecha
 
 
 # ------------------ 🔹 LIKES ------------------
-class LikeSerializer(serializers.ModelSerializer):
+class LikeSerializer(SerializacionMedida, serializers.ModelSerializer):
     class Meta:
         model = Like
         fields = "__all__"
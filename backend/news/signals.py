@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache_respuestas import invalidar_categorias, invalidar_publicacion
+from .contadores import tocar
+from .eventos import publicar_comentario
+from .models import Categoria, Comentario, Publicacion
+from .sincronizacion import ENTIDAD_COMENTARIO, ENTIDAD_PUBLICACION, registrar_cambio
+
+
+# 🔹 Invalidación de la caché de respuestas, validadores HTTP y registro de
+# cambios. Altas/bajas de comentarios y likes ya pasan por
+# contadores.incrementar, y la baja de un comentario se registra en la vista
+# (sin receptores post_delete, el borrado en cascada sigue siendo rápido).
+@receiver([post_save, post_delete], sender=Publicacion)
+def publicacion_cambiada(sender, instance, **kwargs):
+    invalidar_publicacion(instance.pk)
+    registrar_cambio(ENTIDAD_PUBLICACION, instance.pk)
+
+
+@receiver(post_save, sender=Comentario)
+def comentario_guardado(sender, instance, created, **kwargs):
+    registrar_cambio(ENTIDAD_COMENTARIO, instance.pk, instance.publicacion_id)
+    if created:
+        # 🔹 Comentarios y respuestas en vivo (SSE)
+        publicar_comentario(instance)
+    else:
+        tocar(instance.publicacion_id)
+
+
+@receiver([post_save, post_delete], sender=Categoria)
+def categoria_cambiada(sender, instance, **kwargs):
+    invalidar_categorias()
@@ -0,0 +1,188 @@
+"""
+Sincronización incremental (`?since=<token>`).
+
+Cada alta, edición o baja de una publicación o comentario deja una fila en
+RegistroCambio (entidad, objeto, id secuencial y, en Postgres, el xid de la
+transacción que la escribió). El token que recibe el cliente codifica la
+última posición (xid, id) entregada, así que una sincronización sin
+novedades es un rango sobre el índice (entidad, transaccion, id) que no
+devuelve nada.
+
+- Las bajas no necesitan fila propia: un id registrado que ya no existe
+  (o ya no es visible para quien pregunta) se devuelve en `eliminados`.
+  Los comentarios de una publicación borrada no dejan fila: se van con ella.
+- El id de la secuencia se asigna al insertar y no al confirmar: una
+  transacción abierta puede confirmar después un id menor que otro ya
+  entregado. Por eso se recorre en orden (xid, id) y solo se entrega lo de
+  transacciones anteriores a `pg_snapshot_xmin(pg_current_snapshot())`, la
+  más vieja aún abierta: por debajo de ese xid ya no puede aparecer nada.
+  Si lo que queda es de transacciones abiertas se responde `hay_mas=False`
+  con `reintentar_en` (NEWS_SYNC_MARGEN segundos) en vez de hacer girar al
+  cliente. En SQLite (un solo escritor) el orden de los ids es el de commit.
+- `podar_cambios` borra lo anterior a NEWS_SYNC_RETENCION_DIAS y las filas
+  ya superadas por otra del mismo objeto. Un token más viejo que la
+  retención recibe 410 y el cliente vuelve a descargar el feed.
+"""
+import base64
+import binascii
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+
+from .models import RegistroCambio
+
+ENTIDAD_PUBLICACION = "publicacion"
+ENTIDAD_COMENTARIO = "comentario"
+
+
+class TokenExpirado(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "El token de sincronización expiró; descarga el feed de nuevo."
+    default_code = "token_expirado"
+
+
+def _transaccion_actual():
+    """ xid de la transacción que escribe (Postgres); 0 en otros motores. """
+    if connection.vendor == "postgresql":
+        return RawSQL("pg_current_xact_id()::text::bigint", [])
+    return 0
+
+
+def _horizonte():
+    """ xid de la transacción más vieja aún abierta: todo lo anterior ya es definitivo. """
+    return RawSQL("pg_snapshot_xmin(pg_current_snapshot())::text::bigint", [])
+
+
+def _listo():
+    """ Anotación: la fila es de una transacción ya terminada (en SQLite, siempre). """
+    if connection.vendor == "postgresql":
+        return ExpressionWrapper(Q(transaccion__lt=_horizonte()), output_field=BooleanField())
+    return Value(True)
+
+
+def registrar_cambio(entidad, objeto_id, publicacion_id=None):
+    RegistroCambio.objects.create(
+        entidad=entidad, objeto_id=objeto_id, publicacion_id=publicacion_id, transaccion=_transaccion_actual()
+    )
+
+
+def registrar_cambios(entidad, objeto_ids, publicacion_id=None):
+    """ Como registrar_cambio, en un solo INSERT (altas y bajas en bloque sin señales). """
+    transaccion = _transaccion_actual()
+    RegistroCambio.objects.bulk_create([
+        RegistroCambio(entidad=entidad, objeto_id=i, publicacion_id=publicacion_id, transaccion=transaccion)
+        for i in objeto_ids
+    ])
+
+
+# ------------------ 🔹 TOKENS ------------------
+def codificar_token(posicion):
+    transaccion, ultimo_id = posicion
+    crudo = json.dumps({"x": transaccion, "c": ultimo_id, "t": int(time.time())}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodificar_token(token):
+    """ Última posición (xid, id) entregada. ParseError si no es un token; 410 si expiró. """
+    try:
+        relleno = "=" * (-len(token) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(token + relleno))
+        # Los tokens sin "x" son de antes del xid: sus filas quedaron con transaccion 0
+        posicion = int(datos.get("x", 0)), int(datos["c"])
+        emitido = int(datos["t"])
+    except (TypeError, ValueError, KeyError, AttributeError, binascii.Error):
+        raise ParseError("Token de sincronización inválido.")
+    if emitido < time.time() - settings.NEWS_SYNC_RETENCION_DIAS * 86400:
+        raise TokenExpirado()
+    return posicion
+
+
+def token_actual():
+    """
+    Punto de partida: pedirlo ANTES de descargar el feed completo. En
+    Postgres arranca en el horizonte: lo de transacciones aún abiertas se
+    entregará (quizás repetido, nunca perdido).
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+            return codificar_token((cursor.fetchone()[0], 0))
+    ultimo = RegistroCambio.objects.order_by("-id").values_list("id", flat=True).first()
+    return codificar_token((0, ultimo or 0))
+
+
+# ------------------ 🔹 CAMBIOS ------------------
+def cambios_desde(entidad, desde, limite=None, **filtros):
+    """
+    Ids de objetos cambiados después de la posición `desde` (sin repetir, en
+    orden de cambio), la última posición entregada, si quedan más y si hay
+    cambios de transacciones aún abiertas (hay que reintentar más tarde).
+    """
+    limite = limite or settings.NEWS_SYNC_LIMITE
+    transaccion, ultimo_id = desde
+    registros = (
+        RegistroCambio.objects.filter(entidad=entidad, **filtros)
+        .filter(Q(transaccion__gt=transaccion) | Q(transaccion=transaccion, id__gt=ultimo_id))
+        .order_by("transaccion", "id")
+    )
+    filas = list(registros.annotate(listo=_listo()).values_list("transaccion", "id", "objeto_id", "listo")[: limite + 1])
+
+    objetos = {}
+    posicion = desde
+    pendientes = False
+    for registro_tx, registro_id, objeto_id, es_listo in filas[:limite]:
+        if not es_listo:
+            pendientes = True
+            break
+        objetos.pop(objeto_id, None)
+        objetos[objeto_id] = True
+        posicion = (registro_tx, registro_id)
+    if not pendientes and len(filas) > limite:
+        pendientes = not filas[limite][3]
+    hay_mas = len(filas) > limite and not pendientes
+    return list(objetos), posicion, hay_mas, pendientes
+
+
+def sincronizar(request, entidad, queryset, serializar, **filtros):
+    """
+    Respuesta de sync: {"token", "hay_mas", "reintentar_en", "cambios", "eliminados"}.
+    `queryset` ya debe estar filtrado por visibilidad; `serializar(objetos)`
+    devuelve la lista serializada.
+    """
+    token = request.query_params.get("since")
+    if not token:
+        return {"token": token_actual(), "hay_mas": False, "reintentar_en": None, "cambios": [], "eliminados": []}
+
+    ids, posicion, hay_mas, pendientes = cambios_desde(entidad, decodificar_token(token), **filtros)
+    vivos = list(queryset.filter(pk__in=ids)) if ids else []
+    presentes = {obj.pk for obj in vivos}
+    return {
+        "token": codificar_token(posicion),
+        "hay_mas": hay_mas,
+        "reintentar_en": settings.NEWS_SYNC_MARGEN if pendientes else None,
+        "cambios": serializar(vivos),
+        "eliminados": [str(i) for i in ids if i not in presentes],
+    }
+
+
+def podar_cambios(retencion_dias=None):
+    """ Devuelve (expiradas, superadas) borradas. """
+    retencion_dias = settings.NEWS_SYNC_RETENCION_DIAS if retencion_dias is None else retencion_dias
+    limite = timezone.now() - timedelta(days=retencion_dias, seconds=settings.NEWS_SYNC_MARGEN)
+    expiradas, _ = RegistroCambio.objects.filter(fecha__lt=limite).delete()
+    # Posterior en el mismo orden (xid, id) en que se entrega
+    posterior = RegistroCambio.objects.filter(
+        Q(transaccion__gt=OuterRef("transaccion")) | Q(transaccion=OuterRef("transaccion"), id__gt=OuterRef("id")),
+        entidad=OuterRef("entidad"),
+        objeto_id=OuterRef("objeto_id"),
+    )
+    superadas, _ = RegistroCambio.objects.filter(Exists(posterior)).delete()
+    return expiradas, superadas
@@ -0,0 +1,249 @@
+"""
+Subidas de imágenes acotadas en memoria.
+
+Multipart: SubidaImagenHandler reemplaza a los handlers por defecto en las
+vistas de publicaciones. Escribe siempre a un archivo temporal por trozos
+(nunca el archivo entero en memoria), corta con 413 en cuanto se pasa de
+NEWS_SUBIDA_MAX_BYTES y con 415 si los primeros bytes no son de una imagen.
+
+Subida directa: el cliente pide una URL firmada (POST publicaciones/subidas/),
+sube los bytes directamente al almacenamiento y luego crea o edita la
+publicación con `imagen_subida=<clave>`. El backend es configurable
+(NEWS_SUBIDAS_DIRECTAS_BACKEND): SubidaDirectaLocal (stand-in en disco para
+dev/tests, con su propio endpoint PUT) o SubidaDirectaS3 (URL prefirmada).
+"""
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.files.storage import storages
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .imagenes import ImagenInvalida, preparar_original
+
+# Cabeceras multipart y campos de texto que acompañan al archivo
+MARGEN_MULTIPART = 64 * 1024
+BYTES_FIRMA = 12
+TIPOS_PERMITIDOS = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+CARPETA_SUBIDAS = "subidas"
+
+
+class ArchivoDemasiadoGrande(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_code = "archivo_demasiado_grande"
+
+    def __init__(self):
+        super().__init__(f"El archivo supera el máximo de {settings.NEWS_SUBIDA_MAX_BYTES} bytes.")
+
+
+class TipoNoSoportado(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = "Solo se aceptan imágenes JPEG, PNG, GIF o WebP."
+    default_code = "tipo_no_soportado"
+
+
+def tipo_por_firma(cabecera):
+    """ MIME según los primeros bytes (magic bytes), o None. """
+    if cabecera.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if cabecera.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if cabecera[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if cabecera[:4] == b"RIFF" and cabecera[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+# ------------------ 🔹 MULTIPART EN STREAMING ------------------
+class SubidaImagenHandler(TemporaryFileUploadHandler):
+    chunk_size = 64 * 1024
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Rechazo inmediato si el cliente ya declara un cuerpo demasiado grande
+        if content_length and content_length > settings.NEWS_SUBIDA_MAX_BYTES + MARGEN_MULTIPART:
+            raise ArchivoDemasiadoGrande()
+        return super().handle_raw_input(input_data, META, content_length, boundary, encoding)
+
+    def new_file(self, *args, **kwargs):
+        self.recibidos = 0
+        self.cabecera = b""
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.recibidos += len(raw_data)
+        if self.recibidos > settings.NEWS_SUBIDA_MAX_BYTES:
+            raise ArchivoDemasiadoGrande()
+        if len(self.cabecera) < BYTES_FIRMA:
+            self.cabecera += raw_data[: BYTES_FIRMA - len(self.cabecera)]
+            if len(self.cabecera) >= BYTES_FIRMA:
+                self._verificar_firma()
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        self._verificar_firma()
+        return super().file_complete(file_size)
+
+    def _verificar_firma(self):
+        if tipo_por_firma(self.cabecera) is None:
+            raise TipoNoSoportado()
+
+
+def copiar_acotado(leer, destino):
+    """ Copia `leer(n)` a `destino` por trozos verificando firma y tamaño. """
+    copiados = 0
+    cabecera = b""
+    while True:
+        trozo = leer(SubidaImagenHandler.chunk_size)
+        if not trozo:
+            break
+        copiados += len(trozo)
+        if copiados > settings.NEWS_SUBIDA_MAX_BYTES:
+            raise ArchivoDemasiadoGrande()
+        if len(cabecera) < BYTES_FIRMA:
+            cabecera += trozo[: BYTES_FIRMA - len(cabecera)]
+            if len(cabecera) >= BYTES_FIRMA and tipo_por_firma(cabecera) is None:
+                raise TipoNoSoportado()
+        destino.write(trozo)
+    if tipo_por_firma(cabecera) is None:
+        raise TipoNoSoportado()
+    return copiados
+
+
+# ------------------ 🔹 SUBIDAS DIRECTAS ------------------
+class SubidaDirectaLocal:
+    """
+    Stand-in local de una URL prefirmada: un token firmado (django.core.signing)
+    que autoriza un PUT a /api/subidas/<token>/ durante NEWS_SUBIDAS_DIRECTAS_EXPIRA.
+    """
+    salt = "news.subidas.directa"
+
+    def firmar(self, request, clave, content_type):
+        token = signing.dumps({"k": clave, "t": content_type}, salt=self.salt)
+        return {
+            "metodo": "PUT",
+            "url": request.build_absolute_uri(reverse("subida-directa-local", args=[token])),
+            "campos": {},
+            "cabeceras": {"Content-Type": content_type},
+        }
+
+    def verificar(self, token):
+        """ Clave autorizada por el token, o None si es inválido o expiró. """
+        try:
+            datos = signing.loads(token, salt=self.salt, max_age=settings.NEWS_SUBIDAS_DIRECTAS_EXPIRA)
+        except signing.BadSignature:
+            return None
+        return datos["k"]
+
+    @property
+    def storage(self):
+        # Área privada (STORAGES["subidas"]), fuera de la media pública
+        return storages["subidas"]
+
+    def recibir(self, clave, leer):
+        """ Guarda el cuerpo del PUT (por trozos, acotado) en la clave firmada. """
+        with tempfile.TemporaryFile() as temporal:
+            copiar_acotado(leer, temporal)
+            temporal.seek(0)
+            if self.storage.exists(clave):
+                self.storage.delete(clave)
+            self.storage.save(clave, File(temporal))
+
+    def abrir(self, clave):
+        if not self.storage.exists(clave):
+            return None
+        return self.storage.open(clave, "rb")
+
+    def eliminar(self, clave):
+        self.storage.delete(clave)
+
+
+class SubidaDirectaS3:
+    """
+    URL prefirmada de S3 (POST con condiciones de tipo y tamaño).
+    Requiere boto3 y NEWS_SUBIDAS_BUCKET; credenciales por las variables
+    estándar de AWS.
+    """
+
+    def __init__(self):
+        try:
+            import boto3
+        except ImportError as exc:
+            raise ImproperlyConfigured("SubidaDirectaS3 requiere boto3.") from exc
+        if not settings.NEWS_SUBIDAS_BUCKET:
+            raise ImproperlyConfigured("SubidaDirectaS3 requiere NEWS_SUBIDAS_BUCKET.")
+        self.bucket = settings.NEWS_SUBIDAS_BUCKET
+        self.cliente = boto3.client("s3")
+
+    def firmar(self, request, clave, content_type):
+        firmado = self.cliente.generate_presigned_post(
+            self.bucket,
+            clave,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, settings.NEWS_SUBIDA_MAX_BYTES],
+            ],
+            ExpiresIn=settings.NEWS_SUBIDAS_DIRECTAS_EXPIRA,
+        )
+        return {"metodo": "POST", "url": firmado["url"], "campos": firmado["fields"], "cabeceras": {}}
+
+    def abrir(self, clave):
+        try:
+            objeto = self.cliente.get_object(Bucket=self.bucket, Key=clave)
+        except self.cliente.exceptions.NoSuchKey:
+            return None
+        temporal = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        copiar_acotado(objeto["Body"].read, temporal)
+        temporal.seek(0)
+        return temporal
+
+    def eliminar(self, clave):
+        self.cliente.delete_object(Bucket=self.bucket, Key=clave)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.NEWS_SUBIDAS_DIRECTAS_BACKEND)()
+    return _backend
+
+
+def nueva_subida(request, content_type):
+    """ Clave reservada para el usuario + instrucciones de subida. """
+    if content_type not in TIPOS_PERMITIDOS:
+        raise TipoNoSoportado()
+    clave = f"{CARPETA_SUBIDAS}/{request.user.id}/{uuid.uuid4().hex}"
+    return {
+        "clave": clave,
+        "tamano_max": settings.NEWS_SUBIDA_MAX_BYTES,
+        "expira_en": settings.NEWS_SUBIDAS_DIRECTAS_EXPIRA,
+        **get_backend().firmar(request, clave, content_type),
+    }
+
+
+def tomar_subida(clave, usuario_id):
+    """
+    Lee una subida directa del usuario, la normaliza como original de la
+    publicación y la borra del área de subidas. ImagenInvalida si no vale.
+    """
+    if not clave.startswith(f"{CARPETA_SUBIDAS}/{usuario_id}/"):
+        raise ImagenInvalida("La subida no pertenece a este usuario.")
+    backend = get_backend()
+    archivo = backend.abrir(clave)
+    if archivo is None:
+        raise ImagenInvalida("La subida no existe o ya se usó.")
+    with archivo:
+        original = preparar_original(archivo)
+    backend.eliminar(clave)
+    return original
@@ -0,0 +1,97 @@
+"""
+Feed por tendencia (`?orden=tendencia`).
+
+    score = log10(max(1, interacción)) + epoch(fecha_publicacion) / NEWS_TENDENCIA_SEGUNDOS
+    interacción = likes·NEWS_TENDENCIA_PESO_LIKE
+                + comentarios·NEWS_TENDENCIA_PESO_COMENTARIO
+                + vistas·NEWS_TENDENCIA_PESO_VISTA
+
+Fórmula "hot": la antigüedad entra como una constante por fila, así que el
+score solo cambia cuando cambia la interacción y no hay que recalcular todo
+a medida que pasa el tiempo. Cada NEWS_TENDENCIA_SEGUNDOS una publicación
+necesita 10× más interacción para seguir a la par de una nueva.
+
+- Incremental: contadores.incrementar (comentarios, likes) y el UPDATE con
+  CTE de likes en Postgres recalculan el score en el mismo UPDATE.
+- Lote: `recalcular_tendencia` (cron) recoge las vistas, que se vuelcan por
+  lotes sin recalcular, y los cambios de pesos.
+- Índice (estado, -score, -id): el feed pagina por keyset como el cronológico.
+
+La fórmula está en tres formas (Python, expresión del ORM y SQL de
+Postgres); si cambia una, cambian las tres.
+"""
+import math
+
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, FloatField, Func, Value
+from django.db.models.functions import Greatest, Log
+
+PARAMETRO_ORDEN = "tendencia"
+ORDEN_TENDENCIA = ("-score", "-id")
+
+
+class Epoch(Func):
+    """ Segundos desde 1970 de una fecha (float). """
+    template = "EXTRACT(EPOCH FROM %(expressions)s)"
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template="((julianday(%(expressions)s) - 2440587.5) * 86400.0)", **extra_context
+        )
+
+
+def _pesos():
+    return (
+        float(settings.NEWS_TENDENCIA_PESO_LIKE),
+        float(settings.NEWS_TENDENCIA_PESO_COMENTARIO),
+        float(settings.NEWS_TENDENCIA_PESO_VISTA),
+    )
+
+
+def calcular_score(likes, comentarios, vistas, fecha_publicacion):
+    peso_like, peso_comentario, peso_vista = _pesos()
+    interaccion = likes * peso_like + comentarios * peso_comentario + vistas * peso_vista
+    return math.log10(max(1.0, interaccion)) + fecha_publicacion.timestamp() / settings.NEWS_TENDENCIA_SEGUNDOS
+
+
+def _contador(campo, delta):
+    return F(campo) + delta if delta else F(campo)
+
+
+def expresion_score(likes_count=0, comentarios_count=0, vistas=0):
+    """
+    Score como expresión para un UPDATE. Los deltas son los que aplica el
+    mismo UPDATE a los contadores (en SQL, el SET ve los valores anteriores).
+    """
+    peso_like, peso_comentario, peso_vista = _pesos()
+    interaccion = ExpressionWrapper(
+        _contador("likes_count", likes_count) * peso_like
+        + _contador("comentarios_count", comentarios_count) * peso_comentario
+        + _contador("vistas", vistas) * peso_vista,
+        output_field=FloatField(),
+    )
+    return ExpressionWrapper(
+        Log(10, Greatest(Value(1.0), interaccion))
+        + Epoch("fecha_publicacion") / Value(float(settings.NEWS_TENDENCIA_SEGUNDOS)),
+        output_field=FloatField(),
+    )
+
+
+def sql_score(delta_likes=0, sql_delta_likes=None):
+    """
+    (sql, parámetros) del score para los UPDATE con SQL directo (Postgres).
+    `sql_delta_likes` es una expresión SQL que reemplaza al delta fijo
+    (el toggle no sabe de antemano si suma o resta).
+    """
+    peso_like, peso_comentario, peso_vista = _pesos()
+    parametros = [peso_like, peso_comentario, peso_vista, float(settings.NEWS_TENDENCIA_SEGUNDOS)]
+    if sql_delta_likes is None:
+        sql_delta_likes = "%s"
+        parametros.insert(0, delta_likes)
+    return (
+        f"(log(10::numeric, greatest(1, (likes_count + {sql_delta_likes}) * %s + comentarios_count * %s"
+        " + vistas * %s)::numeric)::float8"
+        " + extract(epoch from fecha_publicacion)::float8 / %s)",
+        parametros,
+    )
@@ -0,0 +1,61 @@
+"""
+Ayudas para los tests: comprobar los presupuestos de consultas por acción
+(NEWS_PRESUPUESTOS_CONSULTAS) con las mismas mediciones que el middleware
+de news/instrumentacion.py.
+
+    class FeedTests(PresupuestoConsultasMixin, APITestCase):
+        def test_feed(self):
+            with self.assertPresupuesto("publicacion.list"):
+                self.client.get("/api/publicaciones/")
+
+Sin acción, se comprueba cada petición hecha dentro del bloque contra el
+presupuesto de la suya. `maximo` fija un tope explícito.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .instrumentacion import PresupuestoExcedido, observadores, presupuesto
+
+
+@contextmanager
+def capturar_mediciones():
+    """ Lista (que se va llenando) con las mediciones de las peticiones hechas dentro. """
+    mediciones = []
+    observadores.append(mediciones.append)
+    try:
+        yield mediciones
+    finally:
+        observadores.remove(mediciones.append)
+
+
+def comprobar_presupuestos(mediciones, accion=None, maximo=None):
+    """ PresupuestoExcedido (un AssertionError) con cada medición que se pasa. """
+    if accion is not None:
+        mediciones = [m for m in mediciones if m.accion == accion]
+        if not mediciones:
+            raise AssertionError(f"No se midió ninguna petición de '{accion}'.")
+
+    excedidas = []
+    for medicion in mediciones:
+        limite = maximo if maximo is not None else presupuesto(medicion.accion)
+        if limite is not None and medicion.consultas > limite:
+            excedidas.append(f"{medicion.accion}: {medicion.consultas} consultas (presupuesto {limite})")
+    if excedidas:
+        raise PresupuestoExcedido("Presupuesto de consultas excedido:\n  " + "\n  ".join(excedidas))
+
+
+@contextmanager
+def dentro_de_presupuesto(accion=None, maximo=None):
+    if not settings.NEWS_INSTRUMENTACION:
+        raise AssertionError("NEWS_INSTRUMENTACION está desactivado: no hay mediciones.")
+    with capturar_mediciones() as mediciones:
+        yield mediciones
+    comprobar_presupuestos(mediciones, accion, maximo)
+
+
+class PresupuestoConsultasMixin:
+    """ Para TestCase/APITestCase: `with self.assertPresupuesto(...)`. """
+
+    def assertPresupuesto(self, accion=None, maximo=None):
+        return dentro_de_presupuesto(accion, maximo)
@@ -0,0 +1,60 @@
+import io
+import uuid
+from datetime import timedelta
+
+import jwt
+from PIL import Image
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from news import vistas
+from news.models import Publicacion
+
+
+def token(rol="estudiante", **datos):
+    """ JWT como los que emite auth_service. """
+    return jwt.encode({"id": str(uuid.uuid4()), "rol": rol, **datos}, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
+
+
+def imagen_en_bytes(formato="JPEG", tamano=(400, 300), **opciones):
+    salida = io.BytesIO()
+    Image.new("RGB", tamano, (200, 30, 30)).save(salida, formato, **opciones)
+    return salida.getvalue()
+
+
+class DatosNews:
+    """
+    Caché de respuestas limpia en cada test (las claves no cambian entre tests).
+    Las vistas del detalle quedan en el buffer: se descartan al terminar,
+    antes de que se borre la BD de tests.
+    """
+
+    def setUp(self):
+        caches[settings.NEWS_CACHE_ALIAS].clear()
+        self.addCleanup(vistas.get_buffer().almacen.extraer)
+
+    def publicacion(self, titulo, contenido="", hace=0, **campos):
+        """ Publicación publicada con `hace` horas de antigüedad. """
+        campos.setdefault("estado", "publicado")
+        publicacion = Publicacion.objects.create(
+            titulo=titulo,
+            contenido=contenido or titulo,
+            autor_id=campos.pop("autor_id", uuid.uuid4()),
+            tipo_autor=campos.pop("tipo_autor", "usuario"),
+            **campos,
+        )
+        if hace:
+            fecha = timezone.now() - timedelta(hours=hace)
+            Publicacion.objects.filter(pk=publicacion.pk).update(fecha_publicacion=fecha)
+            publicacion.fecha_publicacion = fecha
+        return publicacion
+
+    def titulos(self, respuesta):
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return [p["titulo"] for p in respuesta.json()["results"]]
+
+
+class BaseNewsTest(DatosNews, APITestCase):
+    pass
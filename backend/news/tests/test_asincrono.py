@@ -0,0 +1,126 @@
+import uuid
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, override_settings
+from django.urls import include, path
+
+from news import asincrono
+from news.models import Comentario, Publicacion
+
+from .base import BaseNewsTest, token
+
+# 🔹 Rutas del modo ASGI (NEWS_ASYNC_LECTURAS) sin tocar el ajuste global: lo mismo que news/urls.py
+urlpatterns = [
+    path("api/publicaciones/", asincrono.feed, name="publicacion-list"),
+    path("api/publicaciones/<uuid:pk>/", asincrono.detalle, name="publicacion-detail"),
+    path("api/publicaciones/<uuid:pk>/comentarios/", asincrono.comentarios, name="publicacion-listar-comentarios"),
+    path("api/publicaciones/<uuid:pk>/eventos/", asincrono.eventos, name="publicacion-eventos"),
+    path("", include("news.urls")),
+]
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class LecturasAsincronasTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.autor = uuid.uuid4()
+        self.pub = self.publicacion("Feria de ciencias", autor_id=self.autor, hace=2)
+        self.publicacion("Torneo", hace=1)
+        self.borrador = self.publicacion("Borrador", estado="borrador", autor_id=self.autor)
+        raiz = Comentario.objects.create(publicacion=self.pub, usuario_id=uuid.uuid4(), contenido="¿Cuándo?")
+        respuesta = Comentario(publicacion=self.pub, usuario_id=uuid.uuid4(), contenido="El viernes")
+        respuesta.colgar_de(raiz)
+        respuesta.save()
+
+    def sync(self, metodo, url, credencial=None, **datos):
+        self.client.credentials(**({"HTTP_AUTHORIZATION": f"Bearer {credencial}"} if credencial else {}))
+        return getattr(self.client, metodo)(url, datos or None, format="json")
+
+    def asgi(self, metodo, url, credencial=None, cabeceras=None, **datos):
+        """ Misma petición por AsyncClient contra las rutas async (ORM async, autores async). """
+        # Cabeceras por petición: AsyncClient(headers=...) las pierde en Django 5.0
+        cabeceras = dict(cabeceras or {})
+        if credencial:
+            cabeceras["Authorization"] = f"Bearer {credencial}"
+        extra = {"headers": cabeceras}
+        if datos:
+            extra.update(data=datos, content_type="application/json")
+        with self.settings(ROOT_URLCONF=__name__):
+            return async_to_sync(getattr(AsyncClient(), metodo))(url, **extra)
+
+    def assertIguales(self, url, credencial=None, status=200):
+        sync, asgi = self.sync("get", url, credencial), self.asgi("get", url, credencial)
+        self.assertEqual((sync.status_code, asgi.status_code), (status, status), asgi.content)
+        self.assertEqual(asgi.json(), sync.json())
+        self.assertEqual(asgi.get("ETag"), sync.get("ETag"))
+        return asgi
+
+    # ------------------ 🔹 MISMAS RESPUESTAS QUE LAS VISTAS SYNC ------------------
+    def test_feed(self):
+        for parametros in ("", "?page_size=1", "?vista=compacta", "?fields=id,titulo", "?orden=tendencia"):
+            with self.subTest(parametros=parametros):
+                self.assertIguales(f"/api/publicaciones/{parametros}")
+
+    def test_feed_pagina_siguiente(self):
+        siguiente = self.assertIguales("/api/publicaciones/?page_size=1").json()["next"]
+        self.assertIguales(siguiente)
+
+    def test_detalle(self):
+        respuesta = self.assertIguales(f"/api/publicaciones/{self.pub.pk}/")
+        comentarios = {c["contenido"]: c for c in respuesta.json()["comentarios"]}
+        self.assertEqual([r["contenido"] for r in comentarios["¿Cuándo?"]["respuestas"]], ["El viernes"])
+
+    def test_comentarios(self):
+        for parametros in ("", "?profundidad=0", "?page_size=1"):
+            with self.subTest(parametros=parametros):
+                self.assertIguales(f"/api/publicaciones/{self.pub.pk}/comentarios/{parametros}")
+
+    def test_validadores(self):
+        url = f"/api/publicaciones/{self.pub.pk}/"
+        etag = self.sync("get", url)["ETag"]
+        self.assertEqual(self.asgi("get", url, cabeceras={"If-None-Match": etag}).status_code, 304)
+
+    # ------------------ 🔹 PERMISOS Y 404 ------------------
+    def test_borrador_solo_para_quien_puede_verlo(self):
+        url = f"/api/publicaciones/{self.borrador.pk}/"
+        self.assertIguales(url, status=404)
+        self.assertIguales(url, token(), status=404)
+        self.assertIguales(f"{url}comentarios/", token(), status=404)
+        self.assertIguales(url, token("institucion", id=str(self.autor)))
+        respuesta = self.assertIguales("/api/publicaciones/", token("admin"))
+        self.assertIn("Borrador", self.titulos(respuesta))
+        self.assertNotIn("Borrador", self.titulos(self.asgi("get", "/api/publicaciones/")))
+
+    def test_inexistente(self):
+        self.assertIguales(f"/api/publicaciones/{uuid.uuid4()}/", status=404)
+        self.assertIguales(f"/api/publicaciones/{uuid.uuid4()}/comentarios/", status=404)
+
+    def test_token_invalido(self):
+        sync = self.sync("get", "/api/publicaciones/", "no-es-jwt")
+        asgi = self.asgi("get", "/api/publicaciones/", "no-es-jwt")
+        self.assertEqual(asgi.status_code, sync.status_code)
+        self.assertIn(asgi.status_code, (401, 403))
+
+    # ------------------ 🔹 EL RESTO DE MÉTODOS VA A LA VISTA SYNC ------------------
+    def test_crear_por_la_ruta_async(self):
+        anonimo = self.asgi("post", "/api/publicaciones/", titulo="x", contenido="x")
+        sync = self.sync("post", "/api/publicaciones/", titulo="x", contenido="x")
+        self.assertEqual(anonimo.status_code, sync.status_code)
+        self.assertIn(anonimo.status_code, (401, 403))
+        respuesta = self.asgi("post", "/api/publicaciones/", token("institucion"), titulo="Nueva", contenido="c")
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertTrue(Publicacion.objects.filter(titulo="Nueva").exists())
+
+    def test_editar_y_borrar_por_la_ruta_async(self):
+        url, autor = f"/api/publicaciones/{self.pub.pk}/", token("institucion", id=str(self.autor))
+        self.assertEqual(self.asgi("patch", url, token("institucion"), titulo="Ajeno").status_code, 403)
+        respuesta = self.asgi("patch", url, autor, titulo="Feria de ciencias 2026")
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(Publicacion.objects.get(pk=self.pub.pk).titulo, "Feria de ciencias 2026")
+        self.assertEqual(self.asgi("delete", url, autor).status_code, 204)
+        self.assertFalse(Publicacion.objects.filter(pk=self.pub.pk).exists())
+
+    def test_metodo_sin_vista_sync(self):
+        url = f"/api/publicaciones/{self.pub.pk}/"
+        self.assertEqual(self.asgi("post", f"{url}comentarios/", token()).status_code, 405)
+        self.assertEqual(self.asgi("post", f"{url}eventos/", token()).status_code, 405)
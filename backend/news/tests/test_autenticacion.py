@@ -0,0 +1,165 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from unittest import mock
+
+import jwt
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework import exceptions
+
+from news import authentication
+from news.llaves_jwt import LlaveroJWT
+
+
+def jwk_oct(kid, secreto):
+    return {"kty": "oct", "kid": kid, "k": base64.urlsafe_b64encode(secreto).decode("ascii").rstrip("=")}
+
+
+def firmar(secreto, kid=None, **datos):
+    payload = {"id": str(uuid.uuid4()), "rol": "estudiante", **datos}
+    return jwt.encode(payload, secreto, algorithm="HS256", headers={"kid": kid} if kid else None)
+
+
+class LlavesTests(SimpleTestCase):
+    UNO, DOS = b"secreto-de-la-llave-uno-32-bytes", b"secreto-de-la-llave-dos-32-bytes"
+
+    def setUp(self):
+        raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, raiz)
+        self.ruta = os.path.join(raiz, "jwks.json")
+        self.escribir_jwks(jwk_oct("uno", self.UNO))
+        self.llavero = LlaveroJWT(self.ruta, recarga=0)
+        for nombre, valor in (("_cache", None), ("_generacion", 0)):
+            parche = mock.patch.object(authentication, nombre, valor)
+            parche.start()
+            self.addCleanup(parche.stop)
+        parche = mock.patch.object(authentication, "get_llavero", return_value=self.llavero)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def escribir_jwks(self, *llaves, mtime=None):
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            json.dump({"keys": list(llaves)}, archivo)
+        if mtime is not None:
+            os.utime(self.ruta, (mtime, mtime))
+
+    def test_la_llave_la_elige_el_kid(self):
+        principal, _ = authentication.verificar_token(firmar(self.UNO, kid="uno"))
+        self.assertEqual(principal.rol, "estudiante")
+        # Firmado con otra llave bajo el mismo kid, o con un kid desconocido
+        for token in (firmar(self.DOS, kid="uno"), firmar(self.UNO, kid="otro")):
+            with self.subTest(token=token), self.assertRaises(exceptions.AuthenticationFailed):
+                authentication.verificar_token(token)
+
+    def test_sin_kid_prueba_la_por_defecto_y_las_del_archivo(self):
+        for secreto in (settings.JWT_SECRET.encode("utf-8"), self.UNO):
+            with self.subTest(secreto=secreto):
+                self.assertTrue(authentication.verificar_token(firmar(secreto))[0].id)
+
+    def test_el_alg_lo_fija_la_llave(self):
+        token = jwt.encode({"id": "x"}, self.UNO, algorithm="HS512", headers={"kid": "uno"})
+        with self.assertRaisesRegex(exceptions.AuthenticationFailed, "algoritmo"):
+            authentication.verificar_token(token)
+
+    def test_recarga_el_jwks_si_cambia_el_mtime(self):
+        token = firmar(self.DOS, kid="dos")
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            authentication.verificar_token(token)
+        generacion = self.llavero.generacion
+
+        mtime = os.stat(self.ruta).st_mtime
+        self.escribir_jwks(jwk_oct("dos", self.DOS), mtime=mtime)
+        self.llavero.revisar()  # mismo mtime: no relee
+        self.assertEqual(self.llavero.generacion, generacion)
+
+        self.escribir_jwks(jwk_oct("dos", self.DOS), mtime=mtime + 1)
+        self.assertTrue(authentication.verificar_token(token)[0].id)
+        self.assertEqual(self.llavero.generacion, generacion + 1)
+        # La llave retirada deja de valer, aunque el token estuviera en la caché
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            authentication.verificar_token(firmar(self.UNO, kid="uno"))
+
+    def test_jwks_roto_conserva_las_llaves(self):
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("{no es json")
+        os.utime(self.ruta, (time.time() + 5,) * 2)
+        with self.assertLogs("news.llaves_jwt", "ERROR"):
+            # revisar() vuelve a intentarlo (recarga=0) mientras siga roto
+            self.assertTrue(authentication.verificar_token(firmar(self.UNO, kid="uno"))[0].id)
+
+    def test_retirar_una_llave_vacia_la_cache(self):
+        token = firmar(self.UNO, kid="uno")
+        authentication.verificar_token(token)
+        self.escribir_jwks(jwk_oct("dos", self.DOS), mtime=time.time() + 5)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            authentication.verificar_token(token)
+
+
+@override_settings(JWT_CACHE_MAX=100, JWT_CACHE_TTL=300, JWT_LEEWAY=0)
+class CacheTokensTests(SimpleTestCase):
+    def setUp(self):
+        for nombre, valor in (("_cache", None), ("_generacion", 0)):
+            parche = mock.patch.object(authentication, nombre, valor)
+            parche.start()
+            self.addCleanup(parche.stop)
+        parche = mock.patch.object(authentication, "get_llavero", return_value=LlaveroJWT())
+        parche.start()
+        self.addCleanup(parche.stop)
+        parche = mock.patch.dict(authentication._metricas, {"aciertos": 0, "fallos": 0, "rechazados": 0})
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def firmar(self, **datos):
+        return firmar(settings.JWT_SECRET, **datos)
+
+    def metricas(self):
+        metricas = authentication.metricas_auth()
+        return metricas["aciertos"], metricas["fallos"], metricas["rechazados"], metricas["cache_tokens"]
+
+    def test_acierto_no_vuelve_a_verificar(self):
+        token = self.firmar()
+        primero = authentication.verificar_token(token)
+        with mock.patch.object(authentication.jwt, "decode") as decode:
+            segundo = authentication.verificar_token(token)
+        decode.assert_not_called()
+        self.assertIs(segundo[0], primero[0])
+        self.assertEqual(self.metricas(), (1, 1, 0, 1))
+
+    def test_no_dura_mas_que_el_exp(self):
+        token = self.firmar(exp=int(time.time()) + 5)
+        authentication.verificar_token(token)
+        authentication.verificar_token(token)
+        self.assertEqual(self.metricas()[:2], (1, 1))
+        # 10 s después (reloj de la caché): venció aunque JWT_CACHE_TTL sea 300
+        ahora = time.monotonic() + 10
+        with mock.patch("news.cache_local.time.monotonic", return_value=ahora):
+            authentication.verificar_token(token)
+        self.assertEqual(self.metricas()[:2], (1, 2))
+
+    def test_rechazados_nunca_se_guardan(self):
+        malos = (
+            firmar(b"otro-secreto-de-32-bytes-minimo!"),
+            self.firmar(exp=int(time.time()) - 10),
+            jwt.encode({"rol": "admin"}, settings.JWT_SECRET, algorithm=settings.JWT_ALG),  # sin id
+            "no.es.un.jwt",
+        )
+        for token in malos * 2:
+            with self.subTest(token=token), self.assertRaises(exceptions.AuthenticationFailed):
+                authentication.verificar_token(token)
+        self.assertEqual(self.metricas(), (0, 8, 8, 0))
+
+    @override_settings(JWT_CACHE_MAX=0)
+    def test_sin_cache(self):
+        token = self.firmar()
+        authentication.verificar_token(token)
+        authentication.verificar_token(token)
+        self.assertEqual(self.metricas(), (0, 2, 0, 0))
+
+    def test_is_staff_no_sale_del_rol(self):
+        principal, _ = authentication.verificar_token(self.firmar(rol="admin"))
+        self.assertFalse(principal.is_staff)
@@ -0,0 +1,151 @@
+import asyncio
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from news import autores
+from news.autores import ResolutorClaimsJWT, ResolutorHTTP, aresolver_nombres, resolver_nombres
+from news.models import Comentario
+
+from .base import BaseNewsTest
+
+URL = "http://auth.local/usuarios/lote"
+
+# Usuarios que "conoce" auth_service en estos tests
+USUARIOS = {}
+LLAMADAS = []
+
+
+def transporte_stub(url, cuerpo, timeout):
+    """ Stand-in de auth_service (NEWS_AUTORES_TRANSPORTE). """
+    LLAMADAS.append((url, sorted(cuerpo["ids"])))
+    return [{"id": uid, **datos} for uid, datos in USUARIOS.items() if uid in cuerpo["ids"]]
+
+
+async def transporte_async_stub(url, cuerpo, timeout):
+    return transporte_stub(url, cuerpo, timeout)
+
+
+def transporte_caido(url, cuerpo, timeout):
+    LLAMADAS.append((url, sorted(cuerpo["ids"])))
+    raise OSError("auth_service no responde")
+
+
+class ResolutoresMixin:
+    """ Caché y cadena de resolutores nuevas en cada test. """
+
+    def setUp(self):
+        super().setUp()
+        USUARIOS.clear()
+        LLAMADAS.clear()
+        for nombre in ("_cache", "_resolutores"):
+            parche = mock.patch.object(autores, nombre, None)
+            parche.start()
+            self.addCleanup(parche.stop)
+        parche = mock.patch.dict(ResolutorClaimsJWT._nombres, clear=True)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def usuario(self, nombre=None, apellido=None, email=None):
+        uid = uuid.uuid4()
+        USUARIOS[str(uid)] = {"nombre": nombre, "apellido": apellido, "email": email}
+        return uid
+
+
+@override_settings(
+    NEWS_AUTORES_URL=URL,
+    NEWS_AUTORES_RESOLUTORES=["news.autores.ResolutorClaimsJWT", "news.autores.ResolutorHTTP"],
+    NEWS_AUTORES_TRANSPORTE="news.tests.test_autores.transporte_stub",
+    NEWS_AUTORES_TRANSPORTE_ASYNC="news.tests.test_autores.transporte_async_stub",
+)
+class ResolucionAutoresTests(ResolutoresMixin, SimpleTestCase):
+    def test_un_lote_una_llamada(self):
+        ids = [self.usuario(f"Nombre{i}", "Apellido") for i in range(5)]
+        nombres = resolver_nombres(ids + ids[:2])  # repetidos: una sola vez en el lote
+        self.assertEqual(nombres, {uid: f"Nombre{i} Apellido" for i, uid in enumerate(ids)})
+        self.assertEqual(LLAMADAS, [(URL, sorted(str(uid) for uid in ids))])
+
+    def test_cache_positiva(self):
+        uid = self.usuario(email="ana@colegio.edu")
+        self.assertEqual(resolver_nombres([uid]), {uid: "ana@colegio.edu"})
+        self.assertEqual(resolver_nombres([uid]), {uid: "ana@colegio.edu"})
+        self.assertEqual(len(LLAMADAS), 1)
+
+    def test_cache_negativa(self):
+        conocido, desconocido = self.usuario("Ana"), uuid.uuid4()
+        nombres = resolver_nombres([conocido, desconocido])
+        self.assertEqual(nombres[desconocido], f"Usuario {str(desconocido)[:8]}")
+        # El desconocido ya no se vuelve a pedir
+        resolver_nombres([desconocido])
+        self.assertEqual(len(LLAMADAS), 1)
+
+    @override_settings(NEWS_AUTORES_TRANSPORTE="news.tests.test_autores.transporte_caido")
+    def test_si_falla_no_se_cachea_como_desconocido(self):
+        uid = uuid.uuid4()
+        with self.assertLogs("news.autores", "WARNING"):
+            self.assertEqual(resolver_nombres([uid]), {uid: f"Usuario {str(uid)[:8]}"})
+        with self.assertLogs("news.autores", "WARNING"):
+            resolver_nombres([uid])
+        self.assertEqual(len(LLAMADAS), 2)
+
+    def test_la_cadena_solo_pide_lo_que_falta(self):
+        del_token, de_auth = uuid.uuid4(), self.usuario("Beto")
+        ResolutorClaimsJWT.recordar(del_token, "Ana del token")
+        nombres = resolver_nombres([del_token, de_auth])
+        self.assertEqual(nombres, {del_token: "Ana del token", de_auth: "Beto"})
+        self.assertEqual(LLAMADAS, [(URL, [str(de_auth)])])
+
+    def test_sin_faltantes_no_hay_llamadas(self):
+        uid = uuid.uuid4()
+        ResolutorClaimsJWT.recordar(uid, "Ana")
+        resolver_nombres([uid])
+        self.assertEqual(LLAMADAS, [])
+
+    def test_async_mismo_resultado_y_misma_cache(self):
+        ids = [self.usuario(f"Nombre{i}") for i in range(3)]
+        nombres = asyncio.run(aresolver_nombres(ids))
+        self.assertEqual(nombres, {uid: f"Nombre{i}" for i, uid in enumerate(ids)})
+        self.assertEqual(resolver_nombres(ids), nombres)
+        self.assertEqual(len(LLAMADAS), 1)
+
+
+class ResolutorHTTPTests(SimpleTestCase):
+    def test_formatos_de_respuesta(self):
+        uid = str(uuid.uuid4())
+        resolutor = ResolutorHTTP(url=URL, transporte=lambda url, cuerpo, timeout: {uid: "Ana", "otro": ""})
+        self.assertEqual(resolutor.resolver([uid, "otro"]), {uid: "Ana"})
+        lista = [{"id": uid, "nombre": "Ana", "apellido": "Pérez"}, {"id": "sin-nombre"}]
+        resolutor = ResolutorHTTP(url=URL, transporte=lambda url, cuerpo, timeout: lista)
+        self.assertEqual(resolutor.resolver([uid, "sin-nombre"]), {uid: "Ana Pérez"})
+
+    def test_sin_url_no_llama(self):
+        transporte = mock.Mock()
+        with self.settings(NEWS_AUTORES_URL=""):
+            self.assertEqual(ResolutorHTTP(transporte=transporte).resolver(["x"]), {})
+        transporte.assert_not_called()
+
+    def test_async_sin_transporte_async_usa_el_sync_en_un_hilo(self):
+        transporte = mock.Mock(return_value={"x": "Ana"})
+        resolutor = ResolutorHTTP(url=URL, timeout=1, transporte=transporte)
+        self.assertEqual(asyncio.run(resolutor.aresolver(["x"])), {"x": "Ana"})
+        transporte.assert_called_once_with(URL, {"ids": ["x"]}, 1)
+
+
+@override_settings(
+    NEWS_CACHE_RESPUESTAS_TTL=0,
+    NEWS_AUTORES_URL=URL,
+    NEWS_AUTORES_RESOLUTORES=["news.autores.ResolutorHTTP"],
+    NEWS_AUTORES_TRANSPORTE="news.tests.test_autores.transporte_stub",
+)
+class AutoresEnLaAPITests(ResolutoresMixin, BaseNewsTest):
+    def test_comentarios_de_n_autores_una_llamada(self):
+        pub = self.publicacion("Charla")
+        autores_ids = [self.usuario(f"Autor{i}") for i in range(4)]
+        for uid in autores_ids:
+            Comentario.objects.create(publicacion=pub, usuario_id=uid, contenido="Hola")
+        respuesta = self.client.get(f"/api/publicaciones/{pub.pk}/comentarios/")
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        nombres = sorted(c["usuario_nombre"] for c in respuesta.json()["results"])
+        self.assertEqual(nombres, [f"Autor{i}" for i in range(4)])
+        self.assertEqual(len(LLAMADAS), 1)
@@ -0,0 +1,42 @@
+from news.busqueda import buscar_publicaciones, soporta_busqueda_completa
+from news.models import Publicacion
+
+from .base import BaseNewsTest
+
+
+class BusquedaSQLiteTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.beca_titulo = self.publicacion("Beca de ingeniería", "Convocatoria abierta", hace=3)
+        self.beca_contenido = self.publicacion("Convocatoria", "Se abre la BECA de arte", hace=1)
+        self.otra = self.publicacion("Feria de ciencias", "Stands y talleres", hace=2)
+
+    def test_usa_el_fallback(self):
+        self.assertFalse(soporta_busqueda_completa())
+        queryset, orden = buscar_publicaciones(Publicacion.objects.all(), "beca")
+        self.assertIsNone(orden)
+        self.assertEqual({p.pk for p in queryset}, {self.beca_titulo.pk, self.beca_contenido.pk})
+
+    def test_termino_en_titulo_o_contenido_sin_distinguir_mayusculas(self):
+        titulos = self.titulos(self.client.get("/api/publicaciones/", {"q": "beca"}))
+        self.assertCountEqual(titulos, ["Beca de ingeniería", "Convocatoria"])
+
+    def test_sin_coincidencias(self):
+        self.assertEqual(self.titulos(self.client.get("/api/publicaciones/", {"q": "astronomía"})), [])
+
+    def test_orden_cronologico(self):
+        # Sin ranking de relevancia: lo más reciente primero, como el feed
+        titulos = self.titulos(self.client.get("/api/publicaciones/", {"q": "convocatoria"}))
+        self.assertEqual(titulos, ["Convocatoria", "Beca de ingeniería"])
+
+    def test_solo_lo_visible(self):
+        self.publicacion("Beca en borrador", estado="borrador")
+        titulos = self.titulos(self.client.get("/api/publicaciones/", {"q": "beca"}))
+        self.assertNotIn("Beca en borrador", titulos)
+
+    def test_q_ausente_o_en_blanco_no_filtra(self):
+        todas = ["Convocatoria", "Feria de ciencias", "Beca de ingeniería"]
+        self.assertEqual(self.titulos(self.client.get("/api/publicaciones/")), todas)
+        for q in ("", "   "):
+            with self.subTest(q=q):
+                self.assertEqual(self.titulos(self.client.get("/api/publicaciones/", {"q": q})), todas)
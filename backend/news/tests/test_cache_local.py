@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase
+
+from news.cache_local import DESCONOCIDO, CacheLRU
+
+
+class CacheLRUTests(SimpleTestCase):
+    def test_expulsa_la_menos_usada(self):
+        cache = CacheLRU(maximo=2, ttl=60, ttl_negativo=60)
+        cache.guardar("a", 1)
+        cache.guardar("b", 2)
+        cache.obtener("a")
+        cache.guardar("c", 3)
+        self.assertEqual([cache.obtener(c) for c in "abc"], [1, DESCONOCIDO, 3])
+
+    def test_ttl_y_cache_negativa(self):
+        cache = CacheLRU(maximo=10, ttl=60, ttl_negativo=-1)
+        cache.guardar("nadie", None)
+        cache.guardar("token", "principal", ttl=-1)  # ya vencido (p. ej. exp pasado)
+        self.assertIs(cache.obtener("nadie"), DESCONOCIDO)
+        self.assertIs(cache.obtener("token"), DESCONOCIDO)
+        cache.ttl_negativo = 60
+        cache.guardar("nadie", None)
+        self.assertIsNone(cache.obtener("nadie"))
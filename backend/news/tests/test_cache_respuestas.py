@@ -0,0 +1,70 @@
+from django.test import override_settings
+
+from news.models import Categoria, Publicacion
+
+from .base import BaseNewsTest, token
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=60)
+class CacheRespuestasTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.pub = self.publicacion("Feria vocacional")
+
+    def leer(self, url, cache):
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(respuesta["X-Cache"], cache)
+        return respuesta.json()
+
+    def escribir(self, escritura):
+        # La invalidación corre tras el commit
+        with self.captureOnCommitCallbacks(execute=True):
+            escritura()
+
+    def test_feed(self):
+        url = "/api/publicaciones/"
+        self.leer(url, "MISS")
+        self.leer(url, "HIT")
+        self.escribir(lambda: self.publicacion("Nueva beca"))
+        titulos = [p["titulo"] for p in self.leer(url, "MISS")["results"]]
+        self.assertEqual(titulos, ["Nueva beca", "Feria vocacional"])
+
+    def test_detalle(self):
+        url = f"/api/publicaciones/{self.pub.pk}/"
+        self.leer(url, "MISS")
+        self.leer(url, "HIT")
+
+        def editar():
+            self.pub.titulo = "Feria vocacional 2026"
+            self.pub.save()
+
+        self.escribir(editar)
+        self.assertEqual(self.leer(url, "MISS")["titulo"], "Feria vocacional 2026")
+
+    def test_detalle_tras_un_like(self):
+        url = f"/api/publicaciones/{self.pub.pk}/"
+        self.leer(url, "MISS")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token()}")
+        self.escribir(lambda: self.client.put(f"/api/publicaciones/{self.pub.pk}/like/"))
+        self.assertEqual(self.leer(url, "MISS")["likes_count"], 1)
+        self.assertEqual(self.leer(url, "HIT")["likes_count"], 1)
+
+    def test_otra_publicacion_no_invalida_el_detalle(self):
+        url = f"/api/publicaciones/{self.pub.pk}/"
+        self.leer(url, "MISS")
+        self.escribir(lambda: Publicacion.objects.get(pk=self.publicacion("Otra").pk).save())
+        self.leer(url, "HIT")
+
+    def test_categorias(self):
+        url = "/api/categorias/"
+        Categoria.objects.create(nombre="Becas")
+        self.assertEqual([c["nombre"] for c in self.leer(url, "MISS")], ["Becas"])
+        self.leer(url, "HIT")
+        self.escribir(lambda: Categoria.objects.create(nombre="Arte"))
+        self.assertEqual([c["nombre"] for c in self.leer(url, "MISS")], ["Arte", "Becas"])
+
+    def test_categorias_abiertas_a_lectores_y_cerradas_a_escritura(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token()}")
+        self.assertEqual(self.client.get("/api/categorias/").status_code, 200)
+        self.assertEqual(self.client.post("/api/categorias/", {"nombre": "Arte"}).status_code, 403)
@@ -0,0 +1,70 @@
+from django.test import override_settings
+
+from news import vistas
+
+from .base import BaseNewsTest, token
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class GetCondicionalTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.pub = self.publicacion("Feria vocacional")
+        self.urls = {
+            "feed": "/api/publicaciones/",
+            "detalle": f"/api/publicaciones/{self.pub.pk}/",
+            "comentarios": f"/api/publicaciones/{self.pub.pk}/comentarios/",
+        }
+
+    def get(self, url, etag=None):
+        return self.client.get(url, **({"HTTP_IF_NONE_MATCH": etag} if etag else {}))
+
+    def etags(self):
+        etags = {}
+        for nombre, url in self.urls.items():
+            respuesta = self.get(url)
+            self.assertEqual(respuesta.status_code, 200, respuesta.content)
+            etags[nombre] = respuesta["ETag"]
+        return etags
+
+    def test_304_con_el_mismo_etag(self):
+        for nombre, etag in self.etags().items():
+            with self.subTest(nombre):
+                respuesta = self.get(self.urls[nombre], etag)
+                self.assertEqual(respuesta.status_code, 304)
+                self.assertEqual(respuesta["ETag"], etag)
+                self.assertEqual(respuesta.content, b"")
+
+    def test_last_modified_salvo_en_el_feed(self):
+        for nombre in ("detalle", "comentarios"):
+            with self.subTest(nombre):
+                fecha = self.get(self.urls[nombre])["Last-Modified"]
+                respuesta = self.client.get(self.urls[nombre], HTTP_IF_MODIFIED_SINCE=fecha)
+                self.assertEqual(respuesta.status_code, 304)
+        self.assertNotIn("Last-Modified", self.get(self.urls["feed"]))
+
+    def test_edicion_cambia_los_validadores(self):
+        antes = self.etags()
+        self.pub.titulo = "Feria vocacional 2026"
+        self.pub.save()
+        despues = self.etags()
+        for nombre, url in self.urls.items():
+            with self.subTest(nombre):
+                self.assertNotEqual(despues[nombre], antes[nombre])
+                self.assertEqual(self.get(url, antes[nombre]).status_code, 200)
+
+    def test_comentario_y_like_cambian_los_validadores(self):
+        antes = self.etags()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token()}")
+        self.client.post("/api/comentarios/", {"publicacion": str(self.pub.pk), "contenido": "Hola"}, format="json")
+        tras_comentario = self.etags()
+        self.client.put(f"/api/publicaciones/{self.pub.pk}/like/")
+        tras_like = self.etags()
+        for nombre in self.urls:
+            with self.subTest(nombre):
+                self.assertEqual(len({antes[nombre], tras_comentario[nombre], tras_like[nombre]}), 3)
+
+    def test_las_vistas_no_cambian_el_etag(self):
+        etag = self.get(self.urls["detalle"])["ETag"]
+        vistas.get_buffer().vaciar()
+        self.assertEqual(self.get(self.urls["detalle"], etag).status_code, 304)
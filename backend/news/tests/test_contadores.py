@@ -0,0 +1,103 @@
+import uuid
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from news.contadores import incrementar
+from news.models import Comentario, Like, Publicacion
+
+from .base import BaseNewsTest, token
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class ContadoresTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.pub = self.publicacion("Feria vocacional")
+
+    def como(self, usuario_id):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token(id=str(usuario_id))}")
+
+    def contadores(self):
+        pub = Publicacion.objects.get(pk=self.pub.pk)
+        return pub.likes_count, pub.comentarios_count
+
+    def test_likes(self):
+        ana, beto = uuid.uuid4(), uuid.uuid4()
+        url = f"/api/publicaciones/{self.pub.pk}/like/"
+        for usuario_id, metodo, esperado in (
+            (ana, "put", 1), (ana, "put", 1), (beto, "put", 2), (ana, "delete", 1), (ana, "delete", 1),
+        ):
+            self.como(usuario_id)
+            getattr(self.client, metodo)(url)
+            self.assertEqual(self.contadores(), (esperado, 0))
+        self.como(beto)
+        self.client.post(f"/api/publicaciones/{self.pub.pk}/like_toggle/")
+        self.assertEqual(self.contadores(), (0, 0))
+        self.assertEqual(Like.objects.count(), 0)
+
+    def test_comentarios_respuestas_y_bajas(self):
+        self.como(uuid.uuid4())
+        respuesta = self.client.post(
+            "/api/comentarios/", {"publicacion": str(self.pub.pk), "contenido": "Hola"}, format="json"
+        )
+        raiz = respuesta.json()["id"]
+        self.client.post(f"/api/comentarios/{raiz}/responder/", {"contenido": "¿Dónde?"}, format="json")
+        otro = self.client.post(
+            "/api/comentarios/", {"publicacion": str(self.pub.pk), "contenido": "Otro"}, format="json"
+        ).json()["id"]
+        self.assertEqual(self.contadores(), (0, 3))
+
+        self.client.delete(f"/api/comentarios/{otro}/")
+        self.assertEqual(self.contadores(), (0, 2))
+        # La raíz se lleva su respuesta: baja de dos
+        self.client.delete(f"/api/comentarios/{raiz}/")
+        self.assertEqual(self.contadores(), (0, 0))
+        # Borrar lo ya borrado no descuenta
+        self.assertEqual(self.client.delete(f"/api/comentarios/{raiz}/").status_code, 404)
+        self.assertEqual(self.contadores(), (0, 0))
+
+    def test_incrementar_sube_la_version_en_el_mismo_update(self):
+        with self.assertNumQueries(2):  # UPDATE + registro de cambio
+            self.assertEqual(incrementar(self.pub.pk, likes_count=2, comentarios_count=-1), 1)
+        pub = Publicacion.objects.get(pk=self.pub.pk)
+        self.assertEqual((pub.likes_count, pub.comentarios_count, pub.version), (2, -1, 2))
+        with self.assertNumQueries(0):
+            self.assertEqual(incrementar(self.pub.pk, likes_count=0), 0)
+
+
+class ReconciliarContadoresTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.desalineada = self.publicacion("Desalineada")
+        self.correcta = self.publicacion("Correcta")
+        for pub, likes, comentarios in ((self.desalineada, 2, 3), (self.correcta, 1, 1)):
+            for _ in range(likes):
+                Like.objects.create(publicacion=pub, usuario_id=uuid.uuid4())
+            for _ in range(comentarios):
+                Comentario.objects.create(publicacion=pub, usuario_id=uuid.uuid4(), contenido="x")
+            Publicacion.objects.filter(pk=pub.pk).update(likes_count=likes, comentarios_count=comentarios)
+        # Deriva: un contador se perdió un incremento y el otro se pasó
+        Publicacion.objects.filter(pk=self.desalineada.pk).update(likes_count=1, comentarios_count=7)
+
+    def reconciliar(self, **opciones):
+        salida = StringIO()
+        call_command("reconciliar_contadores", stdout=salida, **opciones)
+        return salida.getvalue()
+
+    def estado(self, pub):
+        pub = Publicacion.objects.get(pk=pub.pk)
+        return pub.likes_count, pub.comentarios_count, pub.version
+
+    def test_dry_run_solo_informa(self):
+        self.assertIn("1 publicaciones con contadores desalineados", self.reconciliar(dry_run=True))
+        self.assertEqual(self.estado(self.desalineada), (1, 7, 1))
+
+    def test_corrige_solo_las_desalineadas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            salida = self.reconciliar(lote=1)
+        self.assertIn("1 publicaciones", salida)
+        self.assertEqual(self.estado(self.desalineada), (2, 3, 2))
+        self.assertEqual(self.estado(self.correcta), (1, 1, 1))
+        self.assertIn("0 publicaciones con contadores desalineados", self.reconciliar(dry_run=True))
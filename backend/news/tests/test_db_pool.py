@@ -0,0 +1,121 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from news_service.db_pool.base import PoolAgotado, PoolConexiones
+
+
+class Conexion:
+    """ Lo que el pool usa de una conexión psycopg2. """
+
+    def __init__(self, vivas):
+        self.closed = False
+        self.autocommit = True
+        self.vivas = vivas
+        vivas.append(self)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.vivas.remove(self)
+
+
+class PoolConexionesTests(SimpleTestCase):
+    def setUp(self):
+        self.vivas = []
+
+    def crear(self):
+        return Conexion(self.vivas)
+
+    def test_sin_cupo_espera_y_falla_por_timeout(self):
+        pool = PoolConexiones(maximo=1, timeout=0.05)
+        pool.obtener(self.crear)
+        inicio = time.monotonic()
+        with self.assertRaises(PoolAgotado):
+            pool.obtener(self.crear)
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.05)
+        estado = pool.estado()
+        self.assertEqual((estado["timeouts"], estado["esperas"], estado["abiertas"]), (1, 1, 1))
+
+    def test_devolver_despierta_a_quien_espera(self):
+        pool = PoolConexiones(maximo=1, timeout=5)
+        conexion = pool.obtener(self.crear)
+        threading.Timer(0.05, pool.devolver, [conexion]).start()
+        self.assertIs(pool.obtener(self.crear), conexion)
+        self.assertEqual(pool.estado()["creadas"], 1)
+
+    def test_rota_al_devolver_se_descarta(self):
+        pool = PoolConexiones(maximo=1, timeout=0.05)
+        conexion = pool.obtener(self.crear)
+        conexion.closed = True
+        pool.devolver(conexion)
+        estado = pool.estado()
+        self.assertEqual((estado["abiertas"], estado["libres"], estado["descartadas"]), (0, 0, 1))
+        self.assertIsNot(pool.obtener(self.crear), conexion)
+
+    def test_rota_al_sacarla_se_reemplaza_sin_soltar_el_cupo(self):
+        pool = PoolConexiones(maximo=1, timeout=0.05)
+        conexion = pool.obtener(self.crear)
+        pool.devolver(conexion)
+        conexion.close()  # la BD la cerró mientras estaba libre
+        nueva = pool.obtener(self.crear)
+        self.assertIsNot(nueva, conexion)
+        estado = pool.estado()
+        self.assertEqual((estado["abiertas"], estado["en_uso"], estado["descartadas"]), (1, 1, 1))
+
+    def test_falla_al_crear_devuelve_el_cupo(self):
+        pool = PoolConexiones(maximo=1, timeout=0.05)
+
+        def falla():
+            raise OSError("sin conexión")
+
+        with self.assertRaises(OSError):
+            pool.obtener(falla)
+        self.assertEqual(pool.estado()["abiertas"], 0)
+        pool.obtener(self.crear)
+
+    def test_concurrencia_nunca_supera_el_maximo(self):
+        pool = PoolConexiones(maximo=3, timeout=5, chequeo=60)
+        lock = threading.Lock()
+        maximos = {"vivas": 0, "abiertas": 0}
+        errores = []
+        descartar = pool._descartar
+
+        def descartar_lento(conexion):
+            # Ensancha la ventana en la que otro hilo podría quedarse con el cupo
+            descartar(conexion)
+            time.sleep(0.001)
+
+        pool._descartar = descartar_lento
+
+        def crear():
+            with lock:
+                conexion = self.crear()
+                maximos["vivas"] = max(maximos["vivas"], len(self.vivas))
+            time.sleep(0.001)  # crear es lento: ventana para que otro hilo tome el cupo
+            return conexion
+
+        def trabajar(n):
+            try:
+                for i in range(100):
+                    conexion = pool.obtener(crear)
+                    with lock:
+                        maximos["abiertas"] = max(maximos["abiertas"], pool.estado()["abiertas"])
+                    pool.devolver(conexion)
+                    if (i + n) % 3 == 0:
+                        with lock:
+                            conexion.close()  # cortada mientras está libre
+            except Exception as exc:
+                errores.append(exc)
+
+        hilos = [threading.Thread(target=trabajar, args=(n,)) for n in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        self.assertLessEqual(maximos["vivas"], 3)
+        self.assertLessEqual(maximos["abiertas"], 3)
+        self.assertGreater(pool.estado()["descartadas"], 0)
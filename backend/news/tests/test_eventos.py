@@ -0,0 +1,100 @@
+import asyncio
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from news import eventos
+from news.models import Comentario
+
+from .base import BaseNewsTest
+
+
+class EventosComentarioTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.pub = self.publicacion("Charla de carreras")
+
+    def comentar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Comentario.objects.create(publicacion=self.pub, usuario_id=uuid.uuid4(), contenido="Hola")
+
+    @override_settings(NEWS_EVENTOS=False)
+    def test_desactivados_no_publican(self):
+        with mock.patch.object(eventos, "get_bus") as get_bus:
+            self.comentar()
+        get_bus.assert_not_called()
+
+    @override_settings(NEWS_EVENTOS=True)
+    def test_sin_interesados_no_se_arma_el_evento(self):
+        bus = mock.Mock(**{"interesa.return_value": False})
+        with mock.patch.object(eventos, "get_bus", return_value=bus), \
+                mock.patch("news.serializers.ComentarioSerializer") as serializador:
+            self.comentar()
+        serializador.assert_not_called()
+        bus.publicar.assert_not_called()
+
+    @override_settings(NEWS_EVENTOS=True)
+    def test_se_publica_despues_del_commit(self):
+        bus = mock.Mock(**{"interesa.return_value": True})
+        with mock.patch.object(eventos, "get_bus", return_value=bus):
+            with self.captureOnCommitCallbacks() as callbacks:
+                Comentario.objects.create(publicacion=self.pub, usuario_id=uuid.uuid4(), contenido="Hola")
+            bus.publicar.assert_not_called()
+            for callback in callbacks:
+                callback()
+        mensaje = bus.publicar.call_args.args[0]
+        self.assertEqual((mensaje["tipo"], mensaje["datos"]["contenido"]), (eventos.EVENTO_COMENTARIO, "Hola"))
+
+    @override_settings(NEWS_EVENTOS=True)
+    def test_respuesta_con_su_padre(self):
+        raiz = Comentario.objects.create(publicacion=self.pub, usuario_id=uuid.uuid4(), contenido="¿Cuándo?")
+        bus = mock.Mock(**{"interesa.return_value": True})
+        with mock.patch.object(eventos, "get_bus", return_value=bus):
+            with self.captureOnCommitCallbacks(execute=True):
+                respuesta = Comentario(publicacion=self.pub, usuario_id=uuid.uuid4(), contenido="El lunes")
+                respuesta.colgar_de(raiz)
+                respuesta.save()
+        mensaje = bus.publicar.call_args.args[0]
+        self.assertEqual(
+            (mensaje["tipo"], mensaje["publicacion"], mensaje["datos"]["padre"]),
+            (eventos.EVENTO_RESPUESTA, str(self.pub.pk), str(raiz.pk)),
+        )
+
+
+class CentroTests(SimpleTestCase):
+    """ Reparto por publicación, cola acotada y tope de conexiones (un Centro por test). """
+
+    def setUp(self):
+        self.centro = eventos.Centro(maximo=2)
+
+    def mensaje(self, publicacion, likes_count):
+        return {"tipo": eventos.EVENTO_LIKES, "publicacion": publicacion, "datos": {"likes_count": likes_count}}
+
+    async def test_reparte_solo_a_los_de_la_publicacion(self):
+        una, otra = self.centro.suscribir("a"), self.centro.suscribir("b")
+        self.centro.entregar(self.mensaje("a", 3))
+        await asyncio.sleep(0)
+        self.assertEqual(una.cola.get_nowait(), 'event: likes\ndata: {"publicacion":"a","likes_count":3}\n\n')
+        self.assertTrue(otra.cola.empty())
+        self.assertEqual(self.centro.metricas["entregados"], 1)
+
+    @override_settings(NEWS_SSE_COLA=2)
+    async def test_cliente_lento_recibe_desfase(self):
+        suscripcion = self.centro.suscribir("a")
+        for likes_count in range(3):
+            self.centro.entregar(self.mensaje("a", likes_count))
+        await asyncio.sleep(0)
+        self.assertEqual(suscripcion.cola.qsize(), 1)
+        self.assertTrue(suscripcion.cola.get_nowait().startswith(f"event: {eventos.EVENTO_DESFASE}\n"))
+        self.assertEqual(self.centro.metricas["desfases"], 1)
+
+    async def test_tope_de_conexiones(self):
+        primera = self.centro.suscribir("a")
+        self.centro.suscribir("b")
+        with self.assertRaises(eventos.DemasiadasConexiones):
+            self.centro.suscribir("c")
+        self.centro.cancelar(primera)
+        self.centro.cancelar(primera)  # cancelar dos veces no descuenta de más
+        self.centro.suscribir("c")
+        self.assertEqual((self.centro.metricas["conexiones"], self.centro.metricas["rechazadas"]), (2, 1))
@@ -0,0 +1,60 @@
+import re
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from news.models import Categoria, Comentario, ComentarioRespuesta, Like, Publicacion
+
+
+class GenerarDatosTests(TestCase):
+    OPCIONES = {
+        "publicaciones": 12, "comentarios": 40, "likes": 25, "vistas": 300, "usuarios": 15,
+        "instituciones": 2, "categorias": 3, "lote": 7, "limpiar": True,
+    }
+
+    def generar(self, semilla):
+        salida = StringIO()
+        call_command("generar_datos", semilla=semilla, stdout=salida, **self.OPCIONES)
+        # Los tiempos cambian de una corrida a otra; los conteos no
+        return re.sub(r" \(\d+\.\ds\)| en \d+\.\ds", "", salida.getvalue())
+
+    def instantanea(self):
+        """ Todo lo generado salvo las fechas (relativas a la hora de la corrida). """
+        return {
+            "categorias": list(Categoria.objects.order_by("id").values_list("id", "nombre", "descripcion", "color")),
+            "publicaciones": list(Publicacion.objects.order_by("id").values_list(
+                "id", "titulo", "contenido", "autor_id", "autor_institucion_id", "tipo_autor", "categoria_id",
+                "estado", "vistas", "likes_count", "comentarios_count", "version",
+            )),
+            "comentarios": list(Comentario.objects.order_by("id").values_list(
+                "id", "publicacion_id", "usuario_id", "contenido", "hilo_id", "ruta", "profundidad",
+            )),
+            "respuestas": list(ComentarioRespuesta.objects.order_by("id").values_list(
+                "id", "comentario_padre_id", "comentario_respuesta_id",
+            )),
+            "likes": list(Like.objects.order_by("id").values_list("id", "publicacion_id", "usuario_id")),
+        }
+
+    def test_misma_semilla_mismos_datos(self):
+        salida = self.generar(7)
+        datos = self.instantanea()
+        self.assertEqual(len(datos["publicaciones"]), 12)
+        self.assertTrue(datos["comentarios"] and datos["likes"])
+
+        self.assertEqual(self.generar(7), salida)
+        self.assertEqual(self.instantanea(), datos)
+
+    def test_conteos_consistentes(self):
+        salida = self.generar(7)
+        for modelo, nombre in ((Comentario, "comentarios"), (Like, "likes")):
+            self.assertIn(f"{modelo.objects.count()} {nombre}", salida)
+        for pub in Publicacion.objects.all():
+            self.assertEqual(pub.likes_count, pub.likes.count())
+            self.assertEqual(pub.comentarios_count, pub.comentarios.count())
+
+    def test_otra_semilla_otros_datos(self):
+        self.generar(7)
+        datos = self.instantanea()
+        self.generar(8)
+        self.assertNotEqual(self.instantanea()["publicaciones"], datos["publicaciones"])
@@ -0,0 +1,114 @@
+import importlib
+import uuid
+
+from django.apps import apps
+
+from news.models import Comentario, ComentarioRespuesta, Publicacion
+
+from .base import BaseNewsTest, token
+
+migracion_hilos = importlib.import_module("news.migrations.0006_hilos_materializados")
+
+
+class HilosTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.pub = self.publicacion("Charla de carreras")
+        self.usuario_id = uuid.uuid4()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token(id=str(self.usuario_id))}")
+        # raiz -> respuesta -> subrespuesta, y otra raíz aparte
+        self.raiz = self.comentar("Raíz")
+        self.respuesta = self.responder(self.raiz, "Respuesta")
+        self.subrespuesta = self.responder(self.respuesta, "Subrespuesta")
+        self.otra = self.comentar("Otra raíz")
+
+    def comentar(self, contenido):
+        respuesta = self.client.post(
+            "/api/comentarios/", {"publicacion": str(self.pub.pk), "contenido": contenido}, format="json"
+        )
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        return Comentario.objects.get(pk=respuesta.json()["id"])
+
+    def responder(self, padre, contenido):
+        respuesta = self.client.post(f"/api/comentarios/{padre.pk}/responder/", {"contenido": contenido}, format="json")
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        return Comentario.objects.get(contenido=contenido)
+
+    def hilo(self, comentario):
+        respuesta = self.client.get(f"/api/comentarios/{comentario.pk}/hilo/")
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()
+
+    def arbol(self, datos):
+        """ (contenido, [subárboles]) de la representación anidada. """
+        return datos["contenido"], [self.arbol(r) for r in datos["respuestas"]]
+
+    def test_materializa_el_hilo(self):
+        self.assertEqual(
+            [(c.hilo_id, c.profundidad) for c in (self.raiz, self.respuesta, self.subrespuesta)],
+            [(self.raiz.pk, 0), (self.raiz.pk, 1), (self.raiz.pk, 2)],
+        )
+        self.assertEqual(
+            self.subrespuesta.ruta, "/".join(c.pk.hex for c in (self.raiz, self.respuesta, self.subrespuesta))
+        )
+
+    def test_hilo_completo_desde_cualquier_comentario(self):
+        esperado = ("Raíz", [("Respuesta", [("Subrespuesta", [])])])
+        for comentario in (self.raiz, self.subrespuesta):
+            with self.subTest(comentario=comentario.contenido):
+                self.assertEqual(self.arbol(self.hilo(comentario)), esperado)
+
+    def test_listado_por_profundidad(self):
+        respuesta = self.client.get(f"/api/comentarios/de-publicacion/{self.pub.pk}/", {"profundidad": 1})
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertCountEqual(
+            [self.arbol(c) for c in respuesta.json()["results"]],
+            [("Raíz", [("Respuesta", [])]), ("Otra raíz", [])],
+        )
+
+    def test_hilo_sin_raiz_devuelve_el_comentario_pedido(self):
+        # Datos anteriores a la baja en cascada: la raíz se borró sola
+        Comentario.objects.filter(pk=self.raiz.pk).delete()
+        self.assertEqual(self.arbol(self.hilo(self.respuesta)), ("Respuesta", [("Subrespuesta", [])]))
+
+    def test_baja_se_lleva_las_respuestas(self):
+        respuesta = self.client.delete(f"/api/comentarios/{self.respuesta.pk}/")
+        self.assertEqual(respuesta.status_code, 204, respuesta.content)
+        self.assertCountEqual(
+            Comentario.objects.values_list("contenido", flat=True), ["Raíz", "Otra raíz"]
+        )
+        self.assertEqual(Publicacion.objects.get(pk=self.pub.pk).comentarios_count, 2)
+        self.assertEqual(self.arbol(self.hilo(self.raiz)), ("Raíz", []))
+
+    def test_listado_por_profundidad_tras_la_baja(self):
+        self.client.delete(f"/api/comentarios/{self.raiz.pk}/")
+        respuesta = self.client.get(f"/api/comentarios/de-publicacion/{self.pub.pk}/", {"profundidad": 2})
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual([self.arbol(c) for c in respuesta.json()["results"]], [("Otra raíz", [])])
+        self.assertEqual(Comentario.objects.count(), 1)
+
+
+class RellenoHilosTests(BaseNewsTest):
+    """ RunPython de 0006: hilo_id/ruta/profundidad a partir de ComentarioRespuesta. """
+
+    def test_rellena_desde_las_relaciones(self):
+        pub = self.publicacion("Anterior a los hilos")
+        raiz, respuesta, subrespuesta, suelto = (
+            Comentario.objects.create(publicacion=pub, usuario_id=uuid.uuid4(), contenido=c)
+            for c in ("Raíz", "Respuesta", "Subrespuesta", "Suelto")
+        )
+        ComentarioRespuesta.objects.create(comentario_padre=raiz, comentario_respuesta=respuesta)
+        ComentarioRespuesta.objects.create(comentario_padre=respuesta, comentario_respuesta=subrespuesta)
+        # Como antes de la migración: columnas con sus valores por defecto
+        Comentario.objects.update(hilo_id=None, ruta="", profundidad=0)
+
+        migracion_hilos.rellenar_hilos(apps, None)
+
+        esperado = {
+            raiz.pk: (raiz.pk, raiz.pk.hex, 0),
+            respuesta.pk: (raiz.pk, f"{raiz.pk.hex}/{respuesta.pk.hex}", 1),
+            subrespuesta.pk: (raiz.pk, f"{raiz.pk.hex}/{respuesta.pk.hex}/{subrespuesta.pk.hex}", 2),
+            suelto.pk: (suelto.pk, suelto.pk.hex, 0),
+        }
+        obtenido = {c.pk: (c.hilo_id, c.ruta, c.profundidad) for c in Comentario.objects.all()}
+        self.assertEqual(obtenido, esperado)
@@ -0,0 +1,118 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from news import imagenes
+from news.models import Publicacion
+
+from .base import BaseNewsTest, imagen_en_bytes, token
+
+
+class OriginalImagenTests(SimpleTestCase):
+    def test_limpia_se_guarda_tal_cual(self):
+        datos = imagen_en_bytes(quality=70)
+        self.assertEqual(imagenes.preparar_original(io.BytesIO(datos)).read(), datos)
+
+    def test_con_exif_se_recodifica_sin_metadatos(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotada 90°
+        original = imagenes.preparar_original(io.BytesIO(imagen_en_bytes(exif=exif)))
+        imagen = Image.open(original)
+        self.assertEqual((imagen.size, dict(imagen.getexif())), ((300, 400), {}))
+
+    def test_mpo_queda_en_un_jpeg_de_un_cuadro(self):
+        segunda = Image.new("RGB", (400, 300), (0, 0, 255))
+        datos = imagen_en_bytes("MPO", save_all=True, append_images=[segunda])
+        imagen = Image.open(imagenes.preparar_original(io.BytesIO(datos)))
+        self.assertEqual((imagen.format, getattr(imagen, "n_frames", 1)), ("JPEG", 1))
+
+
+class VariantesTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, raiz)
+        ajustes = override_settings(
+            MEDIA_ROOT=raiz, NEWS_IMAGEN_WORKERS=0, NEWS_IMAGEN_ANCHOS=[100, 200], NEWS_CACHE_RESPUESTAS_TTL=0
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token('admin')}")
+
+    def crear(self, datos):
+        archivo = SimpleUploadedFile("foto.jpg", datos, "image/jpeg")
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                "/api/publicaciones/", {"titulo": "Con foto", "contenido": "c", "imagen": archivo}, format="multipart"
+            )
+
+    def test_alta_con_variantes_y_srcset(self):
+        respuesta = self.crear(imagen_en_bytes())
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        pub = Publicacion.objects.get(pk=respuesta.json()["id"])
+        self.assertEqual(set(pub.imagen_variantes), {"webp", "jpeg"})
+        srcset = self.client.get(f"/api/publicaciones/{pub.pk}/").json()["srcset"]
+        for formato in ("webp", "jpeg"):
+            with self.subTest(formato=formato):
+                self.assertEqual([parte.split()[-1] for parte in srcset[formato].split(", ")], ["100w", "200w"])
+
+    def test_imagen_corrupta(self):
+        # Firma de PNG válida (pasa el filtro de la subida) y el resto basura
+        respuesta = self.crear(imagen_en_bytes("PNG")[:16] + b"x" * 200)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn("imagen", respuesta.json())
+        self.assertFalse(Publicacion.objects.exists())
+
+    def test_el_comando_genera_las_que_faltan(self):
+        pub_id = self.crear(imagen_en_bytes()).json()["id"]
+        Publicacion.objects.filter(pk=pub_id).update(imagen_variantes={})
+        call_command("generar_variantes_imagenes", stdout=StringIO())
+        self.assertEqual(set(Publicacion.objects.get(pk=pub_id).imagen_variantes), {"webp", "jpeg"})
+
+
+class VariantesPendientesTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, raiz)
+        ajustes = override_settings(MEDIA_ROOT=raiz, NEWS_IMAGEN_WORKERS=2, NEWS_IMAGEN_ANCHOS=[100])
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token('admin')}")
+
+    def crear_sin_pool(self):
+        """ Alta con imagen cuando el pool nunca llega a generar las variantes (reinicio). """
+        archivo = SimpleUploadedFile("foto.jpg", imagen_en_bytes(), "image/jpeg")
+        with mock.patch.object(imagenes, "get_pool"), self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.client.post(
+                "/api/publicaciones/", {"titulo": "Con foto", "contenido": "c", "imagen": archivo}, format="multipart"
+            )
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        return Publicacion.objects.get(pk=respuesta.json()["id"])
+
+    def test_el_comando_retoma_las_pendientes(self):
+        pub = self.crear_sin_pool()
+        self.assertEqual((pub.variantes_pendientes, pub.imagen_variantes), (True, {}))
+
+        call_command("generar_variantes_imagenes", stdout=StringIO())
+        pub.refresh_from_db()
+        self.assertTrue(pub.variantes_pendientes)  # recién subida: el pool aún podría estar en ello
+
+        call_command("generar_variantes_imagenes", margen=0, stdout=StringIO())
+        pub.refresh_from_db()
+        self.assertFalse(pub.variantes_pendientes)
+        self.assertEqual(set(pub.imagen_variantes), {"webp", "jpeg"})
+
+    def test_quitar_la_imagen_no_deja_pendiente(self):
+        pub = self.crear_sin_pool()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/publicaciones/{pub.pk}/", {"imagen": None}, format="json")
+        pub.refresh_from_db()
+        self.assertFalse(pub.variantes_pendientes)
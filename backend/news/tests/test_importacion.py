@@ -0,0 +1,285 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import override_settings
+from django.utils import timezone
+
+from news import exportacion, importacion
+from news.models import Categoria, Publicacion
+
+from .base import BaseNewsTest, token
+
+# Lo que la importación toma de cada fila (el autor es quien importa)
+CAMPOS = ("id", "titulo", "contenido", "categoria_id", "estado", "fecha_publicacion")
+
+
+def ndjson(*filas):
+    return b"".join((f if isinstance(f, bytes) else json.dumps(f).encode()) + b"\n" for f in filas)
+
+
+def csv_de(cabecera, *filas):
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow(cabecera)
+    escritor.writerows(filas)
+    return salida.getvalue().encode("utf-8")
+
+
+class ImportacionBase(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.institucion_id = str(uuid.uuid4())
+        self.usuario_id = str(uuid.uuid4())
+        self.como("institucion", id=self.usuario_id, institucion_id=self.institucion_id)
+        self.categoria = Categoria.objects.create(nombre="Ciencias")
+
+    def como(self, rol, **datos):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token(rol, **datos)}")
+
+    def importar(self, cuerpo, formato="ndjson", **parametros):
+        consulta = "&".join(f"{k}={v}" for k, v in {"formato": formato, **parametros}.items())
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f"/api/publicaciones/importar/?{consulta}", data=cuerpo, content_type="application/octet-stream"
+            )
+
+    def errores(self, respuesta):
+        return {e["fila"]: set(e["errores"]) for e in respuesta.json()["errores"]}
+
+
+class ImportacionTests(ImportacionBase):
+    # ------------------ 🔹 ERRORES POR FILA ------------------
+    def test_ndjson_errores_por_linea(self):
+        tomado = self.publicacion("Existente").pk
+        repetido = str(uuid.uuid4())
+        manana = (timezone.now() + timedelta(days=1)).isoformat()
+        cuerpo = ndjson(
+            {"titulo": "Buena", "contenido": "c", "categoria": str(self.categoria.pk)},  # 1
+            b"{no es json",  # 2
+            b"",  # 3: vacía, no cuenta
+            [1, 2],  # 4
+            {"contenido": "sin título"},  # 5
+            {"titulo": "Futura", "contenido": "c", "fecha_publicacion": manana},  # 6
+            {"titulo": "Sin categoría", "contenido": "c", "categoria": str(uuid.uuid4())},  # 7
+            {"id": str(tomado), "titulo": "Id tomado", "contenido": "c"},  # 8
+            {"id": repetido, "titulo": "Primera", "contenido": "c"},  # 9
+            {"id": repetido, "titulo": "Repetida", "contenido": "c"},  # 10
+            {"titulo": "Estado raro", "contenido": "c", "estado": "secreto"},  # 11
+        )
+        respuesta = self.importar(cuerpo)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        reporte = respuesta.json()
+        self.assertEqual((reporte["filas"], reporte["validas"], reporte["creadas"]), (10, 2, 2))
+        self.assertEqual(
+            self.errores(respuesta),
+            {2: {"json"}, 4: {"fila"}, 5: {"titulo"}, 6: {"fecha_publicacion"}, 7: {"categoria"}, 8: {"id"},
+             10: {"id"}, 11: {"estado"}},
+        )
+        creadas = Publicacion.objects.exclude(pk=tomado)
+        self.assertEqual(sorted(creadas.values_list("titulo", flat=True)), ["Buena", "Primera"])
+        for publicacion in creadas:
+            self.assertEqual(str(publicacion.autor_id), self.usuario_id)
+            self.assertEqual(str(publicacion.autor_institucion_id), self.institucion_id)
+            self.assertEqual(publicacion.tipo_autor, "institucion")
+
+    def test_csv_errores_por_registro(self):
+        cuerpo = csv_de(
+            ("titulo", "contenido", "categoria", "estado"),
+            ("Buena", "Con, comas y\n\"saltos\"", str(self.categoria.pk), ""),  # registro 2 (dos líneas)
+            ("", "sin título", "", ""),  # 3
+            ("Otra", "c", "no-es-uuid", ""),  # 4
+            ("Borrador", "c", "", "borrador"),  # 5
+        )
+        respuesta = self.importar(cuerpo, "csv")
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(self.errores(respuesta), {3: {"titulo"}, 4: {"categoria"}})
+        buena = Publicacion.objects.get(titulo="Buena")
+        self.assertEqual(buena.contenido, "Con, comas y\n\"saltos\"")
+        self.assertEqual(buena.categoria_id, self.categoria.pk)
+        self.assertEqual(Publicacion.objects.get(titulo="Borrador").estado, "borrador")
+
+    def test_csv_ilegible_corta_la_importacion(self):
+        cuerpo = csv_de(("titulo", "contenido"), ("Antes", "c")) + "Después,ñ\n".encode("latin-1")
+        respuesta = self.importar(cuerpo, "csv")
+        self.assertEqual(self.errores(respuesta), {3: {"csv"}})
+        # Lo leído antes del corte se importa
+        self.assertEqual(list(Publicacion.objects.values_list("titulo", flat=True)), ["Antes"])
+
+    @override_settings(NEWS_IMPORTACION_MAX_LINEA=64)
+    def test_linea_demasiado_larga(self):
+        cuerpo = ndjson({"titulo": "x" * 100, "contenido": "c"}, {"titulo": "Corta", "contenido": "c"})
+        respuesta = self.importar(cuerpo)
+        self.assertEqual(self.errores(respuesta), {1: {"linea"}})
+        self.assertEqual(list(Publicacion.objects.values_list("titulo", flat=True)), ["Corta"])
+
+    def test_todo_invalido_es_400(self):
+        respuesta = self.importar(ndjson({"contenido": "sin título"}, b"[]"))
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json()["validas"], 0)
+
+    def test_validar_no_escribe(self):
+        cuerpo = ndjson(
+            {"titulo": "A", "contenido": "c"}, {"titulo": "B", "contenido": "c", "categoria": str(uuid.uuid4())}
+        )
+        respuesta = self.importar(cuerpo, validar=1)
+        reporte = respuesta.json()
+        self.assertEqual((reporte["validar"], reporte["validas"], reporte["creadas"]), (True, 1, 0))
+        self.assertEqual(set(self.errores(respuesta)), {2})
+        self.assertFalse(Publicacion.objects.exists())
+
+    @override_settings(NEWS_IMPORTACION_MAX_FILAS=3, NEWS_IMPORTACION_MAX_ERRORES=1)
+    def test_limites(self):
+        filas = [{"contenido": "sin título"}] * 2 + [{"titulo": "ok", "contenido": "c"}] * 3
+        respuesta = self.importar(ndjson(*filas))
+        reporte = respuesta.json()
+        self.assertEqual((reporte["filas"], reporte["creadas"], reporte["truncado"]), (3, 1, True))
+        self.assertEqual((reporte["errores_total"], len(reporte["errores"])), (2, 1))
+
+    def test_formato_y_permisos(self):
+        respuesta = self.client.post("/api/publicaciones/importar/", b"{}", content_type="text/plain")
+        self.assertEqual(respuesta.status_code, 415)
+        self.como("estudiante")
+        self.assertEqual(self.importar(ndjson({"titulo": "x", "contenido": "c"})).status_code, 403)
+
+    # ------------------ 🔹 LOTES ------------------
+    @override_settings(NEWS_IMPORTACION_LOTE=2)
+    def test_un_lote_que_falla_no_se_guarda(self):
+        registrar = importacion.registrar_cambios
+        llamadas = []
+
+        def falla_en_el_segundo(*args, **kwargs):
+            # Ya se hizo el INSERT del lote: el fallo tiene que deshacerlo
+            llamadas.append(args)
+            if len(llamadas) == 2:
+                raise IntegrityError("duplicate key value violates unique constraint")
+            return registrar(*args, **kwargs)
+
+        filas = [{"titulo": f"Fila {i}", "contenido": "c"} for i in range(1, 6)]
+        with mock.patch.object(importacion, "registrar_cambios", falla_en_el_segundo):
+            respuesta = self.importar(ndjson(*filas))
+        reporte = respuesta.json()
+        self.assertEqual((reporte["filas"], reporte["validas"], reporte["creadas"]), (5, 3, 3))
+        self.assertEqual(self.errores(respuesta), {3: {"lote"}, 4: {"lote"}})
+        self.assertEqual(
+            sorted(Publicacion.objects.values_list("titulo", flat=True)), ["Fila 1", "Fila 2", "Fila 5"]
+        )
+
+    @override_settings(NEWS_IMPORTACION_LOTE=2)
+    def test_filas_invalidas_no_tumban_el_lote(self):
+        filas = [{"titulo": "A", "contenido": "c"}, {"titulo": "B", "categoria": str(uuid.uuid4()), "contenido": "c"},
+                 {"titulo": "C", "contenido": "c"}]
+        reporte = self.importar(ndjson(*filas)).json()
+        self.assertEqual(reporte["creadas"], 2)
+        self.assertEqual(sorted(Publicacion.objects.values_list("titulo", flat=True)), ["A", "C"])
+
+    def test_invalida_el_feed_y_deja_score(self):
+        self.assertEqual(self.titulos(self.client.get("/api/publicaciones/")), [])
+        self.importar(ndjson({"titulo": "Importada", "contenido": "c"}))
+        self.assertEqual(self.titulos(self.client.get("/api/publicaciones/")), ["Importada"])
+        self.assertGreater(Publicacion.objects.get().score, 0)
+
+
+class ExportacionTests(ImportacionBase):
+    def setUp(self):
+        super().setUp()
+        self.propia = self.publicacion(
+            "Propia", "Texto con \"comillas\", comas\ny saltos — ñ 🎉", hace=3,
+            categoria=self.categoria, autor_id=self.usuario_id, autor_institucion_id=self.institucion_id,
+            tipo_autor="institucion",
+        )
+        self.borrador_propio = self.publicacion(
+            "Borrador propio", estado="borrador", autor_id=self.usuario_id, autor_institucion_id=self.institucion_id,
+        )
+        self.ajena = self.publicacion("Ajena publicada", hace=5)
+        self.borrador_ajeno = self.publicacion("Borrador ajeno", estado="borrador")
+        # Misma fecha: el orden del volcado desempata por id
+        Publicacion.objects.filter(pk__in=[self.borrador_propio.pk, self.borrador_ajeno.pk]).update(
+            fecha_publicacion=timezone.now() - timedelta(hours=1)
+        )
+
+    def exportar(self, formato="ndjson", **parametros):
+        respuesta = self.client.get("/api/publicaciones/exportar/", {"formato": formato, **parametros})
+        self.assertEqual(respuesta.status_code, 200)
+        return b"".join(respuesta.streaming_content)
+
+    def registros(self, crudo, formato="ndjson"):
+        if formato == "csv":
+            return list(csv.DictReader(io.StringIO(crudo.decode("utf-8"))))
+        return [json.loads(linea) for linea in crudo.splitlines()]
+
+    def estado(self):
+        return {p[0]: p[1:] for p in Publicacion.objects.values_list(*CAMPOS)}
+
+    # ------------------ 🔹 VISIBILIDAD ------------------
+    def test_solo_lo_visible_para_la_institucion(self):
+        for formato in ("ndjson", "csv"):
+            with self.subTest(formato=formato):
+                titulos = [r["titulo"] for r in self.registros(self.exportar(formato), formato)]
+                self.assertEqual(titulos, ["Ajena publicada", "Propia", "Borrador propio"])
+
+    def test_filtros_del_listado(self):
+        titulos = [r["titulo"] for r in self.registros(self.exportar(estado="borrador"))]
+        self.assertEqual(titulos, ["Borrador propio"])
+        titulos = [r["titulo"] for r in self.registros(self.exportar(institucion_id=self.institucion_id))]
+        self.assertEqual(titulos, ["Propia", "Borrador propio"])
+
+    def test_admin_exporta_todo_y_estudiante_no(self):
+        self.como("admin")
+        self.assertEqual(len(self.registros(self.exportar())), 4)
+        self.como("estudiante")
+        self.assertEqual(self.client.get("/api/publicaciones/exportar/").status_code, 403)
+
+    def test_formato_desconocido(self):
+        self.assertEqual(self.client.get("/api/publicaciones/exportar/", {"formato": "xml"}).status_code, 400)
+
+    # ------------------ 🔹 IDA Y VUELTA ------------------
+    def test_ida_y_vuelta(self):
+        for formato in ("ndjson", "csv"):
+            with self.subTest(formato=formato):
+                self.como("admin")
+                antes = self.estado()
+                volcado = self.exportar(formato)
+                Publicacion.objects.all().delete()
+                respuesta = self.importar(volcado, formato)
+                self.assertEqual(respuesta.json()["creadas"], 4, respuesta.content)
+                self.assertEqual(self.estado(), antes)
+                # El volcado de lo importado es el mismo, salvo autor y fechas de edición
+                otra = self.registros(self.exportar(formato), formato)
+                for registro, original in zip(otra, self.registros(volcado, formato)):
+                    for campo in ("id", "titulo", "contenido", "categoria", "estado", "fecha_publicacion"):
+                        self.assertEqual(registro[campo], original[campo])
+
+    @override_settings(NEWS_EXPORTACION_LOTE=1)
+    def test_por_bloques(self):
+        self.como("admin")
+        respuesta = self.client.get("/api/publicaciones/exportar/", {"formato": "csv"})
+        bloques = list(respuesta.streaming_content)
+        self.assertEqual(len(bloques), 4)  # la cabecera va con la primera fila
+        self.assertEqual(respuesta["Cache-Control"], "no-store")
+
+    def test_por_llave_con_empates(self):
+        # Lo que usa Postgres detrás de pgbouncer (sin cursores de servidor)
+        q = Publicacion.objects.order_by("fecha_publicacion", "id").values_list(*(c for _, c in exportacion.COLUMNAS))
+        self.assertEqual(list(exportacion._por_llave(q, 1)), list(q))
+        self.assertEqual(list(exportacion._por_llave(q, 3)), list(q))
+
+    def test_comandos(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "volcado.csv")
+            call_command("exportar_publicaciones", salida=ruta, formato="csv", stdout=StringIO())
+            antes = self.estado()
+            Publicacion.objects.all().delete()
+            salida = StringIO()
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command("importar_publicaciones", ruta, autor=str(uuid.uuid4()), lote=2, stdout=salida)
+        self.assertIn("4 de 4 publicaciones creadas", salida.getvalue())
+        self.assertEqual(self.estado(), antes)
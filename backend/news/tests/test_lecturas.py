@@ -0,0 +1,87 @@
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from news.models import Comentario
+from news.serializers import ComentarioSerializer
+
+from .base import BaseNewsTest, token
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class LecturasTests(BaseNewsTest):
+    """ Las lecturas hacen las mismas consultas con una publicación o comentario que con muchos. """
+
+    def post(self, url, **datos):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token()}")
+        respuesta = self.client.post(url, datos, format="json")
+        self.client.credentials()
+        self.assertIn(respuesta.status_code, (200, 201), respuesta.content)
+        return respuesta
+
+    def poblar(self, titulo, comentarios=2, likes=1):
+        """ Publicación con `comentarios` raíces, cada una con una respuesta que a su vez tiene otra. """
+        pub = self.publicacion(titulo)
+        for i in range(comentarios):
+            raiz = self.post("/api/comentarios/", publicacion=str(pub.pk), contenido=f"{titulo} {i}").json()["id"]
+            self.post(f"/api/comentarios/{raiz}/responder/", contenido=f"{titulo} {i}.1")
+            respuesta = Comentario.objects.get(contenido=f"{titulo} {i}.1").pk
+            self.post(f"/api/comentarios/{respuesta}/responder/", contenido=f"{titulo} {i}.1.1")
+        for _ in range(likes):
+            self.post(f"/api/publicaciones/{pub.pk}/like_toggle/")
+        return pub
+
+    def consultas(self, url):
+        with CaptureQueriesContext(connections["default"]) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return len(consultas), respuesta.json()
+
+    def hilo(self, comentarios, contenido):
+        """ Contenidos de la cadena raíz → respuesta → respuesta a la respuesta. """
+        comentario = next(c for c in comentarios if c["contenido"] == contenido)
+        cadena = [comentario["contenido"]]
+        while comentario["respuestas"]:
+            comentario = comentario["respuestas"][0]
+            cadena.append(comentario["contenido"])
+        return cadena
+
+    def test_feed_no_crece_con_las_publicaciones(self):
+        self.poblar("Uno")
+        una, _ = self.consultas("/api/publicaciones/")
+        for titulo in ("Dos", "Tres", "Cuatro"):
+            self.poblar(titulo, comentarios=3, likes=2)
+        muchas, _ = self.consultas("/api/publicaciones/")
+        self.assertEqual(muchas, una)
+
+    def test_conteos_anotados(self):
+        self.poblar("Uno", comentarios=2, likes=3)
+        self.poblar("Dos", comentarios=0, likes=0)
+        _, datos = self.consultas("/api/publicaciones/")
+        publicaciones = datos.get("results", datos) if isinstance(datos, dict) else datos
+        conteos = {p["titulo"]: (p["comentarios_count"], p["likes_count"]) for p in publicaciones}
+        self.assertEqual(conteos, {"Uno": (6, 3), "Dos": (0, 0)})
+
+    def test_detalle_no_crece_con_los_comentarios(self):
+        pocos, muchos = self.poblar("Pocos", comentarios=1), self.poblar("Muchos", comentarios=5)
+        self.assertEqual(
+            self.consultas(f"/api/publicaciones/{muchos.pk}/")[0], self.consultas(f"/api/publicaciones/{pocos.pk}/")[0]
+        )
+
+    def test_detalle_con_respuestas_anidadas(self):
+        pub = self.poblar("Uno", comentarios=1)
+        _, datos = self.consultas(f"/api/publicaciones/{pub.pk}/")
+        self.assertEqual(self.hilo(datos["comentarios"], "Uno 0"), ["Uno 0", "Uno 0.1", "Uno 0.1.1"])
+        self.assertTrue(all(c["usuario_nombre"] for c in datos["comentarios"]))
+
+    def test_comentarios_no_crecen_con_el_hilo(self):
+        pocos, muchos = self.poblar("Pocos", comentarios=1), self.poblar("Muchos", comentarios=5)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token()}")  # de-publicacion pide sesión
+        for url in ("/api/publicaciones/{}/comentarios/", "/api/comentarios/de-publicacion/{}/"):
+            with self.subTest(url=url):
+                self.assertEqual(self.consultas(url.format(muchos.pk))[0], self.consultas(url.format(pocos.pk))[0])
+
+    def test_serializer_sin_contexto(self):
+        self.poblar("Uno", comentarios=1)
+        raiz = Comentario.objects.get(contenido="Uno 0")
+        self.assertEqual(self.hilo([ComentarioSerializer(raiz).data], "Uno 0"), ["Uno 0", "Uno 0.1", "Uno 0.1.1"])
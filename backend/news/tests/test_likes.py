@@ -0,0 +1,99 @@
+import uuid
+
+from django.test import override_settings
+
+from news.models import Like, Publicacion
+
+from .base import BaseNewsTest, token
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class LikesTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.pub = self.publicacion("Feria vocacional")
+        self.url = f"/api/publicaciones/{self.pub.pk}/like/"
+        self.usuario_id = uuid.uuid4()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token(id=str(self.usuario_id))}")
+
+    def like_de_otro(self, pub=None):
+        Like.objects.create(publicacion=pub or self.pub, usuario_id=uuid.uuid4())
+        Publicacion.objects.filter(pk=(pub or self.pub).pk).update(likes_count=1)
+
+    def llamar(self, metodo, url=None):
+        respuesta = getattr(self.client, metodo)(url or self.url)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        datos = respuesta.json()
+        return datos["liked"], datos["likes_count"]
+
+    def test_put_y_delete_idempotentes(self):
+        self.like_de_otro()
+        self.assertEqual([self.llamar("put") for _ in range(2)], [(True, 2)] * 2)
+        self.assertEqual(Like.objects.filter(usuario_id=self.usuario_id).count(), 1)
+        self.assertEqual([self.llamar("delete") for _ in range(2)], [(False, 1)] * 2)
+        self.assertFalse(Like.objects.filter(usuario_id=self.usuario_id).exists())
+
+    def test_toggle_devuelve_el_conteo(self):
+        self.like_de_otro()
+        url = f"/api/publicaciones/{self.pub.pk}/like_toggle/"
+        self.assertEqual([self.llamar("post", url) for _ in range(3)], [(True, 2), (False, 1), (True, 2)])
+
+    def test_toggle_y_put_se_combinan(self):
+        self.llamar("put")
+        url = f"/api/publicaciones/{self.pub.pk}/like_toggle/"
+        self.assertEqual(self.llamar("post", url), (False, 0))
+
+    def test_publicacion_no_visible(self):
+        borrador = self.publicacion("Borrador", estado="borrador")
+        for metodo in ("put", "delete"):
+            with self.subTest(metodo=metodo):
+                respuesta = getattr(self.client, metodo)(f"/api/publicaciones/{borrador.pk}/like/")
+                self.assertEqual(respuesta.status_code, 404)
+        self.assertFalse(Like.objects.exists())
+
+    def test_sin_autenticar(self):
+        self.client.credentials()
+        self.assertIn(self.client.put(self.url).status_code, (401, 403))
+        self.assertFalse(Like.objects.exists())
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class LikesEstadoTests(BaseNewsTest):
+    URL = "/api/publicaciones/likes-estado/"
+
+    def setUp(self):
+        super().setUp()
+        self.usuario_id = uuid.uuid4()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token(id=str(self.usuario_id))}")
+        self.con_like = self.publicacion("Con like")
+        self.sin_like = self.publicacion("Sin like")
+        self.oculta = self.publicacion("Volvió a borrador")
+        for pub in (self.con_like, self.oculta):
+            Like.objects.create(publicacion=pub, usuario_id=self.usuario_id)
+        Publicacion.objects.filter(pk=self.oculta.pk).update(estado="borrador")
+
+    def estado(self, *ids):
+        respuesta = self.client.get(self.URL, {"ids": ",".join(str(i) for i in ids)})
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()
+
+    def test_estado_en_una_consulta(self):
+        inexistente = uuid.uuid4()
+        with self.assertNumQueries(1):
+            estado = self.estado(self.con_like.pk, self.sin_like.pk, inexistente)
+        self.assertEqual(estado, {str(self.con_like.pk): True, str(self.sin_like.pk): False, str(inexistente): False})
+
+    def test_lo_que_no_se_ve_sale_en_falso(self):
+        self.assertEqual(self.estado(self.oculta.pk), {str(self.oculta.pk): False})
+        # Quien sí la ve (admin) ve su like
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token('admin', id=str(self.usuario_id))}")
+        self.assertEqual(self.estado(self.oculta.pk), {str(self.oculta.pk): True})
+
+    def test_sin_ids(self):
+        self.assertEqual(self.client.get(self.URL).json(), {})
+
+    def test_ids_invalidos_o_demasiados(self):
+        self.assertEqual(self.client.get(self.URL, {"ids": "no-es-uuid"}).status_code, 400)
+        with self.settings(NEWS_MAX_PAGE_SIZE=2):
+            ids = ",".join(str(uuid.uuid4()) for _ in range(3))
+            self.assertEqual(self.client.get(self.URL, {"ids": ids}).status_code, 400)
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import AsyncClient, SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from news.almacenamiento import AlmacenamientoLocal, es_nombre_por_contenido
+from news.media import CACHE_INMUTABLE
+
+
+class MediaTests(SimpleTestCase):
+    CONTENIDO = bytes(range(256)) * 1024  # 256 KiB: varios trozos de lectura
+
+    def setUp(self):
+        raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, raiz)
+        ajustes = override_settings(MEDIA_ROOT=raiz, NEWS_MEDIA_X_ACCEL_PREFIX="")
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        ruta = os.path.join(raiz, "portada.jpg")
+        with open(ruta, "wb") as archivo:
+            archivo.write(self.CONTENIDO)
+        self.url = "/media/portada.jpg"
+        self.mtime = os.stat(ruta).st_mtime
+
+    def cuerpo(self, respuesta):
+        return b"".join(respuesta.streaming_content)
+
+    def test_rango(self):
+        respuesta = self.client.get(self.url, headers={"Range": "bytes=10-19"})
+        self.assertEqual(respuesta.status_code, 206)
+        self.assertEqual(respuesta["Content-Range"], f"bytes 10-19/{len(self.CONTENIDO)}")
+        self.assertEqual(self.cuerpo(respuesta), self.CONTENIDO[10:20])
+
+    def test_if_range_vigente_respeta_el_rango(self):
+        etag = self.client.get(self.url)["ETag"]
+        for validador in (etag, http_date(self.mtime)):
+            with self.subTest(validador=validador):
+                respuesta = self.client.get(self.url, headers={"Range": "bytes=-5", "If-Range": validador})
+                self.assertEqual((respuesta.status_code, self.cuerpo(respuesta)), (206, self.CONTENIDO[-5:]))
+
+    def test_if_range_viejo_devuelve_todo(self):
+        for validador in ('"otra-version"', "W/" + self.client.get(self.url)["ETag"], http_date(self.mtime - 60)):
+            with self.subTest(validador=validador):
+                respuesta = self.client.get(self.url, headers={"Range": "bytes=0-9", "If-Range": validador})
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertNotIn("Content-Range", respuesta)
+                self.assertEqual(self.cuerpo(respuesta), self.CONTENIDO)
+
+    async def test_asgi_iterador_asincrono(self):
+        cliente = AsyncClient()
+        respuesta = await cliente.get(self.url, headers={"Range": "bytes=100-"})
+        self.assertEqual(respuesta.status_code, 206)
+        self.assertTrue(respuesta.is_async)
+        cuerpo = b"".join([trozo async for trozo in respuesta])
+        self.assertEqual(cuerpo, self.CONTENIDO[100:])
+
+    def test_rango_insatisfacible(self):
+        respuesta = self.client.get(self.url, headers={"Range": f"bytes={len(self.CONTENIDO)}-"})
+        self.assertEqual(respuesta.status_code, 416)
+        self.assertEqual(respuesta["Content-Range"], f"bytes */{len(self.CONTENIDO)}")
+
+    def test_nombre_viejo_y_304(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta["Cache-Control"], f"public, max-age={settings.NEWS_MEDIA_MAX_AGE}")
+        self.assertEqual(self.cuerpo(respuesta), self.CONTENIDO)
+        otra = self.client.get(self.url, headers={"If-None-Match": respuesta["ETag"]})
+        self.assertEqual(otra.status_code, 304)
+
+    def test_nombre_por_contenido_inmutable(self):
+        nombre = AlmacenamientoLocal().save("publicaciones/foto.JPG", ContentFile(b"bytes de la foto"))
+        respuesta = self.client.get(f"/media/{nombre}")
+        self.assertEqual(respuesta["Cache-Control"], CACHE_INMUTABLE)
+        self.assertEqual(respuesta["ETag"], f'"{os.path.splitext(os.path.basename(nombre))[0]}"')
+
+    def test_fuera_de_media_o_inexistente(self):
+        for url in ("/media/no-existe.jpg", "/media/../manage.py"):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(NEWS_MEDIA_X_ACCEL_PREFIX="/interno/")
+    def test_x_accel_redirect(self):
+        respuesta = self.client.get(self.url, headers={"Range": "bytes=10-19"})
+        self.assertEqual((respuesta.status_code, respuesta.content), (200, b""))
+        self.assertEqual(respuesta["X-Accel-Redirect"], "/interno/portada.jpg")
+
+
+class AlmacenamientoTests(SimpleTestCase):
+    def setUp(self):
+        raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, raiz)
+        self.storage = AlmacenamientoLocal(location=raiz)
+
+    def test_mismo_contenido_un_solo_archivo(self):
+        primero = self.storage.save("publicaciones/a.JPG", ContentFile(b"hola"))
+        segundo = self.storage.save("publicaciones/b.jpg", ContentFile(b"hola"))
+        self.assertEqual(primero, segundo)
+        self.assertTrue(primero.startswith("publicaciones/") and primero.endswith(".jpg"))
+        self.assertTrue(es_nombre_por_contenido(primero))
+        self.assertEqual(self.storage.listdir("publicaciones")[1], [os.path.basename(primero)])
+
+    def test_otro_contenido_otro_nombre(self):
+        self.assertNotEqual(
+            self.storage.save("publicaciones/a.jpg", ContentFile(b"uno")),
+            self.storage.save("publicaciones/a.jpg", ContentFile(b"dos")),
+        )
+        self.assertFalse(es_nombre_por_contenido("publicaciones/portada.jpg"))
@@ -0,0 +1,120 @@
+import base64
+import json
+import uuid
+from datetime import timedelta
+
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from news.models import Comentario, Publicacion
+from news.pagination import CursorKeysetPagination
+
+from .base import BaseNewsTest, token
+
+
+def cursor(datos):
+    crudo = json.dumps(datos).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class PaginacionKeysetTests(BaseNewsTest):
+    URL = "/api/publicaciones/"
+
+    def setUp(self):
+        super().setUp()
+        # 7 publicaciones con la misma fecha (empates) entre dos con fecha propia
+        self.nueva = self.publicacion("Nueva", hace=1)
+        empatadas = [self.publicacion(f"Empatada {i}") for i in range(7)]
+        self.vieja = self.publicacion("Vieja", hace=48)
+        fecha = timezone.now() - timedelta(hours=5)
+        Publicacion.objects.filter(pk__in=[p.pk for p in empatadas]).update(fecha_publicacion=fecha)
+        # Orden esperado: fecha desc y, dentro del empate, id desc
+        self.orden = [self.nueva.pk, *sorted((p.pk for p in empatadas), reverse=True), self.vieja.pk]
+
+    def pagina(self, url, **parametros):
+        respuesta = self.client.get(url, parametros)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()
+
+    def ids(self, pagina):
+        return [uuid.UUID(p["id"]) for p in pagina["results"]]
+
+    def test_hacia_adelante_y_atras_con_empates(self):
+        paginas = [self.pagina(self.URL, page_size=3)]
+        while paginas[-1]["next"]:
+            paginas.append(self.pagina(paginas[-1]["next"]))
+        self.assertEqual([len(p["results"]) for p in paginas], [3, 3, 3])
+        self.assertEqual([i for p in paginas for i in self.ids(p)], self.orden)
+        self.assertIsNone(paginas[0]["previous"])
+
+        # De vuelta desde la última: las mismas páginas, en el mismo orden interno
+        atras = [paginas[-1]]
+        while atras[-1]["previous"]:
+            atras.append(self.pagina(atras[-1]["previous"]))
+        self.assertEqual([self.ids(p) for p in reversed(atras)], [self.ids(p) for p in paginas])
+        self.assertIsNotNone(atras[-1]["next"])
+
+    def test_alta_entre_paginas_no_repite_ni_salta(self):
+        primera = self.pagina(self.URL, page_size=4)
+        self.publicacion("Recién publicada")
+        segunda = self.pagina(primera["next"])
+        self.assertEqual(self.ids(primera) + self.ids(segunda), self.orden[:8])
+
+    def test_sin_conteo(self):
+        with CaptureQueriesContext(connections["default"]) as consultas:
+            pagina = self.pagina(self.URL, page_size=3)
+        self.assertEqual(set(pagina), {"next", "previous", "results"})
+        # Los conteos anotados son subconsultas; lo que no debe haber es un SELECT COUNT de la página
+        self.assertFalse([c for c in consultas if c["sql"].upper().startswith("SELECT COUNT(")])
+
+    def test_cursor_invalido_es_400(self):
+        valido = self.pagina(self.URL, page_size=3)["next"].split("cursor=")[1]
+        malos = {
+            "basura": "%%%no-base64",
+            "no_json": base64.urlsafe_b64encode(b"no es json").decode("ascii"),
+            "sin_posicion": cursor({"x": 1}),
+            "no_es_objeto": cursor([1, 2]),
+            "largo": cursor({"p": ["2026-01-01T00:00:00+00:00"]}),
+            "fecha": cursor({"p": ["ayer", str(uuid.uuid4())]}),
+            "uuid": cursor({"p": ["2026-01-01T00:00:00+00:00", "no-uuid"]}),
+            "tipos": cursor({"p": [[1], {"a": 1}]}),
+            "manipulado": valido[:-2] + ("AA" if not valido.endswith("AA") else "BB"),
+        }
+        for nombre, malo in malos.items():
+            with self.subTest(nombre):
+                respuesta = self.client.get(self.URL, {"cursor": malo})
+                self.assertEqual(respuesta.status_code, 400, respuesta.content)
+
+    def test_cursor_por_tendencia(self):
+        malo = cursor({"p": ["x", str(uuid.uuid4())]})
+        respuesta = self.client.get(self.URL, {"orden": "tendencia", "cursor": malo})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_anotaciones_solo_numericas(self):
+        # p. ej. la relevancia de la búsqueda en Postgres: un texto no llega al SQL
+        self.assertEqual(CursorKeysetPagination._desde_json(Publicacion, "relevancia", 0.5), 0.5)
+        for valor in ("x", True, None, [1]):
+            with self.subTest(valor=valor), self.assertRaises(ValueError):
+                CursorKeysetPagination._desde_json(Publicacion, "relevancia", valor)
+
+    def test_page_size_acotado(self):
+        with self.settings(NEWS_MAX_PAGE_SIZE=4):
+            self.assertEqual(len(self.pagina(self.URL, page_size=50)["results"]), 4)
+        self.assertEqual(len(self.pagina(self.URL, page_size="x")["results"]), 9)
+
+    def test_comentarios_en_orden_de_conversacion(self):
+        pub = self.publicacion("Con comentarios")
+        creados = [
+            Comentario.objects.create(publicacion=pub, usuario_id=uuid.uuid4(), contenido=str(i)) for i in range(5)
+        ]
+        Comentario.objects.update(fecha_comentario=timezone.now())  # todos empatados
+        url = f"/api/comentarios/de-publicacion/{pub.pk}/"
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token()}")
+        paginas = [self.pagina(url, page_size=2)]
+        while paginas[-1]["next"]:
+            paginas.append(self.pagina(paginas[-1]["next"]))
+        self.assertEqual(self.ids({"results": [c for p in paginas for c in p["results"]]}),
+                         sorted(c.pk for c in creados))
@@ -0,0 +1,95 @@
+import uuid
+
+from django.test import override_settings
+
+from news.instrumentacion import PresupuestoExcedido
+from news.models import Comentario
+from news.testing import PresupuestoConsultasMixin
+
+from .base import BaseNewsTest, token
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class PresupuestosTests(PresupuestoConsultasMixin, BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.pub = self.publicacion("Feria vocacional", "Stands de todas las carreras")
+        for i in range(3):
+            self.publicacion(f"Aviso {i}", hace=i + 1)
+        self.comentario = Comentario.objects.create(publicacion=self.pub, usuario_id=uuid.uuid4(), contenido="Hola")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token()}")
+
+    def test_listado(self):
+        for vista in ("completa", "compacta"):
+            with self.subTest(vista=vista), self.assertPresupuesto("publicacion.list"):
+                self.assertEqual(self.client.get("/api/publicaciones/", {"vista": vista}).status_code, 200)
+
+    def test_detalle(self):
+        with self.assertPresupuesto("publicacion.retrieve"):
+            self.assertEqual(self.client.get(f"/api/publicaciones/{self.pub.pk}/").status_code, 200)
+
+    def test_comentarios_de_la_publicacion(self):
+        with self.assertPresupuesto("publicacion.listar_comentarios"):
+            self.assertEqual(self.client.get(f"/api/publicaciones/{self.pub.pk}/comentarios/").status_code, 200)
+
+    def test_like_toggle(self):
+        # Dar y quitar: los dos caminos del toggle
+        for liked in (True, False):
+            with self.subTest(liked=liked), self.assertPresupuesto("publicacion.like_toggle"):
+                respuesta = self.client.post(f"/api/publicaciones/{self.pub.pk}/like_toggle/")
+            self.assertEqual(respuesta.json()["liked"], liked)
+
+    def test_like_idempotente(self):
+        for metodo in ("put", "put", "delete", "delete"):
+            with self.subTest(metodo=metodo), self.assertPresupuesto("publicacion.like"):
+                respuesta = getattr(self.client, metodo)(f"/api/publicaciones/{self.pub.pk}/like/")
+            self.assertEqual(respuesta.status_code, 200)
+
+    def test_likes_estado(self):
+        with self.assertPresupuesto("publicacion.likes_estado"):
+            respuesta = self.client.get("/api/publicaciones/likes-estado/", {"ids": str(self.pub.pk)})
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_crear_comentario(self):
+        with self.assertPresupuesto("comentario.create"):
+            respuesta = self.client.post(
+                "/api/comentarios/", {"publicacion": str(self.pub.pk), "contenido": "Me interesa"}, format="json"
+            )
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+
+    def test_responder(self):
+        with self.assertPresupuesto("comentario.responder"):
+            respuesta = self.client.post(
+                f"/api/comentarios/{self.comentario.pk}/responder/", {"contenido": "¿Dónde?"}, format="json"
+            )
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+
+    def test_excedido_falla(self):
+        with self.assertRaises(AssertionError):
+            with self.assertPresupuesto("publicacion.list", maximo=0):
+                self.client.get("/api/publicaciones/")
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class InstrumentacionTests(BaseNewsTest):
+    @override_settings(NEWS_SERVER_TIMING=True)
+    def test_server_timing(self):
+        cabecera = self.client.get("/api/publicaciones/")["Server-Timing"]
+        self.assertRegex(cabecera, r'^db;dur=[\d.]+;desc="\d+ consultas", ser;dur=[\d.]+, total;dur=[\d.]+$')
+
+    @override_settings(NEWS_PRESUPUESTO_MODO="error", NEWS_PRESUPUESTOS_CONSULTAS={"publicacion.list": 0})
+    def test_modo_error(self):
+        with self.assertRaises(PresupuestoExcedido):
+            self.client.get("/api/publicaciones/")
+
+    @override_settings(DEBUG=False, NEWS_METRICAS_TOKEN="")
+    def test_metricas_ocultas_sin_token(self):
+        self.assertEqual(self.client.get("/internal/metricas/").status_code, 404)
+
+    @override_settings(NEWS_METRICAS_TOKEN="secreto")
+    def test_metricas_con_token(self):
+        self.client.get("/api/publicaciones/")
+        self.assertEqual(self.client.get("/internal/metricas/").status_code, 403)
+        respuesta = self.client.get("/internal/metricas/", headers={"Authorization": "Bearer secreto"})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('accion="publicacion.list"', respuesta.content.decode())
@@ -0,0 +1,103 @@
+import time
+import uuid
+from unittest import mock
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.test import modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITransactionTestCase
+
+from news import replicas
+from news.models import Publicacion
+
+from .base import DatosNews, token
+
+
+@override_settings(
+    DATABASE_ROUTERS=["news.replicas.RouterReplicas"],
+    NEWS_REPLICA_CHEQUEO=0,
+    NEWS_CACHE_RESPUESTAS_TTL=0,
+)
+@modify_settings(MIDDLEWARE={"append": "news.replicas.ReplicasMiddleware"})
+class ReplicasTests(DatosNews, APITransactionTestCase):
+    # La "réplica" no replica nada: lo que está solo en default no se ve desde replica_1.
+    # Sin TestCase: dentro de su transacción el router lee siempre de la primaria.
+    databases = {"default", "replica_1"}
+
+    def setUp(self):
+        super().setUp()
+        replicas.replicas.estados.clear()
+        self.primaria = self.publicacion("Solo en la primaria")
+        # flush no limpia replica_1: el router no deja migrar (ni vaciar) réplicas
+        self.addCleanup(lambda: Publicacion.objects.using("replica_1").all().delete())
+        Publicacion.objects.using("replica_1").bulk_create([
+            Publicacion(titulo="Solo en la réplica", contenido="x", autor_id=uuid.uuid4(),
+                        tipo_autor="usuario", estado="publicado"),
+        ])
+
+    def consultas(self, peticion):
+        """ (respuesta, consultas en default, consultas en replica_1) """
+        with CaptureQueriesContext(connections["default"]) as primaria, \
+                CaptureQueriesContext(connections["replica_1"]) as replica:
+            respuesta = peticion()
+        return respuesta, len(primaria), len(replica)
+
+    def test_get_lee_de_la_replica(self):
+        respuesta, en_primaria, en_replica = self.consultas(lambda: self.client.get("/api/publicaciones/"))
+        self.assertEqual(self.titulos(respuesta), ["Solo en la réplica"])
+        self.assertEqual(en_primaria, 0)
+        self.assertGreater(en_replica, 0)
+
+    def test_escritura_fija_la_primaria_el_resto_de_la_peticion(self):
+        router = replicas.RouterReplicas()
+        marca = replicas._lectura.set(replicas.Lectura(primaria=False))
+        try:
+            self.assertEqual(router.db_for_read(Publicacion), "replica_1")
+            self.assertEqual(router.db_for_write(Publicacion), "default")
+            self.assertEqual(router.db_for_read(Publicacion), "default")
+        finally:
+            replicas._lectura.reset(marca)
+
+    def test_peticion_que_escribe_no_toca_la_replica(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token()}")
+        respuesta, _, en_replica = self.consultas(
+            lambda: self.client.post(f"/api/publicaciones/{self.primaria.pk}/like_toggle/")
+        )
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(en_replica, 0)
+        # Leer lo propio: el cliente queda pegado a la primaria
+        self.assertIn(replicas.COOKIE_PRIMARIA, respuesta.cookies)
+        self.assertIn(replicas.CABECERA_PRIMARIA, respuesta)
+        respuesta, _, en_replica = self.consultas(lambda: self.client.get("/api/publicaciones/"))
+        self.assertEqual(self.titulos(respuesta), ["Solo en la primaria"])
+        self.assertEqual(en_replica, 0)
+
+    def test_cabecera_fuerza_la_primaria(self):
+        hasta = str(int(time.time()) + settings.NEWS_REPLICA_PEGAJOSO)
+        respuesta, _, en_replica = self.consultas(
+            lambda: self.client.get("/api/publicaciones/", HTTP_X_PRIMARIA_HASTA=hasta)
+        )
+        self.assertEqual(self.titulos(respuesta), ["Solo en la primaria"])
+        self.assertEqual(en_replica, 0)
+
+    def test_marca_vencida_o_manipulada_no_cuenta(self):
+        for hasta in (time.time() - 1, time.time() + 10 * settings.NEWS_REPLICA_PEGAJOSO, "x"):
+            with self.subTest(hasta=hasta):
+                self.client.cookies[replicas.COOKIE_PRIMARIA] = str(hasta)
+                self.assertEqual(self.titulos(self.client.get("/api/publicaciones/")), ["Solo en la réplica"])
+
+    def test_replica_caida_se_marca_y_se_salta(self):
+        with mock.patch.object(replicas.Replicas, "medir_retraso", side_effect=OperationalError("caída")):
+            respuesta, en_primaria, en_replica = self.consultas(lambda: self.client.get("/api/publicaciones/"))
+        self.assertEqual(self.titulos(respuesta), ["Solo en la primaria"])
+        self.assertGreater(en_primaria, 0)
+        self.assertEqual(en_replica, 0)
+        estado = replicas.metricas_replicas()["replica_1"]
+        self.assertEqual((estado["sana"], estado["fallos"]), (0, 1))
+
+    def test_replica_atrasada_se_salta(self):
+        retraso = settings.NEWS_REPLICA_RETRASO_MAX + 1
+        with mock.patch.object(replicas.Replicas, "medir_retraso", return_value=retraso):
+            self.assertEqual(self.titulos(self.client.get("/api/publicaciones/")), ["Solo en la primaria"])
+        self.assertEqual(replicas.metricas_replicas()["replica_1"]["sana"], 0)
@@ -0,0 +1,131 @@
+import uuid
+
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from news.models import Comentario
+from news.serializers import PublicacionCompactaSerializer
+
+from .base import BaseNewsTest
+
+LARGO = "La feria de ciencias reúne proyectos de todos los cursos, con jurados invitados y premios. " * 5
+CAMPOS_COMPACTA = set(PublicacionCompactaSerializer.Meta.fields)
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0, NEWS_EXTRACTO_LARGO=60)
+class RepresentacionTests(BaseNewsTest):
+    URL = "/api/publicaciones/"
+
+    def setUp(self):
+        super().setUp()
+        self.larga = self.publicacion("Feria de ciencias", LARGO, hace=1)
+        self.corta = self.publicacion("Torneo", "Sábado a las 10.", hace=2)
+        raiz = Comentario.objects.create(publicacion=self.larga, usuario_id=uuid.uuid4(), contenido="¿Dónde?")
+        respuesta = Comentario(publicacion=self.larga, usuario_id=uuid.uuid4(), contenido="En el patio")
+        respuesta.colgar_de(raiz)
+        respuesta.save()
+
+    def get(self, url=None, **parametros):
+        respuesta = self.client.get(url or self.URL, parametros)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()
+
+    def por_titulo(self, datos):
+        return {p["titulo"]: p for p in datos["results"]}
+
+    def consultas_a_comentarios(self, **parametros):
+        with CaptureQueriesContext(connections["default"]) as consultas:
+            self.get(**parametros)
+        tabla = Comentario._meta.db_table
+        return [c["sql"] for c in consultas if tabla in c["sql"]]
+
+    # ------------------ 🔹 ?fields= ------------------
+    def test_fields_recorta_la_salida(self):
+        for publicacion in self.get(fields="titulo,likes_count")["results"]:
+            self.assertEqual(set(publicacion), {"id", "titulo", "likes_count"})
+
+    def test_fields_en_el_detalle(self):
+        datos = self.get(f"{self.URL}{self.larga.pk}/", fields="titulo, comentarios ,")
+        self.assertEqual(set(datos), {"id", "titulo", "comentarios"})
+        self.assertEqual(len(datos["comentarios"]), 2)
+
+    def test_fields_sin_comentarios_no_los_consulta(self):
+        self.assertEqual(self.consultas_a_comentarios(fields="titulo"), [])
+        self.assertTrue(self.consultas_a_comentarios(fields="titulo,comentarios"))
+
+    def test_campos_calculados(self):
+        publicacion = self.get(fields="titulo,srcset")["results"][0]
+        # Sin imagen no hay srcset: pedirlo es válido y no agrega nada
+        self.assertEqual(set(publicacion), {"id", "titulo"})
+
+    def test_campos_desconocidos(self):
+        casos = (
+            ({"fields": "titulo,clave_secreta"}, "fields"),
+            ({"fields": "busqueda"}, "fields"),  # columna interna del modelo
+            ({"fields": "imagen_subida"}, "fields"),  # solo de escritura
+            ({"vista": "compacta", "fields": "contenido"}, "fields"),
+            ({"expand": "likes"}, "expand"),
+            ({"vista": "miniatura"}, "vista"),
+        )
+        for parametros, clave in casos:
+            with self.subTest(**parametros):
+                respuesta = self.client.get(self.URL, parametros)
+                self.assertEqual(respuesta.status_code, 400, respuesta.content)
+                self.assertIn(clave, respuesta.json())
+        respuesta = self.client.get(f"{self.URL}{self.larga.pk}/", {"fields": "nada"})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_vista_solo_en_listados(self):
+        # El detalle es siempre la representación completa
+        datos = self.get(f"{self.URL}{self.larga.pk}/", vista="compacta")
+        self.assertEqual(datos["contenido"], LARGO)
+
+    # ------------------ 🔹 ?vista=compacta ------------------
+    def test_compacta(self):
+        publicaciones = self.por_titulo(self.get(vista="compacta"))
+        for publicacion in publicaciones.values():
+            self.assertEqual(set(publicacion), CAMPOS_COMPACTA)
+        self.assertEqual(publicaciones["Torneo"]["extracto"], "Sábado a las 10.")
+        extracto = publicaciones["Feria de ciencias"]["extracto"]
+        self.assertTrue(extracto.endswith("…"))
+        self.assertLessEqual(len(extracto), 61)
+        # Cortado en un espacio, sin la puntuación del final
+        self.assertTrue(LARGO.startswith(extracto[:-1]))
+        self.assertIn(LARGO[len(extracto) - 1], " ,")
+
+    def test_compacta_no_consulta_comentarios(self):
+        self.assertEqual(self.consultas_a_comentarios(vista="compacta"), [])
+
+    def test_compacta_con_expand(self):
+        publicaciones = self.por_titulo(self.get(vista="compacta", expand="comentarios"))
+        feria = publicaciones["Feria de ciencias"]
+        self.assertEqual(set(feria), CAMPOS_COMPACTA | {"comentarios"})
+        raiz = next(c for c in feria["comentarios"] if c["contenido"] == "¿Dónde?")
+        self.assertEqual([r["contenido"] for r in raiz["respuestas"]], ["En el patio"])
+        self.assertEqual(publicaciones["Torneo"]["comentarios"], [])
+
+    def test_compacta_con_fields(self):
+        for publicacion in self.get(vista="compacta", fields="extracto")["results"]:
+            self.assertEqual(set(publicacion), {"id", "extracto"})
+        for publicacion in self.get(vista="compacta", expand="comentarios", fields="comentarios")["results"]:
+            self.assertEqual(set(publicacion), {"id", "comentarios"})
+
+    @override_settings(NEWS_FEED_VISTA="compacta")
+    def test_vista_por_defecto_configurable(self):
+        self.assertEqual(set(self.get()["results"][0]), CAMPOS_COMPACTA)
+        self.assertIn("contenido", self.get(vista="completa")["results"][0])
+
+
+class RepresentacionCacheadaTests(BaseNewsTest):
+    def test_cada_representacion_con_su_entrada(self):
+        self.publicacion("Feria de ciencias", LARGO)
+        url = "/api/publicaciones/"
+        for parametros, campos in (
+            ({}, "contenido"), ({"vista": "compacta"}, "extracto"), ({"fields": "titulo"}, "titulo"),
+        ):
+            for _ in range(2):  # la segunda sale de la caché de respuestas
+                with self.subTest(**parametros):
+                    publicacion = self.client.get(url, parametros).json()["results"][0]
+                    self.assertIn(campos, publicacion)
+                    self.assertEqual("extracto" in publicacion, parametros.get("vista") == "compacta")
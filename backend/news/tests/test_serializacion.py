@@ -0,0 +1,188 @@
+import datetime
+import uuid
+import zoneinfo
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from news.models import Categoria, Publicacion
+from news.renderers import JSONRapidoParser, JSONRapidoRenderer, cargar, volcar
+from news.serializers import CategoriaSerializer, PublicacionCompactaSerializer, PublicacionSerializer
+from news.valores import plan_valores
+from news.views import PublicacionViewSet
+
+from .base import BaseNewsTest
+
+UTC = datetime.timezone.utc
+BOGOTA = zoneinfo.ZoneInfo("America/Bogota")
+
+DATOS = {
+    "utc": datetime.datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=UTC),
+    "utc_sin_micro": datetime.datetime(2026, 3, 1, 12, 30, tzinfo=UTC),
+    "con_zona": datetime.datetime(2026, 3, 1, 7, 30, tzinfo=BOGOTA),
+    "ingenua": datetime.datetime(2026, 3, 1, 12, 30),
+    "fecha": datetime.date(2026, 3, 1),
+    "hora": datetime.time(8, 15, 30, 250000),
+    "duracion": datetime.timedelta(hours=1, seconds=3),
+    "decimal": Decimal("10.50"),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "lazy": gettext_lazy("Publicación"),
+    "texto": "Ñandú «comillas» \"dobles\" \\ / \u2028 \u2029 emoji 🎉 \x00",
+    "numeros": [0, -1, 2 ** 53, 1.5, 0.1, True, False, None],
+    "anidado": {"lista": [{"a": ()}], "vacio": {}},
+    "tupla": (1, "dos"),
+    "conjunto": frozenset({3}),
+}
+
+
+class JSONRapidoRendererTests(SimpleTestCase):
+    """ Los mismos bytes que el JSONRenderer de DRF. """
+
+    def render(self, clase, datos, **contexto):
+        return clase().render(datos, "application/json", contexto)
+
+    def test_mismos_bytes(self):
+        for nombre, valor in DATOS.items():
+            with self.subTest(nombre=nombre):
+                self.assertEqual(
+                    self.render(JSONRapidoRenderer, {nombre: valor}), self.render(JSONRenderer, {nombre: valor})
+                )
+        self.assertEqual(self.render(JSONRapidoRenderer, DATOS), self.render(JSONRenderer, DATOS))
+        self.assertIn(b'"2026-03-01T12:30:05.123456Z"', self.render(JSONRapidoRenderer, DATOS))
+
+    def test_claves_no_texto(self):
+        datos = {2: "dos", None: "nulo", 1.5: "float", True: "bool"}
+        self.assertEqual(self.render(JSONRapidoRenderer, datos), self.render(JSONRenderer, datos))
+        # UUID como clave: DRF falla, orjson lo escribe como texto
+        with self.assertRaises(TypeError):
+            self.render(JSONRenderer, {DATOS["uuid"]: 1})
+        self.assertEqual(self.render(JSONRapidoRenderer, {DATOS["uuid"]: 1}), f'{{"{DATOS["uuid"]}":1}}'.encode())
+
+    def test_floats_en_notacion_exponencial(self):
+        # Mismo valor; orjson escribe "1e-7" y DRF "1e-07"
+        datos = {"floats": [1e-7, 1.5e300, -2.5e-10]}
+        rapida, drf = self.render(JSONRapidoRenderer, datos), self.render(JSONRenderer, datos)
+        self.assertEqual(cargar(rapida), cargar(drf))
+
+    def test_none_e_indentado(self):
+        self.assertEqual(self.render(JSONRapidoRenderer, None), b"")
+        self.assertEqual(
+            self.render(JSONRapidoRenderer, DATOS, indent=2), self.render(JSONRenderer, DATOS, indent=2)
+        )
+
+    def test_volcar(self):
+        self.assertEqual(volcar(DATOS), self.render(JSONRenderer, DATOS))
+        with self.settings(NEWS_JSON_RAPIDO=False):
+            self.assertEqual(volcar(DATOS), self.render(JSONRenderer, DATOS))
+
+    def test_parser(self):
+        for crudo in (b'{"a": [1, 2.5, null, true, "\\u00f1"], "b": {}}', '{"texto": "ñandú"}'.encode()):
+            with self.subTest(crudo=crudo):
+                self.assertEqual(JSONRapidoParser().parse(BytesIO(crudo)), JSONParser().parse(BytesIO(crudo)))
+                self.assertEqual(cargar(crudo), JSONParser().parse(BytesIO(crudo)))
+        for crudo in (b"{", b'{"a": NaN}', b"[Infinity]"):
+            with self.subTest(crudo=crudo):
+                for clase in (JSONRapidoParser, JSONParser):
+                    with self.assertRaises(ParseError):
+                        clase().parse(BytesIO(crudo))
+
+    def test_parser_con_otra_codificacion(self):
+        crudo = '{"texto": "ñandú"}'.encode("latin-1")
+        contexto = {"encoding": "latin-1"}
+        self.assertEqual(JSONRapidoParser().parse(BytesIO(crudo), parser_context=contexto), {"texto": "ñandú"})
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class PlanValoresTests(BaseNewsTest):
+    """ plan_valores(...).convertir(filas de .values()) == serializer.data """
+
+    def setUp(self):
+        super().setUp()
+        self.categoria = Categoria.objects.create(nombre="Ciencias", descripcion=None, color="#00ff00")
+        Categoria.objects.create(nombre="Deportes", descripcion="Torneos")
+        con_imagen = self.publicacion("Con imagen", "texto " * 80, categoria=self.categoria)
+        sin_imagen = self.publicacion("Sin imagen", "corto", hace=5)
+        Publicacion.objects.filter(pk=con_imagen.pk).update(imagen="publicaciones/ab/foto ñ 1.jpg")
+        # Fecha con microsegundos y otra exacta en UTC
+        Publicacion.objects.filter(pk=con_imagen.pk).update(
+            fecha_publicacion=datetime.datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=UTC)
+        )
+        Publicacion.objects.filter(pk=sin_imagen.pk).update(
+            fecha_publicacion=datetime.datetime(2026, 2, 1, 23, 0, tzinfo=UTC)
+        )
+
+    def contexto(self, **extra):
+        return {"request": Request(APIRequestFactory().get("/api/publicaciones/")), **extra}
+
+    def comparar(self, serializador, queryset):
+        plan = plan_valores(serializador)
+        self.assertIsNotNone(plan)
+        por_valores = plan.convertir(queryset.values(*plan.columnas))
+        por_modelos = type(serializador)(list(queryset), many=True, context=serializador.context).data
+        self.assertEqual(JSONRenderer().render(por_valores), JSONRenderer().render(por_modelos))
+        return por_valores
+
+    def publicaciones(self):
+        """ El queryset del listado compacto (sin contenido, con extracto_bd). """
+        vista = self.vista(vista="compacta")
+        return vista.aligerar(Publicacion.objects.order_by("-fecha_publicacion"))
+
+    def vista(self, **parametros):
+        vista = PublicacionViewSet(action="list", format_kwarg=None)
+        vista.request = Request(APIRequestFactory().get("/api/publicaciones/", parametros))
+        vista.args, vista.kwargs = (), {}
+        return vista
+
+    def test_compacta(self):
+        with timezone.override(UTC):
+            datos = self.comparar(PublicacionCompactaSerializer(context=self.contexto()), self.publicaciones())
+        con_imagen = next(p for p in datos if p["titulo"] == "Con imagen")
+        self.assertEqual(con_imagen["fecha_publicacion"], "2026-03-01T12:30:05.123456Z")
+        self.assertEqual(con_imagen["imagen"], "http://testserver/media/publicaciones/ab/foto%20%C3%B1%201.jpg")
+        self.assertEqual(con_imagen["categoria"], self.categoria.pk)
+
+    def test_compacta_con_fields(self):
+        serializador = PublicacionCompactaSerializer(
+            context=self.contexto(campos=frozenset({"id", "imagen", "fecha_publicacion"}))
+        )
+        datos = self.comparar(serializador, self.publicaciones())
+        self.assertEqual(set(datos[0]), {"id", "imagen", "fecha_publicacion"})
+
+    def test_otra_zona_horaria(self):
+        with timezone.override(BOGOTA):
+            datos = self.comparar(PublicacionCompactaSerializer(context=self.contexto()), self.publicaciones())
+        self.assertEqual(
+            {p["fecha_publicacion"] for p in datos}, {"2026-03-01T07:30:05.123456-05:00", "2026-02-01T18:00:00-05:00"}
+        )
+
+    def test_sin_request_url_relativa(self):
+        datos = self.comparar(PublicacionCompactaSerializer(context={}), self.publicaciones())
+        self.assertIn("/media/publicaciones/ab/foto%20%C3%B1%201.jpg", {p["imagen"] for p in datos})
+
+    def test_categorias(self):
+        self.comparar(CategoriaSerializer(context=self.contexto()), Categoria.objects.order_by("nombre"))
+
+    def test_sin_plan(self):
+        self.assertIsNone(plan_valores(PublicacionSerializer(context=self.contexto())))
+        expandida = PublicacionCompactaSerializer(context=self.contexto(expandir=frozenset({"comentarios"})))
+        self.assertIsNone(plan_valores(expandida))
+        with self.settings(NEWS_LISTAS_POR_VALORES=False):
+            self.assertIsNone(plan_valores(PublicacionCompactaSerializer(context=self.contexto())))
+
+    def test_respuestas_http_iguales(self):
+        for url in ("/api/publicaciones/?vista=compacta", "/api/categorias/"):
+            with self.subTest(url=url):
+                rapida = self.client.get(url)
+                with self.settings(NEWS_LISTAS_POR_VALORES=False, NEWS_JSON_RAPIDO=False):
+                    drf = self.client.get(url)
+                self.assertEqual(rapida.status_code, 200)
+                self.assertEqual(rapida.content, drf.content)
+                self.assertEqual(rapida.get("ETag"), drf.get("ETag"))
@@ -0,0 +1,80 @@
+import base64
+import json
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.test import override_settings
+
+from news import sincronizacion
+from news.models import RegistroCambio
+
+from .base import BaseNewsTest
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class SincronizacionTests(BaseNewsTest):
+    URL = "/api/publicaciones/sync/"
+
+    def sync(self, token=None):
+        respuesta = self.client.get(self.URL, {"since": token} if token else {})
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()
+
+    def test_entrega_lo_nuevo_una_sola_vez(self):
+        inicio = self.sync()
+        self.publicacion("Nueva beca")
+        r = self.sync(inicio["token"])
+        self.assertEqual([c["titulo"] for c in r["cambios"]], ["Nueva beca"])
+        self.assertEqual((r["hay_mas"], r["reintentar_en"]), (False, None))
+        self.assertEqual(self.sync(r["token"])["cambios"], [])
+
+    def test_transaccion_abierta_no_hace_girar_al_cliente(self):
+        inicio = self.sync()
+        self.publicacion("Confirmada")
+        abierta = self.publicacion("Aún abierta")
+        self.publicacion("Detrás de la abierta")
+        # Las filas desde la de la transacción "abierta" aún no son definitivas
+        corte = RegistroCambio.objects.get(objeto_id=abierta.pk).id
+        abierta_hasta = ExpressionWrapper(Q(id__lt=corte), output_field=BooleanField())
+        with mock.patch.object(sincronizacion, "_listo", return_value=abierta_hasta):
+            r = self.sync(inicio["token"])
+            self.assertEqual([c["titulo"] for c in r["cambios"]], ["Confirmada"])
+            self.assertEqual((r["hay_mas"], r["reintentar_en"]), (False, settings.NEWS_SYNC_MARGEN))
+            # Solo queda lo pendiente: nada que entregar y la misma posición
+            # (el token cambia si se emite en otro segundo)
+            r2 = self.sync(r["token"])
+            self.assertEqual((r2["cambios"], r2["hay_mas"]), ([], False))
+            self.assertEqual(
+                sincronizacion.decodificar_token(r2["token"]), sincronizacion.decodificar_token(r["token"])
+            )
+        r3 = self.sync(r["token"])
+        self.assertEqual(sorted(c["titulo"] for c in r3["cambios"]), ["Aún abierta", "Detrás de la abierta"])
+
+    @override_settings(NEWS_SYNC_LIMITE=2)
+    def test_hay_mas_al_llegar_al_limite(self):
+        inicio = self.sync()
+        for i in range(3):
+            self.publicacion(f"Aviso {i}")
+        r = self.sync(inicio["token"])
+        self.assertEqual((len(r["cambios"]), r["hay_mas"]), (2, True))
+        r2 = self.sync(r["token"])
+        self.assertEqual((len(r2["cambios"]), r2["hay_mas"]), (1, False))
+
+    def test_token_sin_transaccion_sigue_valiendo(self):
+        self.publicacion("Anterior")
+        ultimo = RegistroCambio.objects.order_by("-id").values_list("id", flat=True).first()
+        self.publicacion("Posterior")
+        crudo = json.dumps({"c": ultimo, "t": int(time.time())}).encode("utf-8")
+        viejo = base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+        self.assertEqual([c["titulo"] for c in self.sync(viejo)["cambios"]], ["Posterior"])
+
+    def test_baja_en_eliminados(self):
+        pub = self.publicacion("Se borra")
+        pub_id = str(pub.pk)
+        inicio = self.sync()
+        pub.save()
+        pub.delete()
+        r = self.sync(inicio["token"])
+        self.assertEqual((r["cambios"], r["eliminados"]), ([], [pub_id]))
@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import uuid
+from unittest import mock
+from urllib.parse import urlparse
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from news import imagenes, subidas
+from news.models import Publicacion
+
+from .base import BaseNewsTest, imagen_en_bytes, token
+
+
+class SubidasTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        media, privadas = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.addCleanup(shutil.rmtree, privadas)
+        ajustes = override_settings(
+            MEDIA_ROOT=media,
+            NEWS_SUBIDA_MAX_BYTES=50 * 1024,
+            STORAGES={
+                "default": {"BACKEND": "news.almacenamiento.AlmacenamientoLocal"},
+                "subidas": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": privadas},
+                },
+            },
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        # Sin pool de variantes: aquí solo interesa el original
+        parche = mock.patch.object(imagenes, "get_pool")
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.usuario_id = str(uuid.uuid4())
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token('institucion', id=self.usuario_id)}")
+
+    def grande(self, tamano):
+        """ Firma de PNG válida y relleno hasta `tamano` bytes. """
+        datos = imagen_en_bytes("PNG")
+        return datos + os.urandom(tamano - len(datos))
+
+    def crear(self, archivo):
+        return self.client.post(
+            "/api/publicaciones/", {"titulo": "Con foto", "contenido": "c", "imagen": archivo}, format="multipart"
+        )
+
+    # ------------------ 🔹 MULTIPART ------------------
+    def test_imagen_dentro_del_limite(self):
+        respuesta = self.crear(SimpleUploadedFile("foto.jpg", imagen_en_bytes(), "image/jpeg"))
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertTrue(Publicacion.objects.get(pk=respuesta.json()["id"]).imagen)
+
+    def test_413_al_pasarse_mientras_llega(self):
+        # Cuerpo declarado dentro del margen: el corte lo da el conteo por trozos
+        datos = self.grande(60 * 1024)
+        respuesta = self.crear(SimpleUploadedFile("foto.png", datos, "image/png"))
+        self.assertEqual(respuesta.status_code, 413, respuesta.content)
+        self.assertFalse(Publicacion.objects.exists())
+
+    @override_settings(NEWS_SUBIDA_MAX_BYTES=1024)
+    def test_413_por_el_tamano_declarado(self):
+        datos = self.grande(1024 + subidas.MARGEN_MULTIPART + 1)
+        respuesta = self.crear(SimpleUploadedFile("foto.png", datos, "image/png"))
+        self.assertEqual(respuesta.status_code, 413, respuesta.content)
+
+    def test_415_si_los_bytes_no_son_de_una_imagen(self):
+        # El nombre y el Content-Type mienten: manda la firma
+        for datos in (b"<?php echo 'hola'; ?>" * 10, b"%PDF-1.4 " * 10, b"ab"):
+            with self.subTest(datos=datos[:8]):
+                respuesta = self.crear(SimpleUploadedFile("foto.jpg", datos, "image/jpeg"))
+                self.assertEqual(respuesta.status_code, 415, respuesta.content)
+        self.assertFalse(Publicacion.objects.exists())
+
+    def test_firmas_reconocidas(self):
+        for formato, tipo in (("JPEG", "image/jpeg"), ("PNG", "image/png"), ("GIF", "image/gif"),
+                              ("WEBP", "image/webp")):
+            with self.subTest(formato=formato):
+                self.assertEqual(subidas.tipo_por_firma(imagen_en_bytes(formato)[:subidas.BYTES_FIRMA]), tipo)
+
+    # ------------------ 🔹 SUBIDA DIRECTA (SubidaDirectaLocal) ------------------
+    def pedir_subida(self, content_type="image/jpeg"):
+        respuesta = self.client.post("/api/publicaciones/subidas/", {"content_type": content_type}, format="json")
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        return respuesta.json()
+
+    def subir(self, instrucciones, datos):
+        # Sin credenciales: el token firmado de la URL es la autorización
+        cliente = self.client_class()
+        return cliente.generic(
+            instrucciones["metodo"], urlparse(instrucciones["url"]).path, datos,
+            content_type=instrucciones["cabeceras"]["Content-Type"],
+        )
+
+    def test_flujo_completo(self):
+        instrucciones = self.pedir_subida()
+        self.assertTrue(instrucciones["clave"].startswith(f"subidas/{self.usuario_id}/"))
+        respuesta = self.subir(instrucciones, imagen_en_bytes())
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+
+        datos = {"titulo": "Directa", "contenido": "c", "imagen_subida": instrucciones["clave"]}
+        respuesta = self.client.post("/api/publicaciones/", datos, format="json")
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertTrue(Publicacion.objects.get(pk=respuesta.json()["id"]).imagen)
+
+        # La subida se consume: no se puede usar dos veces
+        respuesta = self.client.post("/api/publicaciones/", datos, format="json")
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn("imagen_subida", respuesta.json())
+
+    def test_token_manipulado_o_vencido(self):
+        instrucciones = self.pedir_subida()
+        manipulado = {**instrucciones, "url": instrucciones["url"].rstrip("/") + "x/"}
+        self.assertEqual(self.subir(manipulado, imagen_en_bytes()).status_code, 403)
+        with override_settings(NEWS_SUBIDAS_DIRECTAS_EXPIRA=-1):
+            self.assertEqual(self.subir(instrucciones, imagen_en_bytes()).status_code, 403)
+
+    def test_subida_directa_acotada(self):
+        instrucciones = self.pedir_subida()
+        self.assertEqual(self.subir(instrucciones, b"no es una imagen").status_code, 415)
+        self.assertEqual(self.subir(instrucciones, self.grande(60 * 1024)).status_code, 413)
+
+    def test_tipo_no_permitido_al_pedir(self):
+        respuesta = self.client.post("/api/publicaciones/subidas/", {"content_type": "text/html"}, format="json")
+        self.assertEqual(respuesta.status_code, 415)
+
+    def test_clave_de_otro_usuario(self):
+        instrucciones = self.pedir_subida()
+        self.subir(instrucciones, imagen_en_bytes())
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token('institucion')}")
+        respuesta = self.client.post(
+            "/api/publicaciones/",
+            {"titulo": "Ajena", "contenido": "c", "imagen_subida": instrucciones["clave"]},
+            format="json",
+        )
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(Publicacion.objects.exists())
@@ -0,0 +1,192 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from news.models import Publicacion
+from news.tendencia import calcular_score, expresion_score, sql_score
+
+from .base import BaseNewsTest, token
+
+# (likes, comentarios, vistas, horas de antigüedad): incluye interacción nula y < 1
+CASOS = [(0, 0, 0, 0), (0, 0, 5, 3), (1, 0, 0, 30), (12, 4, 300, 200), (250, 80, 10_000, 24 * 90)]
+
+
+class FormulaTendenciaTests(BaseNewsTest):
+    """ Las tres formas del score (Python, ORM y SQL de Postgres) dan lo mismo. """
+
+    def setUp(self):
+        super().setUp()
+        self.publicaciones = []
+        for likes, comentarios, vistas, hace in CASOS:
+            pub = self.publicacion(f"{likes}/{comentarios}/{vistas}", hace=hace)
+            Publicacion.objects.filter(pk=pub.pk).update(
+                likes_count=likes, comentarios_count=comentarios, vistas=vistas
+            )
+            self.publicaciones.append(Publicacion.objects.get(pk=pub.pk))
+
+    def esperado(self, pub, likes=0, comentarios=0, vistas=0):
+        return calcular_score(
+            pub.likes_count + likes, pub.comentarios_count + comentarios, pub.vistas + vistas, pub.fecha_publicacion
+        )
+
+    def test_expresion_del_orm(self):
+        for deltas in ({}, {"likes_count": 1}, {"likes_count": -1, "comentarios_count": 2}, {"vistas": 40}):
+            anotadas = dict(Publicacion.objects.annotate(s=expresion_score(**deltas)).values_list("id", "s"))
+            for pub in self.publicaciones:
+                with self.subTest(titulo=pub.titulo, deltas=deltas):
+                    esperado = self.esperado(
+                        pub, deltas.get("likes_count", 0), deltas.get("comentarios_count", 0), deltas.get("vistas", 0)
+                    )
+                    self.assertAlmostEqual(anotadas[pub.pk], esperado, places=6)
+
+    @skipUnless(connection.vendor == "postgresql", "sql_score es SQL de Postgres")
+    def test_sql_de_postgres(self):
+        tabla = connection.ops.quote_name(Publicacion._meta.db_table)
+        for delta in (0, 1, -1):
+            sql, parametros = sql_score(delta_likes=delta)
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT id, {sql} FROM {tabla}", parametros)
+                calculados = dict(cursor.fetchall())
+            for pub in self.publicaciones:
+                with self.subTest(titulo=pub.titulo, delta=delta):
+                    self.assertAlmostEqual(calculados[pub.pk], self.esperado(pub, likes=delta), places=6)
+
+    @skipUnless(connection.vendor == "postgresql", "sql_score es SQL de Postgres")
+    def test_sql_de_postgres_con_delta_en_sql(self):
+        tabla = connection.ops.quote_name(Publicacion._meta.db_table)
+        sql, parametros = sql_score(sql_delta_likes="(1 - 2)")
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id, {sql} FROM {tabla}", parametros)
+            calculados = dict(cursor.fetchall())
+        for pub in self.publicaciones:
+            self.assertAlmostEqual(calculados[pub.pk], self.esperado(pub, likes=-1), places=6)
+
+    def test_al_crear(self):
+        pub = Publicacion.objects.get(pk=self.publicacion("Nueva").pk)
+        self.assertAlmostEqual(pub.score, calcular_score(0, 0, 0, pub.fecha_publicacion), places=6)
+
+    @override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+    def test_incremental_con_likes_y_comentarios(self):
+        pub = self.publicaciones[2]
+        usuario = token()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {usuario}")
+        self.client.put(f"/api/publicaciones/{pub.pk}/like/")
+        self.client.post("/api/comentarios/", {"publicacion": str(pub.pk), "contenido": "Hola"}, format="json")
+        pub.refresh_from_db()
+        self.assertEqual((pub.likes_count, pub.comentarios_count), (2, 1))
+        self.assertAlmostEqual(pub.score, self.esperado(pub), places=6)
+
+
+class RecalcularTendenciaTests(BaseNewsTest):
+    def setUp(self):
+        super().setUp()
+        self.reciente = self.publicacion("Reciente", hace=2)
+        self.vieja = self.publicacion("Vieja", hace=24 * 10)
+        Publicacion.objects.update(score=expresion_score())  # al día con la fecha movida
+        # Vistas volcadas por lotes: suben el contador pero no el score
+        Publicacion.objects.update(vistas=500)
+
+    def recalcular(self, **opciones):
+        salida = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("recalcular_tendencia", stdout=salida, **opciones)
+        return salida.getvalue()
+
+    def score(self, pub):
+        return Publicacion.objects.get(pk=pub.pk).score
+
+    def esperado(self, pub):
+        pub = Publicacion.objects.get(pk=pub.pk)
+        return calcular_score(pub.likes_count, pub.comentarios_count, pub.vistas, pub.fecha_publicacion)
+
+    def test_recoge_las_vistas(self):
+        antes = self.score(self.reciente)
+        self.assertIn("2 publicaciones", self.recalcular(lote=1))
+        for pub in (self.reciente, self.vieja):
+            self.assertAlmostEqual(self.score(pub), self.esperado(pub), places=6)
+        self.assertGreater(self.score(self.reciente), antes)
+
+    def test_solo_los_ultimos_dias(self):
+        antes = self.score(self.vieja)
+        self.assertIn("1 publicaciones", self.recalcular(dias=3))
+        self.assertEqual(self.score(self.vieja), antes)
+        self.assertAlmostEqual(self.score(self.reciente), self.esperado(self.reciente), places=6)
+
+    def test_cambio_de_pesos(self):
+        self.recalcular()
+        with self.settings(NEWS_TENDENCIA_PESO_VISTA=0):
+            self.recalcular()
+            self.assertAlmostEqual(self.score(self.reciente), self.esperado(self.reciente), places=6)
+        self.assertAlmostEqual(
+            self.score(self.reciente),
+            calcular_score(0, 0, 0, Publicacion.objects.get(pk=self.reciente.pk).fecha_publicacion),
+            places=6,
+        )
+
+    def test_invalida_el_feed_cacheado(self):
+        # De ayer y con muchas vistas: supera a la reciente cuando se recalcula
+        ayer = timezone.now() - timedelta(days=1)
+        Publicacion.objects.filter(pk=self.vieja.pk).update(
+            fecha_publicacion=ayer, score=calcular_score(0, 0, 0, ayer), vistas=10 ** 6
+        )
+        url = "/api/publicaciones/?orden=tendencia"
+        self.assertEqual(self.titulos(self.client.get(url)), ["Reciente", "Vieja"])
+        self.recalcular()
+        self.assertEqual(self.titulos(self.client.get(url)), ["Vieja", "Reciente"])
+
+
+@override_settings(NEWS_CACHE_RESPUESTAS_TTL=0)
+class OrdenTendenciaTests(BaseNewsTest):
+    URL = "/api/publicaciones/"
+
+    def setUp(self):
+        super().setUp()
+        ahora = timezone.now()
+        self.filas = {}
+        for titulo, likes, hace in (
+            ("Nueva sin likes", 0, 1), ("Ayer muy comentada", 40, 24), ("Vieja popular", 900, 24 * 30),
+            ("Empate A", 5, 10), ("Empate B", 5, 10), ("Reciente con likes", 8, 3),
+        ):
+            pub = self.publicacion(titulo)
+            fecha = ahora - timedelta(hours=hace)
+            Publicacion.objects.filter(pk=pub.pk).update(
+                fecha_publicacion=fecha, likes_count=likes, score=calcular_score(likes, 0, 0, fecha)
+            )
+        self.publicacion("Borrador", estado="borrador")
+        # Orden esperado: score desc y, en el empate, id desc
+        self.orden = [
+            p.titulo for p in sorted(
+                Publicacion.objects.filter(estado="publicado"), key=lambda p: (p.score, p.pk), reverse=True
+            )
+        ]
+
+    def test_orden_por_score(self):
+        titulos = self.titulos(self.client.get(self.URL, {"orden": "tendencia"}))
+        self.assertEqual(titulos, self.orden)
+        self.assertEqual(titulos[0], "Reciente con likes")
+        self.assertLess(titulos.index("Ayer muy comentada"), titulos.index("Nueva sin likes"))
+        self.assertNotEqual(titulos, self.titulos(self.client.get(self.URL)))
+
+    def test_paginas_por_cursor(self):
+        vistos, url, parametros = [], self.URL, {"orden": "tendencia", "page_size": 2}
+        while url:
+            pagina = self.client.get(url, parametros).json()
+            vistos += [p["titulo"] for p in pagina["results"]]
+            url, parametros = pagina["next"], None
+        self.assertEqual(vistos, self.orden)
+
+    def test_con_filtros_y_busqueda(self):
+        titulos = self.titulos(self.client.get(self.URL, {"orden": "tendencia", "q": "empate"}))
+        self.assertEqual(sorted(titulos), ["Empate A", "Empate B"])
+        self.assertEqual(titulos, [t for t in self.orden if t.startswith("Empate")])
+
+    def test_parametro_desconocido_es_cronologico(self):
+        self.assertEqual(
+            self.titulos(self.client.get(self.URL, {"orden": "otro"})), self.titulos(self.client.get(self.URL))
+        )
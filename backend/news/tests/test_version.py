@@ -0,0 +1,44 @@
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from news.models import Publicacion
+
+from .base import BaseNewsTest, token
+
+
+class VersionPublicacionTests(BaseNewsTest):
+    def test_save_sube_la_version_sin_releer(self):
+        pub = self.publicacion("Versión")
+        Publicacion.objects.filter(pk=pub.pk).update(version=7)  # edición concurrente
+        pub.titulo = "Versión editada"
+        with CaptureQueriesContext(connections["default"]) as consultas:
+            pub.save()
+        self.assertFalse([c for c in consultas if c["sql"].startswith("SELECT")])
+        # Se lee recién cuando alguien la necesita (un ETag), con un SELECT
+        with self.assertNumQueries(1):
+            self.assertEqual(pub.version, 8)
+        pub.save(update_fields=["titulo"])
+        self.assertEqual((pub.version, Publicacion.objects.get(pk=pub.pk).version), (9, 9))
+
+    def test_guardar_dos_veces_sin_leerla(self):
+        pub = self.publicacion("Versión")
+        pub.save()
+        pub.save()
+        self.assertEqual(pub.version, 3)
+
+    def test_la_edicion_por_la_api_cambia_el_etag(self):
+        pub = self.publicacion("Con ETag")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token('admin')}")
+        url = f"/api/publicaciones/{pub.pk}/"
+        etag = self.client.get(url)["ETag"]
+        respuesta = self.client.patch(url, {"titulo": "Editada"}, format="json")
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(Publicacion.objects.get(pk=pub.pk).version, 2)
+
+    def test_version_y_actividad_no_salen_en_la_respuesta(self):
+        pub = self.publicacion("Interna")
+        respuesta = self.client.get(f"/api/publicaciones/{pub.pk}/")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn("ETag", respuesta)
+        self.assertFalse({"version", "fecha_actividad"} & respuesta.json().keys())
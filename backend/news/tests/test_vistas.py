@@ -0,0 +1,39 @@
+import threading
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from news import vistas
+
+
+class BufferVistasTests(SimpleTestCase):
+    def buffer(self, tamano=100):
+        buffer = vistas.BufferVistas(vistas.AlmacenMemoria(), intervalo=60, tamano=tamano)
+        self.addCleanup(buffer.detener)
+        return buffer
+
+    def test_clave_normalizada(self):
+        buffer = self.buffer()
+        pub_id = uuid.uuid4()
+        with mock.patch.object(vistas, "get_buffer", return_value=buffer), \
+                override_settings(NEWS_VISTAS_FLUSH_INTERVAL=60):
+            vistas.registrar_vista(pub_id)  # detalle: instance.pk
+            vistas.registrar_vista(str(pub_id))  # caché acertada: pk de la URL
+            vistas.registrar_vista("no-es-un-uuid")
+        self.assertEqual(buffer.almacen.extraer(), {pub_id: 2})
+
+    def test_lote_lleno_lo_vuelca_el_hilo_de_fondo(self):
+        buffer = self.buffer(tamano=2)
+        hilos, volcado = [], threading.Event()
+
+        def escribir(pendientes):
+            hilos.append(threading.current_thread().name)
+            volcado.set()
+
+        with mock.patch.object(vistas, "escribir_vistas", side_effect=escribir):
+            buffer.registrar(uuid.uuid4())
+            buffer.registrar(uuid.uuid4())
+            self.assertTrue(volcado.wait(5))
+        self.assertEqual(hilos, ["news-vistas"])
+        self.assertEqual(buffer.almacen.extraer(), {})
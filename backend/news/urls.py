@@ -1,8 +1,9 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import CategoriaViewSet, PublicacionViewSet, ComentarioViewSet
+from .views import CategoriaViewSet, PublicacionViewSet, ComentarioViewSet, SubidaDirectaLocalView
 from django.conf import settings
-from django.conf.urls.static import static
+from .media import servir_media
+from .metricas import metricas
 
 # 🔹 Registramos los routers de la API
 router = DefaultRouter()
@@ -11,10 +12,32 @@ router.register(r'publicaciones', PublicacionViewSet, basename='publicacion')
 router.register(r'comentarios', ComentarioViewSet, basename='comentario')
 
 # 🔹 Prefijo /api/ para mantener consistencia con los demás microservicios
-urlpatterns = [
+urlpatterns = []
+
+# 🔹 Modo ASGI: feed, detalle y comentarios por vistas async (antes que el router)
+if settings.NEWS_ASYNC_LECTURAS:
+    from . import asincrono
+
+    urlpatterns += [
+        path('api/publicaciones/', asincrono.feed, name='publicacion-list'),
+        path('api/publicaciones/<uuid:pk>/', asincrono.detalle, name='publicacion-detail'),
+        path(
+            'api/publicaciones/<uuid:pk>/comentarios/',
+            asincrono.comentarios,
+            name='publicacion-listar-comentarios',
+        ),
+        # SSE: necesita ASGI (bajo WSGI cada conexión ocuparía un hilo)
+        path('api/publicaciones/<uuid:pk>/eventos/', asincrono.eventos, name='publicacion-eventos'),
+    ]
+
+urlpatterns += [
     path('api/', include(router.urls)),
+    path('internal/metricas/', metricas, name='metricas'),
+    path('api/subidas/<str:token>/', SubidaDirectaLocalView.as_view(), name='subida-directa-local'),
 ]
 
-# 🔹 Servir archivos locales (imágenes subidas desde tu computadora)
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# 🔹 Media: URLs por contenido con caché inmutable y soporte de Range
+#     (en producción conviene delante nginx/CDN; ver news/media.py)
+urlpatterns += [
+    re_path(rf"^{settings.MEDIA_URL.strip('/')}/(?P<ruta>.+)$", servir_media, name="media"),
+]
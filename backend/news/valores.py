@@ -0,0 +1,160 @@
+"""
+Listados de solo lectura "por valores" (NEWS_LISTAS_POR_VALORES): las
+filas salen de `.values()` como dicts y se convierten columna a columna,
+sin instanciar un modelo por fila ni pasar por el to_representation de
+cada campo de DRF.
+
+El plan se arma una vez por petición a partir del serializador (con sus
+campos ya recortados por ?fields=) y da la misma salida que `.data`:
+- campos simples del modelo: el valor tal cual (UUID → str; fechas en
+  ISO 8601 con la zona resuelta una vez, no por valor),
+- claves foráneas (PrimaryKeyRelatedField): la columna `<campo>_id`,
+- imágenes/archivos: la URL del storage, absoluta si hay request,
+- SerializerMethodField: `valor_<campo>(fila)` del serializador, con las
+  columnas que declare en `columnas_valores`.
+
+Solo serializadores con `por_valores = True`. Si alguno de los campos no
+se puede armar así (anidados, `source` con puntos...), `plan_valores`
+devuelve None y la vista usa el serializador normal.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .instrumentacion import midiendo_serializacion
+
+# Campos de DRF cuyo to_representation devuelve el valor de la BD sin cambios
+_IDENTIDAD = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.BooleanField,
+    serializers.JSONField,
+)
+# Se convierten con el to_representation del propio campo
+_CON_FORMATO = (
+    serializers.DateField,
+    serializers.TimeField,
+    serializers.DecimalField,
+    serializers.DurationField,
+)
+
+
+class PlanValores:
+    def __init__(self, salidas):
+        # (nombre, columna, conversor); columna None → conversor(fila)
+        self.salidas = salidas
+        columnas = []
+        for _, columna, conversor in salidas:
+            extra = getattr(conversor, "columnas", ()) if columna is None else (columna,)
+            columnas.extend(c for c in extra if c not in columnas)
+        self.columnas = columnas
+
+    def convertir(self, filas):
+        """ Lista de dicts de salida (cuenta como tiempo de serialización). """
+        salidas = self.salidas
+        with midiendo_serializacion():
+            resultado = []
+            for fila in filas:
+                rep = {}
+                for nombre, columna, conversor in salidas:
+                    if columna is None:
+                        rep[nombre] = conversor(fila)
+                        continue
+                    valor = fila[columna]
+                    rep[nombre] = valor if valor is None or conversor is None else conversor(valor)
+                resultado.append(rep)
+            return resultado
+
+
+def _archivo(campo, modelo, request):
+    storage = modelo._meta.get_field(campo.source).storage
+    use_url = getattr(campo, "use_url", True)
+
+    def conversor(nombre):
+        if not nombre:
+            return None
+        if not use_url:
+            return nombre
+        ruta = storage.url(nombre)
+        return request.build_absolute_uri(ruta) if request is not None else ruta
+    return conversor
+
+
+def _fecha_hora(campo):
+    """
+    DateTimeField en ISO 8601 con la zona resuelta una vez por plan: el
+    to_representation de DRF la busca en cada valor. Fechas sin zona o
+    formatos propios, por el de DRF.
+    """
+    formato = getattr(campo, "format", api_settings.DATETIME_FORMAT)
+    zona = campo.timezone if hasattr(campo, "timezone") else campo.default_timezone()
+    if formato is None or formato.lower() != ISO_8601 or zona is None:
+        return campo.to_representation
+
+    def conversor(valor):
+        if not isinstance(valor, datetime) or valor.tzinfo is None:
+            return campo.to_representation(valor)
+        texto = valor.astimezone(zona).isoformat()
+        return texto[:-6] + "Z" if texto.endswith("+00:00") else texto
+    return conversor
+
+
+def _calculado(serializador, nombre):
+    metodo = getattr(serializador, f"valor_{nombre}", None)
+    if metodo is None:
+        return None
+
+    def conversor(fila):
+        return metodo(fila)
+    # PlanValores pide estas columnas para el método
+    conversor.columnas = serializador.columnas_valores.get(nombre, ())
+    return conversor
+
+
+def _salida(serializador, nombre, campo, modelo):
+    """ (nombre, columna, conversor) de un campo, o None si no se puede por valores. """
+    if isinstance(campo, serializers.SerializerMethodField):
+        conversor = _calculado(serializador, nombre)
+        return None if conversor is None else (nombre, None, conversor)
+    try:
+        # Solo columnas del modelo (no propiedades ni `source` con puntos)
+        if modelo._meta.get_field(campo.source).many_to_many:
+            return None
+    except FieldDoesNotExist:
+        return None
+    if isinstance(campo, serializers.PrimaryKeyRelatedField):
+        if campo.pk_field is not None:
+            return None
+        return nombre, modelo._meta.get_field(campo.source).attname, None
+    if isinstance(campo, serializers.FileField):
+        return nombre, campo.source, _archivo(campo, modelo, serializador.context.get("request"))
+    if isinstance(campo, serializers.UUIDField):
+        return nombre, campo.source, str if campo.uuid_format == "hex_verbose" else campo.to_representation
+    if isinstance(campo, serializers.DateTimeField):
+        return nombre, campo.source, _fecha_hora(campo)
+    if isinstance(campo, _CON_FORMATO):
+        return nombre, campo.source, campo.to_representation
+    if isinstance(campo, _IDENTIDAD) and not getattr(campo, "binary", False):
+        return nombre, campo.source, None
+    return None
+
+
+def plan_valores(serializador):
+    """ PlanValores del serializador (instancia, con su contexto) o None. """
+    if not settings.NEWS_LISTAS_POR_VALORES or not getattr(serializador, "por_valores", False):
+        return None
+    modelo = serializador.Meta.model
+    salidas = []
+    for nombre, campo in serializador.fields.items():
+        if campo.write_only:
+            continue
+        salida = _salida(serializador, nombre, campo, modelo)
+        if salida is None:
+            return None
+        salidas.append(salida)
+    return PlanValores(salidas)
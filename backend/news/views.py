@@ -1,7 +1,16 @@
-from django.db.models import Q, F
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Q, F, Prefetch, aprefetch_related_objects, prefetch_related_objects
+from django.db.models.functions import Substr
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, permissions, status, parsers
 from rest_framework.decorators import action
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
@@ -12,6 +21,45 @@ from .serializers import (
     ComentarioSerializer,
     ComentarioRespuestaSerializer,
     LikeSerializer,
+    MARGEN_EXTRACTO,
+    acontexto_comentarios,
+    contexto_comentarios,
+    incluye,
+    representacion_publicaciones,
+)
+from .busqueda import abuscar_publicaciones, buscar_publicaciones
+from .cache_respuestas import (
+    GRUPO_CATEGORIAS,
+    GRUPO_FEED,
+    acachear_respuesta,
+    cachear_respuesta,
+    grupo_publicacion,
+    parametros_normalizados,
+)
+from .condicional import con_validadores, etag_de, no_modificado
+from .contadores import incrementar
+from .eventos import EVENTO_COMENTARIO_ELIMINADO, publicar_evento, respuesta_sse
+from .exportacion import respuesta_exportacion
+from .hilos import cargar_hilos
+from .imagenes import programar_variantes
+from .importacion import FORMATOS, LECTORES, Importacion, autor_de, formato_de, lineas
+from .instrumentacion import AccionMedida
+from .renderers import JSONRapidoParser
+from .valores import plan_valores
+from .tendencia import ORDEN_TENDENCIA, PARAMETRO_ORDEN
+from .subidas import SubidaDirectaLocal, SubidaImagenHandler, get_backend, nueva_subida
+from .likes import alternar_like, dar_like, quitar_like, publicaciones_con_like
+from .vistas import aregistrar_vista, registrar_vista
+from .sincronizacion import (
+    ENTIDAD_COMENTARIO,
+    ENTIDAD_PUBLICACION,
+    registrar_cambios,
+    sincronizar,
+)
+from .pagination import (
+    PublicacionCursorPagination,
+    ComentarioCursorPagination,
+    ComentarioRecientesPagination,
 )
 from .permissions import (
     PuedePublicar,
@@ -20,22 +68,72 @@ from .permissions import (
     EsDuenioComentarioOAdmin,
 )
 
+def profundidad_solicitada(request):
+    """
+    `?profundidad=N` en los listados de comentarios: paginar solo los
+    comentarios principales y anidar respuestas hasta N niveles.
+    """
+    valor = request.query_params.get("profundidad")
+    if valor is None:
+        return None
+    try:
+        return max(0, min(int(valor), settings.NEWS_HILO_PROFUNDIDAD_MAX))
+    except ValueError:
+        return None
+
+
+def filtrar_raices(comentarios, profundidad):
+    return comentarios if profundidad is None else comentarios.filter(profundidad=0)
+
+
+def version_de(publicacion):
+    """ (id, version) para el ETag, de un modelo o de una fila de .values(). """
+    if isinstance(publicacion, dict):
+        return publicacion["id"], publicacion["version"]
+    return publicacion.pk, publicacion.version
+
+
 # -------------------- 🔹 CATEGORÍAS --------------------
-class CategoriaViewSet(viewsets.ModelViewSet):
+class CategoriaViewSet(AccionMedida, viewsets.ModelViewSet):
     queryset = Categoria.objects.all().order_by("nombre")
     serializer_class = CategoriaSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    def get_permissions(self):
+        # Leer categorías es público (filtros del feed); escribir sigue siendo de admin
+        if self.action in ["list", "retrieve"]:
+            return [AllowAny()]
+        return super().get_permissions()
+
+    @cachear_respuesta(lambda view, kwargs: [GRUPO_CATEGORIAS])
+    def list(self, request, *args, **kwargs):
+        plan = plan_valores(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(plan.convertir(queryset.values(*plan.columnas)))
+
 
 # -------------------- 🔹 PUBLICACIONES --------------------
-class PublicacionViewSet(viewsets.ModelViewSet):
+# Acciones con representación a pedido (?vista=, ?fields=, ?expand=)
+ACCIONES_REPRESENTACION = ("list", "retrieve")
+
+
+class PublicacionViewSet(AccionMedida, viewsets.ModelViewSet):
     serializer_class = PublicacionSerializer
-    parser_classes = [parsers.MultiPartParser, parsers.FormParser, parsers.JSONParser]
+    pagination_class = PublicacionCursorPagination
+    parser_classes = [parsers.MultiPartParser, parsers.FormParser, JSONRapidoParser]
     permission_classes = [AllowAny]  # 👈 por defecto, todo el mundo puede leer
+    orden_cursor = None  # llave keyset alternativa (búsqueda por relevancia)
+
+    def initialize_request(self, request, *args, **kwargs):
+        # 🔹 Multipart en streaming: a disco por trozos, con límite y firma verificada
+        request.upload_handlers = [SubidaImagenHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
 
     def get_permissions(self):
-        # 🔹 Crear publicación: debe poder publicar alguien autorizado
-        if self.action == "create":
+        # 🔹 Crear publicación (también en bloque, y el volcado): debe poder publicar alguien autorizado
+        if self.action in ("create", "subida", "importar", "exportar"):
             # si quieres que solo usuarios logueados puedan publicar:
             return [IsAuthenticated(), PuedePublicar()]
 
@@ -44,28 +142,26 @@ class PublicacionViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), EsAutorOAdmin()]
 
         # 🔹 Like / dislike: solo usuarios autenticados
-        if self.action == "like_toggle":
+        if self.action in ["like_toggle", "like", "likes_estado"]:
             return [IsAuthenticated()]
 
         # 🔹 Cualquier otra acción (list, retrieve, listar_comentarios, etc.)
         #     → pública, sin token
         return [AllowAny()]
 
-    def get_queryset(self):
+    def queryset_visible(self):
+        """ Filtros de la query y visibilidad por rol (sin búsqueda; no consulta). """
         user = getattr(self.request, "user", None)
         q = Publicacion.objects.all().order_by("-fecha_publicacion")
 
         categoria = self.request.query_params.get("categoria")
         institucion_id = self.request.query_params.get("institucion_id")
-        texto = self.request.query_params.get("q")
         estado = self.request.query_params.get("estado")
 
         if categoria:
             q = q.filter(categoria_id=categoria)
         if institucion_id:
             q = q.filter(autor_institucion_id=institucion_id)
-        if texto:
-            q = q.filter(Q(titulo__icontains=texto) | Q(contenido__icontains=texto))
         if estado:
             q = q.filter(estado=estado)
 
@@ -85,20 +181,249 @@ class PublicacionViewSet(viewsets.ModelViewSet):
         else:
             # público general (no logueado / estudiante / etc.) solo ve publicado
             q = q.filter(estado="publicado")
+        return q
+
+    def aplicar_orden(self):
+        # 🔹 ?orden=tendencia: keyset sobre el score precalculado (también con búsqueda)
+        if self.request.query_params.get("orden") == PARAMETRO_ORDEN:
+            self.orden_cursor = ORDEN_TENDENCIA
+
+    # 🔹 Representación a pedido: ?vista=compacta|completa (listados), ?fields= y ?expand=
+    def representacion(self):
+        if getattr(self, "_representacion", None) is None:
+            self._representacion = representacion_publicaciones(
+                self.request.query_params, lista=self.action == "list"
+            )
+        return self._representacion
+
+    def get_serializer_class(self):
+        if self.action in ACCIONES_REPRESENTACION:
+            return self.representacion().serializador
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        contexto = super().get_serializer_context()
+        if self.action in ACCIONES_REPRESENTACION:
+            contexto["campos"] = self.representacion().campos
+            contexto["expandir"] = self.representacion().expandir
+        return contexto
+
+    def aligerar(self, q):
+        """ Sin cargar las columnas que la respuesta no muestra (contenido, tsvector, variantes). """
+        representacion = self.representacion()
+        diferidos = ["busqueda"]
+        if not incluye(representacion, "contenido"):
+            diferidos.append("contenido")
+        if not incluye(representacion, "imagen"):
+            diferidos.append("imagen_variantes")
+        q = q.defer(*diferidos)
+        if incluye(representacion, "extracto"):
+            # Solo el principio del contenido, cortado en la BD
+            q = q.annotate(extracto_bd=Substr("contenido", 1, settings.NEWS_EXTRACTO_LARGO + MARGEN_EXTRACTO))
+        return q
+
+    def get_queryset(self):
+        q = self.queryset_visible()
+
+        # 🔹 Búsqueda de texto (full-text en Postgres) sobre lo ya visible
+        texto = (self.request.query_params.get("q") or "").strip()
+        if texto:
+            q, self.orden_cursor = buscar_publicaciones(q, texto)
+        self.aplicar_orden()
+
+        # 🔹 Likes: solo hace falta saber que la publicación es visible
+        if self.action in ["like_toggle", "like"]:
+            q = q.only("id")
+        elif self.action in ACCIONES_REPRESENTACION:
+            q = self.aligerar(q)
 
         return q
 
+    def plan_listado(self):
+        """ Listado por valores (news/valores.py) si la representación lo admite. """
+        if self.action != "list":
+            return None
+        return plan_valores(self.get_serializer())
+
+    def por_valores(self, queryset, plan):
+        """ Solo las columnas del plan, más las del ETag y la llave del cursor. """
+        orden = [c.lstrip("-") for c in self.paginator.get_ordering(self.request, queryset, self)]
+        columnas = dict.fromkeys([*plan.columnas, "id", "version", *orden])
+        return queryset.values(*columnas)
+
+    def necesita_comentarios(self):
+        return self.action not in ACCIONES_REPRESENTACION or incluye(self.representacion(), "comentarios")
+
+    def get_serializer_context_lectura(self, publicaciones):
+        """
+        Precarga los comentarios de las publicaciones (una consulta; los
+        conteos ya son columnas) y arma el contexto con respuestas y autores.
+        Se llama después de comprobar los validadores HTTP. Sin comentarios
+        en la respuesta (?vista=compacta, ?fields=), no consulta nada.
+        """
+        contexto = self.get_serializer_context()
+        if not self.necesita_comentarios():
+            return contexto
+        prefetch_related_objects(
+            publicaciones,
+            Prefetch("comentarios", queryset=Comentario.objects.order_by("fecha_comentario")),
+        )
+        comentarios = [c for pub in publicaciones for c in pub.comentarios.all()]
+        contexto.update(contexto_comentarios(comentarios, hilos_completos=True))
+        return contexto
+
+    # 🔹 Variantes async (ASGI, ver news/asincrono.py): misma lógica, E/S con el ORM async
+    async def aget_queryset(self):
+        q = self.queryset_visible()
+        texto = (self.request.query_params.get("q") or "").strip()
+        if texto:
+            q, self.orden_cursor = await abuscar_publicaciones(q, texto)
+        self.aplicar_orden()
+        if self.action in ACCIONES_REPRESENTACION:
+            q = self.aligerar(q)
+        return q
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        instance = await queryset.filter(pk=self.kwargs["pk"]).afirst()
+        if instance is None:
+            # El mismo cuerpo que get_object_or_404 en la vista sync
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def aget_serializer_context_lectura(self, publicaciones):
+        contexto = self.get_serializer_context()
+        if not self.necesita_comentarios():
+            return contexto
+        await aprefetch_related_objects(
+            publicaciones,
+            Prefetch("comentarios", queryset=Comentario.objects.order_by("fecha_comentario")),
+        )
+        comentarios = [c for pub in publicaciones for c in pub.comentarios.all()]
+        contexto.update(await acontexto_comentarios(comentarios, hilos_completos=True))
+        return contexto
+
+    @cachear_respuesta(lambda view, kwargs: [GRUPO_FEED])
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # 🔹 Sin modelos por fila cuando la representación es plana (?vista=compacta)
+        plan = self.plan_listado()
+        if plan is not None:
+            queryset = self.por_valores(queryset, plan)
+        page = self.paginate_queryset(queryset)
+        publicaciones = list(page if page is not None else queryset)
+
+        # 🔹 Validador de la página: filas, versiones y cursores
+        etag = etag_de(
+            [version_de(p) for p in publicaciones],
+            self.paginator.get_next_link() if page is not None else None,
+            self.paginator.get_previous_link() if page is not None else None,
+        )
+        no_cambio = no_modificado(request, etag)
+        if no_cambio is not None:
+            return no_cambio
+
+        if plan is not None:
+            datos = plan.convertir(publicaciones)
+        else:
+            datos = self.get_serializer(
+                publicaciones,
+                many=True,
+                context=self.get_serializer_context_lectura(publicaciones),
+            ).data
+        if page is not None:
+            return con_validadores(self.get_paginated_response(datos), etag)
+        return con_validadores(Response(datos), etag)
+
+    @cachear_respuesta(
+        lambda view, kwargs: [grupo_publicacion(kwargs["pk"])],
+        al_acertar=lambda view, kwargs: registrar_vista(kwargs["pk"]),
+    )
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        # 🔹 Contador de vistas: se acumula y se vuelca por lotes
+        registrar_vista(instance.pk)
+        instance.vistas += 1
+
+        etag = etag_de(instance.pk, instance.version)
+        no_cambio = no_modificado(request, etag, instance.fecha_actividad)
+        if no_cambio is not None:
+            return no_cambio
+
+        serializer = self.get_serializer(
+            instance, context=self.get_serializer_context_lectura([instance])
+        )
+        return con_validadores(Response(serializer.data), etag, instance.fecha_actividad)
+
+    @acachear_respuesta(lambda view, kwargs: [GRUPO_FEED])
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        plan = self.plan_listado()
+        if plan is not None:
+            queryset = self.por_valores(queryset, plan)
+        publicaciones = await self.paginator.apaginate_queryset(queryset, request, view=self)
+
+        etag = etag_de(
+            [version_de(p) for p in publicaciones],
+            self.paginator.get_next_link(),
+            self.paginator.get_previous_link(),
+        )
+        no_cambio = no_modificado(request, etag)
+        if no_cambio is not None:
+            return no_cambio
+
+        if plan is not None:
+            datos = plan.convertir(publicaciones)
+        else:
+            datos = self.get_serializer(
+                publicaciones,
+                many=True,
+                context=await self.aget_serializer_context_lectura(publicaciones),
+            ).data
+        return con_validadores(self.get_paginated_response(datos), etag)
+
+    @acachear_respuesta(
+        lambda view, kwargs: [grupo_publicacion(kwargs["pk"])],
+        al_acertar=lambda view, kwargs: aregistrar_vista(kwargs["pk"]),
+    )
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+
+        await aregistrar_vista(instance.pk)
+        instance.vistas += 1
+
+        etag = etag_de(instance.pk, instance.version)
+        no_cambio = no_modificado(request, etag, instance.fecha_actividad)
+        if no_cambio is not None:
+            return no_cambio
+
+        serializer = self.get_serializer(
+            instance, context=await self.aget_serializer_context_lectura([instance])
+        )
+        return con_validadores(Response(serializer.data), etag, instance.fecha_actividad)
+
+    # 🔹 Eventos en vivo (SSE, solo ASGI): comentarios, respuestas, borrados y likes
+    async def aeventos(self, request, pk=None):
+        publicacion = await self.aget_object()
+        return respuesta_sse(publicacion.pk)
+
     def perform_create(self, serializer):
-        user = self.request.user
-        rol = (user.rol or "").lower()
-        data = {
-            "autor_id": user.id,
-            "tipo_autor": "institucion" if rol == "institucion" else "usuario",
-            "autor_institucion_id": getattr(user, "institucion_id", None)
-            if rol == "institucion"
-            else None,
-        }
-        serializer.save(**data)
+        con_imagen = bool(serializer.validated_data.get("imagen"))
+        publicacion = serializer.save(**autor_de(self.request.user), variantes_pendientes=con_imagen)
+        if publicacion.imagen:
+            programar_variantes(publicacion.pk)
+
+    def perform_update(self, serializer):
+        # 🔹 Imagen nueva (o quitada): las variantes viejas dejan de valer
+        if "imagen" not in serializer.validated_data:
+            serializer.save()
+            return
+        con_imagen = bool(serializer.validated_data["imagen"])
+        publicacion = serializer.save(imagen_variantes={}, variantes_pendientes=con_imagen)
+        if publicacion.imagen:
+            programar_variantes(publicacion.pk)
 
     @action(detail=True, methods=["delete"], permission_classes=[EsAutorOAdmin])
     def eliminar(self, request, pk=None):
@@ -123,13 +448,75 @@ class PublicacionViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
     def like_toggle(self, request, pk=None):
         pub = self.get_object()
-        user = request.user
-        like = Like.objects.filter(publicacion=pub, usuario_id=user.id).first()
-        if like:
-            like.delete()
-            return Response({"liked": False})
-        Like.objects.create(publicacion=pub, usuario_id=user.id)
-        return Response({"liked": True})
+        liked, likes_count = alternar_like(pub.pk, request.user.id)
+        return Response({"liked": liked, "likes_count": likes_count})
+
+    # 🔹 Like idempotente: PUT marca, DELETE desmarca (repetirlos no cambia nada)
+    @action(detail=True, methods=["put", "delete"], url_path="like")
+    def like(self, request, pk=None):
+        pub = self.get_object()
+        if request.method == "PUT":
+            _, likes_count = dar_like(pub.pk, request.user.id)
+            return Response({"liked": True, "likes_count": likes_count})
+        _, likes_count = quitar_like(pub.pk, request.user.id)
+        return Response({"liked": False, "likes_count": likes_count})
+
+    # 🔹 Estado de like del usuario para una página del feed, en una consulta
+    @action(detail=False, methods=["get"], url_path="likes-estado")
+    def likes_estado(self, request):
+        ids = [i.strip() for i in request.query_params.get("ids", "").split(",") if i.strip()]
+        if len(ids) > settings.NEWS_MAX_PAGE_SIZE:
+            return Response(
+                {"detail": f"Máximo {settings.NEWS_MAX_PAGE_SIZE} ids por consulta."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            ids = [uuid.UUID(i) for i in ids]
+        except ValueError:
+            return Response({"detail": "ids debe ser una lista de UUID separada por comas."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        con_like = publicaciones_con_like(request.user.id, ids, visibles=self.queryset_visible())
+        return Response({str(i): i in con_like for i in ids})
+
+    # 🔹 Subida directa al almacenamiento: devuelve clave + URL firmada
+    @action(detail=False, methods=["post"], url_path="subidas")
+    def subida(self, request):
+        content_type = request.data.get("content_type", "")
+        return Response(nueva_subida(request, content_type), status=status.HTTP_201_CREATED)
+
+    # 🔹 Importación masiva: NDJSON/CSV en streaming, por lotes y con errores por fila
+    @action(detail=False, methods=["post"], url_path="importar")
+    def importar(self, request):
+        formato = formato_de(request)
+        importacion = Importacion(
+            autor_de(request.user),
+            validar=request.query_params.get("validar") == "1",
+            max_filas=settings.NEWS_IMPORTACION_MAX_FILAS,
+        )
+        # Del cuerpo crudo línea a línea (request.data lo leería entero)
+        importacion.ejecutar(LECTORES[formato](lineas(request._request.readline)))
+        reporte = importacion.reporte()
+        sin_validas = reporte["filas"] and not reporte["validas"]
+        return Response(reporte, status=status.HTTP_400_BAD_REQUEST if sin_validas else status.HTTP_200_OK)
+
+    # 🔹 Exportación completa en streaming (?formato=ndjson|csv, mismos filtros que el listado)
+    @action(detail=False, methods=["get"], url_path="exportar")
+    def exportar(self, request):
+        formato = request.query_params.get("formato", "ndjson")
+        if formato not in FORMATOS:
+            return Response({"detail": "formato debe ser ndjson o csv."}, status=status.HTTP_400_BAD_REQUEST)
+        asincrono = isinstance(request._request, ASGIRequest)
+        return respuesta_exportacion(self.queryset_visible(), formato, asincrono=asincrono)
+
+    # 🔹 Sincronización incremental: solo lo creado/cambiado/borrado desde `since`
+    @action(detail=False, methods=["get"], url_path="sync")
+    def sync(self, request):
+        def serializar(publicaciones):
+            contexto = self.get_serializer_context_lectura(publicaciones)
+            return self.get_serializer(publicaciones, many=True, context=contexto).data
+
+        return Response(sincronizar(request, ENTIDAD_PUBLICACION, self.get_queryset(), serializar))
 
     @action(
         detail=True,
@@ -139,16 +526,59 @@ class PublicacionViewSet(viewsets.ModelViewSet):
     )
     def listar_comentarios(self, request, pk=None):
         publicacion = self.get_object()
-        comentarios = Comentario.objects.filter(publicacion=publicacion).order_by(
-            "-fecha_comentario"
+        etag = etag_de(publicacion.pk, publicacion.version, "recientes", parametros_normalizados(request))
+        no_cambio = no_modificado(request, etag, publicacion.fecha_actividad)
+        if no_cambio is not None:
+            return no_cambio
+
+        profundidad = profundidad_solicitada(request)
+        paginator = ComentarioRecientesPagination()
+        comentarios = paginator.paginate_queryset(
+            filtrar_raices(Comentario.objects.filter(publicacion=publicacion), profundidad),
+            request,
+            view=self,
         )
         serializer = ComentarioSerializer(
-            comentarios, many=True, context={"request": request}
+            comentarios,
+            many=True,
+            context={
+                "request": request,
+                **contexto_comentarios(comentarios, profundidad_max=profundidad),
+            },
         )
-        return Response(serializer.data)
-        
+        return con_validadores(
+            paginator.get_paginated_response(serializer.data), etag, publicacion.fecha_actividad
+        )
+
+    async def alistar_comentarios(self, request, pk=None):
+        publicacion = await self.aget_object()
+        etag = etag_de(publicacion.pk, publicacion.version, "recientes", parametros_normalizados(request))
+        no_cambio = no_modificado(request, etag, publicacion.fecha_actividad)
+        if no_cambio is not None:
+            return no_cambio
+
+        profundidad = profundidad_solicitada(request)
+        paginator = ComentarioRecientesPagination()
+        comentarios = await paginator.apaginate_queryset(
+            filtrar_raices(Comentario.objects.filter(publicacion=publicacion), profundidad),
+            request,
+            view=self,
+        )
+        serializer = ComentarioSerializer(
+            comentarios,
+            many=True,
+            context={
+                "request": request,
+                **await acontexto_comentarios(comentarios, profundidad_max=profundidad),
+            },
+        )
+        return con_validadores(
+            paginator.get_paginated_response(serializer.data), etag, publicacion.fecha_actividad
+        )
+
+
 # -------------------- 🔹 COMENTARIOS --------------------
-class ComentarioViewSet(viewsets.ModelViewSet):
+class ComentarioViewSet(AccionMedida, viewsets.ModelViewSet):
     """
     Gestiona comentarios de las publicaciones:
     - Crear comentario
@@ -157,10 +587,11 @@ class ComentarioViewSet(viewsets.ModelViewSet):
     """
     queryset = Comentario.objects.all().select_related("publicacion")
     serializer_class = ComentarioSerializer
+    pagination_class = ComentarioCursorPagination
     permission_classes = [PuedeComentar]
 
     def get_permissions(self):
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "hilo", "sync"]:
             return [AllowAny()]
         elif self.action in ["destroy"]:
             return [IsAuthenticated(), EsDuenioComentarioOAdmin()]
@@ -179,11 +610,13 @@ class ComentarioViewSet(viewsets.ModelViewSet):
 
         publicacion = get_object_or_404(Publicacion, id=publicacion_id)
 
-        comentario = Comentario.objects.create(
-            publicacion=publicacion,
-            usuario_id=user.id,
-            contenido=contenido
-        )
+        with transaction.atomic():
+            comentario = Comentario.objects.create(
+                publicacion=publicacion,
+                usuario_id=user.id,
+                contenido=contenido
+            )
+            incrementar(publicacion.pk, comentarios_count=1)
 
         serializer = ComentarioSerializer(comentario)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -199,16 +632,20 @@ class ComentarioViewSet(viewsets.ModelViewSet):
             return Response({"detail": "El contenido no puede estar vacío."},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        respuesta = Comentario.objects.create(
-            publicacion=comentario_padre.publicacion,
-            usuario_id=user.id,
-            contenido=contenido
-        )
+        with transaction.atomic():
+            respuesta = Comentario(
+                publicacion=comentario_padre.publicacion,
+                usuario_id=user.id,
+                contenido=contenido
+            )
+            respuesta.colgar_de(comentario_padre)
+            respuesta.save()
 
-        ComentarioRespuesta.objects.create(
-            comentario_padre=comentario_padre,
-            comentario_respuesta=respuesta
-        )
+            ComentarioRespuesta.objects.create(
+                comentario_padre=comentario_padre,
+                comentario_respuesta=respuesta
+            )
+            incrementar(comentario_padre.publicacion_id, comentarios_count=1)
 
         return Response({"detail": "Respuesta creada correctamente."},
                         status=status.HTTP_201_CREATED)
@@ -225,13 +662,116 @@ class ComentarioViewSet(viewsets.ModelViewSet):
             return Response({"detail": "No tienes permiso para eliminar este comentario."},
                             status=status.HTTP_403_FORBIDDEN)
 
-        comentario.delete()
+        with transaction.atomic():
+            # Las respuestas se van con el comentario: sin él quedarían con un
+            # hilo/ruta colgando y fuera de los listados con ?profundidad=
+            ids = list(
+                Comentario.objects.filter(
+                    Q(pk=comentario.pk)
+                    | Q(hilo_id=comentario.hilo_id or comentario.pk, ruta__startswith=f"{comentario.ruta}/")
+                ).values_list("id", flat=True)
+            )
+            # El total de delete() incluye las filas de ComentarioRespuesta en cascada
+            _, borrados = Comentario.objects.filter(pk__in=ids).delete()
+            total = borrados.get(Comentario._meta.label, 0)
+            if total:
+                incrementar(comentario.publicacion_id, comentarios_count=-total)
+                registrar_cambios(ENTIDAD_COMENTARIO, ids, comentario.publicacion_id)
+                for comentario_id in ids:
+                    publicar_evento(
+                        comentario.publicacion_id, EVENTO_COMENTARIO_ELIMINADO, {"id": str(comentario_id)}
+                    )
         return Response({"detail": "Comentario eliminado correctamente."},
                         status=status.HTTP_204_NO_CONTENT)
 
     # 🔹 Listar comentarios por publicación
     @action(detail=False, methods=["get"], url_path="de-publicacion/(?P<pub_id>[^/.]+)")
     def comentarios_de_publicacion(self, request, pub_id=None):
-        comentarios = Comentario.objects.filter(publicacion_id=pub_id).order_by("fecha_comentario")
-        serializer = ComentarioSerializer(comentarios, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Validadores: una lectura de dos columnas de la publicación
+        try:
+            version, fecha_actividad = (
+                Publicacion.objects.filter(pk=pub_id)
+                .values_list("version", "fecha_actividad")
+                .get()
+            )
+        except (Publicacion.DoesNotExist, ValidationError):
+            version, fecha_actividad = None, None
+        etag = etag_de(pub_id, version, "cronologico", parametros_normalizados(request))
+        no_cambio = no_modificado(request, etag, fecha_actividad)
+        if no_cambio is not None:
+            return no_cambio
+
+        profundidad = profundidad_solicitada(request)
+        comentarios = self.paginate_queryset(
+            filtrar_raices(Comentario.objects.filter(publicacion_id=pub_id), profundidad)
+        )
+        serializer = ComentarioSerializer(
+            comentarios,
+            many=True,
+            context=contexto_comentarios(comentarios, profundidad_max=profundidad),
+        )
+        return con_validadores(self.get_paginated_response(serializer.data), etag, fecha_actividad)
+
+    # 🔹 Hilo completo del comentario (una consulta, árbol armado en memoria)
+    @action(detail=True, methods=["get"], url_path="hilo")
+    def hilo(self, request, pk=None):
+        comentario = self.get_object()
+        comentarios = cargar_hilos([comentario.hilo_id or comentario.id])
+        # Sin raíz (borrada antes de que la baja se llevara las respuestas): el pedido
+        raiz = next((c for c in comentarios if c.profundidad == 0), comentario)
+        serializer = self.get_serializer(
+            raiz,
+            context={
+                **self.get_serializer_context(),
+                **contexto_comentarios(comentarios, hilos_completos=True),
+            },
+        )
+        return Response(serializer.data)
+
+    # 🔹 Sincronización incremental (opcionalmente de una sola publicación)
+    @action(detail=False, methods=["get"], url_path="sync")
+    def sync(self, request):
+        filtros = {}
+        publicacion_id = request.query_params.get("publicacion")
+        if publicacion_id:
+            try:
+                filtros["publicacion_id"] = uuid.UUID(publicacion_id)
+            except ValueError:
+                return Response({"detail": "publicacion debe ser un UUID."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        def serializar(comentarios):
+            contexto = {**self.get_serializer_context(), **contexto_comentarios(comentarios)}
+            return self.get_serializer(comentarios, many=True, context=contexto).data
+
+        return Response(
+            sincronizar(request, ENTIDAD_COMENTARIO, Comentario.objects.all(), serializar, **filtros)
+        )
+
+    def list(self, request, *args, **kwargs):
+        comentarios = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(
+            comentarios,
+            many=True,
+            context={**self.get_serializer_context(), **contexto_comentarios(comentarios)},
+        )
+        return self.get_paginated_response(serializer.data)
+
+
+# -------------------- 🔹 SUBIDAS DIRECTAS (stand-in local) --------------------
+class SubidaDirectaLocalView(AccionMedida, APIView):
+    """
+    Recibe el PUT de una subida directa cuando el backend es SubidaDirectaLocal.
+    El token firmado es la credencial (como una URL prefirmada de S3).
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def put(self, request, token):
+        backend = get_backend()
+        clave = backend.verificar(token) if isinstance(backend, SubidaDirectaLocal) else None
+        if clave is None:
+            return Response({"detail": "Token de subida inválido o expirado."},
+                            status=status.HTTP_403_FORBIDDEN)
+        backend.recibir(clave, request._request.read)
+        return Response({"clave": clave}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,200 @@
+"""
+Conteo de vistas con buffer.
+
+Cada `retrieve` registra +1 en un almacén local (por defecto, memoria del
+proceso; configurable con NEWS_VISTAS_ALMACEN) y un hilo de fondo vacía
+los acumulados cada NEWS_VISTAS_FLUSH_INTERVAL segundos, o antes si se alcanzan
+NEWS_VISTAS_FLUSH_SIZE publicaciones distintas (la petición solo despierta
+al hilo: nunca escribe ella), con un único UPDATE ... FROM (VALUES ...) por
+lote. Al apagar el proceso (atexit) se vacía lo pendiente.
+
+Las claves son UUID: el camino de caché acertada recibe el pk de la URL
+como texto y no debe abrir una entrada aparte para la misma publicación.
+"""
+import atexit
+import logging
+import threading
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from .models import Publicacion
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------ 🔹 ALMACENES ------------------
+class AlmacenMemoria:
+    """
+    Acumulados en un dict del proceso (por defecto y en tests).
+    Cualquier clase con sumar/extraer/devolver sirve como almacén.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pendientes = {}
+
+    def sumar(self, publicacion_id, cantidad=1):
+        with self._lock:
+            self._pendientes[publicacion_id] = self._pendientes.get(publicacion_id, 0) + cantidad
+            return len(self._pendientes)
+
+    def extraer(self):
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, {}
+        return pendientes
+
+    def devolver(self, pendientes):
+        for publicacion_id, cantidad in pendientes.items():
+            self.sumar(publicacion_id, cantidad)
+
+
+# ------------------ 🔹 BUFFER ------------------
+class BufferVistas:
+    def __init__(self, almacen, intervalo, tamano):
+        self.almacen = almacen
+        self.intervalo = intervalo
+        self.tamano = tamano
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._detener = threading.Event()
+        self._despertar = threading.Event()
+        self.metricas = {
+            "vistas_registradas": 0,
+            "vistas_volcadas": 0,
+            "vistas_pendientes": 0,
+            "vaciados": 0,
+            "errores": 0,
+        }
+
+    def registrar(self, publicacion_id, cantidad=1):
+        distintos = self.almacen.sumar(publicacion_id, cantidad)
+        with self._lock:
+            self.metricas["vistas_registradas"] += cantidad
+            self.metricas["vistas_pendientes"] += cantidad
+        self._asegurar_hilo()
+        if distintos >= self.tamano:
+            self._despertar.set()
+
+    def vaciar(self):
+        """ Vuelca los acumulados en la BD. Devuelve el total de vistas escritas. """
+        pendientes = self.almacen.extraer()
+        if not pendientes:
+            return 0
+        total = sum(pendientes.values())
+        try:
+            escribir_vistas(pendientes)
+        except Exception:
+            logger.exception("No se pudieron volcar %s vistas; se reintentará", total)
+            self.almacen.devolver(pendientes)
+            with self._lock:
+                self.metricas["errores"] += 1
+            return 0
+        with self._lock:
+            self.metricas["vistas_volcadas"] += total
+            self.metricas["vistas_pendientes"] = max(0, self.metricas["vistas_pendientes"] - total)
+            self.metricas["vaciados"] += 1
+        return total
+
+    def detener(self):
+        self._detener.set()
+        self._despertar.set()
+        self.vaciar()
+
+    def _asegurar_hilo(self):
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="news-vistas", daemon=True)
+                self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            # Cada `intervalo`, o antes si `registrar` llegó al tamaño del lote
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            if self._detener.is_set():
+                return
+            try:
+                self.vaciar()
+            finally:
+                connection.close()
+
+
+def escribir_vistas(pendientes):
+    """
+    Aplica {publicacion_id: vistas} en un solo UPDATE.
+    Postgres: UPDATE ... FROM (VALUES ...); otros motores: un F() por fila
+    dentro de una transacción. Las filas se actualizan en orden de id para
+    que dos workers vaciando a la vez no se bloqueen mutuamente.
+    """
+    pendientes = dict(sorted(pendientes.items(), key=lambda item: str(item[0])))
+    if connection.vendor == "postgresql":
+        tabla = connection.ops.quote_name(Publicacion._meta.db_table)
+        valores = ", ".join(["(%s::uuid, %s)"] * len(pendientes))
+        parametros = []
+        for publicacion_id, cantidad in pendientes.items():
+            parametros += [str(publicacion_id), cantidad]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {tabla} AS p SET vistas = p.vistas + v.cantidad "
+                f"FROM (VALUES {valores}) AS v(id, cantidad) WHERE p.id = v.id",
+                parametros,
+            )
+        return
+
+    with transaction.atomic():
+        for publicacion_id, cantidad in pendientes.items():
+            Publicacion.objects.filter(pk=publicacion_id).update(vistas=F("vistas") + cantidad)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                almacen = import_string(settings.NEWS_VISTAS_ALMACEN)()
+                _buffer = BufferVistas(
+                    almacen,
+                    intervalo=settings.NEWS_VISTAS_FLUSH_INTERVAL,
+                    tamano=settings.NEWS_VISTAS_FLUSH_SIZE,
+                )
+                atexit.register(_buffer.detener)
+    return _buffer
+
+
+def registrar_vista(publicacion_id):
+    """
+    Punto de entrada de las vistas. Si el buffer está desactivado
+    (NEWS_VISTAS_FLUSH_INTERVAL = 0) se escribe directamente con F().
+    """
+    try:
+        publicacion_id = publicacion_id if isinstance(publicacion_id, uuid.UUID) else uuid.UUID(str(publicacion_id))
+    except ValueError:
+        return
+    if settings.NEWS_VISTAS_FLUSH_INTERVAL <= 0:
+        escribir_vistas({publicacion_id: 1})
+        return
+    get_buffer().registrar(publicacion_id)
+
+
+async def aregistrar_vista(publicacion_id):
+    """ Para vistas async: la escritura directa (o un almacén externo) bloquea. """
+    await sync_to_async(registrar_vista)(publicacion_id)
+
+
+def metricas_vistas():
+    """ Contadores de vistas registradas vs. volcadas (para métricas internas). """
+    if _buffer is None:
+        return {}
+    with _buffer._lock:
+        return dict(_buffer.metricas)
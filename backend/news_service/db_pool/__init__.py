@@ -0,0 +1,5 @@
+"""
+Backend de Postgres con pool de conexiones en proceso.
+
+ENGINE = "news_service.db_pool" (ver settings.py, DB_POOL=1).
+"""
@@ -0,0 +1,200 @@
+"""
+Postgres (psycopg2) con un pool de conexiones por proceso.
+
+Django abre una conexión por petición y la cierra al terminar
+(CONN_MAX_AGE = 0); aquí "abrir" es sacar una conexión del pool y
+"cerrar" es devolverla, así que el handshake TLS con la BD se paga una
+vez por conexión del pool y no una vez por petición.
+
+OPTIONS["pool"] = {"max": 4, "timeout": 10, "chequeo": 30}
+- max: conexiones por proceso (por worker de gunicorn)
+- timeout: segundos esperando una conexión libre antes de fallar
+- chequeo: conexiones ociosas más de N segundos se validan con SELECT 1
+"""
+import logging
+import os
+import threading
+import time
+
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+logger = logging.getLogger(__name__)
+
+
+class PoolAgotado(OperationalError):
+    pass
+
+
+class PoolConexiones:
+    def __init__(self, maximo=4, timeout=10.0, chequeo=30.0):
+        self.maximo = maximo
+        self.timeout = timeout
+        self.chequeo = chequeo
+        self._cond = threading.Condition()
+        self._libres = []  # [(conexion, devuelta_en)]
+        self._total = 0
+        self.metricas = {
+            "checkouts": 0,
+            "esperas": 0,
+            "segundos_espera": 0.0,
+            "timeouts": 0,
+            "creadas": 0,
+            "descartadas": 0,
+        }
+
+    def obtener(self, crear):
+        """ Conexión libre y sana, o una nueva con `crear()` si hay cupo. """
+        limite = time.monotonic() + self.timeout
+        esperando_desde = None
+        with self._cond:
+            while True:
+                if self._libres:
+                    conexion, devuelta_en = self._libres.pop()
+                    break
+                if self._total < self.maximo:
+                    self._total += 1
+                    conexion = None
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self.metricas["timeouts"] += 1
+                    raise PoolAgotado(
+                        f"No hay conexiones libres en el pool tras {self.timeout}s "
+                        f"(max={self.maximo})."
+                    )
+                if esperando_desde is None:
+                    esperando_desde = time.monotonic()
+                    self.metricas["esperas"] += 1
+                self._cond.wait(restante)
+            if esperando_desde is not None:
+                self.metricas["segundos_espera"] += time.monotonic() - esperando_desde
+            self.metricas["checkouts"] += 1
+
+        if conexion is not None:
+            if self._sana(conexion, devuelta_en):
+                return conexion
+            # Se reemplaza sin soltar el cupo: si se liberara, otro hilo podría
+            # tomarlo antes de retomarlo y el pool pasaría de `maximo`
+            with self._cond:
+                self._cerrar(conexion)
+
+        try:
+            conexion = crear()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.metricas["creadas"] += 1
+        return conexion
+
+    def devolver(self, conexion):
+        """ Deja la conexión lista para reutilizar (o la descarta si está rota). """
+        try:
+            if conexion.closed:
+                raise OperationalError("conexión cerrada")
+            if not conexion.autocommit:
+                conexion.rollback()
+        except Exception:
+            self._descartar(conexion)
+            return
+        with self._cond:
+            self._libres.append((conexion, time.monotonic()))
+            self._cond.notify()
+
+    def cerrar_todas(self):
+        with self._cond:
+            libres, self._libres = self._libres, []
+        for conexion, _ in libres:
+            self._descartar(conexion)
+
+    def estado(self):
+        with self._cond:
+            return {
+                **self.metricas,
+                "max": self.maximo,
+                "abiertas": self._total,
+                "libres": len(self._libres),
+                "en_uso": self._total - len(self._libres),
+            }
+
+    def _sana(self, conexion, devuelta_en):
+        if conexion.closed:
+            return False
+        if time.monotonic() - devuelta_en < self.chequeo:
+            return True
+        try:
+            with conexion.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not conexion.autocommit:
+                conexion.rollback()
+            return True
+        except Exception:
+            logger.info("Conexión del pool descartada por fallar el chequeo", exc_info=True)
+            return False
+
+    def _cerrar(self, conexion):
+        """ Cierra la conexión sin liberar su cupo (con el lock tomado). """
+        try:
+            conexion.close()
+        except Exception:
+            pass
+        self.metricas["descartadas"] += 1
+
+    def _descartar(self, conexion):
+        with self._cond:
+            self._cerrar(conexion)
+            self._total -= 1
+            self._cond.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def obtener_pool(alias, opciones):
+    """ Un pool por alias y por proceso (los workers de gunicorn hacen fork). """
+    clave = (alias, os.getpid())
+    pool = _pools.get(clave)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(clave)
+            if pool is None:
+                pool = PoolConexiones(
+                    maximo=int(opciones.get("max", 4)),
+                    timeout=float(opciones.get("timeout", 10)),
+                    chequeo=float(opciones.get("chequeo", 30)),
+                )
+                _pools[clave] = pool
+    return pool
+
+
+def metricas_pools():
+    """ {alias: estado del pool} de este proceso. """
+    pid = os.getpid()
+    return {alias: pool.estado() for (alias, p), pool in list(_pools.items()) if p == pid}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        opciones = self.settings_dict["OPTIONS"]
+        pool = obtener_pool(self.alias, opciones.get("pool", {}))
+        # Lo que el backend base fija al conectar, también para conexiones reutilizadas
+        self.isolation_level = IsolationLevel(
+            opciones.get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        return pool.obtener(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            obtener_pool(self.alias, self.settings_dict["OPTIONS"].get("pool", {})).devolver(
+                self.connection
+            )
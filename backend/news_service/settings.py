@@ -1,4 +1,7 @@
+import json
 import os
+import sys
+import tempfile
 from pathlib import Path
 import dj_database_url  # 👈 asegúrate de agregarlo a requirements.txt
 
@@ -18,6 +21,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # búsqueda full-text y trigramas
     "corsheaders",
     "rest_framework",
     "news",  # 👈 app principal
@@ -35,6 +39,32 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# --- Instrumentación por petición (ver news/instrumentacion.py) ---
+NEWS_INSTRUMENTACION = os.getenv("NEWS_INSTRUMENTACION", "1") == "1"
+if NEWS_INSTRUMENTACION:
+    # Primero: mide la petición completa, middlewares incluidos
+    MIDDLEWARE.insert(0, "news.instrumentacion.InstrumentacionMiddleware")
+NEWS_SERVER_TIMING = os.getenv("NEWS_SERVER_TIMING", "1" if DEBUG else "0") == "1"
+NEWS_METRICAS_TOKEN = os.getenv("NEWS_METRICAS_TOKEN", "")  # sin token: /internal/metricas/ solo con DEBUG
+# Consultas máximas por acción ("<basename>.<acción>"); "log" avisa, "error" hace fallar la petición
+NEWS_PRESUPUESTO_MODO = os.getenv("NEWS_PRESUPUESTO_MODO", "log")
+# (medidos en SQLite y Postgres; las escrituras incluyen SAVEPOINT/RELEASE).
+# Env: JSON que se mezcla con estos, p. ej. '{"publicacion.list": 3}'
+NEWS_PRESUPUESTOS_CONSULTAS = {
+    "publicacion.list": 2,
+    "publicacion.retrieve": 4,
+    "publicacion.listar_comentarios": 3,
+    "publicacion.likes_estado": 1,
+    "publicacion.like_toggle": 8,
+    "publicacion.like": 7,
+    "comentario.create": 8,
+    "comentario.responder": 9,
+    "comentario.hilo": 2,
+    "comentario.list": 2,
+    "categoria.list": 1,
+}
+NEWS_PRESUPUESTOS_CONSULTAS.update(json.loads(os.getenv("NEWS_PRESUPUESTOS_CONSULTAS", "{}")))
+
 ROOT_URLCONF = "news_service.urls"
 
 # --- Templates ---
@@ -55,6 +85,30 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "news_service.wsgi.application"
+ASGI_APPLICATION = "news_service.asgi.application"
+
+# --- Modo de servidor (ver entrypoint.sh) ---
+# wsgi: gunicorn sync (por defecto); asgi: gunicorn con workers de uvicorn.
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi").lower()
+# Feed, detalle y comentarios por vistas async (news/asincrono.py)
+NEWS_ASYNC_LECTURAS = os.getenv("NEWS_ASYNC_LECTURAS", "1" if SERVER_MODE == "asgi" else "0") == "1"
+
+# --- Conexiones a la BD ---
+# DB_CONN_MAX_AGE: segundos que se reutiliza una conexión persistente (0 = una por petición).
+#   En ASGI el ORM corre en un hilo distinto por petición y las conexiones
+#   persistentes se acumulan, así que por defecto es 0: usar DB_POOL.
+#   En WSGI con hilos (entrypoint.sh) hay una conexión persistente por hilo:
+#   hasta GUNICORN_WORKERS x GUNICORN_THREADS por instancia, y por réplica.
+# DB_POOL=1: pool en proceso (news_service.db_pool); tamaño por worker de gunicorn.
+# DB_PGBOUNCER=1: detrás de pgbouncer en modo transacción (sin cursores de
+#   servidor ni parámetros de sesión al conectar; el search_path debe fijarse
+#   en el rol: ALTER ROLE ... SET search_path = news_service, public).
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "0" if SERVER_MODE == "asgi" else "60"))
+DB_POOL = os.getenv("DB_POOL", "0") == "1"
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "4"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_CHEQUEO = float(os.getenv("DB_POOL_CHEQUEO", "30"))
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "0") == "1"
 
 DATABASES = {
     "default": {
@@ -64,6 +118,8 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", "postgres"),
         "HOST": os.getenv("POSTGRES_HOST", "db"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -73,17 +129,98 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL:
     db_from_env = dj_database_url.parse(
         DATABASE_URL,
-        conn_max_age=0,          # o 60, pero no infinito
+        conn_max_age=DB_CONN_MAX_AGE,
         conn_health_checks=True  # importante para conexiones muertas
     )
 
     # Asegurar opciones y search_path al esquema de news
+    # (pgbouncer en modo transacción no admite parámetros de arranque)
     options = db_from_env.get("OPTIONS", {})
-    options["options"] = "-c search_path=news_service,public"
+    if not DB_PGBOUNCER:
+        options["options"] = "-c search_path=news_service,public"
     db_from_env["OPTIONS"] = options
 
     DATABASES["default"] = db_from_env
 
+
+def configurar_conexion(db):
+    """ Aplica pool / pgbouncer a una entrada de DATABASES de Postgres. """
+    if "postgresql" not in db["ENGINE"]:
+        return db
+    if DB_POOL:
+        db["ENGINE"] = "news_service.db_pool"
+        db["CONN_MAX_AGE"] = 0  # cada petición devuelve su conexión al pool
+        db.setdefault("OPTIONS", {})["pool"] = {
+            "max": DB_POOL_MAX,
+            "timeout": DB_POOL_TIMEOUT,
+            "chequeo": DB_POOL_CHEQUEO,
+        }
+    if DB_PGBOUNCER:
+        db["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return db
+
+
+configurar_conexion(DATABASES["default"])
+
+# --- Tests: SQLite local, sin Postgres (DB_TEST_POSTGRES=1 para usar la BD configurada) ---
+# La búsqueda cae a icontains (news/busqueda.py). `replica_1` es una segunda
+# SQLite que hace de réplica en los tests del router (news/replicas.py); el
+# router solo se activa en esos tests.
+EN_TESTS = sys.argv[1:2] == ["test"]
+DB_TEST_SQLITE = EN_TESTS and os.getenv("DB_TEST_POSTGRES", "0") != "1"
+if DB_TEST_SQLITE:
+    DATABASES = {
+        "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "test_news.sqlite3"},
+        "replica_1": {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "test_news_replica.sqlite3"},
+    }
+
+# --- Réplicas de lectura (ver news/replicas.py) ---
+# DATABASE_REPLICA_URLS: URLs separadas por comas → alias replica_1, replica_2...
+# Las lecturas de GET/HEAD van a una réplica sana; escrituras y lecturas del
+# mismo cliente durante NEWS_REPLICA_PEGAJOSO segundos después, a la primaria.
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+if DB_TEST_SQLITE:
+    DATABASE_REPLICA_URLS = []  # la réplica de los tests es la SQLite de arriba
+NEWS_REPLICA_PEGAJOSO = int(os.getenv("NEWS_REPLICA_PEGAJOSO", "5"))  # segundos
+NEWS_REPLICA_RETRASO_MAX = float(os.getenv("NEWS_REPLICA_RETRASO_MAX", "10"))  # segundos; más → primaria
+NEWS_REPLICA_RETRASO_CACHE = float(os.getenv("NEWS_REPLICA_RETRASO_CACHE", "1"))  # más → no se cachea
+NEWS_REPLICA_CHEQUEO = float(os.getenv("NEWS_REPLICA_CHEQUEO", "5"))  # segundos entre chequeos
+NEWS_REPLICA_CONNECT_TIMEOUT = int(os.getenv("NEWS_REPLICA_CONNECT_TIMEOUT", "2"))
+
+for numero, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    replica = dj_database_url.parse(url, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=True)
+    if "postgresql" in replica["ENGINE"]:
+        options = replica.setdefault("OPTIONS", {})
+        # Mismo search_path que la primaria
+        if "options" in DATABASES["default"].get("OPTIONS", {}):
+            options["options"] = DATABASES["default"]["OPTIONS"]["options"]
+        # Una réplica caída no debe colgar la petición
+        options.setdefault("connect_timeout", NEWS_REPLICA_CONNECT_TIMEOUT)
+    # En los tests, las réplicas apuntan a la base de test de la primaria
+    replica["TEST"] = {"MIRROR": "default"}
+    DATABASES[f"replica_{numero}"] = configurar_conexion(replica)
+
+DATABASE_ROUTERS = ["news.replicas.RouterReplicas"] if DATABASE_REPLICA_URLS else []
+if DATABASE_REPLICA_URLS:
+    # Después de la instrumentación, antes de todo lo que pueda leer de la BD
+    MIDDLEWARE.insert(MIDDLEWARE.index("corsheaders.middleware.CorsMiddleware") + 1, "news.replicas.ReplicasMiddleware")
+
+# --- Caché (locmem en dev/tests, Redis en producción con REDIS_URL) ---
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # --- Validadores de contraseñas (sin uso por ahora) ---
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -112,22 +249,157 @@ else:
 CORS_ALLOW_ALL_ORIGINS = not bool(CORS_ALLOWED_ORIGINS)
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_HEADERS = ["*"]
+# Para que el front pueda leer la marca de primaria (news/replicas.py)
+CORS_EXPOSE_HEADERS = ["X-Primaria-Hasta"]
 
 # --- JWT global (usado por authentication.py) ---
 JWT_SECRET = os.getenv("JWT_SECRET", SECRET_KEY)
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
+# Llaves extra con `kid` (JWKS local, "oct"/"RSA"); se recarga al cambiar el archivo
+JWT_JWKS_PATH = os.getenv("JWT_JWKS_PATH", "")
+JWT_JWKS_RECARGA = float(os.getenv("JWT_JWKS_RECARGA", "30"))  # segundos entre revisiones
+JWT_LEEWAY = int(os.getenv("JWT_LEEWAY", "0"))  # tolerancia de reloj para exp/nbf
+# Caché de tokens verificados (0 en cualquiera de los dos = sin caché)
+JWT_CACHE_MAX = int(os.getenv("JWT_CACHE_MAX", "10000"))
+JWT_CACHE_TTL = int(os.getenv("JWT_CACHE_TTL", "300"))  # tope; nunca más allá del exp
 
 # --- Django REST Framework ---
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "news.authentication.JWTUserAuthentication",
     ],
+    # JSON con orjson si está instalado (mismo formato; ver news/renderers.py)
+    "DEFAULT_RENDERER_CLASSES": [
+        "news.renderers.JSONRapidoRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "news.renderers.JSONRapidoParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
+# --- JSON rápido y listados por valores (ver news/renderers.py, news/valores.py) ---
+# 0 = JSONRenderer/JSONParser de DRF tal cual
+NEWS_JSON_RAPIDO = os.getenv("NEWS_JSON_RAPIDO", "1") == "1"
+# Listados planos (?vista=compacta, categorías) desde .values(), sin modelos por fila
+NEWS_LISTAS_POR_VALORES = os.getenv("NEWS_LISTAS_POR_VALORES", "1") == "1"
+
+# --- Paginación por cursor (keyset) ---
+NEWS_PAGE_SIZE = int(os.getenv("NEWS_PAGE_SIZE", "20"))
+NEWS_MAX_PAGE_SIZE = int(os.getenv("NEWS_MAX_PAGE_SIZE", "100"))
+# Representación por defecto de los listados de publicaciones: "completa"
+# (contenido y comentarios) o "compacta" (tarjeta con extracto y conteos).
+# Cada petición puede elegir con ?vista=; ver news/serializers.py.
+NEWS_FEED_VISTA = os.getenv("NEWS_FEED_VISTA", "completa")
+NEWS_EXTRACTO_LARGO = int(os.getenv("NEWS_EXTRACTO_LARGO", "200"))  # caracteres
+NEWS_HILO_PROFUNDIDAD_MAX = int(os.getenv("NEWS_HILO_PROFUNDIDAD_MAX", "20"))
+
+# --- Caché de respuestas de lectura (0 = desactivada) ---
+NEWS_CACHE_ALIAS = os.getenv("NEWS_CACHE_ALIAS", "default")
+NEWS_CACHE_RESPUESTAS_TTL = int(os.getenv("NEWS_CACHE_RESPUESTAS_TTL", "60"))
+
+# --- Sincronización incremental (ver news/sincronizacion.py) ---
+NEWS_SYNC_MARGEN = int(os.getenv("NEWS_SYNC_MARGEN", "2"))  # segundos: `reintentar_en` si hay transacciones abiertas
+NEWS_SYNC_LIMITE = int(os.getenv("NEWS_SYNC_LIMITE", "500"))
+NEWS_SYNC_RETENCION_DIAS = int(os.getenv("NEWS_SYNC_RETENCION_DIAS", "30"))
+
+# --- Importación / exportación masiva (ver news/importacion.py, news/exportacion.py) ---
+NEWS_IMPORTACION_LOTE = int(os.getenv("NEWS_IMPORTACION_LOTE", "500"))  # filas por transacción
+NEWS_IMPORTACION_MAX_FILAS = int(os.getenv("NEWS_IMPORTACION_MAX_FILAS", "10000"))  # por petición
+NEWS_IMPORTACION_MAX_ERRORES = int(os.getenv("NEWS_IMPORTACION_MAX_ERRORES", "200"))  # listados en el reporte
+NEWS_IMPORTACION_MAX_LINEA = int(os.getenv("NEWS_IMPORTACION_MAX_LINEA", str(256 * 1024)))  # bytes
+NEWS_EXPORTACION_LOTE = int(os.getenv("NEWS_EXPORTACION_LOTE", "1000"))  # filas por lectura del cursor
+
+# --- Imágenes de publicaciones (ver news/imagenes.py) ---
+NEWS_IMAGEN_MAX_PIXELES = int(os.getenv("NEWS_IMAGEN_MAX_PIXELES", str(40_000_000)))
+NEWS_IMAGEN_LADO_MAX = int(os.getenv("NEWS_IMAGEN_LADO_MAX", "2048"))
+NEWS_IMAGEN_ANCHOS = [int(a) for a in os.getenv("NEWS_IMAGEN_ANCHOS", "320,640,1080").split(",")]
+NEWS_IMAGEN_FORMATOS = os.getenv("NEWS_IMAGEN_FORMATOS", "webp,jpeg").split(",")
+NEWS_IMAGEN_CALIDAD = int(os.getenv("NEWS_IMAGEN_CALIDAD", "80"))
+NEWS_IMAGEN_CALIDAD_ORIGINAL = int(os.getenv("NEWS_IMAGEN_CALIDAD_ORIGINAL", "90"))
+NEWS_IMAGEN_WORKERS = int(os.getenv("NEWS_IMAGEN_WORKERS", "2"))  # 0 = en el mismo hilo
+
+# --- Subidas (ver news/subidas.py) ---
+NEWS_SUBIDA_MAX_BYTES = int(os.getenv("NEWS_SUBIDA_MAX_BYTES", str(10 * 1024 * 1024)))
+NEWS_SUBIDAS_DIRECTAS_BACKEND = os.getenv("NEWS_SUBIDAS_DIRECTAS_BACKEND", "news.subidas.SubidaDirectaLocal")
+NEWS_SUBIDAS_DIRECTAS_EXPIRA = int(os.getenv("NEWS_SUBIDAS_DIRECTAS_EXPIRA", "600"))
+NEWS_SUBIDAS_BUCKET = os.getenv("NEWS_SUBIDAS_BUCKET", "")
+FILE_UPLOAD_TEMP_DIR = os.getenv("FILE_UPLOAD_TEMP_DIR") or None
+
+# --- Resolución de nombres de autores (ver news/autores.py) ---
+NEWS_AUTORES_URL = os.getenv("AUTH_SERVICE_USUARIOS_URL", "")
+NEWS_AUTORES_RESOLUTORES = [
+    r.strip()
+    for r in os.getenv(
+        "NEWS_AUTORES_RESOLUTORES",
+        "news.autores.ResolutorClaimsJWT,news.autores.ResolutorHTTP,news.autores.ResolutorTablaLocal",
+    ).split(",")
+    if r.strip()
+]
+NEWS_AUTORES_TRANSPORTE = os.getenv("NEWS_AUTORES_TRANSPORTE", "news.autores.transporte_urllib")
+NEWS_AUTORES_TRANSPORTE_ASYNC = os.getenv("NEWS_AUTORES_TRANSPORTE_ASYNC", "news.autores.transporte_async")
+NEWS_AUTORES_TIMEOUT = float(os.getenv("NEWS_AUTORES_TIMEOUT", "2"))
+NEWS_AUTORES_CACHE_MAX = int(os.getenv("NEWS_AUTORES_CACHE_MAX", "10000"))
+NEWS_AUTORES_CACHE_TTL = int(os.getenv("NEWS_AUTORES_CACHE_TTL", "300"))
+NEWS_AUTORES_CACHE_TTL_NEGATIVO = int(os.getenv("NEWS_AUTORES_CACHE_TTL_NEGATIVO", "60"))
+
+# --- Feed por tendencia (ver news/tendencia.py) ---
+NEWS_TENDENCIA_PESO_LIKE = float(os.getenv("NEWS_TENDENCIA_PESO_LIKE", "2"))
+NEWS_TENDENCIA_PESO_COMENTARIO = float(os.getenv("NEWS_TENDENCIA_PESO_COMENTARIO", "3"))
+NEWS_TENDENCIA_PESO_VISTA = float(os.getenv("NEWS_TENDENCIA_PESO_VISTA", "0.1"))
+# Segundos en los que una publicación necesita 10× más interacción (≈ 12,5 h)
+NEWS_TENDENCIA_SEGUNDOS = float(os.getenv("NEWS_TENDENCIA_SEGUNDOS", "45000"))
+
+# --- Eventos en vivo por SSE (ver news/eventos.py; solo en modo ASGI) ---
+# Publicar eventos al escribir: por defecto solo si el endpoint SSE existe
+# (lecturas async). Con workers WSGI que escriben y ASGI que sirven el SSE
+# sobre BusPostgres, activarlo también en los WSGI.
+NEWS_EVENTOS = os.getenv("NEWS_EVENTOS", "1" if NEWS_ASYNC_LECTURAS else "0") == "1"
+# Backend vacío = BusPostgres si la BD es Postgres, si no BusMemoria
+NEWS_EVENTOS_BACKEND = os.getenv("NEWS_EVENTOS_BACKEND", "")
+NEWS_EVENTOS_CANAL = os.getenv("NEWS_EVENTOS_CANAL", "news_eventos")
+NEWS_EVENTOS_DSN = os.getenv("NEWS_EVENTOS_DSN", "")  # conexión directa para LISTEN (sin pgbouncer)
+NEWS_SSE_MAX_CONEXIONES = int(os.getenv("NEWS_SSE_MAX_CONEXIONES", "500"))  # por worker
+NEWS_SSE_COLA = int(os.getenv("NEWS_SSE_COLA", "100"))  # eventos pendientes por conexión
+NEWS_SSE_PING = float(os.getenv("NEWS_SSE_PING", "15"))
+NEWS_SSE_DURACION_MAX = float(os.getenv("NEWS_SSE_DURACION_MAX", "300"))
+NEWS_SSE_RETRY_MS = int(os.getenv("NEWS_SSE_RETRY_MS", "3000"))
+
+# --- Conteo de vistas con buffer (0 = escribir cada vista directamente) ---
+NEWS_VISTAS_FLUSH_INTERVAL = float(os.getenv("NEWS_VISTAS_FLUSH_INTERVAL", "5"))
+NEWS_VISTAS_FLUSH_SIZE = int(os.getenv("NEWS_VISTAS_FLUSH_SIZE", "500"))
+NEWS_VISTAS_ALMACEN = os.getenv("NEWS_VISTAS_ALMACEN", "news.vistas.AlmacenMemoria")
 
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# --- Almacenamiento y servido de media (ver news/almacenamiento.py y news/media.py) ---
+NEWS_MEDIA_BACKEND = os.getenv("NEWS_MEDIA_BACKEND", "news.almacenamiento.AlmacenamientoLocal")
+NEWS_MEDIA_MAX_AGE = int(os.getenv("NEWS_MEDIA_MAX_AGE", "3600"))  # nombres no inmutables
+NEWS_MEDIA_X_ACCEL_PREFIX = os.getenv("NEWS_MEDIA_X_ACCEL_PREFIX", "")  # p. ej. /protegido/media
+# Subidas directas pendientes de usar: fuera de MEDIA_ROOT, no se sirven
+NEWS_SUBIDAS_ROOT = os.getenv("NEWS_SUBIDAS_ROOT", os.path.join(tempfile.gettempdir(), "news_subidas"))
+
+STORAGES = {
+    "default": {"BACKEND": NEWS_MEDIA_BACKEND},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "subidas": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": NEWS_SUBIDAS_ROOT},
+    },
+}
+if NEWS_MEDIA_BACKEND.endswith("S3"):
+    # S3 o compatible (MinIO/R2 con AWS_S3_ENDPOINT_URL); requiere django-storages
+    STORAGES["default"]["OPTIONS"] = {
+        "bucket_name": os.getenv("AWS_STORAGE_BUCKET_NAME", ""),
+        "endpoint_url": os.getenv("AWS_S3_ENDPOINT_URL") or None,
+        "custom_domain": os.getenv("AWS_S3_CUSTOM_DOMAIN") or None,
+        "querystring_auth": False,
+        "object_parameters": {"CacheControl": "public, max-age=31536000, immutable"},
+    }
+
 # Si aún no tienes esto:
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
\ No newline at end of file